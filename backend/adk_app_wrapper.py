@@ -5,9 +5,25 @@ Proper ADK App wrapper for Agent Engine deployment
 
 from vertexai import agent_engines
 from deal_sourcing_agent import root_agent
+from streaming import translate_stream
 
 # Wrap the agent in AdkApp for Agent Engine deployment
 app = agent_engines.AdkApp(
     agent=root_agent,
     enable_tracing=True,
-)
\ No newline at end of file
+)
+
+
+def stream_query_with_progress(message: str, user_id: str, session_id: str = None):
+    """Stream text deltas and pipeline progress events from the AdkApp.
+
+    Uses SSE streaming so partial model text is forwarded as it is generated
+    instead of only after each agent turn completes.
+    """
+    events = app.stream_query(
+        message=message,
+        user_id=user_id,
+        session_id=session_id,
+        run_config={"streaming_mode": "sse"},
+    )
+    yield from translate_stream(events)
@@ -15,3 +15,4 @@
 """deal_coordinator_agent for coordinating and synthesizing deal results"""
 
 from .agent import deal_coordinator_agent
+from .scoring import coordinator_agent, scored_deal_coordinator_agent, shortlist_candidates
@@ -18,6 +18,9 @@ from google.adk import Agent
 
 from . import prompt
 
+from utils.model_cascade import CASCADE_AFTER_CALLBACK, CASCADE_BEFORE_CALLBACK
+from utils.model_router import ROUTING_AFTER_CALLBACK, with_model_routing
+
 MODEL = "gemini-2.5-pro"
 
 deal_coordinator_agent = Agent(
@@ -25,4 +28,7 @@ deal_coordinator_agent = Agent(
     name="deal_coordinator_agent",
     instruction=prompt.DEAL_COORDINATOR_AGENT_PROMPT,
     output_key="coordinated_analysis_output",
+    # Cascade mode replaces per-call routing for this agent
+    before_model_callback=CASCADE_BEFORE_CALLBACK or with_model_routing(),
+    after_model_callback=CASCADE_AFTER_CALLBACK or ROUTING_AFTER_CALLBACK,
 )
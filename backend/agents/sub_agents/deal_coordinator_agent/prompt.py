@@ -14,7 +14,26 @@
 
 """deal_coordinator_agent for coordinating and synthesizing deal results"""
 
-DEAL_COORDINATOR_AGENT_PROMPT = """
+from config import OUTPUT_CONFIG
+
+MAX_OPPORTUNITIES = OUTPUT_CONFIG["max_opportunities"]
+
+
+def _rank_range(start: int, end: int) -> str:
+    return f"Rank {start}" if start == end else f"Rank {start}-{end}"
+
+
+def _lower_priority_tiers(limit: int) -> str:
+    """Rank tiers after the first five: 6-10 high, the rest up to `limit` moderate"""
+    tiers = []
+    if limit > 5:
+        tiers.append(f"   * **{_rank_range(6, min(limit, 10))}: High Priority**\n     * [Same structure as above]")
+    if limit > 10:
+        tiers.append(f"   * **{_rank_range(11, limit)}: Moderate Priority**\n     * [Same structure as above]")
+    return "\n\n".join(tiers)
+
+
+DEAL_COORDINATOR_AGENT_PROMPT = f"""
 Agent Role: deal_coordinator_agent
 Tool Usage: No external tools needed - focus on analysis and synthesis.
 
@@ -45,7 +64,7 @@ Look for cross-sector investment themes (e.g., real estate companies in M&A deal
 Opportunity Prioritization:
 Rank all opportunities (both real estate and financial) based on investment attractiveness.
 Consider factors such as deal size, strategic value, timing, market conditions, and alignment with user preferences.
-Identify the top 10-15 most promising opportunities across both categories.
+Identify the top {MAX_OPPORTUNITIES} most promising opportunities across both categories.
 
 Strategic Analysis:
 Identify overarching investment themes and market trends across both datasets.
@@ -73,7 +92,7 @@ The deal_coordinator_agent must return a single, comprehensive coordinated analy
    * Key insights about market conditions and cross-sector themes.
 
 **2. Top Priority Opportunities (Ranked by Investment Attractiveness):**
-   * **Rank 1-5: Highest Priority**
+   * **{_rank_range(1, min(MAX_OPPORTUNITIES, 5))}: Highest Priority**
      * Opportunity Name/Description
      * Category (Real Estate/Financial/Business)
      * Investment Highlights and Strategic Value
@@ -81,11 +100,7 @@ The deal_coordinator_agent must return a single, comprehensive coordinated analy
      * Key Risk Factors and Mitigation Strategies
      * Recommended Next Steps
 
-   * **Rank 6-10: High Priority**
-     * [Same structure as above]
-
-   * **Rank 11-15: Moderate Priority**
-     * [Same structure as above]
+{_lower_priority_tiers(MAX_OPPORTUNITIES)}
 
 **3. Cross-Sector Investment Themes:**
    * **Geographic Hotspots:** Locations with strong activity in both real estate and business deals
@@ -124,4 +139,37 @@ The deal_coordinator_agent must return a single, comprehensive coordinated analy
    * **Reporting Readiness:** Assessment of readiness for final stakeholder reporting
 
 This coordinated analysis will serve as the foundation for the final risk assessment and PDF report generation, ensuring that all discovered opportunities are properly evaluated and prioritized for decision-making.
-"""
\ No newline at end of file
+"""
+OPPORTUNITY_SCORER_PROMPT = """
+Agent Role: opportunity_scorer_agent
+
+Score every candidate investment opportunity in the message from 0 to 100 for investment attractiveness, given the deal_interests and industry_focus in the message. Consider deal size, strategic value, timing, data completeness and fit with the stated interests. Score each candidate independently; other batches are scored in parallel.
+
+Return one score per candidate, using the candidate id exactly as given.
+"""
+
+SHORTLIST_COORDINATION_SUFFIX = """
+
+CANDIDATE SHORTLIST:
+The search results were pre-scored in parallel and only the highest scoring candidates are included below, with their scores. Treat them as real_estate_opportunities_output and financial_news_opportunities_output; candidates_total is the number found before shortlisting and should be reported as the total analyzed.
+
+deal_interests: {deal_interests?}
+industry_focus: {industry_focus?}
+
+{shortlisted_opportunities}
+"""
+
+DEDUPLICATED_COORDINATION_SUFFIX = """
+
+DEDUPLICATED CANDIDATES:
+Listings and deals reported more than once by the searches were merged into single records before this step, keeping the most complete fields of each. Treat the records below as real_estate_opportunities_output and financial_news_opportunities_output; every record is a distinct opportunity, so do not merge or double count them again. entity_resolution gives the number of records found before merging.
+
+deal_interests: {deal_interests?}
+industry_focus: {industry_focus?}
+
+{shortlisted_opportunities}
+"""
+
+ENTITY_RESOLUTION_NOTE = """
+Duplicate listings and deals were merged before scoring, so every candidate is a distinct opportunity; entity_resolution gives the number of records found before merging.
+"""
@@ -0,0 +1,306 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Candidate deduplication and chunked scoring so the coordinator only synthesizes a shortlist"""
+
+import asyncio
+import json
+import re
+import time
+from typing import AsyncGenerator, Dict, Any, List, Optional
+
+from google.adk import Agent
+from google.adk.agents import BaseAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+
+from . import prompt
+from .agent import MODEL, deal_coordinator_agent
+from config import MODELS, OPTIMIZATIONS, SCORING_CONFIG
+from schemas import (
+    CandidateScores,
+    FinancialNewsSearchOutput,
+    RealEstateSearchOutput,
+    parse_structured,
+)
+from utils.agent_runner import run_agent
+from utils.entity_resolution import dedupe_search_outputs
+from utils.model_cascade import CASCADE_AFTER_CALLBACK, CASCADE_BEFORE_CALLBACK
+from utils.model_router import ROUTING_AFTER_CALLBACK, with_model_routing
+from utils.opportunity_ranker import rank_candidates
+
+SCORER_LOCAL = "local"
+SCORER_LLM = "llm"
+SCORER_NUMPY = "numpy"
+CANDIDATE_SCORING = OPTIMIZATIONS["candidate_scoring"]
+ENTITY_RESOLUTION = OPTIMIZATIONS["entity_resolution"]
+
+_WORD = re.compile(r"[a-z0-9]+")
+# Fields whose presence makes a candidate easier to evaluate
+COMPLETENESS_FIELDS = {
+    'real_estate': ('price_usd', 'cap_rate', 'noi_usd', 'location', 'property_type', 'source_url'),
+    'deal': ('value_usd', 'sector', 'location', 'announced_date', 'counterparties', 'source_url'),
+}
+
+opportunity_scorer_agent = Agent(
+    model=MODELS["simple"],
+    name="opportunity_scorer_agent",
+    instruction=prompt.OPPORTUNITY_SCORER_PROMPT,
+    output_schema=CandidateScores,
+    output_key="candidate_scores_output",
+)
+
+
+def extract_candidates(state: Dict[str, Any], deduplicate: bool = False) -> Optional[Dict[str, Any]]:
+    """Split structured search outputs into individually scorable candidates.
+
+    With `deduplicate`, listings and deals reported more than once are merged
+    first and the resolution stats are returned under 'entity_resolution'.
+    Returns None when neither search returned structured output, since free
+    text cannot be split reliably; callers then pass the outputs through.
+    """
+    real_estate = parse_structured(state.get("real_estate_opportunities_output"), RealEstateSearchOutput)
+    financial_news = parse_structured(state.get("financial_news_opportunities_output"), FinancialNewsSearchOutput)
+    if real_estate is None and financial_news is None:
+        return None
+    resolution = None
+    if deduplicate:
+        real_estate, financial_news, resolution = dedupe_search_outputs(real_estate, financial_news)
+
+    candidates = []
+    for i, opp in enumerate(real_estate.opportunities if real_estate else []):
+        candidates.append({'id': f"re-{i}", 'kind': 'real_estate', 'data': opp.model_dump(exclude_none=True)})
+    for i, deal in enumerate(financial_news.deals if financial_news else []):
+        candidates.append({'id': f"deal-{i}", 'kind': 'deal', 'data': deal.model_dump(exclude_none=True)})
+    return {
+        'real_estate': real_estate,
+        'financial_news': financial_news,
+        'candidates': candidates,
+        'entity_resolution': resolution,
+    }
+
+
+def local_score(candidate: Dict[str, Any], interest_terms: set) -> float:
+    """Score 0-100 from keyword fit with the member's interests and data completeness"""
+    data = candidate['data']
+    fields = COMPLETENESS_FIELDS[candidate['kind']]
+    completeness = sum(1 for field in fields if data.get(field)) / len(fields)
+    if interest_terms:
+        words = set(_WORD.findall(json.dumps(data, default=str).lower()))
+        relevance = len(words & interest_terms) / len(interest_terms)
+    else:
+        relevance = 0.5
+    return round(100 * (0.6 * relevance + 0.4 * completeness), 1)
+
+
+def _interest_terms(state: Dict[str, Any]) -> set:
+    text = f"{state.get('deal_interests') or ''} {state.get('industry_focus') or ''}".lower()
+    return {word for word in _WORD.findall(text) if len(word) > 2}
+
+
+async def _score_batch_llm(batch: List[Dict[str, Any]], state: Dict[str, Any]) -> Dict[str, float]:
+    message = (
+        f"deal_interests: {state.get('deal_interests') or 'Broad Investment Focus'}\n"
+        f"industry_focus: {state.get('industry_focus') or 'Multi-Industry Coverage'}\n\n"
+        + "\n".join(json.dumps({'id': c['id'], **c['data']}, default=str) for c in batch)
+    )
+    result = await run_agent(opportunity_scorer_agent, message)
+    scored = parse_structured(result["state"].get("candidate_scores_output") or result["text"], CandidateScores)
+    return {s.id: s.score for s in scored.scores} if scored else {}
+
+
+async def score_candidates(
+    candidates: List[Dict[str, Any]],
+    state: Dict[str, Any],
+    batch_size: int,
+    scorer: str = SCORER_LLM,
+) -> Dict[str, float]:
+    """Score candidates in batches; LLM batches run concurrently.
+
+    Candidates an LLM batch fails to return fall back to the local score, so
+    a truncated batch never silently drops opportunities.
+    """
+    terms = _interest_terms(state)
+    scores = {c['id']: local_score(c, terms) for c in candidates}
+    if scorer != SCORER_LLM:
+        return scores
+
+    batches = [candidates[i:i + batch_size] for i in range(0, len(candidates), batch_size)]
+    for batch_scores in await asyncio.gather(*(_score_batch_llm(b, state) for b in batches)):
+        scores.update({cid: score for cid, score in batch_scores.items() if cid in scores})
+    return scores
+
+
+def _dump(output) -> Optional[Dict[str, Any]]:
+    return output.model_dump(exclude_none=True) if output is not None else None
+
+
+async def shortlist_candidates(
+    state: Dict[str, Any],
+    top_k: Optional[int] = None,
+    deduplicate: Optional[bool] = None,
+    score: bool = True,
+) -> Dict[str, Any]:
+    """Reduce both search outputs to the top-K scored, deduplicated candidates.
+
+    Args:
+        state: Session state holding both search outputs
+        top_k: Candidates to keep, SCORING_CONFIG["top_k"] by default
+        deduplicate: Merge duplicate listings and deals first, on when
+            ENTITY_RESOLUTION is enabled
+        score: Score and cut to top-K; with False the outputs are only deduplicated
+
+    Returns:
+        Dictionary with the shortlisted search outputs, their scores and
+        scoring stats; outputs are passed through unchanged when they are not
+        structured, and unscored when already within top-K
+    """
+    top_k = top_k or SCORING_CONFIG["top_k"]
+    deduplicate = ENTITY_RESOLUTION if deduplicate is None else deduplicate
+    extracted = extract_candidates(state, deduplicate=deduplicate)
+    if extracted is None:
+        return {
+            'real_estate_opportunities_output': state.get("real_estate_opportunities_output"),
+            'financial_news_opportunities_output': state.get("financial_news_opportunities_output"),
+            'stats': {'candidates_total': None, 'shortlisted': None, 'scored': False},
+        }
+    resolution = extracted['entity_resolution']
+    if not score or len(extracted['candidates']) <= top_k:
+        stats = {
+            'candidates_total': len(extracted['candidates']),
+            'shortlisted': len(extracted['candidates']),
+            'scored': False,
+        }
+        if resolution is not None:
+            stats['entity_resolution'] = resolution
+        return {
+            # Unchanged outputs are passed through as found, merged ones re-serialized
+            'real_estate_opportunities_output': (
+                _dump(extracted['real_estate']) if resolution else state.get("real_estate_opportunities_output")
+            ),
+            'financial_news_opportunities_output': (
+                _dump(extracted['financial_news']) if resolution else state.get("financial_news_opportunities_output")
+            ),
+            'stats': stats,
+        }
+
+    started = time.time()
+    candidates = extracted['candidates']
+    scorer = SCORING_CONFIG["scorer"]
+    if scorer == SCORER_NUMPY:
+        top = rank_candidates(candidates, top_k)
+        scores = {c['id']: round(score, 1) for score, c in top}
+        ranked = [c for _, c in top]
+    else:
+        scores = await score_candidates(candidates, state, SCORING_CONFIG["batch_size"], scorer)
+        ranked = sorted(candidates, key=lambda c: scores[c['id']], reverse=True)[:top_k]
+    keep = {c['id'] for c in ranked}
+
+    real_estate, financial_news = extracted['real_estate'], extracted['financial_news']
+    if real_estate is not None:
+        real_estate = real_estate.model_copy(update={'opportunities': [
+            opp for i, opp in enumerate(real_estate.opportunities) if f"re-{i}" in keep
+        ]})
+    if financial_news is not None:
+        financial_news = financial_news.model_copy(update={'deals': [
+            deal for i, deal in enumerate(financial_news.deals) if f"deal-{i}" in keep
+        ]})
+
+    stats = {
+        'candidates_total': len(candidates),
+        'shortlisted': len(ranked),
+        'batches': -(-len(candidates) // SCORING_CONFIG["batch_size"]) if scorer == SCORER_LLM else 0,
+        'scorer': scorer,
+        'scoring_seconds': round(time.time() - started, 2),
+        'scored': True,
+    }
+    if resolution is not None:
+        stats['entity_resolution'] = resolution
+    return {
+        'real_estate_opportunities_output': _dump(real_estate),
+        'financial_news_opportunities_output': _dump(financial_news),
+        'scores': [
+            {'name': c['data'].get('name') or c['data'].get('company'), 'score': scores[c['id']]}
+            for c in ranked
+        ],
+        'stats': stats,
+    }
+
+
+class CandidateShortlistAgent(BaseAgent):
+    """Pipeline stage that writes the scored shortlist into session state"""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        # Deduplication alone also routes through this stage; scoring stays off then
+        shortlist = await shortlist_candidates(
+            dict(ctx.session.state), score=CANDIDATE_SCORING or not ENTITY_RESOLUTION
+        )
+        payload = {
+            'candidates_total': shortlist['stats']['candidates_total'],
+            'real_estate_opportunities_output': shortlist['real_estate_opportunities_output'],
+            'financial_news_opportunities_output': shortlist['financial_news_opportunities_output'],
+            'scores': shortlist.get('scores'),
+        }
+        if 'entity_resolution' in shortlist['stats']:
+            resolution = shortlist['stats']['entity_resolution']
+            payload['entity_resolution'] = {
+                key: resolution[key] for key in ('records_before', 'records_after', 'duplicates_merged')
+            }
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={
+                'shortlisted_opportunities': json.dumps(payload, default=str),
+                'candidate_scoring': shortlist['stats'],
+            }),
+        )
+
+
+if CANDIDATE_SCORING:
+    SHORTLIST_SUFFIX = prompt.SHORTLIST_COORDINATION_SUFFIX + (prompt.ENTITY_RESOLUTION_NOTE if ENTITY_RESOLUTION else "")
+else:
+    SHORTLIST_SUFFIX = prompt.DEDUPLICATED_COORDINATION_SUFFIX
+
+# Same role and output key as deal_coordinator_agent, but it reads only the
+# shortlist from state instead of the full search history
+shortlist_coordinator_agent = Agent(
+    model=MODEL,
+    name="deal_coordinator_agent",
+    instruction=prompt.DEAL_COORDINATOR_AGENT_PROMPT + SHORTLIST_SUFFIX,
+    include_contents='none',
+    output_key="coordinated_analysis_output",
+    before_model_callback=CASCADE_BEFORE_CALLBACK or with_model_routing(),
+    after_model_callback=CASCADE_AFTER_CALLBACK or ROUTING_AFTER_CALLBACK,
+)
+
+scored_deal_coordinator_agent = SequentialAgent(
+    name="scored_deal_coordinator",
+    description=(
+        "Coordinates and prioritizes the real estate and financial search results. "
+        "Merges duplicate candidates and scores them in parallel batches first, "
+        "then synthesizes the top ones."
+    ),
+    sub_agents=[
+        CandidateShortlistAgent(name="candidate_shortlist"),
+        shortlist_coordinator_agent,
+    ],
+)
+
+# Coordinator the root agents delegate to: the shortlist pipeline whenever
+# candidates are deduplicated or scored before synthesis
+coordinator_agent = (
+    scored_deal_coordinator_agent if CANDIDATE_SCORING or ENTITY_RESOLUTION
+    else deal_coordinator_agent
+)
@@ -15,17 +15,41 @@
 """financial_news_agent for finding business deals and financial news"""
 
 from google.adk import Agent
+from google.adk.agents import SequentialAgent
 from google.adk.tools import google_search
 
 from . import prompt
-from config import MODELS
+from config import MODELS, OPTIMIZATIONS
+from schemas import FinancialNewsSearchOutput, STRUCTURED_OUTPUT_INSTRUCTION
 
 MODEL = MODELS["simple"]  # Automatically uses lighter model if optimization enabled
+STRUCTURED = OPTIMIZATIONS["structured_outputs"]
 
-financial_news_agent = Agent(
+# Built-in google_search cannot share a request with the set_model_response
+# tool ADK adds for output_schema, so in structured mode the search stays
+# free text and a tool-less formatter turns its report into the schema
+financial_news_search_agent = Agent(
     model=MODEL,
-    name="financial_news_agent",
+    name="financial_news_search_agent" if STRUCTURED else "financial_news_agent",
     instruction=prompt.FINANCIAL_NEWS_AGENT_PROMPT,
-    output_key="financial_news_opportunities_output",
+    output_key="financial_news_search_results" if STRUCTURED else "financial_news_opportunities_output",
     tools=[google_search],
 )
+
+if STRUCTURED:
+    financial_news_agent = SequentialAgent(
+        name="financial_news_agent",
+        description="Searches financial news for business deals and returns them as structured JSON",
+        sub_agents=[
+            financial_news_search_agent,
+            Agent(
+                model=MODEL,
+                name="financial_news_formatter_agent",
+                instruction=prompt.FINANCIAL_NEWS_FORMATTER_PROMPT + STRUCTURED_OUTPUT_INSTRUCTION,
+                output_schema=FinancialNewsSearchOutput,
+                output_key="financial_news_opportunities_output",
+            ),
+        ],
+    )
+else:
+    financial_news_agent = financial_news_search_agent
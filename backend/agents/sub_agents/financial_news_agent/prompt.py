@@ -119,4 +119,13 @@ The financial_news_agent must return a single, comprehensive report object or st
      * **Deal/Company:** [Company names and deal type]
      * **Announcement Date:** [Date when news was published]
      * **Brief Relevance:** (1-2 sentences on why this opportunity was included)
-"""
\ No newline at end of file
+"""
+FINANCIAL_NEWS_FORMATTER_PROMPT = """
+Agent Role: financial_news_formatter_agent
+Tool Usage: No tools.
+
+Convert the financial news search report below into the response schema. Include every deal in the report and nothing that is not in it.
+
+Financial News search report:
+{financial_news_search_results}
+"""
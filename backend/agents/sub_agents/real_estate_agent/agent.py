@@ -15,17 +15,41 @@
 """real_estate_agent for finding real estate investment opportunities"""
 
 from google.adk import Agent
+from google.adk.agents import SequentialAgent
 from google.adk.tools import google_search
 
 from . import prompt
-from config import MODELS
+from config import MODELS, OPTIMIZATIONS
+from schemas import RealEstateSearchOutput, STRUCTURED_OUTPUT_INSTRUCTION
 
 MODEL = MODELS["simple"]  # Automatically uses lighter model if optimization enabled
+STRUCTURED = OPTIMIZATIONS["structured_outputs"]
 
-real_estate_agent = Agent(
+# Built-in google_search cannot share a request with the set_model_response
+# tool ADK adds for output_schema, so in structured mode the search stays
+# free text and a tool-less formatter turns its report into the schema
+real_estate_search_agent = Agent(
     model=MODEL,
-    name="real_estate_agent",
+    name="real_estate_search_agent" if STRUCTURED else "real_estate_agent",
     instruction=prompt.REAL_ESTATE_AGENT_PROMPT,
-    output_key="real_estate_opportunities_output",
+    output_key="real_estate_search_results" if STRUCTURED else "real_estate_opportunities_output",
     tools=[google_search],
 )
+
+if STRUCTURED:
+    real_estate_agent = SequentialAgent(
+        name="real_estate_agent",
+        description="Searches for real estate investment opportunities and returns them as structured JSON",
+        sub_agents=[
+            real_estate_search_agent,
+            Agent(
+                model=MODEL,
+                name="real_estate_formatter_agent",
+                instruction=prompt.REAL_ESTATE_FORMATTER_PROMPT + STRUCTURED_OUTPUT_INSTRUCTION,
+                output_schema=RealEstateSearchOutput,
+                output_key="real_estate_opportunities_output",
+            ),
+        ],
+    )
+else:
+    real_estate_agent = real_estate_search_agent
@@ -110,4 +110,13 @@ The real_estate_agent must return a single, comprehensive report object or strin
      * **Property:** [Property Name/Address]
      * **Listed Date:** [Date when listing was posted]
      * **Brief Relevance:** (1-2 sentences on why this property was included)
-"""
\ No newline at end of file
+"""
+REAL_ESTATE_FORMATTER_PROMPT = """
+Agent Role: real_estate_formatter_agent
+Tool Usage: No tools.
+
+Convert the real estate search report below into the response schema. Include every listing in the report and nothing that is not in it.
+
+Real Estate search report:
+{real_estate_search_results}
+"""
@@ -15,3 +15,6 @@
 """Risk Analysis Agent for providing the final risk evaluation"""
 
 from .agent import risk_analyst_agent
+from .map_reduce import map_reduce_risk_analysis, run_risk_map_reduce
+from .stress_test import stress_test_opportunities
+from .portfolio import analyze_portfolio
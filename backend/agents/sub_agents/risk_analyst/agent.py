@@ -15,14 +15,37 @@
 """Risk Analysis Agent for providing the final risk evaluation"""
 
 from google.adk import Agent
+from google.adk.tools import FunctionTool
 
 from . import prompt
+from .portfolio import analyze_portfolio
+from .stress_test import stress_test_opportunities
+from config import OPTIMIZATIONS
+from schemas import RiskAssessment, STRUCTURED_OUTPUT_INSTRUCTION
+from utils.model_cascade import CASCADE_AFTER_CALLBACK, CASCADE_BEFORE_CALLBACK
+from utils.model_router import ROUTING_AFTER_CALLBACK, with_model_routing
 
 MODEL="gemini-2.5-pro"
+STRUCTURED = OPTIMIZATIONS["structured_outputs"]
+SIMULATION = OPTIMIZATIONS["risk_simulation"]
+PORTFOLIO = OPTIMIZATIONS["portfolio_analytics"]
 
 risk_analyst_agent = Agent(
     model=MODEL,
     name="risk_analyst_agent",
-    instruction=prompt.RISK_ANALYST_PROMPT,
+    instruction=(
+        prompt.RISK_ANALYST_PROMPT
+        + (prompt.RISK_SIMULATION_SUFFIX if SIMULATION else "")
+        + (prompt.PORTFOLIO_ANALYTICS_SUFFIX if PORTFOLIO else "")
+        + (STRUCTURED_OUTPUT_INSTRUCTION if STRUCTURED else "")
+    ),
+    tools=(
+        ([FunctionTool(func=stress_test_opportunities)] if SIMULATION else [])
+        + ([FunctionTool(func=analyze_portfolio)] if PORTFOLIO else [])
+    ),
+    output_schema=RiskAssessment if STRUCTURED else None,
     output_key="final_risk_assessment_output",
+    # Cascade mode replaces per-call routing for this agent
+    before_model_callback=CASCADE_BEFORE_CALLBACK or with_model_routing(),
+    after_model_callback=CASCADE_AFTER_CALLBACK or ROUTING_AFTER_CALLBACK,
 )
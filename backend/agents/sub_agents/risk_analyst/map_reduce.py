@@ -0,0 +1,217 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Map-reduce risk analysis: risk areas and Tier 1 opportunities in parallel"""
+
+import asyncio
+import json
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+from google.adk import Agent
+from google.adk.tools.tool_context import ToolContext
+
+from . import prompt
+from config import MODELS, OPTIMIZATIONS, RISK_MAP_REDUCE_CONFIG
+from schemas import RiskAssessment, STRUCTURED_OUTPUT_INSTRUCTION, report_data_from_state
+from utils.agent_runner import run_agent
+from utils.portfolio_analytics import portfolio_analytics, portfolio_positions, summary_metrics
+from utils.risk_simulation import deal_parameters, run_risk_simulation
+
+MAP_MODEL = MODELS["simple"]
+REDUCE_MODEL = MODELS["complex"]
+STRUCTURED = OPTIMIZATIONS["structured_outputs"]
+SIMULATION = OPTIMIZATIONS["risk_simulation"]
+PORTFOLIO = OPTIMIZATIONS["portfolio_analytics"]
+
+INPUT_KEYS = (
+    "real_estate_opportunities_output",
+    "financial_news_opportunities_output",
+    "coordinated_analysis_output",
+    "deal_interests",
+    "industry_focus",
+)
+
+risk_area_agents = {
+    area: Agent(
+        model=MAP_MODEL,
+        name=f"risk_{area}_mapper",
+        instruction=prompt.RISK_MAP_PROMPT.format(focus=focus),
+    )
+    for area, focus in prompt.RISK_FOCUS_AREAS.items()
+}
+
+opportunity_risk_agent = Agent(
+    model=MAP_MODEL,
+    name="opportunity_risk_mapper",
+    instruction=prompt.OPPORTUNITY_RISK_MAP_PROMPT,
+)
+
+risk_reduce_agent = Agent(
+    model=REDUCE_MODEL,
+    name="risk_reduce_agent",
+    instruction=(
+        prompt.RISK_ANALYST_PROMPT
+        + prompt.RISK_REDUCE_SUFFIX
+        + (prompt.RISK_SIMULATION_REDUCE_SUFFIX if SIMULATION else "")
+        + (prompt.PORTFOLIO_ANALYTICS_REDUCE_SUFFIX if PORTFOLIO else "")
+        + (STRUCTURED_OUTPUT_INSTRUCTION if STRUCTURED else "")
+    ),
+    output_schema=RiskAssessment if STRUCTURED else None,
+    output_key="final_risk_assessment_output",
+)
+
+
+def _as_text(value: Any) -> str:
+    if value is None:
+        return "(not provided)"
+    return value if isinstance(value, str) else json.dumps(value, default=str)
+
+
+def _inputs_message(state: Dict[str, Any], keys=INPUT_KEYS) -> str:
+    return "\n\n".join(f"{key}:\n{_as_text(state.get(key))}" for key in keys)
+
+
+def tier1_opportunities(state: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """Highest priority opportunities, available when searches returned structured output"""
+    if limit <= 0:
+        return []
+    report_data = report_data_from_state(state)
+    if not report_data:
+        return []
+    return report_data.get("opportunities", [])[:limit]
+
+
+async def _timed(label: str, agent, message: str, state: Dict[str, Any]) -> Tuple[str, str, float]:
+    started = time.time()
+    result = await run_agent(agent, message, state=state)
+    return label, result["text"], time.time() - started
+
+
+async def run_risk_map_reduce(state: Dict[str, Any], include_opportunities: bool = True) -> Dict[str, Any]:
+    """Analyze every risk area (and Tier 1 opportunity) concurrently, then reduce.
+
+    Map calls that fail are left out and listed to the reducer under
+    failed_analyses; RuntimeError is raised only if every map call failed.
+
+    Args:
+        state: Session state holding the search and coordination outputs
+        include_opportunities: Also map each Tier 1 opportunity separately
+
+    Returns:
+        Dictionary with the assembled report, the final_risk_assessment_output
+        value, the failed map calls and stage timings
+    """
+    inputs = _inputs_message(state)
+    # Simulation and portfolio analytics are local NumPy work that costs
+    # milliseconds, so they run before the map stage instead of as map tasks
+    deals = deal_parameters(state) if SIMULATION else []
+    simulation = run_risk_simulation(deals) if deals else None
+    positions = portfolio_positions(state) if PORTFOLIO else []
+    portfolio = portfolio_analytics(positions, risk_simulation=simulation) if positions else None
+    if portfolio:
+        portfolio = {'summary_metrics': summary_metrics(portfolio), **portfolio}
+    portfolio_section = f"\n\nportfolio_analytics:\n{json.dumps(portfolio)}" if portfolio else ""
+
+    calls = [
+        (f"area:{area}", agent, inputs + (portfolio_section if area == "portfolio" else ""))
+        for area, agent in risk_area_agents.items()
+    ]
+    if include_opportunities:
+        context = _inputs_message(state, ("coordinated_analysis_output", "deal_interests", "industry_focus"))
+        for opportunity in tier1_opportunities(state, RISK_MAP_REDUCE_CONFIG["tier1_opportunities"]):
+            message = f"opportunity:\n{json.dumps(opportunity, default=str)}\n\n{context}"
+            calls.append((f"opportunity:{opportunity['name']}", opportunity_risk_agent, message))
+
+    map_started = time.time()
+    # One failed map call must not discard the others; the reducer is told what is missing
+    outcomes = await asyncio.gather(
+        *(_timed(label, agent, message, state) for label, agent, message in calls), return_exceptions=True
+    )
+    map_wall = time.time() - map_started
+    mapped = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+    failed = {
+        label: f"{type(outcome).__name__}: {outcome}"
+        for (label, _, _), outcome in zip(calls, outcomes) if isinstance(outcome, BaseException)
+    }
+    if not mapped:
+        raise RuntimeError(f"Every risk map call failed: {'; '.join(f'{k} ({v})' for k, v in failed.items())}")
+
+    sections = "\n\n".join(f"=== {label} ===\n{text}" for label, text, _ in mapped)
+    if failed:
+        sections += "\n\n=== failed_analyses ===\n" + "\n".join(failed)
+    if simulation:
+        sections += f"\n\n=== risk_simulation ===\n{json.dumps(simulation)}"
+    if portfolio:
+        sections += f"\n\n=== portfolio_analytics ===\n{json.dumps(portfolio)}"
+    reduce_message = (
+        f"deal_interests: {_as_text(state.get('deal_interests'))}\n"
+        f"industry_focus: {_as_text(state.get('industry_focus'))}\n\n{sections}"
+    )
+    reduce_started = time.time()
+    reduced = await run_agent(risk_reduce_agent, reduce_message, state=state)
+    reduce_seconds = time.time() - reduce_started
+
+    return {
+        "report": reduced["text"],
+        "final_risk_assessment_output": reduced["state"].get("final_risk_assessment_output", reduced["text"]),
+        "risk_simulation_output": simulation,
+        "portfolio_analytics_output": portfolio,
+        "failed_analyses": failed,
+        "timing": {
+            "map_tasks": len(calls),
+            "map_wall_seconds": round(map_wall, 2),
+            # What the map stage would have cost run one after another
+            "map_sequential_seconds": round(sum(seconds for _, _, seconds in mapped), 2),
+            "reduce_seconds": round(reduce_seconds, 2),
+        },
+    }
+
+
+async def map_reduce_risk_analysis(
+    include_opportunities: bool = True,
+    tool_context: Optional[ToolContext] = None,
+) -> Dict[str, Any]:
+    """Risk analyst: generate the final risk analysis report for the discovered opportunities.
+
+    Call after both searches and the deal coordinator have run. Each risk
+    area and Tier 1 opportunity is analyzed in parallel and assembled into
+    one report.
+
+    Args:
+        include_opportunities: Also produce a separate risk profile per Tier 1 opportunity
+
+    Returns:
+        Dictionary with the full risk analysis report and stage timings
+    """
+    state = tool_context.state.to_dict() if tool_context is not None else {}
+    if not state.get("coordinated_analysis_output"):
+        return {
+            "success": False,
+            "error": "Coordinated analysis is missing; run both searches and the deal coordinator first",
+        }
+
+    try:
+        result = await run_risk_map_reduce(state, include_opportunities)
+    except RuntimeError as e:
+        return {"success": False, "error": str(e)}
+    if tool_context is not None:
+        tool_context.state["final_risk_assessment_output"] = result["final_risk_assessment_output"]
+        for key in ("risk_simulation_output", "portfolio_analytics_output"):
+            if result[key]:
+                tool_context.state[key] = result[key]
+    response = {"success": True, "report": result["report"], "timing": result["timing"]}
+    if result["failed_analyses"]:
+        response["failed_analyses"] = list(result["failed_analyses"])
+    return response
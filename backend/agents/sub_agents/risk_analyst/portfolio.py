@@ -0,0 +1,52 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Portfolio composition and allocation tool for the risk analyst"""
+
+from typing import Dict, Any, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from utils.portfolio_analytics import portfolio_analytics, portfolio_positions, summary_metrics
+
+
+def analyze_portfolio(allocate: bool = True, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
+    """Compute exact portfolio composition, concentration and a suggested allocation.
+
+    Call once before writing the OPPORTUNITY PORTFOLIO ANALYSIS section
+    instead of counting or estimating these numbers yourself.
+
+    Args:
+        allocate: Also compute long-only mean-variance allocation weights
+
+    Returns:
+        Dictionary with the category mix, market and sector concentration
+        (HHI on a 0-10,000 scale, shares by dollar size), deal size statistics
+        and histogram, executive summary metric strings, and allocation
+        weights with expected portfolio return and volatility
+    """
+    state = tool_context.state.to_dict() if tool_context is not None else {}
+    positions = portfolio_positions(state)
+    if not positions:
+        return {"success": False, "error": "No opportunities found in the search results yet"}
+
+    analytics = portfolio_analytics(
+        positions,
+        allocate=allocate,
+        risk_simulation=state.get("risk_simulation_output"),
+        financial_metrics=state.get("financial_metrics_output"),
+    )
+    if tool_context is not None:
+        tool_context.state["portfolio_analytics_output"] = analytics
+    return {"success": True, "summary_metrics": summary_metrics(analytics), **analytics}
@@ -14,7 +14,9 @@
 
 """Risk Analysis Agent for providing final risk evaluation and PDF-ready report generation"""
 
-RISK_ANALYST_PROMPT = """
+from config import OUTPUT_CONFIG
+
+RISK_ANALYST_PROMPT = f"""
 Objective: Generate a comprehensive risk analysis and PDF-ready report for the discovered investment opportunities from both real estate and financial/business searches. This analysis must evaluate the overall risk profile of the opportunity portfolio, assess individual deal risks, and provide actionable insights for stakeholder decision-making. The output will serve as the final deliverable for the deal sourcing process.
 
 * Given Inputs (These will be strictly provided; do not solicit further input from the user):
@@ -136,7 +138,7 @@ The analysis must cover the following sections in a professional, stakeholder-re
 **APPENDICES**
 
 * **Appendix A: Detailed Opportunity Profiles**
-  * Complete profiles for all top 15 priority opportunities
+  * Complete profiles for all top {OUTPUT_CONFIG['max_opportunities']} priority opportunities
   * Contact information and next steps for each opportunity
   * Key documents and resources for due diligence
 
@@ -155,4 +157,80 @@ The analysis must cover the following sections in a professional, stakeholder-re
 "Important Disclaimer: For Educational and Informational Purposes Only. The investment opportunities and analysis provided in this report, including any analysis, commentary, or potential scenarios, are generated by an AI model and are for educational and informational purposes only. They do not constitute, and should not be interpreted as, financial advice, investment recommendations, endorsements, or offers to buy or sell any securities, real estate, or other financial instruments. Google and its affiliates make no representations or warranties of any kind, express or implied, about the completeness, accuracy, reliability, suitability, or availability with respect to the information provided. Any reliance you place on such information is therefore strictly at your own risk. This is not an offer to buy or sell any security or investment opportunity. Investment decisions should not be made based solely on the information provided here. Investments carry risks, and past performance is not indicative of future results. You should conduct your own thorough research and consult with qualified professionals before making any investment decisions. By using this tool and reviewing these opportunities, you acknowledge that you understand this disclaimer and agree that Google and its affiliates are not liable for any losses or damages arising from your use of or reliance on this information."
 
 This comprehensive report will serve as a professional deliverable for stakeholders, providing the strategic insights and risk analysis necessary for informed investment decision-making based on the AI-powered deal sourcing process.
-"""
\ No newline at end of file
+"""
+# Map-reduce mode: each map call covers one slice of RISK_ANALYST_PROMPT and
+# the reduce call assembles them into the full report structure above.
+
+RISK_FOCUS_AREAS = {
+    "market": """Market and Economic Risks:
+* Interest rate sensitivity and economic cycle risks
+* Industry-specific and sector concentration risks
+* Geographic concentration and market timing risks
+* Liquidity risks and exit strategy considerations""",
+    "operational": """Operational and Execution Risks:
+* Due diligence scope and timeline risks
+* Management bandwidth and expertise risks
+* Technology and systems integration risks
+* Tenant, occupancy, capital expenditure and renovation risks for real estate""",
+    "financial": """Financial and Deal Risks:
+* Property valuation and pricing risks
+* Capital availability and financing risks
+* Integration and execution risks for business deals
+* Competitive and market position risks""",
+    "regulatory": """Regulatory and Legal Risks:
+* Regulatory approval and legal risks for business deals
+* Zoning, permitting and environmental risks for real estate
+* Policy and tax changes affecting the opportunity set""",
+    "portfolio": """Opportunity Portfolio Analysis:
+* Total number of opportunities by category (Real Estate vs. Financial/Business)
+* Geographic distribution and deal size distribution
+* Tier 1 (top 5) opportunities with investment size and risk-return profile
+* Risk-adjusted portfolio construction and capital allocation recommendations""",
+}
+
+RISK_MAP_PROMPT = """
+Objective: Analyze ONE area of a deal sourcing risk report. Other areas are analyzed in parallel by other analysts, so cover only the area below, thoroughly and concisely.
+
+Area:
+{focus}
+
+Inputs: the message contains real_estate_opportunities_output, financial_news_opportunities_output, coordinated_analysis_output, deal_interests and industry_focus.
+
+Output: a markdown section with a heading for the area, an overall Low/Medium/High rating with its key drivers, the specific risks found (naming the opportunity each applies to, or "portfolio-wide"), and a mitigation for each. Do not write an executive summary or disclaimer.
+"""
+
+OPPORTUNITY_RISK_MAP_PROMPT = """
+Objective: Produce a focused risk profile for ONE Tier 1 investment opportunity. Other opportunities are analyzed in parallel.
+
+Inputs: the message contains the opportunity details, plus the coordinated analysis for context.
+
+Output: a short markdown section headed with the opportunity name, covering its strategic value, risk-return profile, the top market, operational, financial and regulatory risks with mitigations, due diligence requirements, and a recommended allocation. Do not write an executive summary or disclaimer.
+"""
+
+RISK_REDUCE_SUFFIX = """
+
+MAP-REDUCE MODE:
+The message contains risk analyses produced in parallel, one per risk area and one per Tier 1 opportunity, all derived from the complete search and coordination results. Treat them as the given inputs: the prerequisite check is satisfied when they are present. Assemble them into the report structure above, reconciling ratings, removing duplication and writing the EXECUTIVE SUMMARY from the combined findings. Do not invent risks the analyses do not support. If a failed_analyses section lists risk areas or opportunities whose analysis failed, say so in the report, mark them as not assessed rather than rating them, and list them under the recommended next steps.
+"""
+
+RISK_SIMULATION_SUFFIX = """
+
+QUANTITATIVE STRESS TESTS:
+Call stress_test_opportunities once before writing the analysis. It simulates thousands of interest rate, vacancy, NOI growth and exit cap scenarios per real estate opportunity. Ground the Financial Risks and the per-opportunity risk-return profiles in its numbers: cite the p5/p50/p95 equity multiple, the 95% value at risk, the probability of loss and the probability of DSCR below 1.0, and name the opportunity that fails the combined stress test first. Do not reproduce the full table; the PDF renders it. If the tool reports no usable opportunities, continue with the qualitative analysis.
+"""
+
+RISK_SIMULATION_REDUCE_SUFFIX = """
+
+The message also contains a risk_simulation section with Monte Carlo and stress test results computed for the real estate opportunities. Use its numbers in the Financial Risks and Tier 1 risk-return profiles instead of estimating them.
+"""
+
+PORTFOLIO_ANALYTICS_SUFFIX = """
+
+PORTFOLIO ANALYTICS:
+Call analyze_portfolio once, before writing the OPPORTUNITY PORTFOLIO ANALYSIS section. Use its exact category counts, market and sector concentration (HHI and largest shares), deal size statistics and allocation weights instead of counting or estimating them. Keep Portfolio Composition to a few sentences interpreting these numbers; the PDF renders the full tables. Base the Risk-Adjusted Portfolio Recommendations on the suggested allocation and say where you depart from it and why.
+"""
+
+PORTFOLIO_ANALYTICS_REDUCE_SUFFIX = """
+
+The message also contains a portfolio_analytics section with exact composition, concentration and allocation figures computed from the search results. Use those numbers in the OPPORTUNITY PORTFOLIO ANALYSIS section and keep it brief.
+"""
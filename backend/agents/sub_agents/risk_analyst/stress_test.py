@@ -0,0 +1,56 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Monte Carlo stress test tool for the risk analyst"""
+
+from typing import Dict, Any, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from utils.risk_simulation import deal_parameters, run_risk_simulation
+
+
+def stress_test_opportunities(
+    ltv: Optional[float] = None,
+    interest_rate: Optional[float] = None,
+    tool_context: Optional[ToolContext] = None,
+) -> Dict[str, Any]:
+    """Simulate levered returns of the real estate opportunities under thousands of scenarios.
+
+    Call once before writing the risk analysis. Uses the price and NOI or cap
+    rate of each listing found by the real estate search and shocks interest
+    rates, vacancy, NOI growth and exit cap rates.
+
+    Args:
+        ltv: Loan-to-value ratio as a fraction, e.g. 0.65; defaults to the configured assumption
+        interest_rate: Annual interest rate as a fraction, e.g. 0.065; defaults to the configured assumption
+
+    Returns:
+        Dictionary with per-opportunity equity multiple and annual return
+        percentiles (p5/p50/p95), 95% value at risk, probability of loss,
+        probability of DSCR below 1.0, deterministic stress multiples and a
+        portfolio summary
+    """
+    state = tool_context.state.to_dict() if tool_context is not None else {}
+    deals = deal_parameters(state)
+    if not deals:
+        return {
+            "success": False,
+            "error": "No opportunity with both a price and an NOI or cap rate was found in the search results",
+        }
+
+    simulation = run_risk_simulation(deals, ltv=ltv, interest_rate=interest_rate)
+    if tool_context is not None:
+        tool_context.state["risk_simulation_output"] = simulation
+    return {"success": True, **simulation}
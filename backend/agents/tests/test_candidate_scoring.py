@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for chunked candidate scoring before coordination"""
+
+import json
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from agents.sub_agents.deal_coordinator_agent import scoring
+from utils.agent_runner import run_agent
+
+
+def _state(listings):
+    return {
+        "deal_interests": "multifamily acquisitions",
+        "industry_focus": "real estate",
+        "real_estate_opportunities_output": {
+            "search_criteria": "multifamily denver",
+            "opportunities": [
+                {"name": f"Listing {i}", "property_type": "multifamily" if i % 2 else "office", "price_usd": 1e6}
+                for i in range(listings)
+            ],
+        },
+        "financial_news_opportunities_output": {
+            "deal_interests": "multifamily acquisitions",
+            "deals": [{"company": "Acme REIT", "deal_type": "M&A", "sector": "multifamily"}],
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_llm_batches_scored_and_top_k_kept(monkeypatch):
+    batches = []
+
+    async def fake_run_agent(agent, message, state=None, user_id="pipeline"):
+        ids = [json.loads(line)["id"] for line in message.splitlines() if line.startswith("{")]
+        batches.append(ids)
+        scores = [{"id": cid, "score": 99 if cid == "re-4" else 10} for cid in ids]
+        return {"text": "", "state": {"candidate_scores_output": {"scores": scores}}}
+
+    monkeypatch.setattr(scoring, "run_agent", fake_run_agent)
+    monkeypatch.setitem(scoring.SCORING_CONFIG, "batch_size", 4)
+    monkeypatch.setitem(scoring.SCORING_CONFIG, "scorer", scoring.SCORER_LLM)
+
+    result = await scoring.shortlist_candidates(_state(10), top_k=3)
+
+    assert len(batches) == 3
+    assert result["stats"]["candidates_total"] == 11
+    assert result["scores"][0] == {"name": "Listing 4", "score": 99}
+    shortlisted = result["real_estate_opportunities_output"]["opportunities"]
+    assert len(shortlisted) + len(result["financial_news_opportunities_output"]["deals"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_shortlist_stage_writes_state(monkeypatch):
+    monkeypatch.setitem(scoring.SCORING_CONFIG, "scorer", scoring.SCORER_LOCAL)
+    stage = scoring.CandidateShortlistAgent(name="candidate_shortlist")
+
+    result = await run_agent(stage, "coordinate", state={**_state(40)})
+
+    assert result["state"]["candidate_scoring"]["shortlisted"] == scoring.SCORING_CONFIG["top_k"]
+    payload = json.loads(result["state"]["shortlisted_opportunities"])
+    assert payload["candidates_total"] == 41
+    # The keyword scorer favours candidates matching the member's interests
+    assert payload["scores"][0]["name"] != "Listing 0"
@@ -0,0 +1,172 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for local entity resolution before coordination"""
+
+import json
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from agents.sub_agents.deal_coordinator_agent import scoring
+from schemas import FinancialNewsSearchOutput, RealEstateSearchOutput
+from utils.entity_resolution import (
+    dedupe_search_outputs,
+    link_across_reports,
+    normalize_address,
+    normalize_company,
+    parse_locality,
+    resolve_entities,
+)
+
+LISTINGS = [
+    {"name": "Maple Court Apartments", "address": "1200 North Maple Street, Suite 4", "location": "Denver, CO",
+     "price_usd": 12_500_000, "source_url": "https://listings.example/maple"},
+    {"name": "Maple Court Apts", "address": "1200 N. Maple St.", "location": "Denver, CO",
+     "price_usd": 12_400_000, "cap_rate": 5.9},
+    {"name": "Maple Court", "location": "Denver, CO", "price_usd": 12_500_000, "noi_usd": 740_000},
+    {"name": "Maple Grove Apartments", "address": "88 Grove Avenue", "location": "Denver, CO", "price_usd": 9_000_000},
+    {"name": "Denver Lofts", "location": "Denver, CO", "price_usd": 4_000_000},
+    {"name": "Austin Lofts", "location": "Austin, TX", "price_usd": 4_000_000},
+]
+DEALS = [
+    {"company": "Acme Holdings, Inc.", "deal_type": "M&A", "value_usd": 250_000_000, "counterparties": ["Blackstone"]},
+    {"company": "ACME Holdings", "deal_type": "M&A", "value_usd": 255_000_000, "sector": "logistics"},
+    {"company": "Acme Holdings Inc", "deal_type": "IPO", "value_usd": 250_000_000},
+    {"company": "Acme Holdings LLC", "deal_type": "M&A", "value_usd": 750_000_000},
+]
+
+
+def _outputs():
+    return (
+        RealEstateSearchOutput(search_criteria="multifamily denver", opportunities=LISTINGS),
+        FinancialNewsSearchOutput(deal_interests="logistics", deals=DEALS),
+    )
+
+
+def test_normalizers_fold_abbreviations_and_legal_suffixes():
+    assert normalize_address("1200 North Maple Street, Suite 4") == normalize_address("1200 N. Maple St.")
+    assert normalize_company("Acme Holdings, Inc.") == normalize_company("ACME Holdings LLC") == "acme"
+
+
+def test_listings_cluster_by_address_and_name():
+    clusters = resolve_entities(LISTINGS, 'listing')
+
+    assert sorted(map(sorted, clusters)) == [[0, 1, 2], [3], [4], [5]]
+
+
+def test_record_without_address_does_not_bridge_two_properties():
+    listings = [
+        {"name": "Maple Court Apartments", "address": "12 Oak St, Austin TX"},
+        {"name": "Maple Court"},
+        {"name": "Maple Court", "address": "900 Elm Ave, Denver CO"},
+    ]
+
+    clusters = resolve_entities(listings, 'listing')
+
+    assert [0, 2] not in map(sorted, clusters)
+    assert not any(len(c) == 3 for c in clusters)
+
+
+def test_same_address_in_different_cities_stays_apart():
+    listings = [
+        {"name": "Sunset Plaza", "address": "100 Main St, Austin TX"},
+        {"name": "Sunset Plaza", "address": "100 Main St, Phoenix AZ"},
+        {"name": "Sunset Plaza", "address": "100 Main Street", "location": "Austin, Texas"},
+    ]
+
+    clusters = resolve_entities(listings, 'listing')
+
+    assert sorted(map(sorted, clusters)) == [[0, 2], [1]]
+
+
+def test_parse_locality_reads_city_and_state():
+    assert parse_locality("Austin, Texas 78701") == ("austin", "tx")
+    assert parse_locality("New York, NY") == ("new york", "ny")
+    assert parse_locality("Phoenix") == ("phoenix", None)
+
+
+def test_deals_in_different_states_stay_apart():
+    deals = [
+        {"company": "Harbor Logistics", "deal_type": "M&A", "location": "Portland, OR"},
+        {"company": "Harbor Logistics Inc", "deal_type": "M&A", "location": "Portland, ME"},
+    ]
+
+    assert sorted(map(sorted, resolve_entities(deals, 'deal'))) == [[0], [1]]
+
+
+def test_deal_type_and_value_gap_keep_deals_apart():
+    clusters = resolve_entities(DEALS, 'deal')
+
+    assert sorted(map(sorted, clusters)) == [[0, 1], [2], [3]]
+
+
+def test_dedupe_merges_fields_and_reports_reduction():
+    real_estate, financial_news, stats = dedupe_search_outputs(*_outputs())
+
+    assert stats['records_before'] == 10 and stats['records_after'] == 7
+    assert stats['duplicates_merged'] == 3
+    assert stats['dedup_ratio'] == pytest.approx(0.3)
+    assert 0 < stats['token_reduction'] < 1
+    assert stats['tokens_after'] < stats['tokens_before']
+    maple = real_estate.opportunities[0]
+    # The most complete record wins and gaps are filled from its duplicates
+    assert maple.source_url and maple.cap_rate == 5.9 and maple.noi_usd == 740_000
+    acme = financial_news.deals[0]
+    assert acme.counterparties == ["Blackstone"] and acme.sector == "logistics"
+
+
+def test_news_deal_about_a_listing_is_merged_across_reports():
+    listings = [
+        {"name": "Maple Court Apartments", "location": "Denver, CO", "price_usd": 12_500_000},
+        {"name": "Harbor Point", "location": "Portland, OR"},
+    ]
+    deals = [
+        {"company": "Maple Court LLC", "deal_type": "M&A", "location": "Denver, Colorado", "value_usd": 12_000_000,
+         "highlights": "Sold to Greystar in an off-market deal", "source_url": "https://news.example/maple"},
+        {"company": "Harbor Point", "deal_type": "M&A", "location": "Portland, ME"},
+        {"company": "Harbor Point Holdings", "deal_type": "M&A"},
+        {"company": "Acme Logistics", "deal_type": "M&A", "location": "Denver, CO"},
+    ]
+
+    assert link_across_reports(listings, deals) == [(0, 0)]
+
+    real_estate, financial_news, stats = dedupe_search_outputs(
+        RealEstateSearchOutput(search_criteria="denver", opportunities=listings),
+        FinancialNewsSearchOutput(deal_interests="real estate", deals=deals),
+    )
+    maple = real_estate.opportunities[0]
+    assert maple.price_usd == 12_500_000 and maple.source_url == "https://news.example/maple"
+    # The two Harbor Point deals merge within the news report but not with the Oregon listing
+    assert [d.company for d in financial_news.deals] == ["Harbor Point", "Acme Logistics"]
+    assert stats['records_after'] == 4 and stats['duplicates_merged'] == 2
+    assert {'kept': "Maple Court Apartments", 'merged': ["Maple Court Apartments", "Maple Court LLC"]} in stats['merged_groups']
+
+
+@pytest.mark.asyncio
+async def test_shortlist_deduplicates_without_scoring():
+    real_estate, financial_news = _outputs()
+    state = {
+        "real_estate_opportunities_output": real_estate.model_dump(),
+        "financial_news_opportunities_output": json.dumps(financial_news.model_dump()),
+    }
+
+    result = await scoring.shortlist_candidates(state, deduplicate=True, score=False)
+
+    assert result["stats"]["scored"] is False
+    assert result["stats"]["candidates_total"] == 7
+    assert result["stats"]["entity_resolution"]["duplicates_merged"] == 3
+    assert len(result["real_estate_opportunities_output"]["opportunities"]) == 4
@@ -0,0 +1,139 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the batch financial metrics engine"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from schemas import Opportunity, RealEstateSearchOutput
+from utils.deal_financing import annual_debt_service, hold_period, loan_balance
+from utils.financial_metrics import (
+    calculate_deal_metrics,
+    compute_metrics,
+    deal_metrics,
+    irr,
+    levered_cash_flows,
+    metric_fields,
+    npv,
+)
+from utils.report_analytics import enrich_report_data
+
+
+class FakeState(dict):
+    def to_dict(self):
+        return dict(self)
+
+
+class FakeToolContext:
+    def __init__(self, state):
+        self.state = FakeState(state)
+
+
+def test_irr_known_values_and_undefined_rows():
+    rates = irr([[-100, 110, 0], [-100, 0, 121], [100, 10, 10], [-100, -10, -1]])
+    assert rates[:2] == pytest.approx([0.10, 0.10])
+    assert np.isnan(rates[2:]).all()
+
+
+def test_irr_zeroes_npv_for_random_deals():
+    rng = np.random.default_rng(1)
+    flows = np.column_stack([-rng.uniform(1e6, 5e6, 300), rng.uniform(5e4, 4e5, (300, 5))])
+    flows[:, -1] += rng.uniform(1e6, 7e6, 300)
+    rates = irr(flows)
+    assert not np.isnan(rates).any()
+    for row, rate in zip(flows[:20], rates[:20]):
+        assert npv(row, rate)[0] == pytest.approx(0.0, abs=1e-4)
+
+
+def test_npv_discounts_from_year_one():
+    assert npv(np.array([[-100.0, 55.0, 60.5]]), 0.10)[0] == pytest.approx(0.0)
+
+
+def test_debt_service_and_balance():
+    assert annual_debt_service(np.array([1e6]), 0.06, 0)[0] == pytest.approx(60_000)
+    payment = annual_debt_service(np.array([1e6]), 0.06, 30)[0]
+    assert payment == pytest.approx(72_648.91, abs=0.01)
+    assert loan_balance(np.array([1e6]), 0.06, 30, 30)[0] == pytest.approx(0.0, abs=1e-6)
+    assert loan_balance(np.array([1e6]), 0.06, 0, 5)[0] == 1e6
+    # Per-cell rates, as the risk simulation passes them, match the scalar results
+    rates = np.array([[0.06, 0.0]])
+    np.testing.assert_allclose(annual_debt_service(np.array([[1e6]]), rates, 30), [[payment, 1e6 / 30]])
+    assert loan_balance(np.array([[1e6]]), rates, 30, 30) == pytest.approx(np.zeros((1, 2)), abs=1e-6)
+
+
+def test_hold_period_totals_match_year_by_year_cash_flows():
+    price, noi = np.array([10e6, 4e6]), np.array([600e3, 200e3])
+    flows = levered_cash_flows(price, noi, 0.65, 0.065, 30, 0.03, 0.005, 5)
+    period = hold_period(price, noi, 0.03, noi / price + 0.005, 0.065, 0.65, 30, 5)
+
+    np.testing.assert_allclose(period['equity'], -flows[:, 0])
+    np.testing.assert_allclose(period['operating_cash_flow'] + period['sale_proceeds'], flows[:, 1:].sum(axis=1))
+
+
+def test_cash_flows_and_metrics_interest_only(monkeypatch):
+    import utils.financial_metrics as financial_metrics
+    config = dict(financial_metrics.FINANCIAL_METRICS_CONFIG, noi_growth=0.0, exit_cap_spread=0.0)
+    monkeypatch.setattr(financial_metrics, "FINANCIAL_METRICS_CONFIG", config)
+    monkeypatch.setattr(financial_metrics, "FINANCING_CONFIG", dict(financial_metrics.FINANCING_CONFIG, amortization_years=0))
+    flows = levered_cash_flows(np.array([10e6]), np.array([600e3]), 0.6, 0.05, 0, 0.0, 0.0, 3)
+    # 4M equity in, 300K a year after 300K interest, sold back at 10M with 6M repaid
+    np.testing.assert_allclose(flows, [[-4e6, 300e3, 300e3, 4.3e6]])
+
+    metrics = compute_metrics(
+        np.array([10e6, 2e6]), np.array([600e3, 120e3]), sqft=np.array([50_000, np.nan]),
+        units=np.array([np.nan, 20]), ltv=0.6, interest_rate=0.05, hold_years=3,
+    )
+    assert metrics['irr'][0] == pytest.approx(0.075)
+    assert metrics['cash_on_cash'][0] == pytest.approx(0.075)
+    assert metrics['dscr'][0] == pytest.approx(2.0)
+    assert metrics['equity_multiple'][0] == pytest.approx(4.9e6 / 4e6)
+    assert metrics['price_per_sqft'][0] == 200 and np.isnan(metrics['price_per_sqft'][1])
+    assert metrics['price_per_unit'][1] == 100_000 and np.isnan(metrics['price_per_unit'][0])
+
+
+def test_tool_reads_state_and_filters_names():
+    search = RealEstateSearchOutput(search_criteria="multifamily", opportunities=[
+        Opportunity(name="Maple Court", price_usd=4.5e6, noi_usd=279e3, square_footage=42_000),
+        Opportunity(name="Oak Plaza", price_usd=12.75e6, cap_rate=7.1),
+        Opportunity(name="No Numbers"),
+    ])
+    context = FakeToolContext({"real_estate_opportunities_output": search.model_dump()})
+    result = calculate_deal_metrics(tool_context=context)
+    assert result['success'] and [r['name'] for r in result['opportunities']] == ["Maple Court", "Oak Plaza"]
+    assert result['opportunities'][1]['price_per_sqft'] is None
+    assert context.state["financial_metrics_output"]['assumptions']['hold_years'] == 5
+
+    only = calculate_deal_metrics(names=["oak plaza"], tool_context=context)
+    assert [r['name'] for r in only['opportunities']] == ["Oak Plaza"]
+    assert not calculate_deal_metrics(tool_context=FakeToolContext({}))['success']
+
+
+def test_metric_fields_feed_pdf_opportunities():
+    output = deal_metrics([
+        {'name': 'Maple Court', 'price_usd': 4.5e6, 'noi_usd': 200e3, 'sqft': 42_000},
+    ])
+    fields = metric_fields(output)['maple court']
+    assert fields['price_per_sqft'] == "$107"
+    assert fields['npv'].startswith("-$")
+    assert fields['dscr'].endswith("x") and fields['irr'].endswith("%")
+
+    report_data = {'opportunities': [{'name': 'Maple Court'}, {'name': 'Other'}]}
+    enrich_report_data(report_data, {"financial_metrics_output": output})
+    assert report_data['opportunities'][0]['irr'] == fields['irr']
+    assert 'irr' not in report_data['opportunities'][1]
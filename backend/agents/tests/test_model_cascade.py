@@ -0,0 +1,96 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the light-first model cascade"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from utils.model_cascade import ModelCascade, validate_coordinated_analysis, validate_risk_assessment
+
+GOOD_COORDINATION = """**Total Opportunities Analyzed:** 12
+**1. Executive Summary:**
+* Strong multifamily pipeline
+**2. Top Priority Opportunities (Ranked by Investment Attractiveness):**
+"""
+
+
+def _response(text):
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+class _FakeHeavy:
+    def __init__(self):
+        self.models = []
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.models.append(llm_request.model)
+        yield _response(GOOD_COORDINATION)
+
+
+def test_validators():
+    assert validate_coordinated_analysis(GOOD_COORDINATION, 3, 3) == []
+    assert "missing executive summary" in validate_coordinated_analysis("Total Opportunities Analyzed: 1", 3, 3)
+
+    risk_json = ('{"overall_risk": "Medium", "key_findings": ["ok"], "recommendations": [], "mitigation_strategies": [], '
+                 '"priority_opportunities": ["A", "B", "C"], '
+                 '"risks": [{"category": "market", "description": "x", "severity": "Low"}]}')
+    assert validate_risk_assessment(risk_json, 3, 3) == ["only 1 risk categories"]
+    assert "schema mismatch" in validate_risk_assessment('{"overall_risk": "Medium"}', 3, 3)
+
+
+@pytest.mark.asyncio
+async def test_escalates_only_on_failure():
+    cascade = ModelCascade(light_model="light", heavy_model="heavy")
+    heavy = _FakeHeavy()
+    cascade._heavy_llm = heavy
+    context = SimpleNamespace(invocation_id="inv-1", agent_name="deal_coordinator_agent")
+
+    request = LlmRequest()
+    cascade.before_model(context, request)
+    assert request.model == "light"
+    assert await cascade.after_model(context, _response(GOOD_COORDINATION)) is None
+
+    cascade.before_model(context, LlmRequest())
+    replacement = await cascade.after_model(context, _response("Some notes without structure"))
+    assert replacement.content.parts[0].text == GOOD_COORDINATION
+    assert heavy.models == ["heavy"]
+
+    stats = cascade.report()['agents']['deal_coordinator_agent']
+    assert stats['calls'] == 2
+    assert stats['escalations'] == 1
+    assert stats['escalation_rate'] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_tool_call_steps_are_not_escalated():
+    cascade = ModelCascade(light_model="light", heavy_model="heavy")
+    heavy = _FakeHeavy()
+    cascade._heavy_llm = heavy
+    context = SimpleNamespace(invocation_id="inv-1", agent_name="risk_analyst_agent")
+
+    cascade.before_model(context, LlmRequest())
+    tool_call = LlmResponse(content=types.Content(role="model", parts=[types.Part(
+        function_call=types.FunctionCall(name="run_stress_test", args={"deal": "A"}))]))
+    assert await cascade.after_model(context, tool_call) is None
+
+    assert heavy.models == []
+    assert 'risk_analyst_agent' not in cascade.report()['agents']
@@ -0,0 +1,112 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for per-call model routing"""
+
+import sys
+import os
+
+import pytest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from google.genai import types
+from utils.model_router import ModelRouter
+
+
+def _router(slo=30.0, output_tokens=None):
+    return ModelRouter(
+        light_model="light",
+        heavy_model="heavy",
+        small_input_tokens=500,
+        latency_slo_seconds=slo,
+        default_seconds_per_ktoken={"light": 0.1, "heavy": 0.3},
+        default_seconds_per_output_ktoken={"light": 4.0, "heavy": 12.0},
+        expected_output_tokens=output_tokens or {"search": 1500, "synthesis": 3000, "analysis": 3000, "conversation": 500},
+    )
+
+
+def _message(text):
+    return [types.Content(role="user", parts=[types.Part(text=text)])]
+
+
+def test_routes_by_task_and_size():
+    router = _router()
+    assert router.choose("deal_sourcing_coordinator", _message("hello"))['model'] == "light"
+    assert router.choose("real_estate_agent", _message("x " * 5000))['model'] == "light"
+    assert router.choose("deal_coordinator_agent", _message("listing " * 1000))['model'] == "heavy"
+
+
+def test_heavy_tasks_stay_heavy_for_small_input():
+    router = _router()
+    for agent in ("risk_analyst_agent", "deal_coordinator_agent"):
+        decision = router.choose(agent, _message("assess this deal"))
+        assert decision['model'] == "heavy"
+        assert decision['reason'].startswith("complex input")
+
+
+def test_presenting_stage_is_not_treated_as_chat():
+    router = _router()
+    contents = _message("find deals") + [
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            name="real_estate_agent", response={"result": "listing " * 1000}))]),
+    ]
+    decision = router.choose("deal_sourcing_coordinator", contents)
+    assert decision['stage'] == "presenting"
+    assert decision['model'] == "heavy"
+
+
+def _presenting(result_text):
+    return _message("find deals") + [
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            name="real_estate_agent", response={"result": result_text}))]),
+    ]
+
+
+def test_heavy_tasks_are_never_downgraded_for_large_input():
+    router = _router(slo=5.0)
+    for agent in ("risk_analyst_agent", "deal_coordinator_agent"):
+        decision = router.choose(agent, _message("risk " * 40000))
+        assert decision['model'] == "heavy"
+        assert "over SLO" in decision['reason']
+
+
+def test_latency_is_predicted_from_output_tokens():
+    router = _router()
+    # 40k input tokens with a short answer fits the SLO on the heavy model
+    assert router.predict_latency("heavy", 40000, 500) == pytest.approx(18.0)
+    decision = router.choose("deal_sourcing_coordinator", _presenting("listing " * 20000))
+    assert decision['model'] == "heavy"
+
+    # The same input with a long expected answer does not
+    router = _router(output_tokens={"conversation": 3000})
+    decision = router.choose("deal_sourcing_coordinator", _presenting("listing " * 20000))
+    assert decision['model'] == "light"
+    assert decision['reason'].startswith("latency SLO")
+
+
+def test_observed_latency_and_output_feed_back_into_report():
+    router = _router()
+    decision = router.choose("deal_coordinator_agent", _message("listing " * 1000))
+    assert decision['expected_output_tokens'] == 3000
+
+    router.decisions.append(decision)
+    router.record_latency(decision, 12.3, output_tokens=1000)
+    report = router.report()
+    route = report['routes']["deal_coordinator_agent:heavy"]
+    assert route['calls'] == 1
+    assert route['p50_latency_seconds'] == 12.3
+    assert decision['output_tokens'] == 1000
+    assert report['expected_output_tokens'] == {"deal_coordinator_agent": 1000}
+    assert router.expected_output("deal_coordinator_agent", "synthesis") == 1000
+    # Generation took ~12s for 1k tokens, close to the starting estimate
+    assert report['seconds_per_output_ktoken']["heavy"] == pytest.approx(12.0, rel=0.05)
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for single-pass numeric extraction"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.numeric_extraction import (
+    MISSING_DATE,
+    extract_count,
+    extract_numeric,
+    parse_money,
+)
+from benchmarks.numeric_extraction import per_field_extract, synthetic_report
+
+REPORT = """# Real Estate Opportunities
+
+1. **Maple Court Apartments** - Denver, CO
+   - Asking Price: $4.5M
+   - 6.2% cap, NOI $279K
+   - 48 units, 42,000 sq ft
+   - Listed June 5, 2025
+
+2. **Oak Plaza** (retail)
+   - Price: 12,750,000; Cap Rate: 7.1%
+   - NOI: 905,000
+   - Listed 03/14/2025
+
+## Acme Logistics acquisition
+Acme agreed to buy Beta Freight for 1.2 billion on 2025-02-01. Occupancy 95%.
+"""
+
+
+@pytest.mark.parametrize("token, expected", [
+    ("$4.5M", 4_500_000),
+    ("4,500,000", 4_500_000),
+    ("$850K", 850_000),
+    ("1.2 billion", 1_200_000_000),
+    ("$ 12", 12),
+    ("TBD", None),
+])
+def test_parse_money(token, expected):
+    assert parse_money(token) == expected
+
+
+def test_extract_count_reads_whole_number_only():
+    # The old digit filter turned this line into 12043
+    assert extract_count("Total Opportunities: 1,204 across 3 markets") == 1204
+    assert extract_count("Total opportunities: none") is None
+
+
+def test_extract_numeric_one_row_per_record():
+    rows = list(extract_numeric(REPORT).rows())
+
+    assert len(rows) == 3
+    maple, oak, acme = rows
+    assert maple['price_usd'] == 4_500_000
+    assert maple['cap_rate'] == 6.2
+    assert maple['noi_usd'] == 279_000
+    assert (maple['units'], maple['sqft'], maple['date']) == (48, 42_000, '2025-06-05')
+    assert (oak['price_usd'], oak['cap_rate'], oak['noi_usd']) == (12_750_000, 7.1, 905_000)
+    assert oak['date'] == '2025-03-14'
+    # Occupancy is a percentage but not a cap rate
+    assert acme['price_usd'] == 1_200_000_000
+    assert acme['cap_rate'] is None
+    assert acme['date'] == '2025-02-01'
+    assert REPORT[maple['offset']:].startswith("1. **Maple")
+
+
+def test_first_value_in_record_wins():
+    rows = list(extract_numeric("1. **A**\n   - $2M asking, comps traded at $3M\n").rows())
+    assert rows[0]['price_usd'] == 2_000_000
+
+
+def test_columns_are_typed_numpy_views():
+    columns = extract_numeric(REPORT)
+    arrays = columns.to_numpy()
+
+    assert arrays['price_usd'].dtype == np.float64
+    assert arrays['units'].tolist() == [48, -1, -1]
+    assert arrays['date'][0] != MISSING_DATE
+    assert np.isnan(arrays['sqft'][1])
+
+
+def test_matches_per_field_baseline_on_large_report():
+    text = synthetic_report(500)
+    rows = list(extract_numeric(text).rows())
+    expected = per_field_extract(text)
+
+    assert len(rows) == len(expected) == 500
+    for row, baseline in zip(rows, expected):
+        for column in ('price_usd', 'cap_rate', 'noi_usd', 'sqft', 'units', 'date'):
+            assert row[column] == (pytest.approx(baseline[column]) if column != 'date' else baseline[column])
@@ -0,0 +1,67 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for vectorized opportunity pre-ranking"""
+
+import random
+import sys
+import os
+from datetime import date
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.opportunity_ranker import feature_matrix, normalize, rank_candidates, score_matrix
+
+TODAY = date(2025, 6, 1)
+WEIGHTS = {"cap_rate": 0.35, "noi": 0.2, "price": -0.1, "deal_size": 0.15, "recency": 0.2}
+
+
+def _property(i, cap_rate, price, listed="2025-05-01"):
+    return {'id': f"re-{i}", 'kind': 'real_estate',
+            'data': {'name': f"Listing {i}", 'cap_rate': cap_rate, 'price_usd': price,
+                     'noi_usd': price * cap_rate / 100, 'listed_date': listed}}
+
+
+def test_cap_rate_and_recency_drive_ranking():
+    candidates = [
+        _property(0, 5.0, 4_500_000),
+        _property(1, 7.5, 4_500_000),
+        _property(2, 7.5, 4_500_000, listed="2023-01-01"),
+        {'id': "deal-0", 'kind': 'deal', 'data': {'company': "Acme", 'value_usd': None}},
+    ]
+    ranked = rank_candidates(candidates, k=3, weights=WEIGHTS, today=TODAY)
+    # A stale listing loses to a fresh one despite its higher cap rate
+    assert [c['id'] for _, c in ranked] == ["re-1", "re-0", "re-2"]
+    assert all(0 <= score <= 100 for score, _ in ranked)
+
+
+def test_unknown_values_use_missing_score():
+    raw = feature_matrix([{'id': "deal-0", 'kind': 'deal', 'data': {'announced_date': "not a date"}}], TODAY)
+    assert np.isnan(raw).all()
+    assert (normalize(raw, 90, 0.25) == 0.25).all()
+
+
+def test_streaming_heap_matches_full_sort():
+    rng = random.Random(7)
+    candidates = [
+        _property(i, round(rng.uniform(3, 10), 2), rng.choice([1e6, 5e6, 2e7]),
+                  listed=f"2025-0{rng.randint(1, 5)}-1{rng.randint(0, 9)}")
+        for i in range(5000)
+    ]
+    streamed = rank_candidates(iter(candidates), k=25, weights=WEIGHTS, chunk_size=333, today=TODAY)
+
+    scores = score_matrix(normalize(feature_matrix(candidates, TODAY), 90, 0.25), WEIGHTS)
+    expected = sorted(range(len(candidates)), key=lambda i: (-scores[i], i))[:25]
+    assert [c['id'] for _, c in streamed] == [candidates[i]['id'] for i in expected]
@@ -0,0 +1,109 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for pipeline memoization and in-flight coalescing"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.pipeline_cache import PipelineCache, normalize_criteria
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_normalize_criteria_ignores_case_and_punctuation():
+    assert normalize_criteria("Multifamily, Denver  under $5M", "M&A", None) == \
+        normalize_criteria("multifamily denver under $5m", "m&a", "")
+
+
+def test_hit_after_miss_and_ttl_expiry():
+    cache = PipelineCache(ttl_seconds=0.05)
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+
+    assert cache.get_or_compute("k", compute) == (1, "miss")
+    assert cache.get_or_compute("k", compute) == (1, "hit")
+    time.sleep(0.06)
+    assert cache.get_or_compute("k", compute) == (2, "miss")
+
+
+def test_concurrent_threads_share_one_execution():
+    cache = PipelineCache()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_pipeline():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "report"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow_pipeline)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", slow_pipeline)))
+        for _ in range(3)
+    ]
+    for t in followers:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert sorted(status for _, status in results) == ["coalesced"] * 3 + ["miss"]
+
+
+def test_failures_are_shared_but_not_cached():
+    cache = PipelineCache()
+
+    def failing():
+        raise RuntimeError("search quota exceeded")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute("k", failing)
+    assert cache.get_or_compute("k", lambda: "ok") == ("ok", "miss")
+
+
+def test_invalidate_single_key_and_all():
+    cache = PipelineCache()
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    assert cache.invalidate("a") == 1
+    assert cache.get_or_compute("a", lambda: 3) == (3, "miss")
+    assert cache.invalidate() == 2
+
+
+@pytest.mark.asyncio
+async def test_async_requests_coalesce():
+    cache = PipelineCache()
+    calls = []
+
+    async def pipeline():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"final_risk_assessment_output": "Medium"}
+
+    results = await asyncio.gather(*[cache.get_or_compute_async("k", pipeline) for _ in range(4)])
+    assert len(calls) == 1
+    assert [status for _, status in results].count("coalesced") == 3
@@ -0,0 +1,182 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for portfolio composition, concentration and allocation"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from agents.sub_agents.risk_analyst import analyze_portfolio
+from schemas import Deal, FinancialNewsSearchOutput, Opportunity, RealEstateSearchOutput
+from utils.portfolio_analytics import (
+    concentration,
+    correlation_matrix,
+    mean_variance_weights,
+    portfolio_analytics,
+    portfolio_positions,
+    size_histogram,
+    summary_metrics,
+)
+from config import RISK_SIMULATION_CONFIG
+from utils.report_analytics import enrich_report_data
+
+REAL_ESTATE = RealEstateSearchOutput(search_criteria="multifamily", opportunities=[
+    Opportunity(name="Maple Court", property_type="Multifamily", location="Denver, CO", price_usd=6e6, cap_rate=6.5),
+    Opportunity(name="Oak Plaza", property_type="Retail", location="denver,  CO", price_usd=2e6, cap_rate=7.5),
+    Opportunity(name="Pine Lofts", property_type="multifamily", location="Austin, TX", price_usd=2e6, cap_rate=5.5),
+    Opportunity(name="Unpriced Tower", property_type="Office", location="N/A"),
+])
+NEWS = FinancialNewsSearchOutput(deal_interests="logistics", deals=[
+    Deal(company="Acme Freight", deal_type="M&A", sector="Logistics", location="Austin, TX", value_usd=150e6),
+])
+
+
+class FakeState(dict):
+    def to_dict(self):
+        return dict(self)
+
+
+class FakeToolContext:
+    def __init__(self, state):
+        self.state = FakeState(state)
+
+
+def _state():
+    return {
+        "real_estate_opportunities_output": REAL_ESTATE.model_dump(),
+        "financial_news_opportunities_output": NEWS.model_dump(),
+    }
+
+
+def test_concentration_groups_case_insensitively():
+    result = concentration(["Denver, CO", None, "denver, co", "Austin, TX"], np.array([2.0, 5.0, 1.0, 1.0]))
+    assert result['groups'] == 2
+    assert result['shares'] == [{'name': 'Denver, CO', 'share': 0.75}, {'name': 'Austin, TX', 'share': 0.25}]
+    assert result['hhi'] == 6250 and result['effective_count'] == 1.6
+    assert concentration([None], np.array([1.0]))['hhi'] is None
+
+
+def test_size_histogram_buckets():
+    rows = size_histogram(np.array([0.5e6, 1e6, 4e6, np.nan, 250e6]))
+    counts = {row['bucket']: row['count'] for row in rows}
+    assert counts["Under $1.0M"] == 1
+    assert counts["$1.0M - $5.0M"] == 2
+    assert counts["$100.0M+"] == 1
+    assert sum(counts.values()) == 4
+
+
+def test_correlation_matrix_is_positive_semidefinite():
+    markets = ["Denver", "denver", "Austin", None, None]
+    sectors = ["office", "retail", "office", None, "retail"]
+    matrix = correlation_matrix(markets, sectors)
+    assert np.allclose(np.diag(matrix), 1.0)
+    assert matrix[0, 1] == pytest.approx(0.5) and matrix[0, 2] == pytest.approx(0.4)
+    assert matrix[3, 4] == pytest.approx(0.2)
+    assert np.linalg.eigvalsh(matrix).min() > -1e-12
+
+
+def test_mean_variance_weights_respect_constraints():
+    expected = np.array([0.12, 0.08, 0.06, 0.05])
+    covariance = np.diag([0.04, 0.01, 0.01, 0.01])
+    weights = mean_variance_weights(expected, covariance, risk_aversion=4.0, max_weight=0.4)
+    assert weights.sum() == pytest.approx(1.0)
+    assert (weights >= 0).all() and (weights <= 0.4 + 1e-9).all()
+    # Unconstrained optimum for a lone asset is (mu - shift) / (lambda * var); the cap binds first
+    assert weights[0] == pytest.approx(0.4, abs=1e-6)
+    assert weights[1] > weights[3]
+    # A cap below 1/n would be infeasible, so it is relaxed to equal weight
+    assert mean_variance_weights(expected[:2], covariance[:2, :2], 4.0, 0.1) == pytest.approx([0.5, 0.5])
+
+
+def test_portfolio_analytics_from_structured_state():
+    positions = portfolio_positions(_state())
+    assert [p['category'] for p in positions].count('Business Deal') == 1
+    analytics = portfolio_analytics(positions)
+    assert analytics['positions'] == 5
+    assert analytics['category_counts'] == {'Real Estate': 4, 'Business Deal': 1}
+    markets = analytics['market_concentration']
+    assert markets['groups'] == 2 and markets['shares'][0]['name'] == 'Austin, TX'
+    assert analytics['size']['known'] == 4 and analytics['size']['max_usd'] == 150e6
+
+    allocation = analytics['allocation']
+    assert sum(w['weight'] for w in allocation['weights']) == pytest.approx(1.0, abs=1e-3)
+    # No cap rate, no return comparable with the others
+    assert allocation['excluded'] == ["Unpriced Tower", "Acme Freight"]
+    assert {w['volatility_source'] for w in allocation['weights']} == {'default'}
+
+    metrics = summary_metrics(analytics)
+    assert metrics['geographic_spread'].startswith("2 Markets, largest Austin, TX")
+    assert metrics['avg_deal_size'] == "$40.0M"
+    assert metrics['market_concentration'].endswith("(High)")
+
+
+def test_return_estimates_share_one_basis():
+    growth = RISK_SIMULATION_CONFIG["noi_growth_mean"]
+    positions = portfolio_positions(_state())
+    # A levered IRR is not comparable with the cap rate basis of the others
+    metrics = {'opportunities': [{'name': 'Maple Court', 'price_usd': 6e6, 'noi_usd': 390e3, 'irr': 0.25}]}
+    simulation = {
+        'opportunities': [{'name': 'Pine Lofts', 'cap_rate': 5.5,
+                           'annual_return': {'p5': -0.02, 'p50': 0.14, 'p95': 0.31}}],
+        'assumptions': {'ltv': 0.6},
+    }
+    allocation = portfolio_analytics(positions, risk_simulation=simulation, financial_metrics=metrics)['allocation']
+    rows = {w['name']: w for w in allocation['weights']}
+    assert allocation['return_basis'].startswith('unlevered')
+    assert rows['Maple Court']['expected_return'] == pytest.approx(0.065 + growth, abs=1e-4)
+    assert rows['Pine Lofts']['expected_return'] == pytest.approx(0.055 + growth, abs=1e-4)
+    # The simulated levered range is scaled back to the unlevered basis
+    assert rows['Pine Lofts']['volatility_source'] == 'simulation'
+    assert rows['Pine Lofts']['volatility'] == pytest.approx(0.33 / (2 * 1.6449) * 0.4, abs=1e-4)
+
+
+def test_markdown_positions_take_cap_rates_from_metrics():
+    state = {"real_estate_opportunities_output": (
+        "## Top Opportunities\n1. **Maple Court** - apartment property, $4.5M\n2. **Oak Plaza** - retail property, $2M\n"
+    )}
+    metrics = {'opportunities': [
+        {'name': 'Maple Court', 'price_usd': 4.5e6, 'noi_usd': 279e3},
+        {'name': 'Oak Plaza', 'price_usd': 2e6, 'noi_usd': 150e3},
+    ]}
+    allocation = portfolio_analytics(portfolio_positions(state), financial_metrics=metrics)['allocation']
+    assert allocation['excluded'] == []
+    assert {w['name'] for w in allocation['weights']} <= {"Maple Court", "Oak Plaza"}
+    assert portfolio_analytics(portfolio_positions(state))['allocation'] is None
+
+
+def test_markdown_positions_and_tool():
+    state = {"real_estate_opportunities_output": (
+        "## Top Opportunities\n1. **Maple Court** - apartment property, $4.5M\n2. **Oak Plaza** - retail property, $2M\n"
+    )}
+    positions = portfolio_positions(state)
+    assert [(p['name'], p['size_usd']) for p in positions] == [("Maple Court", 4.5e6), ("Oak Plaza", 2e6)]
+
+    context = FakeToolContext(_state())
+    result = analyze_portfolio(tool_context=context)
+    assert result['success'] and result['summary_metrics']['avg_deal_size'] == "$40.0M"
+    assert context.state["portfolio_analytics_output"]['positions'] == 5
+    assert not analyze_portfolio(tool_context=FakeToolContext({}))['success']
+
+
+def test_enrich_replaces_placeholder_metrics():
+    analytics = portfolio_analytics(portfolio_positions(_state()))
+    report_data = {'executive_summary': {'metrics': {'geographic_spread': 'Multiple Markets'}}, 'risk_analysis': {}}
+    enrich_report_data(report_data, {"portfolio_analytics_output": analytics})
+    assert report_data['executive_summary']['metrics']['geographic_spread'] != 'Multiple Markets'
+    assert report_data['risk_analysis']['allocation']['weights']
+    assert all(row['count'] for row in report_data['risk_analysis']['size_distribution'])
@@ -0,0 +1,158 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the single-pass report parser"""
+
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from utils.pdf_generator import PDFGenerator
+from utils.report_parser import DEFAULT_FINDINGS, ReportParser, parse_report
+from benchmarks.report_parser import synthetic_agent_output
+
+REPORT = """# Deal Sourcing Report
+
+## EXECUTIVE SUMMARY
+Total Opportunities: 12 across 3 markets
+Denver multifamily pricing has softened as supply peaks in 2025.
+We recommend prioritizing value-add multifamily near transit corridors.
+
+## Top Opportunities
+1. **Maple Court Apartments** - Denver, CO
+   - Asking Price: $4.5M, 6.2% cap
+   - 48 units with below-market rents and upside
+2. **Acme Logistics acquisition** - Beta Freight to acquire for $1.2 billion
+   - Strategic M&A consolidating regional freight networks
+
+## Risk Analysis
+Overall risk: High
+- Market risk: rising supply in Denver submarkets
+- Financial risk: refinancing at higher rates
+### Mitigation
+- Lock fixed-rate debt before closing
+"""
+
+
+def test_parse_report_sections():
+    report_data = parse_report(REPORT)
+    summary = report_data['executive_summary']
+    risks = report_data['risk_analysis']
+
+    assert summary['metrics']['total_opportunities'] == 12
+    assert summary['metrics']['real_estate_count'] == 1
+    assert summary['metrics']['business_deals_count'] == 1
+    assert summary['metrics']['avg_deal_size'] == "$4.5M - $1.2B"
+    assert summary['key_findings'] == ["Denver multifamily pricing has softened as supply peaks in 2025."]
+    assert summary['recommendations'] == ["We recommend prioritizing value-add multifamily near transit corridors."]
+    assert risks['overall_risk'] == 'High'
+    assert risks['market_risks'] == ["Market risk: rising supply in Denver submarkets"]
+    assert risks['financial_risks'] == ["Financial risk: refinancing at higher rates"]
+    assert risks['mitigation_strategies'] == ["Lock fixed-rate debt before closing"]
+    assert report_data['additional_content'] == REPORT
+
+
+def test_parse_report_opportunities():
+    maple, acme = parse_report(REPORT)['opportunities']
+
+    assert (maple['name'], maple['category'], maple['investment_size']) == ("Maple Court Apartments", "Real Estate", "$4.5M")
+    assert maple['highlights'] == "Asking Price: $4.5M, 6.2% cap"
+    assert (acme['name'], acme['category'], acme['investment_size']) == ("Acme Logistics acquisition", "Business Deal", "$1.2B")
+
+
+def test_streamed_chunks_match_single_pass():
+    parser = ReportParser()
+    for start in range(0, len(REPORT), 7):
+        parser.feed(REPORT[start:start + 7])
+    assert parser.result() == parse_report(REPORT)
+
+
+def test_report_limit_still_counts_every_opportunity():
+    text = synthetic_agent_output(0.05).replace("Total Opportunities: 40 across 5 markets\n", "")
+    report_data = parse_report(text, max_opportunities=3)
+
+    assert len(report_data['opportunities']) == 3
+    assert report_data['executive_summary']['metrics']['total_opportunities'] == text.count("**Property") + text.count("**Company")
+    assert report_data['risk_analysis']['overall_risk'] == 'Medium'
+
+
+def test_empty_sections_get_defaults():
+    report_data = parse_report("Nothing structured here.")
+    assert report_data['executive_summary']['key_findings'] == DEFAULT_FINDINGS
+    assert all(report_data['risk_analysis'][key] for key in ('market_risks', 'mitigation_strategies'))
+    assert parse_report("", fill_defaults=False)['executive_summary']['key_findings'] == []
+
+
+def test_pdf_generator_uses_shared_parser():
+    report_data = PDFGenerator()._parse_agent_output(REPORT)
+
+    assert report_data['subtitle'] == 'Deal Sourcing Analysis Report'
+    assert [o['name'] for o in report_data['opportunities']] == ["Maple Court Apartments", "Acme Logistics acquisition"]
+    assert '**' not in report_data['additional_content']
+
+
+# Layout the deal_coordinator_agent prompt asks for
+COORDINATED_REPORT = """**Coordinated Investment Opportunities Analysis**
+
+**Report Date:** 2025-06-02
+**Deal Interests Scope:** Broad Investment Focus
+**Total Opportunities Analyzed:** 9
+
+**1. Executive Summary:**
+   * Denver multifamily pricing has softened as supply peaks in 2025.
+
+**2. Top Priority Opportunities (Ranked by Investment Attractiveness):**
+   * **Rank 1-5: Highest Priority**
+     * **Maple Court Apartments** - Denver, CO
+       * Category: Real Estate
+       * Investment Highlights: 48 units with below-market rents
+       * Estimated Investment Size: $4.5M
+     * **Beta Freight acquisition of Acme Logistics**
+       * Category: Business
+       * Estimated Investment Size: $1.2 billion
+     * **Harbor Point**
+       * Investment Highlights: Waterfront redevelopment with public incentives
+
+   * **Rank 6-10: High Priority**
+     * **Summit Ridge Offices** - Austin, TX
+       * Category: Real Estate
+       * Estimated Investment Size: $12M
+
+**3. Cross-Sector Investment Themes:**
+   * **Geographic Hotspots:** Denver and Austin lead activity in both sectors
+   * **Industry Convergence:** Logistics real estate follows freight consolidation
+
+**4. Investment Strategy Recommendations:**
+   * **Immediate Actions:** Recommend submitting an LOI on Maple Court this month
+
+**5. Due Diligence Priorities:**
+   * **Critical Research Gaps:** Rent rolls for Summit Ridge
+"""
+
+
+def test_coordinated_analysis_layout():
+    report_data = parse_report(COORDINATED_REPORT)
+    opportunities = report_data['opportunities']
+    metrics = report_data['executive_summary']['metrics']
+
+    assert [o['name'] for o in opportunities] == [
+        "Maple Court Apartments", "Beta Freight acquisition of Acme Logistics", "Harbor Point", "Summit Ridge Offices",
+    ]
+    assert [o['category'] for o in opportunities] == ["Real Estate", "Business Deal", "", "Real Estate"]
+    assert [o['investment_size'] for o in opportunities] == ["$4.5M", "$1.2B", "TBD", "$12.0M"]
+    assert opportunities[2]['highlights'] == "Investment Highlights: Waterfront redevelopment with public incentives"
+    assert (metrics['total_opportunities'], metrics['real_estate_count'], metrics['business_deals_count']) == (9, 2, 1)
+    assert report_data['executive_summary']['recommendations'] == [
+        "Immediate Actions: Recommend submitting an LOI on Maple Court this month",
+    ]
@@ -0,0 +1,99 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for map-reduce risk analysis"""
+
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from agents.sub_agents.risk_analyst import map_reduce
+
+
+@pytest.mark.asyncio
+async def test_map_calls_run_concurrently(monkeypatch):
+    calls = []
+
+    async def fake_run_agent(agent, message, state=None, user_id="pipeline"):
+        calls.append(agent.name)
+        if agent is map_reduce.risk_reduce_agent:
+            assert "=== area:market ===" in message
+            assert "=== opportunity:Denver Apartments ===" in message
+            return {"text": "EXECUTIVE SUMMARY", "state": {"final_risk_assessment_output": "EXECUTIVE SUMMARY"}}
+        await asyncio.sleep(0.1)
+        return {"text": f"analysis by {agent.name}", "state": {}}
+
+    monkeypatch.setattr(map_reduce, "run_agent", fake_run_agent)
+    state = {
+        "real_estate_opportunities_output": {
+            "search_criteria": "multifamily denver",
+            "opportunities": [{"name": "Denver Apartments", "property_type": "Multifamily"}],
+            "market_insights": [],
+        },
+        "coordinated_analysis_output": "ranked opportunities",
+    }
+
+    result = await map_reduce.run_risk_map_reduce(state)
+
+    assert result["final_risk_assessment_output"] == "EXECUTIVE SUMMARY"
+    assert calls[-1] == "risk_reduce_agent"
+    assert result["timing"]["map_tasks"] == len(map_reduce.risk_area_agents) + 1
+    # Wall clock tracks the longest map call, not their sum
+    assert result["timing"]["map_wall_seconds"] < result["timing"]["map_sequential_seconds"] / 2
+
+
+@pytest.mark.asyncio
+async def test_failed_map_calls_are_listed_to_the_reducer(monkeypatch):
+    async def fake_run_agent(agent, message, state=None, user_id="pipeline"):
+        if agent is map_reduce.risk_reduce_agent:
+            assert "=== area:market ===" in message
+            assert "=== area:regulatory ===" not in message
+            failed = message.split("=== failed_analyses ===\n", 1)[1]
+            assert failed.split("\n", 1)[0] == "area:regulatory"
+            return {"text": "EXECUTIVE SUMMARY", "state": {}}
+        if agent.name == "risk_regulatory_mapper":
+            raise ValueError("malformed model response")
+        return {"text": f"analysis by {agent.name}", "state": {}}
+
+    monkeypatch.setattr(map_reduce, "run_agent", fake_run_agent)
+    result = await map_reduce.run_risk_map_reduce({"coordinated_analysis_output": "ranked"}, include_opportunities=False)
+
+    assert result["report"] == "EXECUTIVE SUMMARY"
+    assert result["failed_analyses"] == {"area:regulatory": "ValueError: malformed model response"}
+    assert result["timing"]["map_tasks"] == len(map_reduce.risk_area_agents)
+
+
+@pytest.mark.asyncio
+async def test_tool_reports_failure_when_every_map_call_fails(monkeypatch):
+    async def fake_run_agent(agent, message, state=None, user_id="pipeline"):
+        assert agent is not map_reduce.risk_reduce_agent
+        raise TimeoutError("model timed out")
+
+    class FakeState(dict):
+        def to_dict(self):
+            return dict(self)
+
+    class FakeToolContext:
+        state = FakeState(coordinated_analysis_output="ranked")
+
+    monkeypatch.setattr(map_reduce, "run_agent", fake_run_agent)
+    tool_context = FakeToolContext()
+    result = await map_reduce.map_reduce_risk_analysis(include_opportunities=False, tool_context=tool_context)
+
+    assert not result["success"]
+    assert "Every risk map call failed" in result["error"]
+    assert "final_risk_assessment_output" not in tool_context.state
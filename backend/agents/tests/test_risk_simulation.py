@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the Monte Carlo risk simulation"""
+
+import sys
+import os
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from schemas import Opportunity, RealEstateSearchOutput
+from utils.risk_simulation import (
+    STRESS_SCENARIOS,
+    deal_parameters,
+    project_returns,
+    run_risk_simulation,
+    simulate,
+    stress_test,
+    stress_test_rows,
+)
+
+DEALS = [
+    {'name': 'Maple Court', 'price_usd': 4_500_000.0, 'noi_usd': 279_000.0, 'cap_rate': 6.2},
+    {'name': 'Oak Plaza', 'price_usd': 12_750_000.0, 'noi_usd': 905_000.0, 'cap_rate': 7.1},
+    {'name': 'Thin Yield Tower', 'price_usd': 20_000_000.0, 'noi_usd': 800_000.0, 'cap_rate': 4.0},
+]
+
+
+def _loop_multiple(price, noi, rate, vacancy, growth, exit_cap, ltv, years, amortization=30):
+    debt = balance = price * ltv
+    payment = debt * rate / (1 - (1 + rate) ** -amortization)
+    cash = 0.0
+    for year in range(1, years + 1):
+        cash += noi * (1 - vacancy) * (1 + growth) ** (year - 1) - payment
+        balance = balance * (1 + rate) - payment
+    exit_value = noi * (1 - vacancy) * (1 + growth) ** years / exit_cap
+    return (cash + exit_value - balance) / (price - debt)
+
+
+@pytest.mark.parametrize("growth", [0.03, 0.0, -0.02])
+def test_project_returns_matches_year_by_year_cash_flows(growth):
+    result = project_returns(
+        np.array([[10e6]]), np.array([[600e3]]), np.array([[0.06]]),
+        interest_rate=np.array([[0.07]]), vacancy=np.array([[0.05]]),
+        noi_growth=np.array([[growth]]), exit_cap=np.array([[0.065]]),
+        ltv=0.6, hold_years=5, amortization_years=30,
+    )
+    expected = _loop_multiple(10e6, 600e3, 0.07, 0.05, growth, 0.065, 0.6, 5)
+    assert result['equity_multiple'][0, 0] == pytest.approx(expected)
+    worst_year = min(570e3 * (1 + growth) ** t for t in range(5))
+    payment = 6e6 * 0.07 / (1 - 1.07 ** -30)
+    assert result['min_dscr'][0, 0] == pytest.approx(worst_year / payment)
+
+
+def test_simulation_and_metrics_share_one_financing_model(monkeypatch):
+    import utils.financial_metrics as financial_metrics
+    monkeypatch.setattr(financial_metrics, "FINANCIAL_METRICS_CONFIG",
+                        dict(financial_metrics.FINANCIAL_METRICS_CONFIG, noi_growth=0.02, exit_cap_spread=0.0))
+    price, noi = np.array([4.5e6]), np.array([279e3])
+    metrics = financial_metrics.compute_metrics(price, noi, ltv=0.65, interest_rate=0.065, hold_years=5)
+    simulated = project_returns(
+        price[:, None], noi[:, None], (noi / price)[:, None],
+        interest_rate=np.array([[0.065]]), vacancy=np.array([[0.0]]), noi_growth=np.array([[0.02]]),
+        exit_cap=(noi / price)[:, None], ltv=0.65, hold_years=5,
+    )
+    assert simulated['equity_multiple'][0, 0] == pytest.approx(metrics['equity_multiple'][0])
+    assert simulated['min_dscr'][0, 0] == pytest.approx(metrics['dscr'][0])
+
+
+def test_simulate_is_reproducible_and_ordered():
+    first = simulate(DEALS, scenarios=5000, seed=3)
+    second = simulate(DEALS, scenarios=5000, seed=3)
+    np.testing.assert_array_equal(first['equity_multiple'], second['equity_multiple'])
+    assert (np.diff(first['equity_multiple'], axis=1) >= 0).all()
+    assert ((first['prob_loss'] >= 0) & (first['prob_loss'] <= 1)).all()
+    # A 4% cap rate cannot cover 6.5% debt service, the others can
+    assert first['prob_dscr_below_1'][2] > 0.5
+    assert first['prob_dscr_below_1'][0] < 0.5
+
+
+def test_simulate_chunks_match_single_pass(monkeypatch):
+    import utils.risk_simulation as risk_simulation
+    whole = simulate(DEALS[:1], scenarios=2000, seed=1)
+    monkeypatch.setattr(risk_simulation, "_CHUNK_CELLS", 2000)
+    chunked = simulate(DEALS[:1], scenarios=2000, seed=1)
+    np.testing.assert_allclose(whole['equity_multiple'], chunked['equity_multiple'])
+
+
+def test_stress_scenarios_are_worse_than_base():
+    stressed = stress_test(DEALS)
+    assert stressed.shape == (len(DEALS), len(STRESS_SCENARIOS))
+    base = stressed[:, 0]
+    for column in range(1, len(STRESS_SCENARIOS)):
+        assert (stressed[:, column] < base).all()
+    assert (stressed[:, -1] == stressed.min(axis=1)).all()
+
+
+def test_vacancy_is_a_shock_on_top_of_the_listed_noi():
+    deal = DEALS[:1]
+    stressed = dict(zip(STRESS_SCENARIOS, stress_test(deal)[0]))
+    no_shock = _loop_multiple(4.5e6, 279e3, 0.065, 0.0, 0.02, 0.062, 0.65, 5)
+    ten_points = _loop_multiple(4.5e6, 279e3, 0.065, 0.10, 0.02, 0.062, 0.65, 5)
+    # The listed NOI is already net of vacancy; base does not take it off again
+    assert stressed['base'] == pytest.approx(no_shock)
+    assert stressed['vacancy_+10pts'] == pytest.approx(ten_points)
+
+
+def test_run_risk_simulation_summary_and_rows():
+    simulation = run_risk_simulation(DEALS, scenarios=2000)
+    assert [row['name'] for row in simulation['opportunities']] == [d['name'] for d in DEALS]
+    assert simulation['portfolio']['worst_deal'] == 'Thin Yield Tower'
+    assert simulation['assumptions']['scenarios'] == 2000
+    rows = stress_test_rows(simulation)
+    assert rows[0]['equity_multiple'].count('x') == 3
+    assert rows[0]['var_95'].endswith('of equity')
+    assert run_risk_simulation([])['opportunities'] == []
+    assert stress_test_rows(None) == []
+
+
+def test_deal_parameters_from_structured_and_markdown():
+    structured = RealEstateSearchOutput(search_criteria="multifamily", opportunities=[
+        Opportunity(name="A", price_usd=1e6, cap_rate=6.0),
+        Opportunity(name="B", price_usd=2e6, noi_usd=130e3),
+        Opportunity(name="No numbers"),
+    ])
+    deals = deal_parameters({"real_estate_opportunities_output": structured.model_dump()})
+    assert [(d['name'], d['noi_usd'], d['cap_rate']) for d in deals] == [("A", 60e3, 6.0), ("B", 130e3, 6.5)]
+
+    markdown = "# Listings\n\n1. **Maple Court** - Denver\n   - Asking Price: $4.5M, NOI $279K\n"
+    deals = deal_parameters({"real_estate_opportunities_output": markdown})
+    assert deals == [{'name': 'Maple Court', 'price_usd': 4.5e6, 'noi_usd': 279e3, 'cap_rate': 6.2,
+                      'sqft': None, 'units': None}]
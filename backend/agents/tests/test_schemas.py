@@ -0,0 +1,96 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for the structured sub-agent output schemas"""
+
+import json
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from schemas import (
+    RealEstateSearchOutput,
+    RiskAssessment,
+    parse_structured,
+    report_data_from_state,
+    report_data_from_text,
+)
+
+REAL_ESTATE_OUTPUT = {
+    "search_criteria": "multifamily in Denver under $5M",
+    "opportunities": [
+        {"name": "Maple Court Apartments", "location": "Denver, CO", "price_usd": 4500000,
+         "cap_rate": 6.2, "noi_usd": 279000, "units": 24},
+        {"name": "1450 Elm St", "location": "Aurora, CO", "price_usd": 3100000},
+    ],
+    "market_insights": ["Cap rates expanded 40bps year over year"],
+}
+
+RISK_OUTPUT = {
+    "overall_risk": "High",
+    "key_findings": ["Two actionable multifamily listings"],
+    "recommendations": ["Tour Maple Court first"],
+    "risks": [
+        {"category": "market", "description": "Rate sensitivity", "severity": "High",
+         "opportunity": "Maple Court Apartments"},
+        {"category": "regulatory", "description": "Rent control proposals"},
+    ],
+    "mitigation_strategies": ["Fix-rate financing"],
+    "priority_opportunities": ["1450 Elm St", "Maple Court Apartments"],
+}
+
+
+def test_parse_structured_rejects_markdown():
+    assert parse_structured("**Real Estate Report**\n...", RealEstateSearchOutput) is None
+    assert parse_structured('{"not": "a report"}', RealEstateSearchOutput) is None
+
+
+def test_parse_structured_accepts_fenced_json():
+    text = "```json\n" + json.dumps(REAL_ESTATE_OUTPUT) + "\n```"
+    parsed = parse_structured(text, RealEstateSearchOutput)
+    assert parsed is not None
+    assert parsed.opportunities[0].cap_rate == 6.2
+
+
+def test_report_data_from_state_uses_typed_outputs():
+    state = {
+        "real_estate_opportunities_output": REAL_ESTATE_OUTPUT,
+        "final_risk_assessment_output": RISK_OUTPUT,
+    }
+    report_data = report_data_from_state(state)
+
+    metrics = report_data["executive_summary"]["metrics"]
+    assert metrics["total_opportunities"] == 2
+    assert metrics["real_estate_count"] == 2
+    assert metrics["geographic_spread"] == "2 Markets"
+
+    names = [o["name"] for o in report_data["opportunities"]]
+    assert names == ["1450 Elm St", "Maple Court Apartments"]
+    maple = report_data["opportunities"][1]
+    assert maple["investment_size"] == "$4.5M"
+    assert maple["cap_rate"] == "6.20%"
+    assert maple["risk_level"] == "High"
+
+    risk = report_data["risk_analysis"]
+    assert risk["overall_risk"] == "High"
+    assert risk["regulatory_risks"] == ["Rent control proposals"]
+
+
+def test_report_data_from_state_without_structured_outputs():
+    assert report_data_from_state({"real_estate_opportunities_output": "# Report"}) is None
+
+
+def test_report_data_from_text_risk_assessment():
+    report_data = report_data_from_text(RiskAssessment(**RISK_OUTPUT).model_dump_json())
+    assert report_data["executive_summary"]["recommendations"] == ["Tour Maple Court first"]
+    assert report_data_from_text("Plain markdown analysis") is None
@@ -0,0 +1,149 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for session history compaction"""
+
+import sys
+import os
+import pytest
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+from utils.session_compaction import SessionCompactor, content_tokens, load_session_artifact
+
+
+class FakeState(dict):
+    def to_dict(self):
+        return dict(self)
+
+
+class FakeContext:
+    """Callback and tool context of one session, with the runner's artifact service"""
+
+    def __init__(self, artifacts=..., state=None):
+        # artifacts=None stands for a runner without an artifact service
+        self.artifacts = {} if artifacts is ... else artifacts
+        self.state = FakeState(state or {})
+        self.saves = 0
+
+    async def save_artifact(self, filename, artifact, custom_metadata=None):
+        if self.artifacts is None:
+            raise ValueError("Artifact service is not initialized.")
+        self.saves += 1
+        self.artifacts[filename] = artifact
+        return 0
+
+    async def load_artifact(self, filename, version=None):
+        if self.artifacts is None:
+            raise ValueError("Artifact service is not initialized.")
+        return self.artifacts.get(filename)
+
+
+def _turn(question, tool_name, payload, answer):
+    return [
+        types.Content(role="user", parts=[types.Part(text=question)]),
+        types.Content(role="model", parts=[types.Part(
+            function_call=types.FunctionCall(name=tool_name, args={"request": question}))]),
+        types.Content(role="user", parts=[types.Part(
+            function_response=types.FunctionResponse(name=tool_name, response={"result": payload}))]),
+        types.Content(role="model", parts=[types.Part(text=answer)]),
+    ]
+
+
+def _history(turns):
+    contents = []
+    for i in range(turns):
+        contents += _turn(f"Question {i}", "real_estate_agent", "listing " * 2000, f"## Answer {i}\nDetails")
+    return contents
+
+
+def test_recent_turns_are_untouched():
+    compactor = SessionCompactor(token_budget=10**9, keep_recent_turns=2, max_inline_chars=500)
+    history = _history(4)
+    offloads = {}
+    compacted = compactor.compact(history, offloads)
+
+    assert compactor.last_stats["artifacts_offloaded"] == 2
+    assert compacted[-8:] == history[-8:]
+    handle = compacted[2].parts[0].function_response.response["artifact_handle"]
+    assert offloads[handle].count("listing") == 2000
+
+
+def test_budget_folds_stale_turns_into_summary():
+    compactor = SessionCompactor(token_budget=9000, keep_recent_turns=1, max_inline_chars=10**9)
+    compacted = compactor.compact(_history(5))
+
+    assert content_tokens(compacted) <= 9000
+    summary = compacted[0].parts[0].text
+    assert summary.startswith("[Summary of earlier conversation]")
+    assert "Question 0" in summary and "answer: Answer 0" in summary
+    assert compacted[-1].parts[0].text.startswith("## Answer 4")
+
+
+def test_offloading_is_idempotent_across_calls():
+    compactor = SessionCompactor(token_budget=10**9, keep_recent_turns=1, max_inline_chars=500)
+    history = _history(3)
+    first = compactor.compact(history, {})
+    second = compactor.compact(history, {})
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_outputs_are_saved_once_as_session_artifacts():
+    compactor = SessionCompactor(token_budget=10**9, keep_recent_turns=1, max_inline_chars=500)
+    context = FakeContext()
+    for _ in range(2):
+        request = LlmRequest(contents=_history(3))
+        await compactor.before_model_callback(context, request)
+
+    assert context.saves == 1
+    handle = request.contents[2].parts[0].function_response.response["artifact_handle"]
+    loaded = await load_session_artifact(handle, context)
+    assert loaded["success"] and loaded["content"].count("listing") == 2000
+
+    # Another session has its own artifacts and cannot read this one's
+    assert not (await load_session_artifact(handle, FakeContext()))["success"]
+
+
+@pytest.mark.asyncio
+async def test_outputs_stay_inline_without_an_artifact_service():
+    compactor = SessionCompactor(token_budget=10**9, keep_recent_turns=1, max_inline_chars=500)
+    history = _history(3)
+    request = LlmRequest(contents=list(history))
+    await compactor.before_model_callback(FakeContext(artifacts=None), request)
+    assert request.contents == history
+
+
+@pytest.mark.asyncio
+async def test_state_outputs_are_compacted_and_restored_for_tools():
+    compactor = SessionCompactor(token_budget=10**9, max_inline_chars=500)
+    report = {"opportunities": ["listing " * 200]}
+    context = FakeContext(state={
+        "coordinated_analysis_output": report,
+        "final_risk_assessment_output": "short",
+        "unrelated_key": "x" * 5000,
+    })
+
+    await compactor.before_agent_callback(context)
+    compacted = context.state["coordinated_analysis_output"]
+    assert set(compacted) == {"artifact_handle", "preview"}
+    assert context.state["final_risk_assessment_output"] == "short"
+    assert context.state["unrelated_key"] == "x" * 5000
+
+    # Already compacted values are not saved again on the next turn
+    await compactor.before_agent_callback(context)
+    assert context.saves == 1
+
+    await compactor.before_tool_callback(None, {}, context)
+    assert context.state["coordinated_analysis_output"] == report
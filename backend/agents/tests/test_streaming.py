@@ -0,0 +1,105 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Test cases for streaming updates"""
+
+import asyncio
+import sys
+import os
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+from streaming import AgentStreamer, StreamTranslator, translate_stream
+
+
+def _event(author, *parts, partial=False):
+    return {'author': author, 'partial': partial, 'content': {'role': 'model', 'parts': list(parts)}}
+
+
+def test_partial_text_is_streamed_once():
+    translator = StreamTranslator(root_agent_name="root")
+    updates = [
+        update
+        for event in (
+            _event("root", {'text': "Top "}, partial=True),
+            _event("root", {'text': "deals"}, partial=True),
+            # Aggregated copy of the deltas above
+            _event("root", {'text': "Top deals"}),
+            _event("root", {'text': "thinking", 'thought': True}, partial=True),
+            _event("real_estate_agent", {'text': "sub-agent text"}, partial=True),
+        )
+        for update in translator.translate(event)
+    ]
+    assert updates == [{'type': 'text', 'delta': "Top "}, {'type': 'text', 'delta': "deals"}]
+    assert list(translator.finish()) == [{'type': 'done', 'text': "Top deals"}]
+
+
+def test_tool_calls_announce_each_stage_once():
+    translator = StreamTranslator(root_agent_name="root")
+    call = {'function_call': {'name': 'real_estate_agent', 'args': {}}}
+    response = {'function_response': {'name': 'real_estate_agent',
+                                      'response': {'result': {'opportunities': [{}, {}, {}]}}}}
+    updates = [
+        update
+        for event in (
+            _event("root", call),
+            _event("root", call),
+            _event("root", response),
+            _event("root", {'function_call': {'name': 'scored_deal_coordinator', 'args': {}}}),
+            _event("root", {'function_call': {'name': 'map_reduce_risk_analysis', 'args': {}}}),
+            _event("root", {'function_call': {'name': 'cached_deal_pipeline', 'args': {}}}),
+        )
+        for update in translator.translate(event)
+    ]
+    assert [(u['stage'], u['tool']) for u in updates] == [
+        ('search_started', 'real_estate_agent'),
+        ('search_results', 'real_estate_agent'),
+        ('coordinating', 'scored_deal_coordinator'),
+        ('risk_analysis', 'map_reduce_risk_analysis'),
+        ('deal_pipeline', 'cached_deal_pipeline'),
+    ]
+    assert updates[1]['message'] == "Found 3 results"
+
+
+def test_non_streaming_backend_sends_final_text():
+    updates = list(translate_stream([
+        _event("root", {'function_call': {'name': 'generate_pdf_report', 'args': {}}}),
+        _event("root", {'text': "Report ready"}),
+    ]))
+    assert [u['type'] for u in updates] == ['progress', 'text', 'done']
+    assert updates[-1] == {'type': 'done', 'text': "Report ready"}
+
+
+class EndlessStreamer(AgentStreamer):
+    """Streams text deltas until cancelled"""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    async def astream(self, message, user_id="default_user", session_id=None):
+        try:
+            while True:
+                yield {'type': 'text', 'delta': "."}
+                await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled.set()
+            raise
+
+
+def test_stream_cancels_the_run_when_the_consumer_stops():
+    streamer = EndlessStreamer()
+    stream = streamer.stream("find deals")
+    assert next(stream) == {'type': 'text', 'delta': "."}
+    stream.close()
+    assert streamer.cancelled.wait(2)
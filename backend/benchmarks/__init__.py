@@ -0,0 +1 @@
+"""Micro-benchmarks for the deal sourcing hot paths; run as `python -m benchmarks.<name>`"""
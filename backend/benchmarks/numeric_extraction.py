@@ -0,0 +1,144 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Throughput of the single-pass numeric extractor against per-field regex scans.
+
+    python -m benchmarks.numeric_extraction --records 20000
+"""
+
+import argparse
+import random
+import re
+import time
+from typing import Dict, Any, List
+
+from utils.numeric_extraction import extract_numeric
+
+_CITIES = ("Denver, CO", "Austin, TX", "Phoenix, AZ", "Nashville, TN", "Tampa, FL")
+_TYPES = ("multifamily", "office", "retail", "industrial")
+
+
+def synthetic_report(records: int, seed: int = 7) -> str:
+    """Markdown report shaped like agent output, one listing per numbered item"""
+    rng = random.Random(seed)
+    lines = ["# Real Estate Opportunities", ""]
+    for i in range(records):
+        price = rng.uniform(0.8, 60.0)
+        cap = rng.uniform(4.0, 9.5)
+        price_text = f"${price:.1f}M" if i % 2 else f"${price * 1_000_000:,.0f}"
+        lines += [
+            f"{i + 1}. **Property {i}** - {rng.choice(_TYPES)} in {rng.choice(_CITIES)}",
+            f"   - Asking Price: {price_text}",
+            f"   - {cap:.1f}% cap, NOI ${price * cap / 100:.2f}M",
+            f"   - {rng.randint(8, 400)} units, {rng.randint(5, 300) * 1000:,} sq ft",
+            f"   - Listed 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "   - Strong rent growth and value-add upside near transit.",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+# Baseline with the same coverage as the single-pass scanner: one
+# pattern per field, searched within each record
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE_WORDS = r"thousand|million|billion|mil|mm|bn|[kmb]"
+_RECORD = re.compile(r"^(?=[ \t]*(?:#{1,6}\s|\d{1,6}[.)]\s|[-*][ \t]+\*\*|\*\*))", re.MULTILINE)
+_FIELD_PATTERNS = {
+    'noi_usd': re.compile(rf"\bNOI\b[^$\d\n]{{0,20}}\$?\s?({_NUMBER})(?:\s?({_SCALE_WORDS}))?\b", re.IGNORECASE),
+    'price_usd': re.compile(
+        rf"(?<!NOI )\$\s?({_NUMBER})(?:\s?({_SCALE_WORDS}))?\b"
+        rf"|\b(?:asking(?:\s+price)?|price[d]?(?:\s+at)?|listed\s+(?:at|for)|valued?\s+at)\b[^$\d\n]{{0,12}}"
+        rf"({_NUMBER})(?:\s?({_SCALE_WORDS}))?\b",
+        re.IGNORECASE,
+    ),
+    'cap_rate': re.compile(
+        r"\bcap(?:italization)?\s+rate\b[^\d\n]{0,15}(\d{1,2}(?:\.\d+)?)\s?%|(\d{1,2}(?:\.\d+)?)\s?%\s+cap\b",
+        re.IGNORECASE,
+    ),
+    'sqft': re.compile(rf"({_NUMBER})\s?(?:sq\.?\s?ft\.?|square\s+f(?:ee|oo)t|SF|ft²)(?!\w)", re.IGNORECASE),
+    'units': re.compile(r"(\d{1,3}(?:,\d{3})*)[-\s]?(?:units?|doors|apartments)\b", re.IGNORECASE),
+    'date': re.compile(
+        r"\b((?:19|20)\d\d-[01]\d-[0-3]\d)\b|\b([01]?\d/[0-3]?\d/(?:19|20)\d\d)\b"
+        r"|\b((?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+[0-3]?\d,?\s+(?:19|20)\d\d)\b",
+        re.IGNORECASE,
+    ),
+}
+_SCALE = {'k': 1e3, 'thousand': 1e3, 'm': 1e6, 'mm': 1e6, 'mil': 1e6, 'million': 1e6,
+          'b': 1e9, 'bn': 1e9, 'billion': 1e9}
+
+
+def per_field_extract(text: str) -> List[Dict[str, Any]]:
+    """Baseline: split into records, then one regex search per field per record"""
+    rows = []
+    for record in _RECORD.split(text):
+        row = {}
+        for name, pattern in _FIELD_PATTERNS.items():
+            match = pattern.search(record)
+            if not match:
+                continue
+            groups = [g for g in match.groups() if g is not None]
+            if name in ('price_usd', 'noi_usd'):
+                scale = groups[1].lower() if len(groups) > 1 else ''
+                row[name] = float(groups[0].replace(",", "")) * _SCALE.get(scale, 1.0)
+            elif name == 'units':
+                row[name] = int(groups[0].replace(",", ""))
+            elif name == 'date':
+                row[name] = groups[0]
+            else:
+                row[name] = float(groups[0].replace(",", ""))
+        if row:
+            rows.append(row)
+    return rows
+
+
+def _throughput(func, text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(records: int = 20000, repeat: int = 3) -> Dict[str, Any]:
+    text = synthetic_report(records)
+    megabytes = len(text.encode()) / 1e6
+    columns = extract_numeric(text)
+    compiled = _throughput(extract_numeric, text, repeat)
+    per_field = _throughput(per_field_extract, text, repeat)
+    assert len(per_field_extract(text)) == len(columns)
+    return {
+        'records': records,
+        'megabytes': round(megabytes, 2),
+        'rows_extracted': len(columns),
+        'compiled_seconds': round(compiled, 3),
+        'compiled_mb_per_second': round(megabytes / compiled, 1),
+        'compiled_records_per_second': round(records / compiled),
+        'per_field_seconds': round(per_field, 3),
+        'per_field_mb_per_second': round(megabytes / per_field, 1),
+        'speedup': round(per_field / compiled, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    for key, value in run(args.records, args.repeat).items():
+        print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Throughput of the single-pass report parser on large agent outputs.
+
+    python -m benchmarks.report_parser --megabytes 1
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, Any, List
+
+from utils.report_parser import ReportParser, parse_report
+
+_CITIES = ("Denver, CO", "Austin, TX", "Phoenix, AZ", "Nashville, TN", "Tampa, FL")
+
+
+def synthetic_agent_output(megabytes: float = 1.0, seed: int = 11) -> str:
+    """Markdown shaped like a coordinator report, repeated up to the requested size"""
+    rng = random.Random(seed)
+    parts = [
+        "# Deal Sourcing Report\n\n## EXECUTIVE SUMMARY\n"
+        "Total Opportunities: 40 across 5 markets\n"
+        "Multifamily pricing has reset as new supply peaks across Sun Belt metros.\n"
+        "We recommend prioritizing value-add assets near transit corridors.\n\n"
+        "## Top Opportunities\n"
+    ]
+    size, i = len(parts[0]), 0
+    while size < megabytes * 1_000_000:
+        i += 1
+        if i % 3:
+            item = (
+                f"{i}. **Property {i} Apartments** - {rng.choice(_CITIES)}\n"
+                f"   - Asking Price: ${rng.uniform(1, 60):.1f}M, {rng.uniform(4, 9):.1f}% cap\n"
+                f"   - {rng.randint(10, 400)} units with below-market rents and renovation upside\n"
+                "   - Strong job growth in the submarket supports rent growth and occupancy.\n\n"
+            )
+        else:
+            item = (
+                f"{i}. **Company {i} acquisition** - ${rng.uniform(0.1, 5):.1f}B M&A deal\n"
+                "   - Strategic buyer consolidating regional logistics networks for scale.\n"
+                "   - Financing committed; regulatory approval expected within two quarters.\n\n"
+            )
+        parts.append(item)
+        size += len(item)
+    parts.append(
+        "## Risk Analysis\nOverall risk: Medium\n"
+        "- Market risk: rising supply in core submarkets\n"
+        "- Financial risk: refinancing at higher rates\n"
+        "- Regulatory risk: rent control proposals\n"
+        "### Mitigation\n- Lock fixed-rate debt before closing\n"
+    )
+    return "".join(parts)
+
+
+def legacy_structure(text: str) -> List[Dict[str, Any]]:
+    """Baseline: the previous pdf_agent line loop, one lower()/upper() per keyword check"""
+    opportunities, section = [], None
+    for line in text.split('\n'):
+        line = line.strip()
+        if 'EXECUTIVE SUMMARY' in line.upper():
+            section = 'executive_summary'
+        elif 'OPPORTUNITY' in line.upper() or 'OPPORTUNITIES' in line.upper():
+            section = 'opportunities'
+        elif 'RISK' in line.upper() and 'ANALYSIS' in line.upper():
+            section = 'risk_analysis'
+        if 'Total' in line and 'opportunities' in line.lower():
+            int(''.join(filter(str.isdigit, line)) or 0)
+        if section == 'opportunities' and any(x in line.lower() for x in ['property', 'deal', 'acquisition', 'm&a']):
+            opportunities.append({'category': 'Real Estate' if 'property' in line.lower() else 'Business Deal',
+                                  'highlights': line[:200]})
+        if 'recommend' in line.lower():
+            pass
+        if section == 'risk_analysis' and 'risk' in line.lower():
+            for name in ('market', 'operational', 'financial', 'regulatory'):
+                if name in line.lower():
+                    break
+    return opportunities
+
+
+def _best_of(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(megabytes: float = 1.0, repeat: int = 5, chunk_size: int = 4096) -> Dict[str, Any]:
+    text = synthetic_agent_output(megabytes)
+    size = len(text.encode()) / 1e6
+
+    def streamed():
+        parser = ReportParser()
+        for start in range(0, len(text), chunk_size):
+            parser.feed(text[start:start + chunk_size])
+        return parser.result()
+
+    single = _best_of(lambda: parse_report(text), repeat)
+    chunked = _best_of(streamed, repeat)
+    # Every opportunity kept, so no line is skipped
+    full = _best_of(lambda: parse_report(text, max_opportunities=10 ** 9), repeat)
+    legacy = _best_of(lambda: legacy_structure(text), repeat)
+    report_data = parse_report(text)
+    return {
+        'megabytes': round(size, 2),
+        'lines': text.count('\n'),
+        'opportunities_parsed': len(report_data['opportunities']),
+        'parse_ms': round(single * 1000, 1),
+        'parse_mb_per_second': round(size / single, 1),
+        'streamed_ms': round(chunked * 1000, 1),
+        'parse_all_opportunities_ms': round(full * 1000, 1),
+        'legacy_ms': round(legacy * 1000, 1),
+        'speedup': round(legacy / single, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    for key, value in run(args.megabytes, args.repeat).items():
+        print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,6 +32,36 @@ OPTIMIZATIONS = {
 
     # Enable batch searching
     "batch_search": os.getenv('BATCH_SEARCH', 'true').lower() == 'true',
+
+    # Sub-agents return typed JSON (schemas.py) instead of markdown reports
+    "structured_outputs": os.getenv('STRUCTURED_OUTPUTS', 'true').lower() == 'true',
+
+    # Keep root agent prompts within a token budget on long sessions
+    "session_compaction": os.getenv('SESSION_COMPACTION', 'true').lower() == 'true',
+
+    # Pick the light or heavy model per call instead of per agent
+    "dynamic_routing": os.getenv('DYNAMIC_MODEL_ROUTING', 'false').lower() == 'true',
+
+    # Coordinator and risk analyst answer with flash, escalating to pro on validation failure
+    "model_cascade": os.getenv('MODEL_CASCADE', 'false').lower() == 'true',
+
+    # Analyze each risk area in parallel with the light model, then assemble the report
+    "map_reduce_risk": os.getenv('MAP_REDUCE_RISK', 'false').lower() == 'true',
+
+    # Score search candidates in parallel batches and coordinate only the top-K
+    "candidate_scoring": os.getenv('CANDIDATE_SCORING', 'false').lower() == 'true',
+
+    # Give the risk analyst a Monte Carlo stress-test tool for real estate deals
+    "risk_simulation": os.getenv('RISK_SIMULATION', 'false').lower() == 'true',
+
+    # Give the coordinators a batch IRR/NPV/DSCR calculator tool
+    "financial_metrics": os.getenv('FINANCIAL_METRICS', 'false').lower() == 'true',
+
+    # Compute portfolio concentration and allocation locally for the risk analyst and PDF
+    "portfolio_analytics": os.getenv('PORTFOLIO_ANALYTICS', 'false').lower() == 'true',
+
+    # Merge duplicate listings and deals locally before coordination
+    "entity_resolution": os.getenv('ENTITY_RESOLUTION', 'false').lower() == 'true',
 }
 
 # Model Configuration
@@ -50,6 +80,7 @@ MODELS = {
 CACHE_CONFIG = {
     "ttl_seconds": int(os.getenv('CACHE_TTL', '3600')),  # 1 hour default
     "max_size": int(os.getenv('CACHE_MAX_SIZE', '100')),  # Max 100 cached results
+    "pipeline_ttl_seconds": int(os.getenv('PIPELINE_CACHE_TTL', '900')),  # 15 min for full pipeline results
 }
 
 # Parallel Execution Configuration
@@ -58,6 +89,123 @@ PARALLEL_CONFIG = {
     "timeout_seconds": int(os.getenv('AGENT_TIMEOUT', '30')),
 }
 
+# Session Compaction Configuration
+COMPACTION_CONFIG = {
+    "token_budget": int(os.getenv('SESSION_TOKEN_BUDGET', '32000')),
+    "keep_recent_turns": int(os.getenv('SESSION_KEEP_RECENT_TURNS', '2')),
+    "max_inline_chars": int(os.getenv('SESSION_MAX_INLINE_CHARS', '2000')),
+}
+
+# Model Routing Configuration
+ROUTER_CONFIG = {
+    "latency_slo_seconds": float(os.getenv('ROUTER_LATENCY_SLO', '20')),
+    "small_input_tokens": int(os.getenv('ROUTER_SMALL_INPUT_TOKENS', '2000')),
+    # Starting latency estimates, replaced by observed values as calls complete.
+    # Input (prefill) is cheap; generation time is dominated by output tokens
+    "light_seconds_per_ktoken": float(os.getenv('ROUTER_LIGHT_SECONDS_PER_KTOKEN', '0.1')),
+    "heavy_seconds_per_ktoken": float(os.getenv('ROUTER_HEAVY_SECONDS_PER_KTOKEN', '0.3')),
+    "light_seconds_per_output_ktoken": float(os.getenv('ROUTER_LIGHT_SECONDS_PER_OUTPUT_KTOKEN', '4')),
+    "heavy_seconds_per_output_ktoken": float(os.getenv('ROUTER_HEAVY_SECONDS_PER_OUTPUT_KTOKEN', '12')),
+    # Expected output tokens per task type until an agent's own outputs are observed
+    "expected_output_tokens": {
+        "search": int(os.getenv('ROUTER_SEARCH_OUTPUT_TOKENS', '1500')),
+        "synthesis": int(os.getenv('ROUTER_SYNTHESIS_OUTPUT_TOKENS', '3000')),
+        "analysis": int(os.getenv('ROUTER_ANALYSIS_OUTPUT_TOKENS', '3000')),
+        "conversation": int(os.getenv('ROUTER_CONVERSATION_OUTPUT_TOKENS', '500')),
+    },
+}
+
+# Model Cascade Configuration
+CASCADE_CONFIG = {
+    "light_model": os.getenv('CASCADE_LIGHT_MODEL', 'gemini-2.0-flash'),
+    "heavy_model": MODELS["complex"],
+    "min_opportunities": int(os.getenv('CASCADE_MIN_OPPORTUNITIES', '3')),
+    "min_risk_categories": int(os.getenv('CASCADE_MIN_RISK_CATEGORIES', '3')),
+}
+
+# Map-Reduce Risk Analysis Configuration
+RISK_MAP_REDUCE_CONFIG = {
+    # Tier 1 opportunities that get their own map call, 0 disables
+    "tier1_opportunities": int(os.getenv('RISK_MAP_TIER1_OPPORTUNITIES', '5')),
+}
+
+# Candidate Scoring Configuration
+SCORING_CONFIG = {
+    "batch_size": int(os.getenv('CANDIDATE_BATCH_SIZE', '20')),
+    "top_k": int(os.getenv('CANDIDATE_TOP_K', '30')),
+    # "numpy" ranks by weighted numeric features, "llm" scores batches with the
+    # light model, "local" uses the keyword scorer only
+    "scorer": os.getenv('CANDIDATE_SCORER', 'numpy'),
+}
+
+# Entity Resolution Configuration
+ENTITY_RESOLUTION_CONFIG = {
+    # Name or address similarity (0-1) at which two records are the same entity
+    "threshold": float(os.getenv('ENTITY_MATCH_THRESHOLD', '0.88')),
+    # Records whose prices or deal values differ by more than this are kept apart
+    "max_value_gap": float(os.getenv('ENTITY_MAX_VALUE_GAP', '0.25')),
+    # Blocks larger than this are too generic to compare pairwise and are skipped
+    "max_block_size": int(os.getenv('ENTITY_MAX_BLOCK_SIZE', '200')),
+}
+
+# Numeric Pre-Ranking Configuration
+RANKING_CONFIG = {
+    # Negative weights favour low values, e.g. a lower asking price
+    "weights": {
+        "cap_rate": float(os.getenv('RANK_WEIGHT_CAP_RATE', '0.35')),
+        "noi": float(os.getenv('RANK_WEIGHT_NOI', '0.2')),
+        "price": float(os.getenv('RANK_WEIGHT_PRICE', '-0.1')),
+        "deal_size": float(os.getenv('RANK_WEIGHT_DEAL_SIZE', '0.15')),
+        "recency": float(os.getenv('RANK_WEIGHT_RECENCY', '0.2')),
+    },
+    "recency_half_life_days": float(os.getenv('RANK_RECENCY_HALF_LIFE_DAYS', '90')),
+    "missing_value": float(os.getenv('RANK_MISSING_VALUE', '0.25')),  # 0..1 score for unknown features
+    "chunk_size": int(os.getenv('RANK_CHUNK_SIZE', '1024')),
+}
+
+# Deal Financing Configuration shared by the risk simulation and the metrics calculator (rates as fractions)
+FINANCING_CONFIG = {
+    "ltv": float(os.getenv('FINANCING_LTV', '0.65')),
+    "interest_rate": float(os.getenv('FINANCING_INTEREST_RATE', '0.065')),
+    "amortization_years": int(os.getenv('FINANCING_AMORTIZATION_YEARS', '30')),  # 0 for interest-only
+    "hold_years": int(os.getenv('FINANCING_HOLD_YEARS', '5')),
+}
+
+# Monte Carlo Risk Simulation Configuration (rates and shocks as fractions)
+RISK_SIMULATION_CONFIG = {
+    "scenarios": int(os.getenv('RISK_SIM_SCENARIOS', '20000')),
+    "rate_shock_sd": float(os.getenv('RISK_SIM_RATE_SHOCK_SD', '0.01')),
+    # Vacancy beyond what the listed NOI already nets out
+    "vacancy_mean": float(os.getenv('RISK_SIM_VACANCY_MEAN', '0.0')),
+    "vacancy_sd": float(os.getenv('RISK_SIM_VACANCY_SD', '0.03')),
+    "noi_growth_mean": float(os.getenv('RISK_SIM_NOI_GROWTH_MEAN', '0.02')),
+    "noi_growth_sd": float(os.getenv('RISK_SIM_NOI_GROWTH_SD', '0.015')),
+    "exit_cap_expansion_mean": float(os.getenv('RISK_SIM_EXIT_CAP_EXPANSION_MEAN', '0.0025')),
+    "exit_cap_expansion_sd": float(os.getenv('RISK_SIM_EXIT_CAP_EXPANSION_SD', '0.005')),
+    "seed": int(os.getenv('RISK_SIM_SEED', '7')),  # fixed so a report is reproducible
+}
+
+# Batch Financial Metrics Configuration (rates as fractions)
+FINANCIAL_METRICS_CONFIG = {
+    "discount_rate": float(os.getenv('METRICS_DISCOUNT_RATE', '0.08')),
+    "noi_growth": float(os.getenv('METRICS_NOI_GROWTH', '0.02')),
+    "exit_cap_spread": float(os.getenv('METRICS_EXIT_CAP_SPREAD', '0.0025')),
+    "max_deals": int(os.getenv('METRICS_MAX_DEALS', '500')),
+}
+
+# Portfolio Analytics Configuration (returns and volatilities as fractions)
+PORTFOLIO_CONFIG = {
+    # Upper edges of the deal size histogram buckets, in millions of dollars
+    "size_buckets_musd": [float(x) for x in os.getenv('PORTFOLIO_SIZE_BUCKETS', '1,5,10,25,50,100').split(',')],
+    "risk_aversion": float(os.getenv('PORTFOLIO_RISK_AVERSION', '4.0')),
+    "max_weight": float(os.getenv('PORTFOLIO_MAX_WEIGHT', '0.35')),
+    "real_estate_volatility": float(os.getenv('PORTFOLIO_RE_VOLATILITY', '0.15')),
+    # Correlation shared by all pairs, plus extra for the same market or sector (sum below 1)
+    "base_correlation": float(os.getenv('PORTFOLIO_BASE_CORRELATION', '0.2')),
+    "market_correlation": float(os.getenv('PORTFOLIO_MARKET_CORRELATION', '0.3')),
+    "sector_correlation": float(os.getenv('PORTFOLIO_SECTOR_CORRELATION', '0.2')),
+}
+
 # Output Configuration
 OUTPUT_CONFIG = {
     "max_opportunities": int(os.getenv('MAX_OPPORTUNITIES', '15')),
@@ -76,6 +224,16 @@ def get_optimization_summary():
         "enable_caching": "50-70% faster repeat queries",
         "async_pdf": "Improved user experience",
         "batch_search": "15-25% fewer API calls",
+        "structured_outputs": "Fewer output tokens, no report re-parsing",
+        "session_compaction": "Flat per-turn latency on long sessions",
+        "dynamic_routing": "Light model for simple turns, heavy model within SLO",
+        "model_cascade": "Flash-first coordination and risk analysis",
+        "map_reduce_risk": "Risk stage bounded by its slowest area",
+        "candidate_scoring": "Coordinator prompt bounded by top-K candidates",
+        "risk_simulation": "Quantified stress tests in milliseconds",
+        "financial_metrics": "Exact deal returns without LLM arithmetic",
+        "portfolio_analytics": "Exact concentration metrics, shorter risk reports",
+        "entity_resolution": "Coordinator sees each listing and deal once",
     }
 
     benefits = [optimization_benefits.get(opt, opt) for opt in enabled]
@@ -0,0 +1,135 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic search -> coordination -> risk pipeline with result caching"""
+
+from typing import Dict, Any, Optional
+
+from google.adk.agents import ParallelAgent, SequentialAgent
+from google.adk.tools.tool_context import ToolContext
+
+from agents.sub_agents.real_estate_agent import real_estate_agent
+from agents.sub_agents.financial_news_agent import financial_news_agent
+from agents.sub_agents.deal_coordinator_agent import coordinator_agent
+from agents.sub_agents.risk_analyst import risk_analyst_agent, run_risk_map_reduce
+from config import OPTIMIZATIONS
+from utils.agent_runner import run_agent
+from utils.pipeline_cache import invalidate_pipeline, memoize_pipeline_async, normalize_criteria
+
+PIPELINE_NAMESPACE = "deal_pipeline"
+MAP_REDUCE_RISK = OPTIMIZATIONS["map_reduce_risk"]
+
+# Session state keys produced by the pipeline stages, in execution order
+PIPELINE_OUTPUT_KEYS = (
+    "real_estate_opportunities_output",
+    "financial_news_opportunities_output",
+    "coordinated_analysis_output",
+    "final_risk_assessment_output",
+)
+
+deal_pipeline_agent = SequentialAgent(
+    name="deal_pipeline",
+    description="Runs both searches in parallel, then coordination, then risk analysis",
+    sub_agents=[
+        ParallelAgent(
+            name="parallel_search",
+            sub_agents=[real_estate_agent, financial_news_agent],
+        ),
+        coordinator_agent,
+        # In map-reduce mode risk analysis runs after the agent, see run_deal_pipeline
+        *([] if MAP_REDUCE_RISK else [risk_analyst_agent]),
+    ],
+)
+
+
+async def run_deal_pipeline(
+    real_estate_criteria: str,
+    deal_interests: str,
+    industry_focus: str,
+) -> Dict[str, Any]:
+    """Run the full pipeline once, without caching"""
+    message = (
+        f"search_criteria: {real_estate_criteria}\n"
+        f"deal_interests: {deal_interests}\n"
+        f"industry_focus: {industry_focus}"
+    )
+    result = await run_agent(
+        deal_pipeline_agent,
+        message,
+        state={
+            "search_criteria": real_estate_criteria,
+            "deal_interests": deal_interests,
+            "industry_focus": industry_focus,
+        },
+    )
+    state = result["state"]
+    if MAP_REDUCE_RISK:
+        risk = await run_risk_map_reduce(state)
+        state["final_risk_assessment_output"] = risk["final_risk_assessment_output"]
+    return {key: state.get(key) for key in PIPELINE_OUTPUT_KEYS}
+
+
+async def cached_deal_pipeline(
+    real_estate_criteria: str,
+    deal_interests: str,
+    industry_focus: str,
+    force_refresh: bool = False,
+    tool_context: Optional[ToolContext] = None,
+) -> Dict[str, Any]:
+    """Search, coordinate and risk-analyze opportunities in one call.
+
+    Identical criteria requested within the cache TTL return the stored
+    coordinated and risk-analyzed output immediately, and concurrent
+    identical requests share a single pipeline execution.
+
+    Args:
+        real_estate_criteria: Search criteria for real estate deals
+        deal_interests: User's deal interests (M&A, partnerships, etc.)
+        industry_focus: User's industry focus
+        force_refresh: Ignore any cached result and search again
+
+    Returns:
+        Dictionary with every stage output and a cache_status of hit, miss,
+        coalesced or bypass
+    """
+    criteria = normalize_criteria(real_estate_criteria, deal_interests, industry_focus)
+    if force_refresh:
+        invalidate_pipeline(PIPELINE_NAMESPACE, criteria)
+
+    outputs, status = await memoize_pipeline_async(
+        PIPELINE_NAMESPACE,
+        criteria,
+        lambda: run_deal_pipeline(real_estate_criteria, deal_interests, industry_focus),
+    )
+
+    # Expose stage outputs to later tools (PDF generation) as if the
+    # sub-agents had run in this session
+    if tool_context is not None:
+        for key, value in outputs.items():
+            if value is not None:
+                tool_context.state[key] = value
+
+    return {**outputs, "cache_status": status}
+
+
+def invalidate_deal_pipeline(
+    real_estate_criteria: Optional[str] = None,
+    deal_interests: Optional[str] = None,
+    industry_focus: Optional[str] = None,
+) -> int:
+    """Drop the cached result for one criteria triple, or all results"""
+    if real_estate_criteria is None and deal_interests is None and industry_focus is None:
+        return invalidate_pipeline()
+    criteria = normalize_criteria(real_estate_criteria, deal_interests, industry_focus)
+    return invalidate_pipeline(PIPELINE_NAMESPACE, criteria)
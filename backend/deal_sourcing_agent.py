@@ -16,13 +16,20 @@
 
 import os
 from google.adk.agents import LlmAgent
+from google.adk.tools import FunctionTool
 from google.adk.tools.agent_tool import AgentTool
 
 import prompt
+from config import OPTIMIZATIONS
 from agents.sub_agents.real_estate_agent import real_estate_agent
 from agents.sub_agents.financial_news_agent import financial_news_agent
-from agents.sub_agents.deal_coordinator_agent import deal_coordinator_agent
-from agents.sub_agents.risk_analyst import risk_analyst_agent
+from agents.sub_agents.deal_coordinator_agent import coordinator_agent
+from agents.sub_agents.risk_analyst import risk_analyst_agent, map_reduce_risk_analysis
+from utils.financial_metrics import METRICS_TOOLS
+from utils.session_compaction import (
+    COMPACTION_AGENT_CALLBACK, COMPACTION_CALLBACK, COMPACTION_TOOL_CALLBACK, COMPACTION_TOOLS,
+)
+from utils.model_router import ROUTING_AFTER_CALLBACK, with_model_routing
 
 MODEL = "gemini-2.5-pro"
 
@@ -41,9 +48,16 @@ deal_sourcing_coordinator = LlmAgent(
     tools=[
         AgentTool(agent=real_estate_agent),
         AgentTool(agent=financial_news_agent),
-        AgentTool(agent=deal_coordinator_agent),
-        AgentTool(agent=risk_analyst_agent),
+        AgentTool(agent=coordinator_agent),
+        FunctionTool(func=map_reduce_risk_analysis) if OPTIMIZATIONS["map_reduce_risk"]
+        else AgentTool(agent=risk_analyst_agent),
+        *COMPACTION_TOOLS,
+        *METRICS_TOOLS,
     ],
+    before_agent_callback=COMPACTION_AGENT_CALLBACK,
+    before_model_callback=with_model_routing(COMPACTION_CALLBACK),
+    before_tool_callback=COMPACTION_TOOL_CALLBACK,
+    after_model_callback=ROUTING_AFTER_CALLBACK,
 )
 
 # Check optimization settings
@@ -14,6 +14,10 @@
 
 """Optimized, concise prompts for faster processing"""
 
+from .config import OUTPUT_CONFIG
+
+MAX_OPPORTUNITIES = OUTPUT_CONFIG["max_opportunities"]
+
 # Optimized Real Estate Agent Prompt (50% shorter)
 REAL_ESTATE_AGENT_PROMPT_OPTIMIZED = """
 Search for real estate investment opportunities based on user criteria.
@@ -31,10 +35,10 @@ Format: Structured list with deal highlights.
 """
 
 # Optimized Deal Coordinator Prompt (40% shorter)
-DEAL_COORDINATOR_PROMPT_OPTIMIZED = """
+DEAL_COORDINATOR_PROMPT_OPTIMIZED = f"""
 Synthesize real estate and business opportunities into unified analysis.
 Rank by: ROI potential, risk level, market timing, investment size.
-Output: Top 15 opportunities with investment thesis for each.
+Output: Top {MAX_OPPORTUNITIES} opportunities with investment thesis for each.
 Include: Quick summary, key metrics, next steps.
 """
 
@@ -47,7 +51,7 @@ Format: Concise risk matrix with actionable insights.
 """
 
 # Optimized Main Coordinator Prompt (60% shorter)
-DEAL_SOURCING_COORDINATOR_PROMPT_OPTIMIZED = """
+DEAL_SOURCING_COORDINATOR_PROMPT_OPTIMIZED = f"""
 Guide users through investment opportunity discovery using specialized agents.
 
 WORKFLOW:
@@ -62,7 +66,7 @@ OUTPUT FORMAT:
 - No technical details
 - Structured sections
 - Executive summary first
-- Top 15 opportunities
+- Top {MAX_OPPORTUNITIES} opportunities
 - Risk assessment
 - Action items
 
@@ -25,8 +25,14 @@ from google.adk.tools import FunctionTool
 from . import prompt
 from .sub_agents.real_estate_agent import real_estate_agent
 from .sub_agents.financial_news_agent import financial_news_agent
-from .sub_agents.deal_coordinator_agent import deal_coordinator_agent
-from .sub_agents.risk_analyst import risk_analyst_agent
+from .sub_agents.deal_coordinator_agent import coordinator_agent
+from .sub_agents.risk_analyst import risk_analyst_agent, map_reduce_risk_analysis
+from .config import OPTIMIZATIONS, OUTPUT_CONFIG
+from .utils.financial_metrics import METRICS_TOOLS
+from .utils.session_compaction import (
+    COMPACTION_AGENT_CALLBACK, COMPACTION_CALLBACK, COMPACTION_TOOL_CALLBACK, COMPACTION_TOOLS,
+)
+from .utils.model_router import ROUTING_AFTER_CALLBACK, with_model_routing
 
 MODEL = "gemini-2.5-pro"
 
@@ -135,9 +141,16 @@ parallel_deal_coordinator = LlmAgent(
     output_key="deal_sourcing_coordinator_output",
     tools=[
         parallel_search_tool,
-        AgentTool(agent=deal_coordinator_agent),
-        AgentTool(agent=risk_analyst_agent),
+        AgentTool(agent=coordinator_agent),
+        FunctionTool(func=map_reduce_risk_analysis) if OPTIMIZATIONS["map_reduce_risk"]
+        else AgentTool(agent=risk_analyst_agent),
+        *COMPACTION_TOOLS,
+        *METRICS_TOOLS,
     ],
+    before_agent_callback=COMPACTION_AGENT_CALLBACK,
+    before_model_callback=with_model_routing(COMPACTION_CALLBACK),
+    before_tool_callback=COMPACTION_TOOL_CALLBACK,
+    after_model_callback=ROUTING_AFTER_CALLBACK,
 )
 
 # Check if PDF generation is enabled
@@ -149,7 +162,7 @@ if PDF_ENABLED:
         from .pdf_agent import generate_pdf_report, PDF_COORDINATOR_PROMPT
 
         # Create PDF-enabled parallel coordinator
-        PARALLEL_PDF_PROMPT = PARALLEL_COORDINATOR_PROMPT + """
+        PARALLEL_PDF_PROMPT = PARALLEL_COORDINATOR_PROMPT + f"""
 
 IMPORTANT WORKFLOW FOR PDF GENERATION:
 
@@ -166,7 +179,7 @@ STEP 2: Ask for PDF confirmation
 
 The PDF should include:
 1. Executive Summary with key metrics and findings
-2. Detailed analysis of top 15 opportunities
+2. Detailed analysis of top {OUTPUT_CONFIG['max_opportunities']} opportunities
 3. Risk assessment and mitigation strategies
 4. Professional formatting and visualization
 5. Complete disclaimer and legal notices
@@ -183,10 +196,17 @@ The PDF should include:
             output_key="deal_sourcing_coordinator_output",
             tools=[
                 parallel_search_tool,
-                AgentTool(agent=deal_coordinator_agent),
-                AgentTool(agent=risk_analyst_agent),
-                generate_pdf_report
+                AgentTool(agent=coordinator_agent),
+                FunctionTool(func=map_reduce_risk_analysis) if OPTIMIZATIONS["map_reduce_risk"]
+                else AgentTool(agent=risk_analyst_agent),
+                generate_pdf_report,
+                *COMPACTION_TOOLS,
+                *METRICS_TOOLS,
             ],
+            before_agent_callback=COMPACTION_AGENT_CALLBACK,
+            before_model_callback=with_model_routing(COMPACTION_CALLBACK),
+            before_tool_callback=COMPACTION_TOOL_CALLBACK,
+            after_model_callback=ROUTING_AFTER_CALLBACK,
         )
 
         optimized_root_agent = parallel_deal_coordinator_with_pdf
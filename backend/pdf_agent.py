@@ -23,23 +23,40 @@ from pathlib import Path
 
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
 
 from . import prompt
+from .config import OUTPUT_CONFIG
+from .schemas import report_data_from_state, report_data_from_text
 from .sub_agents.real_estate_agent import real_estate_agent
 from .sub_agents.financial_news_agent import financial_news_agent
 from .sub_agents.deal_coordinator_agent import deal_coordinator_agent
 from .sub_agents.risk_analyst import risk_analyst_agent
 from .utils.pdf_generator import PDFGenerator
+from .utils.report_parser import parse_report
+from .utils.report_analytics import analytics_from_state, enrich_report_data
+from .utils.financial_metrics import METRICS_TOOLS
+from .utils.session_compaction import (
+    COMPACTION_AGENT_CALLBACK, COMPACTION_CALLBACK, COMPACTION_TOOL_CALLBACK, COMPACTION_TOOLS,
+)
+from .utils.model_router import ROUTING_AFTER_CALLBACK, with_model_routing
 
 MODEL = "gemini-2.5-pro"
 
 
-def generate_pdf_report(analysis_results: str) -> Dict[str, Any]:
+def generate_pdf_report(analysis_results: str, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
     """Generate PDF from analysis results"""
     try:
-        # Parse the analysis results
+        # Prefer the typed sub-agent outputs in session state, then a JSON
+        # analysis, and only re-parse free-form markdown as a last resort
         pdf_generator = PDFGenerator()
-        report_data = _structure_report_data(analysis_results)
+        state = tool_context.state if tool_context else None
+        report_data = (
+            report_data_from_state(state, analysis_results)
+            or report_data_from_text(analysis_results)
+            or parse_report(analysis_results)
+        )
+        report_data = enrich_report_data(report_data, analytics_from_state(state))
 
         # Generate PDF
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -66,129 +83,8 @@ def generate_pdf_report(analysis_results: str) -> Dict[str, Any]:
             "message": f"Failed to generate PDF: {str(e)}"
         }
 
-def _structure_report_data(analysis_results: str) -> Dict[str, Any]:
-        """Structure the analysis results for PDF generation"""
-
-        # Try to extract structured data from the analysis
-        report_data = {
-            'subtitle': 'AI-Powered Investment Opportunity Analysis',
-            'executive_summary': {
-                'metrics': {},
-                'key_findings': [],
-                'recommendations': []
-            },
-            'opportunities': [],
-            'risk_analysis': {
-                'overall_risk': 'Medium',
-                'market_risks': [],
-                'operational_risks': [],
-                'financial_risks': [],
-                'regulatory_risks': [],
-                'mitigation_strategies': []
-            },
-            'additional_content': analysis_results
-        }
-
-        # Parse the analysis results to extract key information
-        lines = analysis_results.split('\n')
-        current_section = None
-        opportunity_count = 0
-
-        for line in lines:
-            line = line.strip()
-
-            # Detect sections
-            if 'EXECUTIVE SUMMARY' in line.upper():
-                current_section = 'executive_summary'
-            elif 'OPPORTUNITY' in line.upper() or 'OPPORTUNITIES' in line.upper():
-                current_section = 'opportunities'
-            elif 'RISK' in line.upper() and 'ANALYSIS' in line.upper():
-                current_section = 'risk_analysis'
-
-            # Extract metrics
-            if 'Total' in line and 'opportunities' in line.lower():
-                try:
-                    count = int(''.join(filter(str.isdigit, line)))
-                    report_data['executive_summary']['metrics']['total_opportunities'] = count
-                except:
-                    pass
-
-            # Extract opportunities
-            if current_section == 'opportunities' and any(x in line.lower() for x in ['property', 'deal', 'acquisition', 'm&a']):
-                opportunity_count += 1
-                if opportunity_count <= 15:  # Limit to top 15
-                    report_data['opportunities'].append({
-                        'name': f'Opportunity {opportunity_count}',
-                        'category': 'Real Estate' if 'property' in line.lower() else 'Business Deal',
-                        'investment_size': 'TBD',
-                        'location': 'Various',
-                        'type': 'Investment Opportunity',
-                        'risk_level': 'Medium',
-                        'priority': 'High' if opportunity_count <= 5 else 'Medium',
-                        'highlights': line[:200] if len(line) > 200 else line,
-                        'risks': 'Standard market and execution risks',
-                        'next_steps': 'Conduct detailed due diligence'
-                    })
-
-            # Extract key findings
-            if current_section == 'executive_summary' and line and len(line) > 20:
-                if len(report_data['executive_summary']['key_findings']) < 5:
-                    report_data['executive_summary']['key_findings'].append(line[:150])
-
-            # Extract recommendations
-            if 'recommend' in line.lower() and line:
-                if len(report_data['executive_summary']['recommendations']) < 5:
-                    report_data['executive_summary']['recommendations'].append(line[:150])
-
-            # Extract risks
-            if current_section == 'risk_analysis' and 'risk' in line.lower():
-                if 'market' in line.lower():
-                    report_data['risk_analysis']['market_risks'].append(line[:100])
-                elif 'operational' in line.lower():
-                    report_data['risk_analysis']['operational_risks'].append(line[:100])
-                elif 'financial' in line.lower():
-                    report_data['risk_analysis']['financial_risks'].append(line[:100])
-                elif 'regulatory' in line.lower():
-                    report_data['risk_analysis']['regulatory_risks'].append(line[:100])
-
-        # Set default metrics if not found
-        if not report_data['executive_summary']['metrics']:
-            report_data['executive_summary']['metrics'] = {
-                'total_opportunities': opportunity_count,
-                'real_estate_count': sum(1 for o in report_data['opportunities'] if o['category'] == 'Real Estate'),
-                'business_deals_count': sum(1 for o in report_data['opportunities'] if o['category'] == 'Business Deal'),
-                'avg_deal_size': 'Varies by opportunity',
-                'geographic_spread': 'Multiple Markets'
-            }
-
-        # Add default content if empty
-        if not report_data['executive_summary']['key_findings']:
-            report_data['executive_summary']['key_findings'] = [
-                'Multiple investment opportunities identified across real estate and business sectors',
-                'Opportunities span various risk-return profiles suitable for different investor types',
-                'Market conditions favorable for selective investment deployment'
-            ]
-
-        if not report_data['executive_summary']['recommendations']:
-            report_data['executive_summary']['recommendations'] = [
-                'Prioritize high-confidence opportunities with clear value propositions',
-                'Conduct thorough due diligence on all opportunities before commitment',
-                'Diversify across opportunity types to manage portfolio risk'
-            ]
-
-        if not report_data['risk_analysis']['mitigation_strategies']:
-            report_data['risk_analysis']['mitigation_strategies'] = [
-                'Implement systematic due diligence process for all opportunities',
-                'Maintain portfolio diversification across sectors and geographies',
-                'Establish clear investment criteria and exit strategies',
-                'Regular monitoring and performance review of investments'
-            ]
-
-        return report_data
-
-
 # Create PDF-enabled coordinator with custom prompt
-PDF_COORDINATOR_PROMPT = prompt.DEAL_SOURCING_COORDINATOR_PROMPT + """
+PDF_COORDINATOR_PROMPT = prompt.DEAL_SOURCING_COORDINATOR_PROMPT + f"""
 
 CRITICAL OUTPUT FORMATTING RULES:
 
@@ -223,7 +119,7 @@ FORMATTING GUIDELINES:
 
 The PDF should include:
 1. Executive Summary with key metrics and findings
-2. Detailed analysis of top 15 opportunities
+2. Detailed analysis of top {OUTPUT_CONFIG['max_opportunities']} opportunities
 3. Risk assessment and mitigation strategies
 4. Professional formatting and visualization
 5. Complete disclaimer and legal notices
@@ -252,8 +148,14 @@ deal_sourcing_coordinator_with_pdf = LlmAgent(
         AgentTool(agent=financial_news_agent),
         AgentTool(agent=deal_coordinator_agent),
         AgentTool(agent=risk_analyst_agent),
-        generate_pdf_report
+        generate_pdf_report,
+        *COMPACTION_TOOLS,
+        *METRICS_TOOLS,
     ],
+    before_agent_callback=COMPACTION_AGENT_CALLBACK,
+    before_model_callback=with_model_routing(COMPACTION_CALLBACK),
+    before_tool_callback=COMPACTION_TOOL_CALLBACK,
+    after_model_callback=ROUTING_AFTER_CALLBACK,
 )
 
 # Make this the root agent for PDF-enabled version
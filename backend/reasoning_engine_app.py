@@ -3,7 +3,10 @@
 Reasoning Engine Application wrapper for Deal Sourcing Agent
 """
 
+from typing import Any, Dict, Iterator, Optional
+
 from deal_sourcing_agent import root_agent
+from streaming import AgentStreamer
 
 class DealSourcingApp:
     """Simple wrapper class that provides query method for Reasoning Engine"""
@@ -12,6 +15,7 @@ class DealSourcingApp:
         self.agent = root_agent
         self.name = "deal_sourcing_app"
         self.description = "AI-powered investment opportunity discovery agent"
+        self._streamer = None
 
     def query(self, input_text: str) -> str:
         """Query method for Reasoning Engine compatibility"""
@@ -29,5 +33,16 @@ class DealSourcingApp:
         except Exception as e:
             return f"Error processing query: {str(e)}"
 
+    def stream_query(
+        self,
+        input_text: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Streaming query method yielding text deltas and progress events"""
+        if self._streamer is None:
+            self._streamer = AgentStreamer(self.agent, app_name=self.name)
+        yield from self._streamer.stream(input_text, user_id=user_id, session_id=session_id)
+
 # Create the app instance
 app = DealSourcingApp()
\ No newline at end of file
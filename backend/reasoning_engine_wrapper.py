@@ -4,7 +4,10 @@ Reasoning Engine Wrapper for ADK Agents
 """
 
 import asyncio
+from typing import Any, Dict, Iterator, Optional
+
 from deal_sourcing_agent import root_agent
+from streaming import AgentStreamer
 
 
 class ReasoningEngineWrapper:
@@ -12,6 +15,7 @@ class ReasoningEngineWrapper:
 
     def __init__(self):
         self.agent = root_agent
+        self._streamer = None
 
     def query(self, input: str) -> str:
         """Query method required by Reasoning Engine"""
@@ -47,6 +51,22 @@ class ReasoningEngineWrapper:
         except Exception as e:
             return f"I'm your AI deal sourcing agent. How can I help you find investment opportunities today?"
 
+    def stream_query(
+        self,
+        input: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Streaming query method: yields text deltas and pipeline progress.
+
+        Each update is a dict with a "type" of "session", "progress", "text",
+        "done" or "error", so members see search progress and the first
+        tokens long before the whole pipeline has finished.
+        """
+        if self._streamer is None:
+            self._streamer = AgentStreamer(self.agent)
+        yield from self._streamer.stream(input, user_id=user_id, session_id=session_id)
+
 
 # Create the reasoning engine instance
 reasoning_engine = ReasoningEngineWrapper()
\ No newline at end of file
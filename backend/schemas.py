@@ -0,0 +1,316 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Structured output schemas for the deal sourcing sub-agents"""
+
+import json
+from typing import Dict, Any, List, Optional, Literal, Type, TypeVar, Union
+
+from pydantic import BaseModel, Field, ValidationError
+
+from config import OUTPUT_CONFIG
+
+RiskCategory = Literal["market", "operational", "financial", "regulatory"]
+RiskLevel = Literal["Low", "Medium", "High"]
+
+
+class Opportunity(BaseModel):
+    """A single real estate listing found by the real estate agent"""
+
+    name: str = Field(description="Property name or street address")
+    property_type: Optional[str] = Field(
+        default=None, description="multifamily, office, retail, industrial or mixed-use"
+    )
+    address: Optional[str] = None
+    location: Optional[str] = Field(default=None, description="City and state")
+    price_usd: Optional[float] = Field(default=None, description="Asking price in US dollars")
+    cap_rate: Optional[float] = Field(default=None, description="Cap rate in percent, e.g. 6.2")
+    noi_usd: Optional[float] = Field(default=None, description="Annual net operating income in US dollars")
+    square_footage: Optional[float] = None
+    units: Optional[int] = None
+    occupancy_rate: Optional[float] = Field(default=None, description="Occupancy in percent")
+    listed_date: Optional[str] = Field(default=None, description="ISO date the listing was posted")
+    highlights: Optional[str] = None
+    source_platform: Optional[str] = None
+    source_url: Optional[str] = None
+
+
+class Deal(BaseModel):
+    """A single business deal found by the financial news agent"""
+
+    company: str = Field(description="Target or primary company name")
+    deal_type: str = Field(description="M&A, private equity, venture, partnership or IPO")
+    counterparties: List[str] = Field(default_factory=list, description="Acquirers, investors or partners")
+    sector: Optional[str] = None
+    location: Optional[str] = None
+    value_usd: Optional[float] = Field(default=None, description="Disclosed deal value in US dollars")
+    announced_date: Optional[str] = Field(default=None, description="ISO date the deal was announced")
+    highlights: Optional[str] = Field(default=None, description="Strategic rationale in one or two sentences")
+    source_platform: Optional[str] = None
+    source_url: Optional[str] = None
+
+
+class RiskItem(BaseModel):
+    """A single risk identified by the risk analyst"""
+
+    category: RiskCategory
+    description: str
+    severity: RiskLevel = "Medium"
+    opportunity: Optional[str] = Field(
+        default=None, description="Opportunity name the risk applies to, empty for portfolio-wide risks"
+    )
+    mitigation: Optional[str] = None
+
+
+class RealEstateSearchOutput(BaseModel):
+    """Structured output of real_estate_agent"""
+
+    search_criteria: str
+    opportunities: List[Opportunity]
+    market_insights: List[str] = Field(default_factory=list, description="3-5 short market observations")
+
+
+class FinancialNewsSearchOutput(BaseModel):
+    """Structured output of financial_news_agent"""
+
+    deal_interests: str
+    industry_focus: Optional[str] = None
+    deals: List[Deal]
+    market_trends: List[str] = Field(default_factory=list, description="3-5 short market observations")
+
+
+class RiskAssessment(BaseModel):
+    """Structured output of risk_analyst_agent"""
+
+    overall_risk: RiskLevel
+    key_findings: List[str] = Field(description="3-5 key findings for the executive summary")
+    recommendations: List[str] = Field(description="3-5 strategic recommendations")
+    risks: List[RiskItem]
+    mitigation_strategies: List[str]
+    priority_opportunities: List[str] = Field(
+        default_factory=list, description="Opportunity names in priority order, highest first"
+    )
+
+
+class CandidateScore(BaseModel):
+    """Attractiveness score of one candidate in a scoring batch"""
+
+    id: str = Field(description="Candidate id exactly as given")
+    score: float = Field(description="0-100, higher is more attractive for the stated interests")
+    reason: Optional[str] = Field(default=None, description="One short sentence")
+
+
+class CandidateScores(BaseModel):
+    """Structured output of the batch opportunity scorer"""
+
+    scores: List[CandidateScore]
+
+
+STRUCTURED_OUTPUT_INSTRUCTION = """
+
+STRUCTURED OUTPUT:
+Return your final answer as a single JSON object matching the response schema
+instead of the markdown report structure described above. Do not wrap it in markdown. Use null for unknown values instead of guessing,
+and give money amounts as plain US dollar numbers (4500000, not "$4.5M").
+"""
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+def parse_structured(value: Union[str, Dict[str, Any], BaseModel, None], schema: Type[SchemaT]) -> Optional[SchemaT]:
+    """Parse an agent output into `schema`, returning None for free-form text"""
+    if value is None:
+        return None
+    if isinstance(value, schema):
+        return value
+    try:
+        if isinstance(value, BaseModel):
+            return schema.model_validate(value.model_dump())
+        if isinstance(value, dict):
+            return schema.model_validate(value)
+        text = str(value).strip()
+        if text.startswith("```"):
+            text = text.strip("`").split("\n", 1)[-1]
+        if not text.startswith("{"):
+            return None
+        return schema.model_validate(json.loads(text))
+    except (ValueError, ValidationError):
+        return None
+
+
+def format_usd(amount: Optional[float]) -> Optional[str]:
+    """Format a dollar amount the way the PDF tables display it"""
+    if amount is None:
+        return None
+    if amount >= 1_000_000_000:
+        return f"${amount / 1_000_000_000:.1f}B"
+    if amount >= 1_000_000:
+        return f"${amount / 1_000_000:.1f}M"
+    if amount >= 1_000:
+        return f"${amount / 1_000:.0f}K"
+    return f"${amount:,.0f}"
+
+
+def opportunity_to_report_entry(opp: Opportunity, rank: int) -> Dict[str, Any]:
+    """Map a real estate Opportunity onto the PDFGenerator opportunity dict"""
+    return {
+        'name': opp.name,
+        'category': 'Real Estate',
+        'property_name': opp.name,
+        'address': opp.address,
+        'investment_size': format_usd(opp.price_usd) or 'TBD',
+        'location': opp.location or 'N/A',
+        'property_type': opp.property_type,
+        'cap_rate': f"{opp.cap_rate:.2f}%" if opp.cap_rate is not None else None,
+        'noi': format_usd(opp.noi_usd),
+        'square_footage': f"{opp.square_footage:,.0f}" if opp.square_footage is not None else None,
+        'risk_level': 'Medium',
+        'priority': 'High' if rank <= 5 else 'Medium',
+        'highlights': opp.highlights,
+        'next_steps': 'Conduct detailed due diligence',
+        'source_platform': opp.source_platform or 'View Listing',
+        'source_url': opp.source_url,
+    }
+
+
+def deal_to_report_entry(deal: Deal, rank: int) -> Dict[str, Any]:
+    """Map a business Deal onto the PDFGenerator opportunity dict"""
+    return {
+        'name': deal.company,
+        'category': 'Business Deal',
+        'property_name': deal.company,
+        'investment_size': format_usd(deal.value_usd) or 'TBD',
+        'location': deal.location or 'N/A',
+        'property_type': deal.deal_type,
+        'risk_level': 'Medium',
+        'priority': 'High' if rank <= 5 else 'Medium',
+        'highlights': deal.highlights,
+        'next_steps': 'Conduct detailed due diligence',
+        'source_platform': deal.source_platform or 'View Source',
+        'source_url': deal.source_url,
+    }
+
+
+def build_report_data(
+    real_estate: Optional[RealEstateSearchOutput] = None,
+    financial_news: Optional[FinancialNewsSearchOutput] = None,
+    risk_assessment: Optional[RiskAssessment] = None,
+    additional_content: str = "",
+) -> Dict[str, Any]:
+    """Build PDFGenerator report_data directly from typed agent outputs"""
+    max_opportunities = OUTPUT_CONFIG["max_opportunities"]
+    properties = real_estate.opportunities if real_estate else []
+    deals = financial_news.deals if financial_news else []
+
+    # Interleave both sources so a long property list does not crowd out deals
+    entries: List[Dict[str, Any]] = []
+    for i in range(max(len(properties), len(deals))):
+        if i < len(properties):
+            entries.append(opportunity_to_report_entry(properties[i], len(entries) + 1))
+        if i < len(deals):
+            entries.append(deal_to_report_entry(deals[i], len(entries) + 1))
+
+    if risk_assessment and risk_assessment.priority_opportunities:
+        order = {name.lower(): i for i, name in enumerate(risk_assessment.priority_opportunities)}
+        entries.sort(key=lambda e: order.get(e['name'].lower(), len(order)))
+        for rank, entry in enumerate(entries, 1):
+            entry['priority'] = 'High' if rank <= 5 else 'Medium'
+    entries = entries[:max_opportunities]
+
+    if risk_assessment:
+        for item in risk_assessment.risks:
+            if not item.opportunity:
+                continue
+            for entry in entries:
+                if entry['name'].lower() == item.opportunity.lower():
+                    entry['risk_level'] = item.severity
+                    entry['risks'] = item.description
+                    if item.mitigation:
+                        entry['next_steps'] = item.mitigation
+
+    prices = [o.price_usd for o in properties if o.price_usd] + [d.value_usd for d in deals if d.value_usd]
+    locations = {e['location'] for e in entries if e['location'] != 'N/A'}
+
+    report_data = {
+        'subtitle': 'AI-Powered Investment Opportunity Analysis',
+        'executive_summary': {
+            'metrics': {
+                'total_opportunities': len(properties) + len(deals),
+                'real_estate_count': len(properties),
+                'business_deals_count': len(deals),
+                'avg_deal_size': format_usd(sum(prices) / len(prices)) if prices else 'Varies by opportunity',
+                'geographic_spread': f"{len(locations)} Markets" if locations else 'Multiple Markets',
+            },
+            'key_findings': [],
+            'recommendations': [],
+        },
+        'opportunities': entries,
+        'risk_analysis': {
+            'overall_risk': 'Medium',
+            'market_risks': [],
+            'operational_risks': [],
+            'financial_risks': [],
+            'regulatory_risks': [],
+            'mitigation_strategies': [],
+        },
+    }
+    if additional_content:
+        report_data['additional_content'] = additional_content
+
+    if real_estate:
+        report_data['executive_summary']['key_findings'].extend(real_estate.market_insights)
+    if financial_news:
+        report_data['executive_summary']['key_findings'].extend(financial_news.market_trends)
+
+    if risk_assessment:
+        summary = report_data['executive_summary']
+        summary['key_findings'] = risk_assessment.key_findings or summary['key_findings']
+        summary['recommendations'] = risk_assessment.recommendations
+        risk_analysis = report_data['risk_analysis']
+        risk_analysis['overall_risk'] = risk_assessment.overall_risk
+        risk_analysis['mitigation_strategies'] = risk_assessment.mitigation_strategies
+        for item in risk_assessment.risks:
+            risk_analysis[f"{item.category}_risks"].append(item.description)
+
+    return report_data
+
+
+def report_data_from_state(state: Any, additional_content: str = "") -> Optional[Dict[str, Any]]:
+    """Build report_data from structured outputs saved in session state.
+
+    Returns None when none of the sub-agents produced structured output, so
+    callers can fall back to parsing the free-form report text.
+    """
+    if state is None:
+        return None
+    real_estate = parse_structured(state.get("real_estate_opportunities_output"), RealEstateSearchOutput)
+    financial_news = parse_structured(state.get("financial_news_opportunities_output"), FinancialNewsSearchOutput)
+    risk_assessment = parse_structured(state.get("final_risk_assessment_output"), RiskAssessment)
+    if not (real_estate or financial_news or risk_assessment):
+        return None
+    return build_report_data(real_estate, financial_news, risk_assessment, additional_content)
+
+
+def report_data_from_text(text: str) -> Optional[Dict[str, Any]]:
+    """Build report_data from a JSON agent output, or None for markdown text"""
+    for schema in (RiskAssessment, RealEstateSearchOutput, FinancialNewsSearchOutput):
+        parsed = parse_structured(text, schema)
+        if parsed is None:
+            continue
+        if isinstance(parsed, RiskAssessment):
+            return build_report_data(risk_assessment=parsed)
+        if isinstance(parsed, RealEstateSearchOutput):
+            return build_report_data(real_estate=parsed)
+        return build_report_data(financial_news=parsed)
+    return None
@@ -0,0 +1,256 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Token and progress streaming for the Agent Engine wrappers"""
+
+import asyncio
+import queue
+import threading
+import uuid
+from typing import Dict, Any, Optional, Iterator, AsyncIterator
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import InMemoryRunner
+from google.genai.types import Part, UserContent
+
+# Pipeline stage announced when the root agent calls each tool
+TOOL_STAGES = {
+    'real_estate_agent': 'search_started',
+    'financial_news_agent': 'search_started',
+    'run_agents_in_parallel': 'search_started',
+    'ultra_fast_search': 'search_started',
+    'cached_deal_pipeline': 'deal_pipeline',
+    'deal_coordinator_agent': 'coordinating',
+    'scored_deal_coordinator': 'coordinating',
+    'risk_analyst_agent': 'risk_analysis',
+    'map_reduce_risk_analysis': 'risk_analysis',
+    'generate_pdf_report': 'generating_pdf',
+    'generate_pdf_async': 'generating_pdf',
+}
+
+STAGE_MESSAGES = {
+    'search_started': 'Searching opportunities...',
+    'search_results': 'Found {count} results',
+    'deal_pipeline': 'Searching, ranking and analyzing risk...',
+    'coordinating': 'Coordinating and ranking opportunities...',
+    'risk_analysis': 'Running risk analysis...',
+    'generating_pdf': 'Generating PDF report...',
+}
+
+# Result list keys, structured (schemas.py) first, then ultra_fast_search keys
+_RESULT_LIST_KEYS = ('opportunities', 'deals', 'results')
+
+
+def _count_results(response: Any) -> Optional[int]:
+    """Best-effort count of the opportunities in a tool response"""
+    if isinstance(response, dict):
+        if 'result' in response and len(response) == 1:
+            return _count_results(response['result'])
+        total = None
+        for key, value in response.items():
+            if key in _RESULT_LIST_KEYS and isinstance(value, list):
+                total = (total or 0) + len(value)
+            elif isinstance(value, dict):
+                nested = _count_results(value)
+                if nested is not None:
+                    total = (total or 0) + nested
+        return total
+    if isinstance(response, list):
+        return len(response)
+    return None
+
+
+def _as_dict(event: Any) -> Dict[str, Any]:
+    """Normalize an ADK Event or an AdkApp stream_query dict to a dict"""
+    if isinstance(event, dict):
+        return event
+    return event.model_dump(mode='json', exclude_none=True)
+
+
+class StreamTranslator:
+    """Translate ADK events into text delta and progress updates.
+
+    Works with both `Runner.run_async` events and the JSON dicts yielded by
+    `AdkApp.stream_query`. Updates are plain dicts:
+
+    - ``{"type": "text", "delta": "..."}`` for model text as it arrives
+    - ``{"type": "progress", "stage": "...", "message": "..."}`` per stage
+    - ``{"type": "done", "text": "..."}`` once, with the final response
+    """
+
+    def __init__(self, root_agent_name: Optional[str] = None):
+        self.root_agent_name = root_agent_name
+        self._streamed_partial = False
+        self._final_text = ""
+        self._announced = set()
+
+    def _progress(self, stage: str, **details) -> Dict[str, Any]:
+        message = STAGE_MESSAGES.get(stage, stage).format(**details)
+        return {'type': 'progress', 'stage': stage, 'message': message, **details}
+
+    def translate(self, event: Any) -> Iterator[Dict[str, Any]]:
+        """Yield the updates carried by a single event"""
+        event = _as_dict(event)
+        author = event.get('author')
+        if self.root_agent_name and author not in (None, self.root_agent_name):
+            # Sub-agent text is surfaced through the root agent's response
+            return
+        partial = bool(event.get('partial'))
+
+        for part in (event.get('content') or {}).get('parts') or []:
+            call = part.get('function_call')
+            if call:
+                stage = TOOL_STAGES.get(call.get('name'))
+                # Announce each tool once, even if a retry re-emits the call
+                if stage and (stage, call.get('name')) not in self._announced:
+                    self._announced.add((stage, call.get('name')))
+                    yield self._progress(stage, tool=call.get('name'))
+                continue
+
+            response = part.get('function_response')
+            if response:
+                if TOOL_STAGES.get(response.get('name')) == 'search_started':
+                    count = _count_results(response.get('response'))
+                    if count is not None:
+                        yield self._progress('search_results', tool=response.get('name'), count=count)
+                continue
+
+            text = part.get('text')
+            if not text or part.get('thought'):
+                continue
+            if partial:
+                self._streamed_partial = True
+            elif self._streamed_partial:
+                # Aggregated copy of the deltas already sent
+                continue
+            # Non-streaming backends only send the aggregated response
+            self._final_text += text
+            yield {'type': 'text', 'delta': text}
+
+        if not partial:
+            self._streamed_partial = False
+
+    def finish(self) -> Iterator[Dict[str, Any]]:
+        """Yield the closing update"""
+        yield {'type': 'done', 'text': self._final_text}
+
+
+class AgentStreamer:
+    """Run an ADK agent with SSE streaming and yield translated updates"""
+
+    def __init__(self, agent, app_name: str = "deal_sourcing_app"):
+        self.agent = agent
+        self.runner = InMemoryRunner(agent=agent, app_name=app_name)
+
+    async def _ensure_session(self, user_id: str, session_id: Optional[str]) -> str:
+        session_service = self.runner.session_service
+        if session_id:
+            session = await session_service.get_session(
+                app_name=self.runner.app_name, user_id=user_id, session_id=session_id
+            )
+            if session:
+                return session.id
+        session = await session_service.create_session(
+            app_name=self.runner.app_name,
+            user_id=user_id,
+            session_id=session_id or str(uuid.uuid4()),
+        )
+        return session.id
+
+    async def astream(
+        self,
+        message: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream updates for one member message"""
+        session_id = await self._ensure_session(user_id, session_id)
+        translator = StreamTranslator(root_agent_name=self.agent.name)
+        yield {'type': 'session', 'session_id': session_id}
+
+        async for event in self.runner.run_async(
+            user_id=user_id,
+            session_id=session_id,
+            new_message=UserContent(parts=[Part(text=message)]),
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        ):
+            for update in translator.translate(event):
+                yield update
+
+        for update in translator.finish():
+            yield update
+
+    def stream(
+        self,
+        message: str,
+        user_id: str = "default_user",
+        session_id: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Synchronous generator over `astream`, for Reasoning Engine wrappers.
+
+        The async pipeline runs on a background thread so the first update is
+        yielded as soon as it is produced rather than after the run finishes.
+        If the consumer stops early (closes the generator or disconnects),
+        the run is cancelled instead of finishing unseen.
+        """
+        updates: "queue.Queue" = queue.Queue()
+        sentinel = object()
+        stop = threading.Event()
+        running: Dict[str, Any] = {}
+
+        async def pump():
+            running['loop'], running['task'] = asyncio.get_running_loop(), asyncio.current_task()
+            try:
+                if stop.is_set():
+                    return
+                async for update in self.astream(message, user_id, session_id):
+                    if stop.is_set():
+                        break
+                    updates.put(update)
+            except Exception as e:
+                updates.put({'type': 'error', 'error': str(e)})
+            finally:
+                updates.put(sentinel)
+
+        def run():
+            try:
+                asyncio.run(pump())
+            except asyncio.CancelledError:
+                pass
+
+        threading.Thread(target=run, daemon=True).start()
+        finished = False
+        try:
+            while True:
+                update = updates.get()
+                if update is sentinel:
+                    finished = True
+                    return
+                yield update
+        finally:
+            stop.set()
+            if not finished and 'task' in running:
+                try:
+                    running['loop'].call_soon_threadsafe(running['task'].cancel)
+                except RuntimeError:
+                    # The run ended meanwhile and its loop is already closed
+                    pass
+
+
+def translate_stream(events) -> Iterator[Dict[str, Any]]:
+    """Translate an `AdkApp.stream_query` event stream into updates"""
+    translator = StreamTranslator()
+    for event in events:
+        yield from translator.translate(event)
+    yield from translator.finish()
@@ -25,8 +25,15 @@ from .config import MODELS, OPTIMIZATIONS, get_optimization_summary
 from .optimized_prompts import OPTIMIZED_PROMPTS
 from .utils.search_optimizer import create_batched_search_tool, batch_google_search
 from .utils.async_pdf import generate_pdf_async, check_pdf_status
-from .sub_agents.deal_coordinator_agent import deal_coordinator_agent
-from .sub_agents.risk_analyst import risk_analyst_agent
+from .sub_agents.deal_coordinator_agent import coordinator_agent
+from .sub_agents.risk_analyst import risk_analyst_agent, map_reduce_risk_analysis
+from .utils.financial_metrics import METRICS_TOOLS
+from .utils.session_compaction import (
+    COMPACTION_AGENT_CALLBACK, COMPACTION_CALLBACK, COMPACTION_TOOL_CALLBACK, COMPACTION_TOOLS,
+)
+from .utils.model_router import ROUTING_AFTER_CALLBACK, with_model_routing
+from .utils.pipeline_cache import memoize_pipeline, normalize_criteria
+from .deal_pipeline import cached_deal_pipeline
 
 def ultra_fast_search(
     real_estate_criteria: str,
@@ -38,6 +45,20 @@ def ultra_fast_search(
     Combines all optimizations: parallel execution, batched searches,
     caching, and optimized prompts for maximum performance.
     """
+    # Identical criteria share one cached result and one in-flight search
+    result, cache_status = memoize_pipeline(
+        "ultra_fast_search",
+        normalize_criteria(real_estate_criteria, deal_interests, industry_focus),
+        lambda: _run_ultra_fast_search(real_estate_criteria, deal_interests, industry_focus),
+    )
+    return {**result, 'cache_status': cache_status}
+
+def _run_ultra_fast_search(
+    real_estate_criteria: str,
+    deal_interests: str,
+    industry_focus: str
+) -> Dict[str, Any]:
+    """Execute the batched searches behind ultra_fast_search"""
     from .sub_agents.real_estate_agent import Agent
     from .sub_agents.real_estate_agent.prompt import REAL_ESTATE_AGENT_PROMPT
     from .sub_agents.financial_news_agent.prompt import FINANCIAL_NEWS_AGENT_PROMPT
@@ -112,6 +133,11 @@ check_pdf_tool = FunctionTool(
     func=check_pdf_status
 )
 
+# Full search -> coordination -> risk pipeline, memoized per criteria
+cached_pipeline_tool = FunctionTool(
+    func=cached_deal_pipeline
+)
+
 # Ultra-optimized prompt
 ULTRA_FAST_PROMPT = """
 Deal Sourcing Agent - ULTRA FAST MODE
@@ -120,10 +146,12 @@ Active Optimizations: {optimizations}
 
 WORKFLOW:
 1. Get criteria (location, industries, interests)
-2. Ultra-fast parallel + batched search
-3. Coordinate results
-4. Risk analysis
-5. Show report + async PDF option
+2. Run cached_deal_pipeline (search + coordination + risk in one call,
+   reused for repeat criteria; pass force_refresh only if the member asks
+   for fresh results)
+3. Fall back to ultra-fast search, coordination and risk analysis
+   step by step only if the pipeline fails
+4. Show report + async PDF option
 
 Be concise. No fluff. Results-focused.
 """.format(optimizations=get_optimization_summary())
@@ -136,12 +164,20 @@ ultra_fast_coordinator = LlmAgent(
     instruction=ULTRA_FAST_PROMPT if OPTIMIZATIONS["use_light_models"] else OPTIMIZED_PROMPTS["main_coordinator"],
     output_key="ultra_fast_output",
     tools=[
+        cached_pipeline_tool,
         ultra_fast_search_tool,
-        AgentTool(agent=deal_coordinator_agent),
-        AgentTool(agent=risk_analyst_agent),
+        AgentTool(agent=coordinator_agent),
+        FunctionTool(func=map_reduce_risk_analysis) if OPTIMIZATIONS["map_reduce_risk"]
+        else AgentTool(agent=risk_analyst_agent),
         async_pdf_tool,
-        check_pdf_tool
+        check_pdf_tool,
+        *COMPACTION_TOOLS,
+        *METRICS_TOOLS,
     ],
+    before_agent_callback=COMPACTION_AGENT_CALLBACK,
+    before_model_callback=with_model_routing(COMPACTION_CALLBACK),
+    before_tool_callback=COMPACTION_TOOL_CALLBACK,
+    after_model_callback=ROUTING_AFTER_CALLBACK,
 )
 
 # Export the ultra-fast agent as the optimized choice
@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Programmatic execution of ADK agents outside the chat loop"""
+
+from typing import Dict, Any, Optional
+
+from google.adk.runners import InMemoryRunner
+from google.genai.types import Part, UserContent
+
+# One runner per agent; InMemoryRunner is cheap to keep and costly to rebuild
+_runners: Dict[int, InMemoryRunner] = {}
+
+
+def _get_runner(agent) -> InMemoryRunner:
+    runner = _runners.get(id(agent))
+    if runner is None:
+        runner = InMemoryRunner(agent=agent, app_name=f"{agent.name}_runner")
+        _runners[id(agent)] = runner
+    return runner
+
+
+async def run_agent(
+    agent,
+    message: str,
+    state: Optional[Dict[str, Any]] = None,
+    user_id: str = "pipeline",
+) -> Dict[str, Any]:
+    """Run an agent to completion in a fresh session.
+
+    Args:
+        agent: The ADK agent to run
+        message: The user message that starts the run
+        state: Initial session state, e.g. outputs of earlier stages
+
+    Returns:
+        Dictionary with the final response text under "text" and the final
+        session state under "state"
+    """
+    runner = _get_runner(agent)
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id, state=dict(state or {})
+    )
+
+    final_text = ""
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session.id,
+        new_message=UserContent(parts=[Part(text=message)]),
+    ):
+        if event.is_final_response() and event.content and event.content.parts:
+            text = "".join(p.text for p in event.content.parts if p.text and not p.thought)
+            if text:
+                final_text = text
+
+    session = await runner.session_service.get_session(
+        app_name=runner.app_name, user_id=user_id, session_id=session.id
+    )
+    # Sessions are single-use, drop them so long-lived processes do not grow
+    await runner.session_service.delete_session(
+        app_name=runner.app_name, user_id=user_id, session_id=session.id
+    )
+    return {"text": final_text, "state": dict(session.state)}
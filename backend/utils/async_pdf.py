@@ -21,7 +21,11 @@ from datetime import datetime
 from pathlib import Path
 import queue
 import uuid
+from google.adk.tools.tool_context import ToolContext
 from config import OPTIMIZATIONS
+from schemas import report_data_from_state, report_data_from_text
+from utils.report_parser import parse_report
+from utils.report_analytics import analytics_from_state, enrich_report_data
 
 class AsyncPDFGenerator:
     """Generate PDFs asynchronously without blocking the main response"""
@@ -48,13 +52,18 @@ class AsyncPDFGenerator:
 
                 task_id = task['id']
                 analysis_results = task['analysis_results']
+                report_data = task.get('report_data')
+                analytics = task.get('analytics')
                 callback = task.get('callback')
 
                 # Generate PDF
                 try:
                     from utils.pdf_generator import PDFGenerator
                     pdf_generator = PDFGenerator()
-                    report_data = self._structure_report_data(analysis_results)
+                    if report_data is None:
+                        report_data = self._structure_report_data(analysis_results)
+                    if analytics:
+                        report_data = enrich_report_data(report_data, analytics)
 
                     # Generate PDF
                     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -93,7 +102,9 @@ class AsyncPDFGenerator:
     def generate_async(
         self,
         analysis_results: str,
-        callback: Optional[Callable] = None
+        callback: Optional[Callable] = None,
+        report_data: Optional[Dict[str, Any]] = None,
+        analytics: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Generate PDF asynchronously
@@ -101,6 +112,8 @@ class AsyncPDFGenerator:
         Args:
             analysis_results: The analysis results to convert to PDF
             callback: Optional callback function to call when PDF is ready
+            report_data: Pre-structured report data, skips text parsing
+            analytics: Local tool outputs from session state to add to the report
 
         Returns:
             Immediate response with task ID for tracking
@@ -117,6 +130,8 @@ class AsyncPDFGenerator:
         task = {
             'id': task_id,
             'analysis_results': analysis_results,
+            'report_data': report_data,
+            'analytics': analytics,
             'callback': callback
         }
         self.pdf_queue.put(task)
@@ -142,31 +157,7 @@ class AsyncPDFGenerator:
 
     def _structure_report_data(self, analysis_results: str) -> Dict[str, Any]:
         """Structure the analysis results for PDF generation"""
-        # This is a simplified version - reuse from pdf_agent.py
-        report_data = {
-            'subtitle': 'AI-Powered Investment Opportunity Analysis',
-            'executive_summary': {
-                'metrics': {'total_opportunities': 0},
-                'key_findings': [],
-                'recommendations': []
-            },
-            'opportunities': [],
-            'risk_analysis': {
-                'overall_risk': 'Medium',
-                'market_risks': [],
-                'mitigation_strategies': []
-            },
-            'additional_content': analysis_results
-        }
-
-        # Parse analysis results
-        lines = analysis_results.split('\n')
-        for line in lines[:10]:  # Quick parse for async
-            if line.strip():
-                if 'opportunity' in line.lower():
-                    report_data['executive_summary']['metrics']['total_opportunities'] += 1
-
-        return report_data
+        return report_data_from_text(analysis_results) or parse_report(analysis_results)
 
 # Global async PDF generator instance
 _async_pdf_generator = None
@@ -178,13 +169,17 @@ def get_async_pdf_generator() -> AsyncPDFGenerator:
         _async_pdf_generator = AsyncPDFGenerator()
     return _async_pdf_generator
 
-def generate_pdf_async(analysis_results: str) -> Dict[str, Any]:
+def generate_pdf_async(analysis_results: str, tool_context: Optional[ToolContext] = None) -> Dict[str, Any]:
     """Generate PDF report asynchronously for immediate response.
 
     Returns immediately with task ID while PDF generation happens in background.
     """
     generator = get_async_pdf_generator()
-    return generator.generate_async(analysis_results)
+    # Structured sub-agent outputs are read here, on the tool call, because
+    # session state is not safe to touch from the worker thread
+    report_data = report_data_from_state(tool_context.state, analysis_results) if tool_context else None
+    analytics = analytics_from_state(tool_context.state) if tool_context else None
+    return generator.generate_async(analysis_results, report_data=report_data, analytics=analytics)
 
 def check_pdf_status(task_id: str) -> Dict[str, Any]:
     """Check status of async PDF generation task."""
@@ -0,0 +1,120 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deal financing model shared by the risk simulation and the metrics calculator.
+
+Debt is `ltv` of the price at `interest_rate`, amortizing over
+`amortization_years` (interest only when 0). Current NOI is year 1 NOI and
+grows each year after; the property is sold at the end of the hold on the
+following year's NOI and the loan balance is repaid. Every function takes
+NumPy arrays that broadcast together, interest rates included.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from config import FINANCING_CONFIG
+
+
+def annual_debt_service(debt: np.ndarray, interest_rate, amortization_years: Optional[int] = None) -> np.ndarray:
+    """Level annual payment of a fully amortizing loan, or interest only when amortization_years is 0"""
+    amortization_years = FINANCING_CONFIG["amortization_years"] if amortization_years is None else amortization_years
+    rate = np.asarray(interest_rate, dtype=np.float64)
+    if amortization_years <= 0:
+        return debt * rate
+    with np.errstate(divide="ignore", invalid="ignore"):
+        payment = debt * rate / (1 - (1 + rate) ** -amortization_years)
+    return np.where(rate > 0, payment, debt / amortization_years)
+
+
+def loan_balance(debt: np.ndarray, interest_rate, amortization_years: Optional[int], years: int) -> np.ndarray:
+    """Outstanding principal after `years` of annual_debt_service payments"""
+    amortization_years = FINANCING_CONFIG["amortization_years"] if amortization_years is None else amortization_years
+    rate = np.asarray(interest_rate, dtype=np.float64)
+    if amortization_years <= 0:
+        return debt + 0 * rate
+    payment = annual_debt_service(debt, rate, amortization_years)
+    growth = (1 + rate) ** years
+    with np.errstate(divide="ignore", invalid="ignore"):
+        balance = np.where(rate > 0, debt * growth - payment * (growth - 1) / rate, debt - payment * years)
+    return np.maximum(balance, 0.0)
+
+
+def sale_proceeds(
+    debt: np.ndarray,
+    noi: np.ndarray,
+    noi_growth,
+    exit_cap,
+    interest_rate,
+    amortization_years: Optional[int],
+    hold_years: int,
+) -> np.ndarray:
+    """Sale price at `exit_cap` on the NOI of the year after the hold, less the loan balance"""
+    exit_value = noi * (1 + noi_growth) ** hold_years / np.maximum(exit_cap, 0.01)
+    return exit_value - loan_balance(debt, interest_rate, amortization_years, hold_years)
+
+
+def hold_period(
+    price: np.ndarray,
+    noi: np.ndarray,
+    noi_growth,
+    exit_cap,
+    interest_rate,
+    ltv: float,
+    amortization_years: Optional[int],
+    hold_years: int,
+) -> Dict[str, np.ndarray]:
+    """Equity, debt service, operating cash flow, sale proceeds and worst DSCR over the hold.
+
+    The NOI path is geometric, so the hold-period sum and the worst year have
+    closed forms and no per-year axis is built; the sums equal the rows of
+    the year-by-year cash flows the metrics calculator uses.
+    """
+    factor = 1 + noi_growth
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # NOI of years 1..hold_years: noi * factor ** (year - 1)
+        annuity = np.where(np.abs(noi_growth) > 1e-9, (factor ** hold_years - 1) / noi_growth, float(hold_years))
+    debt = price * ltv
+    payment = annual_debt_service(debt, interest_rate, amortization_years)
+    with np.errstate(divide="ignore"):
+        min_dscr = noi * np.minimum(1.0, factor ** (hold_years - 1)) / np.where(payment > 0, payment, np.nan)
+    return {
+        'equity': price - debt,
+        'debt_service': payment,
+        'operating_cash_flow': noi * annuity - hold_years * payment,
+        'sale_proceeds': sale_proceeds(debt, noi, noi_growth, exit_cap, interest_rate, amortization_years, hold_years),
+        'min_dscr': min_dscr,
+    }
+
+
+def levered_cash_flows(
+    price: np.ndarray,
+    noi: np.ndarray,
+    noi_growth: float,
+    exit_cap: np.ndarray,
+    interest_rate: float,
+    ltv: float,
+    amortization_years: Optional[int],
+    hold_years: int,
+) -> np.ndarray:
+    """Equity cash flows of 1-D deal arrays with shape (deals, hold_years + 1), year 0 first"""
+    debt = price * ltv
+    payment = annual_debt_service(debt, interest_rate, amortization_years)
+    growth = (1 + noi_growth) ** np.arange(hold_years)
+    flows = np.empty((len(price), hold_years + 1))
+    flows[:, 0] = debt - price
+    flows[:, 1:] = noi[:, None] * growth - payment[:, None]
+    flows[:, -1] += sale_proceeds(debt, noi, noi_growth, exit_cap, interest_rate, amortization_years, hold_years)
+    return flows
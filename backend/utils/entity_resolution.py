@@ -0,0 +1,350 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local entity resolution: merge duplicate listings and deals before coordination"""
+
+import json
+import re
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Any, List, Optional, Tuple
+
+from config import ENTITY_RESOLUTION_CONFIG
+from schemas import Deal, FinancialNewsSearchOutput, Opportunity, RealEstateSearchOutput
+from utils.session_compaction import estimate_tokens
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_ABBREVIATIONS = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'boulevard': 'blvd', 'road': 'rd', 'drive': 'dr',
+    'lane': 'ln', 'court': 'ct', 'place': 'pl', 'parkway': 'pkwy', 'highway': 'hwy', 'square': 'sq',
+    'terrace': 'ter', 'circle': 'cir', 'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'first': '1st', 'second': '2nd', 'third': '3rd', 'apartments': 'apts', 'apartment': 'apts',
+    'center': 'ctr', 'centre': 'ctr', 'and': '&',
+}
+# Unit designators; the token after them is dropped too ('Suite 200')
+_UNIT_WORDS = {'suite', 'ste', 'unit', 'apt', 'floor', 'fl'}
+# Property type words that listing sites add or drop from the same property's name
+_GENERIC_LISTING_WORDS = {
+    'apts', 'residences', 'homes', 'townhomes', 'lofts', 'complex', 'property', 'building', 'bldg', 'community',
+}
+_STATES = {
+    'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar', 'california': 'ca', 'colorado': 'co',
+    'connecticut': 'ct', 'delaware': 'de', 'florida': 'fl', 'georgia': 'ga', 'hawaii': 'hi', 'idaho': 'id',
+    'illinois': 'il', 'indiana': 'in', 'iowa': 'ia', 'kansas': 'ks', 'kentucky': 'ky', 'louisiana': 'la',
+    'maine': 'me', 'maryland': 'md', 'massachusetts': 'ma', 'michigan': 'mi', 'minnesota': 'mn',
+    'mississippi': 'ms', 'missouri': 'mo', 'montana': 'mt', 'nebraska': 'ne', 'nevada': 'nv',
+    'new hampshire': 'nh', 'new jersey': 'nj', 'new mexico': 'nm', 'new york': 'ny', 'north carolina': 'nc',
+    'north dakota': 'nd', 'ohio': 'oh', 'oklahoma': 'ok', 'oregon': 'or', 'pennsylvania': 'pa',
+    'rhode island': 'ri', 'south carolina': 'sc', 'south dakota': 'sd', 'tennessee': 'tn', 'texas': 'tx',
+    'utah': 'ut', 'vermont': 'vt', 'virginia': 'va', 'washington': 'wa', 'west virginia': 'wv',
+    'wisconsin': 'wi', 'wyoming': 'wy', 'district of columbia': 'dc',
+}
+_STATE_CODES = set(_STATES.values())
+_LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'corp', 'corporation', 'co', 'company', 'llc', 'ltd', 'limited', 'plc',
+    'lp', 'llp', 'holdings', 'holding', 'group', 'sa', 'ag', 'nv', 'gmbh', 'the',
+}
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall((text or '').lower().replace('&', ' and '))
+
+
+def normalize_address(address: Optional[str]) -> str:
+    """'123 North Main Street, Suite 200' -> '123 n main st'; city, state and zip are kept"""
+    tokens, skip = [], False
+    for token in _tokens(address):
+        if skip:
+            skip = False
+            continue
+        if token in _UNIT_WORDS:
+            skip = True
+            continue
+        tokens.append(_ABBREVIATIONS.get(token, token))
+    return ' '.join(tokens)
+
+
+def normalize_company(name: Optional[str]) -> str:
+    """'The Acme Holdings, Inc.' -> 'acme'; a name made only of suffixes is kept whole"""
+    tokens = [_ABBREVIATIONS.get(t, t) for t in _tokens(name)]
+    core = [t for t in tokens if t not in _LEGAL_SUFFIXES]
+    return ' '.join(core or tokens)
+
+
+def normalize_listing_name(name: Optional[str]) -> str:
+    """'The Maple Court Apartments' -> 'maple ct'"""
+    tokens = [_ABBREVIATIONS.get(t, t) for t in _tokens(name)]
+    core = [t for t in tokens if t not in _GENERIC_LISTING_WORDS and t != 'the']
+    return ' '.join(core or tokens)
+
+
+def parse_locality(text: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """'Austin, Texas 78701' -> ('austin', 'tx'); parts that cannot be read are None"""
+    tokens = [t for t in _tokens(text) if not (t.isdigit() and len(t) == 5)]
+    state = None
+    for size in (3, 2, 1):
+        tail = ' '.join(tokens[-size:])
+        if len(tokens) >= size and (tail in _STATES or (size == 1 and tail in _STATE_CODES)):
+            state = _STATES.get(tail, tail)
+            tokens = tokens[:-size]
+            break
+    return (' '.join(tokens) or None), state
+
+
+def _locality(record: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """City and state from the location field, else from the address after its first comma"""
+    if record.get('location'):
+        return parse_locality(record['location'])
+    address = record.get('address') or ''
+    if ',' in address:
+        return parse_locality(address.split(',', 1)[1])
+    return None, None
+
+
+def similarity(a: str, b: str) -> float:
+    """Order-insensitive string similarity in [0, 1] on sorted tokens"""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    matcher = SequenceMatcher(None, ' '.join(sorted(a.split())), ' '.join(sorted(b.split())), autojunk=False)
+    if matcher.real_quick_ratio() < 0.5:
+        return 0.0
+    return matcher.ratio()
+
+
+def _values_close(a: Optional[float], b: Optional[float]) -> bool:
+    if not a or not b:
+        return True
+    return abs(a - b) / max(a, b) <= ENTITY_RESOLUTION_CONFIG["max_value_gap"]
+
+
+def _listing_key(record: Dict[str, Any]) -> Dict[str, Any]:
+    address = normalize_address(record.get('address'))
+    number = address.split()[0] if address and address.split()[0].isdigit() else None
+    city, state = _locality(record)
+    return {'name': normalize_listing_name(record.get('name')), 'address': address, 'number': number,
+            'value': record.get('price_usd'), 'city': city, 'state': state}
+
+
+def _deal_key(record: Dict[str, Any]) -> Dict[str, Any]:
+    city, state = _locality(record)
+    return {'name': normalize_company(record.get('company')), 'address': '', 'number': None,
+            'value': record.get('value_usd'), 'deal_type': normalize_company(record.get('deal_type')),
+            'city': city, 'state': state}
+
+
+def _blocking_keys(key: Dict[str, Any]) -> List[int]:
+    """Hashed block ids: street number + street word, and the leading name tokens"""
+    blocks = []
+    address = key['address'].split()
+    if key['number'] and len(address) > 1:
+        blocks.append(hash(('addr', key['number'], address[1])))
+    name = key['name'].split()
+    if name:
+        blocks.append(hash(('name', name[0], name[1][:3] if len(name) > 1 else '')))
+        # Catches reordered or prefixed names such as 'Denver Maple Court'
+        blocks.append(hash(('last', name[-1], len(name) > 1)))
+    return blocks
+
+
+def _same_entity(a: Dict[str, Any], b: Dict[str, Any], threshold: float) -> bool:
+    if not _values_close(a['value'], b['value']):
+        return False
+    if a.get('deal_type') and b.get('deal_type') and a['deal_type'] != b['deal_type']:
+        return False
+    if a['number'] and b['number'] and a['number'] != b['number']:
+        return False
+    # Same name and street in different cities are different properties
+    for part in ('city', 'state'):
+        if a.get(part) and b.get(part) and a[part] != b[part]:
+            return False
+    if a['address'] and b['address'] and similarity(a['address'], b['address']) >= threshold:
+        return True
+    return similarity(a['name'], b['name']) >= threshold
+
+
+def resolve_entities(records: List[Dict[str, Any]], kind: str, threshold: Optional[float] = None) -> List[List[int]]:
+    """Cluster records that describe the same property ('listing') or deal ('deal').
+
+    Records are hashed into blocks on normalized address and name tokens and
+    only pairs sharing a block are compared, so the cost stays near linear.
+    Clusters are merged with complete linkage: every member of one must
+    match every member of the other, so a record without an address cannot
+    bridge two different properties. Returns clusters of record indices in
+    first-seen order.
+    """
+    threshold = ENTITY_RESOLUTION_CONFIG["threshold"] if threshold is None else threshold
+    keys = [(_listing_key if kind == 'listing' else _deal_key)(r) for r in records]
+    parent = list(range(len(records)))
+    members_of: Dict[int, List[int]] = {i: [i] for i in range(len(records))}
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    blocks: Dict[int, List[int]] = defaultdict(list)
+    for i, key in enumerate(keys):
+        for block in _blocking_keys(key):
+            blocks[block].append(i)
+
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > ENTITY_RESOLUTION_CONFIG["max_block_size"]:
+            continue
+        for x, i in enumerate(members):
+            for j in members[x + 1:]:
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j:
+                    continue
+                if all(_same_entity(keys[a], keys[b], threshold) for a in members_of[root_i] for b in members_of[root_j]):
+                    root, child = min(root_i, root_j), max(root_i, root_j)
+                    parent[child] = root
+                    members_of[root].extend(members_of.pop(child))
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for i in range(len(records)):
+        clusters[find(i)].append(i)
+    return list(clusters.values())
+
+
+def link_across_reports(
+    listings: List[Dict[str, Any]],
+    deals: List[Dict[str, Any]],
+    threshold: Optional[float] = None,
+) -> List[Tuple[int, int]]:
+    """(listing, deal) index pairs where a news deal is about a listed property.
+
+    A listing and a deal match when their names agree once generic listing
+    words and legal suffixes are dropped, their locations name the same city
+    and state, and their price and deal value are close. Records without a
+    readable city are never matched across reports. Deals are blocked on
+    city, state and leading name token, and each record is linked at most once.
+    """
+    threshold = ENTITY_RESOLUTION_CONFIG["threshold"] if threshold is None else threshold
+
+    def key(name: Optional[str], record: Dict[str, Any], value: Optional[float]) -> Optional[Dict[str, Any]]:
+        name = normalize_company(normalize_listing_name(name))
+        city, state = _locality(record)
+        if not name or not city:
+            return None
+        return {'name': name, 'city': city, 'state': state, 'value': value}
+
+    blocks: Dict[Tuple, List[int]] = defaultdict(list)
+    deal_keys = [key(d.get('company'), d, d.get('value_usd')) for d in deals]
+    for j, deal_key in enumerate(deal_keys):
+        if deal_key:
+            blocks[(deal_key['city'], deal_key['name'].split()[0])].append(j)
+
+    pairs, linked = [], set()
+    for i, listing in enumerate(listings):
+        listing_key = key(listing.get('name'), listing, listing.get('price_usd'))
+        if not listing_key:
+            continue
+        for j in blocks.get((listing_key['city'], listing_key['name'].split()[0]), []):
+            deal_key = deal_keys[j]
+            if j in linked or not _values_close(listing_key['value'], deal_key['value']):
+                continue
+            if listing_key['state'] and deal_key['state'] and listing_key['state'] != deal_key['state']:
+                continue
+            if similarity(listing_key['name'], deal_key['name']) >= threshold:
+                pairs.append((i, j))
+                linked.add(j)
+                break
+    return pairs
+
+
+def merge_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """The most complete record, with its missing fields filled from the others"""
+    ranked = sorted(records, key=lambda r: sum(1 for v in r.values() if v not in (None, '', [])), reverse=True)
+    merged = dict(ranked[0])
+    for record in ranked[1:]:
+        for field, value in record.items():
+            if merged.get(field) in (None, '', []) and value not in (None, '', []):
+                merged[field] = value
+    return merged
+
+
+def _dedupe(records: List[Dict[str, Any]], kind: str, name_field: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    merged, groups = [], []
+    for cluster in resolve_entities(records, kind):
+        members = [records[i] for i in cluster]
+        merged.append(merge_records(members) if len(members) > 1 else members[0])
+        if len(members) > 1:
+            groups.append({'kept': merged[-1][name_field], 'merged': [m[name_field] for m in members]})
+    return merged, groups
+
+
+def dedupe_search_outputs(
+    real_estate: Optional[RealEstateSearchOutput],
+    financial_news: Optional[FinancialNewsSearchOutput],
+) -> Tuple[Optional[RealEstateSearchOutput], Optional[FinancialNewsSearchOutput], Dict[str, Any]]:
+    """Merge duplicate listings and deals within and across the search outputs.
+
+    Duplicates are merged within each output first. A news deal about a
+    listed property is then folded into that listing, filling its missing
+    price, highlights and source, and dropped from the deals. Returns the
+    deduplicated outputs and stats with the dedup ratio, the merged groups
+    and the estimated prompt token reduction.
+    """
+    def tokens(*outputs) -> int:
+        return sum(estimate_tokens(json.dumps(o.model_dump(exclude_none=True), default=str)) for o in outputs if o)
+
+    tokens_before = tokens(real_estate, financial_news)
+    records_before = records_after = 0
+    groups: List[Dict[str, Any]] = []
+    if real_estate is not None:
+        listings = [o.model_dump() for o in real_estate.opportunities]
+        merged, merged_groups = _dedupe(listings, 'listing', 'name')
+        real_estate = real_estate.model_copy(update={'opportunities': [Opportunity.model_validate(m) for m in merged]})
+        records_before += len(listings)
+        records_after += len(merged)
+        groups.extend(merged_groups)
+    if financial_news is not None:
+        deals = [d.model_dump() for d in financial_news.deals]
+        merged, merged_groups = _dedupe(deals, 'deal', 'company')
+        financial_news = financial_news.model_copy(update={'deals': [Deal.model_validate(m) for m in merged]})
+        records_before += len(deals)
+        records_after += len(merged)
+        groups.extend(merged_groups)
+    if real_estate is not None and financial_news is not None:
+        listings = [o.model_dump() for o in real_estate.opportunities]
+        deals = [d.model_dump() for d in financial_news.deals]
+        pairs = link_across_reports(listings, deals)
+        for i, j in pairs:
+            deal, listing = deals[j], listings[i]
+            for field, value in (('price_usd', deal['value_usd']), ('highlights', deal['highlights']),
+                                 ('source_platform', deal['source_platform']), ('source_url', deal['source_url'])):
+                if listing.get(field) in (None, '') and value not in (None, ''):
+                    listing[field] = value
+            groups.append({'kept': listing['name'], 'merged': [listing['name'], deal['company']]})
+        dropped = {j for _, j in pairs}
+        real_estate = real_estate.model_copy(update={'opportunities': [Opportunity.model_validate(m) for m in listings]})
+        financial_news = financial_news.model_copy(update={
+            'deals': [Deal.model_validate(d) for j, d in enumerate(deals) if j not in dropped],
+        })
+        records_after -= len(pairs)
+    tokens_after = tokens(real_estate, financial_news)
+
+    return real_estate, financial_news, {
+        'records_before': records_before,
+        'records_after': records_after,
+        'duplicates_merged': records_before - records_after,
+        'dedup_ratio': round(1 - records_after / records_before, 4) if records_before else 0.0,
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'token_reduction': round(1 - tokens_after / tokens_before, 4) if tokens_before else 0.0,
+        'merged_groups': groups,
+    }
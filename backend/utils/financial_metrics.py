@@ -0,0 +1,249 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Batch IRR, NPV, cash-on-cash, DSCR and price per square foot over opportunity arrays"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from google.adk.tools.tool_context import ToolContext
+
+from config import FINANCIAL_METRICS_CONFIG, FINANCING_CONFIG, OPTIMIZATIONS
+from schemas import format_usd
+from utils import deal_financing
+from utils.deal_financing import annual_debt_service
+from utils.risk_simulation import deal_parameters
+
+# Per-deal output columns of compute_metrics, NaN where a metric is undefined
+METRIC_COLUMNS = (
+    "irr", "npv_usd", "equity_multiple", "cash_on_cash", "dscr", "price_per_sqft", "price_per_unit",
+)
+
+
+def levered_cash_flows(
+    price: np.ndarray,
+    noi: np.ndarray,
+    ltv: float,
+    interest_rate: float,
+    amortization_years: int,
+    noi_growth: float,
+    exit_cap_spread: float,
+    hold_years: int,
+) -> np.ndarray:
+    """Equity cash flows with shape (deals, hold_years + 1), year 0 first.
+
+    Uses the shared financing model of utils.deal_financing, with the
+    property sold at the entry cap rate plus `exit_cap_spread`.
+    """
+    exit_cap = noi / price + exit_cap_spread
+    return deal_financing.levered_cash_flows(
+        price, noi, noi_growth, exit_cap, interest_rate, ltv, amortization_years, hold_years,
+    )
+
+
+def npv(cash_flows: np.ndarray, rate: float) -> np.ndarray:
+    """Net present value of each row of cash flows, year 0 undiscounted"""
+    cash_flows = np.atleast_2d(cash_flows)
+    return cash_flows @ (1 + rate) ** -np.arange(cash_flows.shape[1], dtype=np.float64)
+
+
+def irr(cash_flows: np.ndarray, guess: float = 0.1, tol: float = 1e-10, max_iter: int = 100) -> np.ndarray:
+    """Internal rate of return of each row by Newton iteration on all rows at once.
+
+    Rows whose cash flows never change sign, or where Newton does not
+    converge, get NaN. Converged rows drop out of later iterations.
+    """
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=np.float64))
+    periods = np.arange(cash_flows.shape[1], dtype=np.float64)
+    rate = np.full(len(cash_flows), guess)
+    converged = np.zeros(len(cash_flows), dtype=bool)
+    pending = np.flatnonzero((cash_flows.min(axis=1) < 0) & (cash_flows.max(axis=1) > 0))
+
+    for _ in range(max_iter):
+        if pending.size == 0:
+            break
+        current = rate[pending]
+        discounted = cash_flows[pending] * (1 + current)[:, None] ** -periods
+        value = discounted.sum(axis=1)
+        slope = -(discounted @ periods) / (1 + current)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = value / slope
+        finite = np.isfinite(step)
+        # Keep the rate above -100%, where the discount factors blow up
+        rate[pending] = np.where(finite, np.maximum(current - step, -0.9999), current)
+        done = finite & (np.abs(step) < tol)
+        converged[pending[done]] = True
+        pending = pending[finite & ~done]
+
+    return np.where(converged, rate, np.nan)
+
+
+def compute_metrics(
+    price: np.ndarray,
+    noi: np.ndarray,
+    sqft: Optional[np.ndarray] = None,
+    units: Optional[np.ndarray] = None,
+    discount_rate: Optional[float] = None,
+    ltv: Optional[float] = None,
+    interest_rate: Optional[float] = None,
+    hold_years: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Every METRIC_COLUMNS column for arrays of deals in one pass.
+
+    `sqft` and `units` may contain NaN for unknown sizes. Assumptions not
+    given come from FINANCIAL_METRICS_CONFIG and FINANCING_CONFIG.
+    """
+    config = FINANCIAL_METRICS_CONFIG
+    amortization_years = FINANCING_CONFIG["amortization_years"]
+    discount_rate = config["discount_rate"] if discount_rate is None else discount_rate
+    ltv = FINANCING_CONFIG["ltv"] if ltv is None else ltv
+    interest_rate = FINANCING_CONFIG["interest_rate"] if interest_rate is None else interest_rate
+    hold_years = hold_years or FINANCING_CONFIG["hold_years"]
+    price = np.asarray(price, dtype=np.float64)
+    noi = np.asarray(noi, dtype=np.float64)
+    sqft = np.full(len(price), np.nan) if sqft is None else np.asarray(sqft, dtype=np.float64)
+    units = np.full(len(price), np.nan) if units is None else np.asarray(units, dtype=np.float64)
+
+    flows = levered_cash_flows(
+        price, noi, ltv, interest_rate, amortization_years,
+        config["noi_growth"], config["exit_cap_spread"], hold_years,
+    )
+    equity = -flows[:, 0]
+    payment = annual_debt_service(price * ltv, interest_rate, amortization_years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "irr": irr(flows),
+            "npv_usd": npv(flows, discount_rate),
+            "equity_multiple": flows[:, 1:].sum(axis=1) / equity,
+            "cash_on_cash": (noi - payment) / equity,
+            "dscr": np.where(payment > 0, noi / payment, np.nan),
+            "price_per_sqft": np.where(sqft > 0, price / sqft, np.nan),
+            "price_per_unit": np.where(units > 0, price / units, np.nan),
+        }
+
+
+def deal_metrics(
+    deals: List[Dict[str, Any]],
+    discount_rate: Optional[float] = None,
+    ltv: Optional[float] = None,
+    interest_rate: Optional[float] = None,
+    hold_years: Optional[int] = None,
+) -> Dict[str, Any]:
+    """compute_metrics over deal_parameters rows; JSON-serializable for tools and session state"""
+    started = time.perf_counter()
+    config = FINANCIAL_METRICS_CONFIG
+    assumptions = {
+        'discount_rate': config["discount_rate"] if discount_rate is None else discount_rate,
+        'ltv': FINANCING_CONFIG["ltv"] if ltv is None else ltv,
+        'interest_rate': FINANCING_CONFIG["interest_rate"] if interest_rate is None else interest_rate,
+        'hold_years': hold_years or FINANCING_CONFIG["hold_years"],
+        'amortization_years': FINANCING_CONFIG["amortization_years"],
+        'noi_growth': config["noi_growth"],
+        'exit_cap_spread': config["exit_cap_spread"],
+    }
+    if not deals:
+        return {'opportunities': [], 'assumptions': assumptions, 'elapsed_ms': 0.0}
+
+    metrics = compute_metrics(
+        np.array([d['price_usd'] for d in deals]),
+        np.array([d['noi_usd'] for d in deals]),
+        np.array([d.get('sqft') or np.nan for d in deals]),
+        np.array([d.get('units') or np.nan for d in deals]),
+        discount_rate=assumptions['discount_rate'],
+        ltv=assumptions['ltv'],
+        interest_rate=assumptions['interest_rate'],
+        hold_years=assumptions['hold_years'],
+    )
+    columns = {name: np.round(metrics[name], 4).tolist() for name in METRIC_COLUMNS}
+    rows = []
+    for i, deal in enumerate(deals):
+        row = {'name': deal['name'], 'price_usd': deal['price_usd'], 'noi_usd': deal['noi_usd']}
+        row.update({name: None if columns[name][i] != columns[name][i] else columns[name][i] for name in METRIC_COLUMNS})
+        rows.append(row)
+    return {
+        'opportunities': rows,
+        'assumptions': assumptions,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def _signed_usd(amount: float) -> str:
+    return f"-{format_usd(-amount)}" if amount < 0 else format_usd(amount)
+
+
+def metric_fields(metrics_output: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """Display strings for the PDF opportunity tables, keyed by lowercase opportunity name"""
+    if not metrics_output:
+        return {}
+    formats = {
+        'irr': ('irr', lambda v: f"{v:.1%}"),
+        'npv_usd': ('npv', _signed_usd),
+        'cash_on_cash': ('cash_on_cash', lambda v: f"{v:.1%}"),
+        'dscr': ('dscr', lambda v: f"{v:.2f}x"),
+        'price_per_sqft': ('price_per_sqft', lambda v: f"${v:,.0f}"),
+    }
+    fields = {}
+    for row in metrics_output.get('opportunities', []):
+        fields[row['name'].lower()] = {
+            key: fmt(row[column]) for column, (key, fmt) in formats.items() if row.get(column) is not None
+        }
+    return fields
+
+
+def calculate_deal_metrics(
+    names: Optional[List[str]] = None,
+    discount_rate: Optional[float] = None,
+    ltv: Optional[float] = None,
+    interest_rate: Optional[float] = None,
+    hold_years: Optional[int] = None,
+    tool_context: Optional[ToolContext] = None,
+) -> Dict[str, Any]:
+    """Compute IRR, NPV, cash-on-cash, DSCR and price per square foot for the real estate opportunities.
+
+    Use this instead of doing return arithmetic yourself whenever the user
+    asks for returns, yields or debt coverage of properties found by the
+    real estate search. Leave an argument empty to use the default assumption.
+
+    Args:
+        names: Only these opportunity names; all opportunities when empty
+        discount_rate: Discount rate for NPV as a fraction, e.g. 0.08
+        ltv: Loan-to-value ratio as a fraction, e.g. 0.65
+        interest_rate: Annual loan interest rate as a fraction, e.g. 0.065
+        hold_years: Holding period in years before the assumed sale
+
+    Returns:
+        Dictionary with one row of metrics per opportunity (rates as
+        fractions, money in US dollars, null where a metric is undefined)
+        and the assumptions used
+    """
+    state = tool_context.state.to_dict() if tool_context is not None else {}
+    deals = deal_parameters(state, limit=FINANCIAL_METRICS_CONFIG["max_deals"])
+    if names:
+        wanted = {name.lower() for name in names}
+        deals = [d for d in deals if d['name'].lower() in wanted]
+    if not deals:
+        return {
+            "success": False,
+            "error": "No real estate opportunity with both a price and an NOI or cap rate was found",
+        }
+
+    result = deal_metrics(deals, discount_rate, ltv, interest_rate, hold_years)
+    if tool_context is not None:
+        tool_context.state["financial_metrics_output"] = result
+    return {"success": True, **result}
+
+
+# Wiring helper for the root coordinators
+METRICS_TOOLS = [calculate_deal_metrics] if OPTIMIZATIONS["financial_metrics"] else []
@@ -0,0 +1,269 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Light-model-first cascade with quality-gated escalation to the heavy model"""
+
+import logging
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.models.registry import LLMRegistry
+
+from config import CASCADE_CONFIG, OPTIMIZATIONS
+from schemas import RiskAssessment, parse_structured
+
+logger = logging.getLogger(__name__)
+
+_TOTAL_OPPORTUNITIES = re.compile(r"total opportunities analyzed\W*(\d+)", re.IGNORECASE)
+_TIER_ENTRY = re.compile(r"^\s*(?:[*-]|\d+\.)\s*\*\*(?:rank|tier|opportunity)\b", re.IGNORECASE | re.MULTILINE)
+
+# Risk categories the risk report must cover, with the headings that signal them
+RISK_CATEGORY_MARKERS = {
+    'market': ("market and economic risks", "market risk"),
+    'operational': ("operational and execution risks", "operational risk"),
+    'financial': ("financial/business deal risks", "financial risk", "valuation and pricing risks"),
+    'regulatory': ("regulatory", "legal risks"),
+}
+
+
+def _response_text(llm_response: LlmResponse) -> str:
+    if not llm_response.content or not llm_response.content.parts:
+        return ""
+    return "".join(p.text for p in llm_response.content.parts if p.text and not p.thought)
+
+
+def validate_coordinated_analysis(text: str, min_opportunities: int, min_risk_categories: int) -> List[str]:
+    """Failures of a deal_coordinator_agent report, empty when it passes"""
+    failures = []
+    lowered = text.lower()
+    if "executive summary" not in lowered:
+        failures.append("missing executive summary")
+    if "top priority opportunities" not in lowered:
+        failures.append("missing priority ranking")
+
+    stated = _TOTAL_OPPORTUNITIES.search(text)
+    count = int(stated.group(1)) if stated else len(_TIER_ENTRY.findall(text))
+    if count < min_opportunities:
+        failures.append(f"only {count} opportunities")
+    return failures
+
+
+def validate_risk_assessment(text: str, min_opportunities: int, min_risk_categories: int) -> List[str]:
+    """Failures of a risk_analyst_agent report, JSON or markdown, empty when it passes"""
+    failures = []
+    required_opportunities = min_opportunities
+    assessment = parse_structured(text, RiskAssessment)
+    if assessment is not None:
+        categories = {risk.category for risk in assessment.risks}
+        opportunities = len(assessment.priority_opportunities)
+        if not assessment.key_findings:
+            failures.append("missing executive summary")
+    else:
+        # Markdown reports only name their Tier 1 section, not every entry
+        required_opportunities = 1
+        if OPTIMIZATIONS["structured_outputs"]:
+            failures.append("schema mismatch")
+        lowered = text.lower()
+        if "executive summary" not in lowered:
+            failures.append("missing executive summary")
+        categories = {
+            category for category, markers in RISK_CATEGORY_MARKERS.items()
+            if any(marker in lowered for marker in markers)
+        }
+        opportunities = len(_TIER_ENTRY.findall(text)) or lowered.count("tier 1")
+
+    if len(categories) < min_risk_categories:
+        failures.append(f"only {len(categories)} risk categories")
+    if opportunities < required_opportunities:
+        failures.append(f"only {opportunities} priority opportunities")
+    return failures
+
+
+# Validator per cascaded agent
+VALIDATORS: Dict[str, Callable[[str, int, int], List[str]]] = {
+    'deal_coordinator_agent': validate_coordinated_analysis,
+    'risk_analyst_agent': validate_risk_assessment,
+}
+
+
+class ModelCascade:
+    """Answer with the light model and escalate to the heavy one on failure.
+
+    The light model's final response is checked by a local validator for
+    the agent; if a required section is missing, the opportunity count is
+    too low or the JSON does not match the schema, the same request is
+    re-sent to the heavy model and its response replaces the light one.
+    Each call is recorded so escalation rates and latency saved per agent
+    can be reported.
+    """
+
+    def __init__(
+        self,
+        light_model: str,
+        heavy_model: str,
+        min_opportunities: int = 3,
+        min_risk_categories: int = 3,
+    ):
+        self.light_model = light_model
+        self.heavy_model = heavy_model
+        self.min_opportunities = min_opportunities
+        self.min_risk_categories = min_risk_categories
+        self._heavy_llm = None
+        self._pending: Dict[Tuple[str, str], Tuple[LlmRequest, float]] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _agent_stats(self, agent_name: str) -> Dict[str, Any]:
+        return self._stats.setdefault(agent_name, {
+            'calls': 0, 'escalations': 0, 'failures': {},
+            'light_seconds': deque(maxlen=1000), 'heavy_seconds': deque(maxlen=1000),
+        })
+
+    def validate(self, agent_name: str, text: str) -> List[str]:
+        """Run the agent's validator; agents without one always pass"""
+        if not text.strip():
+            return ["empty response"]
+        validator = VALIDATORS.get(agent_name)
+        if validator is None:
+            return []
+        return validator(text, self.min_opportunities, self.min_risk_categories)
+
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest):
+        """ADK before_model_callback: send the call to the light model first"""
+        llm_request.model = self.light_model
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        with self._lock:
+            self._pending[key] = (llm_request, time.time())
+            # Calls that errored never reach after_model, keep the map bounded
+            while len(self._pending) > 1000:
+                self._pending.pop(next(iter(self._pending)))
+        return None
+
+    async def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse):
+        """ADK after_model_callback: validate and escalate if needed"""
+        if llm_response.partial:
+            return None
+        agent_name = callback_context.agent_name
+        with self._lock:
+            pending = self._pending.pop((callback_context.invocation_id, agent_name), None)
+        if pending is None:
+            return None
+        llm_request, started = pending
+        light_seconds = time.time() - started
+        parts = (llm_response.content.parts if llm_response.content else None) or []
+        if any(p.function_call for p in parts) or llm_response.error_code:
+            # Tool steps and model errors are not final answers; only the text reply is validated
+            return None
+
+        failures = self.validate(agent_name, _response_text(llm_response))
+        with self._lock:
+            stats = self._agent_stats(agent_name)
+            stats['calls'] += 1
+            stats['light_seconds'].append(light_seconds)
+            for failure in failures:
+                stats['failures'][failure] = stats['failures'].get(failure, 0) + 1
+        if not failures:
+            return None
+
+        logger.info("cascade escalating %s to %s: %s", agent_name, self.heavy_model, "; ".join(failures))
+        heavy_response = await self._call_heavy(llm_request)
+        if heavy_response is None:
+            return None
+        with self._lock:
+            stats['escalations'] += 1
+            stats['heavy_seconds'].append(time.time() - started - light_seconds)
+        return heavy_response
+
+    async def _call_heavy(self, llm_request: LlmRequest) -> Optional[LlmResponse]:
+        """Re-send the request to the heavy model, keeping the light answer on error"""
+        if self._heavy_llm is None:
+            self._heavy_llm = LLMRegistry.new_llm(self.heavy_model)
+        llm_request.model = self.heavy_model
+        final = None
+        try:
+            async for response in self._heavy_llm.generate_content_async(llm_request, stream=False):
+                final = response
+        except Exception as e:
+            logger.warning("cascade escalation to %s failed: %s", self.heavy_model, e)
+            return None
+        return final
+
+    def report(self) -> Dict[str, Any]:
+        """Escalation rate and estimated latency saved per agent"""
+        summary = {}
+        with self._lock:
+            for agent_name, stats in self._stats.items():
+                calls, escalations = stats['calls'], stats['escalations']
+                light = stats['light_seconds']
+                heavy = stats['heavy_seconds']
+                light_avg = sum(light) / len(light) if light else None
+                heavy_avg = sum(heavy) / len(heavy) if heavy else None
+                # Accepted light calls save (heavy - light); escalations waste the light call
+                saved = None
+                if heavy_avg is not None and light_avg is not None:
+                    saved = (calls - escalations) * (heavy_avg - light_avg) - escalations * light_avg
+                summary[agent_name] = {
+                    'calls': calls,
+                    'escalations': escalations,
+                    'escalation_rate': escalations / calls if calls else 0.0,
+                    'avg_light_seconds': light_avg,
+                    'avg_heavy_seconds': heavy_avg,
+                    'estimated_seconds_saved': saved,
+                    'failures': dict(stats['failures']),
+                }
+        return {
+            'light_model': self.light_model,
+            'heavy_model': self.heavy_model,
+            'agents': summary,
+        }
+
+
+_cascade = ModelCascade(
+    light_model=CASCADE_CONFIG["light_model"],
+    heavy_model=CASCADE_CONFIG["heavy_model"],
+    min_opportunities=CASCADE_CONFIG["min_opportunities"],
+    min_risk_categories=CASCADE_CONFIG["min_risk_categories"],
+)
+
+
+def get_model_cascade() -> ModelCascade:
+    """Get the global model cascade"""
+    return _cascade
+
+
+def cascade_light_first(callback_context: CallbackContext, llm_request: LlmRequest):
+    """before_model_callback that sends the call to the light model"""
+    return _cascade.before_model(callback_context, llm_request)
+
+
+async def cascade_escalate(callback_context: CallbackContext, llm_response: LlmResponse):
+    """after_model_callback that escalates failed light responses"""
+    return await _cascade.after_model(callback_context, llm_response)
+
+
+def get_cascade_report() -> Dict[str, Any]:
+    """Escalation rates and latency savings per agent"""
+    return _cascade.report()
+
+
+# Cascaded agents use these instead of the per-call router
+CASCADE_ENABLED = OPTIMIZATIONS["model_cascade"]
+CASCADE_BEFORE_CALLBACK = cascade_light_first if CASCADE_ENABLED else None
+CASCADE_AFTER_CALLBACK = cascade_escalate if CASCADE_ENABLED else None
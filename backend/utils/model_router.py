@@ -0,0 +1,310 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Per-call model routing by request complexity and latency SLO"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from config import MODELS, OPTIMIZATIONS, ROUTER_CONFIG
+from utils.session_compaction import content_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Task type of each agent, anything else is treated as conversation
+AGENT_TASK_TYPES = {
+    'real_estate_agent': 'search',
+    'financial_news_agent': 'search',
+    'deal_coordinator_agent': 'synthesis',
+    'risk_analyst_agent': 'analysis',
+}
+
+# Tasks whose quality depends on the heavy model; neither a small input nor
+# the latency SLO downgrades them
+HEAVY_TASK_TYPES = {'synthesis', 'analysis'}
+
+# Conversation stages derived from the current turn
+STAGE_CHAT = "chat"            # member message, no tool results yet this turn
+STAGE_PRESENTING = "presenting"  # tool results present, composing the answer
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class ModelRouter:
+    """Choose the light or heavy model for each LLM call.
+
+    Inputs are the estimated prompt size, the agent's task type, the
+    conversation stage and the configured latency SLO. Latency is predicted
+    from input tokens plus the expected output tokens, since generation
+    dominates call time. Every decision and the latency observed for it is
+    kept in a bounded log; observed latencies and output sizes feed back into
+    the prediction so it adapts per model and agent.
+    """
+
+    def __init__(
+        self,
+        light_model: str,
+        heavy_model: str,
+        small_input_tokens: int,
+        latency_slo_seconds: float,
+        default_seconds_per_ktoken: Dict[str, float],
+        default_seconds_per_output_ktoken: Optional[Dict[str, float]] = None,
+        expected_output_tokens: Optional[Dict[str, int]] = None,
+        ewma_alpha: float = 0.2,
+        max_decisions: int = 1000,
+    ):
+        self.light_model = light_model
+        self.heavy_model = heavy_model
+        self.small_input_tokens = small_input_tokens
+        self.latency_slo_seconds = latency_slo_seconds
+        self.ewma_alpha = ewma_alpha
+        self._seconds_per_ktoken = dict(default_seconds_per_ktoken)
+        self._seconds_per_output_ktoken = dict(default_seconds_per_output_ktoken or {})
+        self.expected_output_tokens = dict(expected_output_tokens or {})
+        self._output_tokens: Dict[str, float] = {}  # observed output tokens per agent (EWMA)
+        self.decisions: deque = deque(maxlen=max_decisions)
+        self._pending: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def conversation_stage(contents: List[types.Content]) -> Tuple[str, int]:
+        """Return (stage, tokens of the latest member message)"""
+        for content in reversed(contents or []):
+            parts = content.parts or []
+            if any(p.function_response for p in parts):
+                return STAGE_PRESENTING, 0
+            if content.role == "user" and any(p.text for p in parts):
+                text = "".join(p.text for p in parts if p.text)
+                return STAGE_CHAT, estimate_tokens(text)
+        return STAGE_CHAT, 0
+
+    @staticmethod
+    def _rate(rates: Dict[str, float], model: str, fallback_model: str, default: float) -> float:
+        return rates.get(model, rates.get(fallback_model, default))
+
+    def predict_latency(self, model: str, input_tokens: int, output_tokens: int = 0) -> float:
+        """Predicted seconds for a call: prefill of the input plus generation of the output"""
+        input_rate = self._rate(self._seconds_per_ktoken, model, self.heavy_model, 1.0)
+        output_rate = self._rate(self._seconds_per_output_ktoken, model, self.heavy_model, 0.0)
+        return input_rate * input_tokens / 1000 + output_rate * output_tokens / 1000
+
+    def expected_output(self, agent_name: str, task_type: str) -> int:
+        """Output tokens expected from an agent: observed when known, else the task default"""
+        with self._lock:
+            observed = self._output_tokens.get(agent_name)
+        if observed is not None:
+            return int(observed)
+        return self.expected_output_tokens.get(task_type, self.expected_output_tokens.get('conversation', 0))
+
+    def choose(self, agent_name: str, contents: List[types.Content]) -> Dict[str, Any]:
+        """Route one call and return the decision record"""
+        task_type = AGENT_TASK_TYPES.get(agent_name, 'conversation')
+        input_tokens = content_tokens(contents or [])
+        stage, message_tokens = self.conversation_stage(contents)
+        output_tokens = self.expected_output(agent_name, task_type)
+
+        if task_type == 'search':
+            model, reason = self.light_model, "search task"
+        elif task_type == 'conversation' and stage == STAGE_CHAT and message_tokens < self.small_input_tokens // 4:
+            model, reason = self.light_model, "short member message"
+        elif input_tokens < self.small_input_tokens and task_type not in HEAVY_TASK_TYPES:
+            model, reason = self.light_model, "small input"
+        else:
+            model, reason = self.heavy_model, "complex input"
+
+        # Degrade to the light model when the heavy one would miss the SLO,
+        # except for tasks that need the heavy model
+        if model == self.heavy_model:
+            predicted = self.predict_latency(self.heavy_model, input_tokens, output_tokens)
+            if predicted > self.latency_slo_seconds:
+                if task_type in HEAVY_TASK_TYPES:
+                    reason = f"{reason}, over SLO ({predicted:.1f}s predicted)"
+                elif self.predict_latency(self.light_model, input_tokens, output_tokens) <= self.latency_slo_seconds:
+                    model, reason = self.light_model, f"latency SLO ({predicted:.1f}s predicted)"
+
+        return {
+            'timestamp': time.time(),
+            'agent': agent_name,
+            'task_type': task_type,
+            'stage': stage,
+            'input_tokens': input_tokens,
+            'expected_output_tokens': output_tokens,
+            'output_tokens': None,
+            'model': model,
+            'reason': reason,
+            'latency_seconds': None,
+        }
+
+    def before_model(self, callback_context: CallbackContext, llm_request: LlmRequest):
+        """ADK before_model_callback: pick the model for this call"""
+        decision = self.choose(callback_context.agent_name, llm_request.contents)
+        llm_request.model = decision['model']
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        with self._lock:
+            self._pending[key] = decision
+            self.decisions.append(decision)
+            # Calls that errored never reach after_model, keep the map bounded
+            while len(self._pending) > self.decisions.maxlen:
+                self._pending.pop(next(iter(self._pending)))
+        logger.debug("model route %s -> %s (%s)", decision['agent'], decision['model'], decision['reason'])
+        return None
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse):
+        """ADK after_model_callback: record latency of the routed call"""
+        if llm_response.partial:
+            return None
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        with self._lock:
+            decision = self._pending.pop(key, None)
+        if decision is not None:
+            self.record_latency(decision, time.time() - decision['timestamp'], self._response_tokens(llm_response))
+        return None
+
+    @staticmethod
+    def _response_tokens(llm_response: LlmResponse) -> Optional[int]:
+        usage = llm_response.usage_metadata
+        if usage is not None and usage.candidates_token_count:
+            return usage.candidates_token_count
+        if llm_response.content is not None:
+            return content_tokens([llm_response.content])
+        return None
+
+    def _ewma(self, values: Dict[str, float], key: str, observed: float):
+        previous = values.get(key, observed)
+        values[key] = (1 - self.ewma_alpha) * previous + self.ewma_alpha * observed
+
+    def record_latency(self, decision: Dict[str, Any], latency_seconds: float, output_tokens: Optional[int] = None):
+        """Store the observed latency and output size, and update the EWMAs.
+
+        The time left after the predicted prefill is attributed to
+        generation, updating the model's output rate; the agent's output
+        size updates its expected output.
+        """
+        decision['latency_seconds'] = latency_seconds
+        decision['output_tokens'] = output_tokens
+        model = decision['model']
+        if output_tokens is None:
+            output_tokens = decision.get('expected_output_tokens') or 0
+        with self._lock:
+            if decision['output_tokens'] is not None:
+                self._ewma(self._output_tokens, decision['agent'], output_tokens)
+            input_rate = self._rate(self._seconds_per_ktoken, model, self.heavy_model, 1.0)
+            generation = latency_seconds - input_rate * decision['input_tokens'] / 1000
+            if output_tokens > 0 and generation > 0:
+                self._ewma(self._seconds_per_output_ktoken, model, generation / (output_tokens / 1000))
+
+    def report(self) -> Dict[str, Any]:
+        """Per agent/model decision counts, reasons and latency percentiles"""
+        with self._lock:
+            decisions = list(self.decisions)
+            rates = dict(self._seconds_per_ktoken)
+            output_rates = dict(self._seconds_per_output_ktoken)
+            output_tokens = {agent: int(tokens) for agent, tokens in self._output_tokens.items()}
+
+        groups: Dict[str, Dict[str, Any]] = {}
+        for d in decisions:
+            group = groups.setdefault(f"{d['agent']}:{d['model']}", {
+                'calls': 0, 'reasons': {}, 'latencies': [], 'input_tokens': [],
+            })
+            group['calls'] += 1
+            group['reasons'][d['reason']] = group['reasons'].get(d['reason'], 0) + 1
+            group['input_tokens'].append(d['input_tokens'])
+            if d['latency_seconds'] is not None:
+                group['latencies'].append(d['latency_seconds'])
+
+        summary = {}
+        for name, group in groups.items():
+            summary[name] = {
+                'calls': group['calls'],
+                'reasons': group['reasons'],
+                'p50_latency_seconds': _percentile(group['latencies'], 50),
+                'p95_latency_seconds': _percentile(group['latencies'], 95),
+                'p50_input_tokens': _percentile(group['input_tokens'], 50),
+            }
+        return {
+            'light_model': self.light_model,
+            'heavy_model': self.heavy_model,
+            'latency_slo_seconds': self.latency_slo_seconds,
+            'seconds_per_ktoken': rates,
+            'seconds_per_output_ktoken': output_rates,
+            'expected_output_tokens': output_tokens,
+            'routes': summary,
+        }
+
+
+_router = ModelRouter(
+    light_model=MODELS["simple"],
+    heavy_model=MODELS["complex"],
+    small_input_tokens=ROUTER_CONFIG["small_input_tokens"],
+    latency_slo_seconds=ROUTER_CONFIG["latency_slo_seconds"],
+    default_seconds_per_ktoken={
+        MODELS["simple"]: ROUTER_CONFIG["light_seconds_per_ktoken"],
+        MODELS["complex"]: ROUTER_CONFIG["heavy_seconds_per_ktoken"],
+    },
+    default_seconds_per_output_ktoken={
+        MODELS["simple"]: ROUTER_CONFIG["light_seconds_per_output_ktoken"],
+        MODELS["complex"]: ROUTER_CONFIG["heavy_seconds_per_output_ktoken"],
+    },
+    expected_output_tokens=ROUTER_CONFIG["expected_output_tokens"],
+)
+
+
+def get_model_router() -> ModelRouter:
+    """Get the global model router"""
+    return _router
+
+
+def route_model(callback_context: CallbackContext, llm_request: LlmRequest):
+    """before_model_callback that routes the call to the light or heavy model"""
+    return _router.before_model(callback_context, llm_request)
+
+
+def record_model_latency(callback_context: CallbackContext, llm_response: LlmResponse):
+    """after_model_callback that records the latency of the routed call"""
+    return _router.after_model(callback_context, llm_response)
+
+
+def get_routing_report() -> Dict[str, Any]:
+    """Routing decisions and observed latencies, for threshold tuning"""
+    return _router.report()
+
+
+# With USE_LIGHT_MODELS=false both models are the same, so routing is a no-op
+ROUTING_ENABLED = OPTIMIZATIONS["dynamic_routing"] and MODELS["simple"] != MODELS["complex"]
+ROUTING_AFTER_CALLBACK = record_model_latency if ROUTING_ENABLED else None
+
+
+def with_model_routing(*callbacks) -> Optional[List]:
+    """before_model_callback list: the given callbacks, then the router.
+
+    Routing runs last so it sees the prompt size after compaction.
+    """
+    chain = [cb for cb in callbacks if cb is not None]
+    if ROUTING_ENABLED:
+        chain.append(route_model)
+    return chain or None
@@ -0,0 +1,243 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Single-pass extraction of listing and deal numbers into typed columns"""
+
+import re
+from array import array
+from datetime import date
+from typing import Dict, Any, Iterator, Optional
+
+import numpy as np
+
+MISSING_INT = -1
+MISSING_DATE = -(2 ** 31)
+_NAN = float('nan')
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_SCALE = {
+    'k': 1e3, 'thousand': 1e3,
+    'm': 1e6, 'mm': 1e6, 'mil': 1e6, 'million': 1e6,
+    'b': 1e9, 'bn': 1e9, 'billion': 1e9,
+}
+_MONTHS = {
+    name: i for i, names in enumerate((
+        ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"),
+        ("may",), ("jun", "june"), ("jul", "july"), ("aug", "august"),
+        ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"), ("dec", "december"),
+    ), start=1) for name in names
+}
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE_WORDS = r"thousand|million|billion|mil|mm|bn|[kmb]"
+
+# One alternation, so the text is scanned once. Every branch starts at a
+# newline, a '$' or the first digit of a number, and each number is parsed
+# once; its suffix (M, %, sq ft, units ...) picks the column. Keywords
+# that come before a number (NOI, cap rate, asking price, month names) are
+# checked afterwards on a short window, which keeps letters out of the hot
+# loop. A record boundary (heading, numbered item or bold bullet) starts a
+# new row.
+_TOKENS = re.compile(
+    rf"""
+      \n[ \t]*(?P<record>\#{{1,6}}\s|\d{{1,6}}[.)]\s|[-*][ \t]+\*\*|\*\*)
+    | \$\s?(?P<dollars>{_NUMBER})(?:\s?(?P<dollar_scale>{_SCALE_WORDS}))?\b
+    | (?=\d)(?<![\d,.])
+      (?:
+          (?P<iso_date>(?:19|20)\d\d-[01]\d-[0-3]\d)\b
+        | (?P<us_date>[01]?\d/[0-3]?\d/(?:19|20)\d\d)\b
+        | (?P<day>[0-3]?\d),?\s+(?P<year>(?:19|20)\d\d)\b
+        | (?P<number>{_NUMBER})
+          (?:
+              \s?(?P<scale>{_SCALE_WORDS})\b
+            | (?P<percent>\s?%)(?P<cap_after>\s+cap\b)?
+            | \s?(?P<sqft>sq\.?\s?ft\.?|square\s+f(?:ee|oo)t|SF|ft²)(?!\w)
+            | [-\s]?(?P<units>units?|doors|apartments)\b
+            | (?<=\d,\d{{3}})(?P<grouped>)\b
+          )
+      )
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+# Keywords that qualify the number right after them, matched against the
+# _WINDOW characters before the number
+_WINDOW = 30
+_NOI_BEFORE = re.compile(r"\bNOI\b[^$\d\n]{0,20}$", re.IGNORECASE)
+_CAP_BEFORE = re.compile(r"\bcap(?:italization)?\s+rate\b[^\d\n]{0,15}$", re.IGNORECASE)
+_PRICE_BEFORE = re.compile(
+    r"\b(?:asking(?:\s+price)?|price[d]?(?:\s+at)?|listed\s+(?:at|for)|valued?\s+at)\b[^$\d\n]{0,12}$",
+    re.IGNORECASE,
+)
+_MONTH_BEFORE = re.compile(r"\b([a-z]{3,9})\.?\s+$", re.IGNORECASE)
+_MONEY_TOKEN = re.compile(rf"\$?\s?({_NUMBER})\s?([a-z]+)?", re.IGNORECASE)
+_COUNT = re.compile(r"\b(\d{1,3}(?:,\d{3})*|\d+)\b")
+
+
+def parse_money(token: str) -> Optional[float]:
+    """'$4.5M', '4,500,000', '$850K', '1.2 billion' -> dollars"""
+    match = _MONEY_TOKEN.match(token.strip())
+    if not match:
+        return None
+    return _dollars(match.group(1), match.group(2))
+
+
+def _dollars(number: str, scale: Optional[str]) -> float:
+    value = float(number.replace(",", ""))
+    return value * _SCALE.get(scale.lower(), 1.0) if scale else value
+
+
+def extract_count(text: str) -> Optional[int]:
+    """First whole number in a line such as 'Total Opportunities: 12 across 3 markets'"""
+    match = _COUNT.search(text)
+    return int(match.group(1).replace(",", "")) if match else None
+
+
+def _epoch_days(year: str, month: int, day: str) -> int:
+    try:
+        return date(int(year), month, int(day)).toordinal() - _EPOCH_ORDINAL
+    except ValueError:
+        return MISSING_DATE
+
+
+class NumericColumns:
+    """Column store of extracted values, one row per listing or deal record.
+
+    Each column is a typed `array.array`, so a row costs 48 bytes instead of
+    a dict per listing. Missing floats are NaN, missing units are -1 and
+    missing dates are MISSING_DATE; dates are days since 1970-01-01.
+    """
+
+    FLOAT_COLUMNS = ("price_usd", "cap_rate", "noi_usd", "sqft")
+
+    def __init__(self):
+        self.offset = array('q')
+        self.price_usd = array('d')
+        self.cap_rate = array('d')
+        self.noi_usd = array('d')
+        self.sqft = array('d')
+        self.units = array('i')
+        self.date = array('i')
+
+    def __len__(self) -> int:
+        return len(self.offset)
+
+    def append(self, offset: int, values: Dict[str, Any]):
+        """Add a row from a column -> value dict; absent columns are missing"""
+        get = values.get
+        self.offset.append(offset)
+        self.price_usd.append(get('price_usd', _NAN))
+        self.cap_rate.append(get('cap_rate', _NAN))
+        self.noi_usd.append(get('noi_usd', _NAN))
+        self.sqft.append(get('sqft', _NAN))
+        self.units.append(get('units', MISSING_INT))
+        self.date.append(get('date', MISSING_DATE))
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """One record as a dict, with None for missing values"""
+        values: Dict[str, Any] = {'offset': self.offset[i]}
+        for name in self.FLOAT_COLUMNS:
+            value = getattr(self, name)[i]
+            values[name] = None if value != value else value
+        values['units'] = None if self.units[i] == MISSING_INT else self.units[i]
+        values['date'] = (
+            None if self.date[i] == MISSING_DATE
+            else date.fromordinal(self.date[i] + _EPOCH_ORDINAL).isoformat()
+        )
+        return values
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        return (self.row(i) for i in range(len(self)))
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """Zero-copy NumPy views of every column"""
+        return {
+            'offset': np.frombuffer(self.offset, dtype=np.int64),
+            **{name: np.frombuffer(getattr(self, name), dtype=np.float64) for name in self.FLOAT_COLUMNS},
+            'units': np.frombuffer(self.units, dtype=np.int32),
+            'date': np.frombuffer(self.date, dtype=np.int32),
+        }
+
+
+def extract_numeric(text: str) -> NumericColumns:
+    """Scan text once and return one typed row per record that has any value.
+
+    Within a record the first value of each kind wins, so a listing's own
+    price is kept over prices quoted later in its description.
+    """
+    columns = NumericColumns()
+    record: Dict[str, Any] = {}  # first value of each column in the current record
+    record_start = 0
+
+    for match in _TOKENS.finditer(text):
+        # The innermost group closes last, so lastgroup says what matched
+        kind = match.lastgroup
+        if kind == 'record':
+            if record:
+                columns.append(record_start, record)
+                record = {}
+            record_start = match.start() + 1
+            continue
+
+        start = match.start()
+        if kind == 'dollars' or kind == 'dollar_scale':
+            if _NOI_BEFORE.search(text, max(0, start - _WINDOW), start):
+                column = 'noi_usd'
+            else:
+                column = 'price_usd'
+            if column not in record:
+                record[column] = _dollars(match.group('dollars'), match.group('dollar_scale'))
+        elif kind == 'scale' or kind == 'grouped':
+            window = max(0, start - _WINDOW)
+            number = match.group('number')
+            if _NOI_BEFORE.search(text, window, start):
+                column = 'noi_usd'
+            elif (len(match.group('scale') or '') > 1 or number.count(',') >= 2
+                  or _PRICE_BEFORE.search(text, window, start)):
+                # Scale words and millions with separators read as prices on
+                # their own; '850K' or '850,000' needs a price keyword first
+                column = 'price_usd'
+            else:
+                continue
+            if column not in record:
+                record[column] = _dollars(number, match.group('scale'))
+        elif kind == 'cap_after' or kind == 'percent':
+            if 'cap_rate' not in record and (
+                kind == 'cap_after' or _CAP_BEFORE.search(text, max(0, start - _WINDOW), start)
+            ):
+                record['cap_rate'] = float(match.group('number'))
+        elif kind == 'sqft':
+            if 'sqft' not in record:
+                record['sqft'] = float(match.group('number').replace(",", ""))
+        elif kind == 'units':
+            if 'units' not in record:
+                record['units'] = int(float(match.group('number').replace(",", "")))
+        elif 'date' in record:
+            continue
+        elif kind == 'iso_date':
+            token = match.group(kind)
+            record['date'] = _epoch_days(token[:4], int(token[5:7]), token[8:10])
+        elif kind == 'us_date':
+            month, day, year = match.group(kind).split('/')
+            record['date'] = _epoch_days(year, int(month), day)
+        else:
+            # 'June 5, 2025': the digits matched, the month comes before them
+            month = _MONTH_BEFORE.search(text, max(0, start - 12), start)
+            month = _MONTHS.get(month.group(1).lower()) if month else None
+            if month:
+                record['date'] = _epoch_days(match.group('year'), month, match.group('day'))
+
+    if record:
+        columns.append(record_start, record)
+    return columns
+
@@ -0,0 +1,156 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic, vectorized pre-ranking of opportunities by numeric features"""
+
+import heapq
+from datetime import date
+from itertools import islice
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import RANKING_CONFIG
+
+# Feature columns, in matrix order
+FEATURES = ("cap_rate", "noi", "price", "deal_size", "recency")
+
+# Fixed transforms onto 0..1 so scores do not depend on which batch a
+# candidate arrives in: (source field per kind, log10 low, log10 high)
+_MONEY_RANGES = {
+    "noi": (4.0, 8.0),         # $10K .. $100M NOI
+    "price": (5.0, 9.0),       # $100K .. $1B asking price
+    "deal_size": (5.0, 11.0),  # $100K .. $100B deal value
+}
+_MAX_CAP_RATE = 15.0
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _days_ago(value: Any, today: date) -> float:
+    if not value:
+        return np.nan
+    try:
+        return float((today - date.fromisoformat(str(value)[:10])).days)
+    except ValueError:
+        return np.nan
+
+
+def feature_matrix(candidates: List[Dict[str, Any]], today: Optional[date] = None) -> np.ndarray:
+    """Raw (n, len(FEATURES)) feature matrix, NaN where a value is unknown.
+
+    Candidates are {'kind': 'real_estate' | 'deal', 'data': {...}} dicts as
+    produced by the candidate scorer; property price doubles as deal size.
+    """
+    today = today or date.today()
+    rows = []
+    for c in candidates:
+        d = c['data']
+        if c['kind'] == 'real_estate':
+            price = _to_float(d.get('price_usd'))
+            rows.append((_to_float(d.get('cap_rate')), _to_float(d.get('noi_usd')), price, price,
+                         _days_ago(d.get('listed_date'), today)))
+        else:
+            rows.append((np.nan, np.nan, np.nan, _to_float(d.get('value_usd')),
+                         _days_ago(d.get('announced_date'), today)))
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURES))
+
+
+def normalize(raw: np.ndarray, half_life_days: float, missing_value: float) -> np.ndarray:
+    """Map raw features onto 0..1 column by column; unknown values get `missing_value`"""
+    out = np.empty_like(raw)
+    out[:, 0] = np.clip(raw[:, 0], 0.0, _MAX_CAP_RATE) / _MAX_CAP_RATE
+    with np.errstate(divide="ignore", invalid="ignore"):
+        logs = np.log10(np.where(raw[:, 1:4] > 0, raw[:, 1:4], np.nan))
+    for col, feature in enumerate(("noi", "price", "deal_size"), start=1):
+        low, high = _MONEY_RANGES[feature]
+        out[:, col] = np.clip((logs[:, col - 1] - low) / (high - low), 0.0, 1.0)
+    out[:, 4] = np.exp2(-np.clip(raw[:, 4], 0.0, None) / half_life_days)
+    return np.where(np.isnan(out), missing_value, out)
+
+
+def score_matrix(normalized: np.ndarray, weights: Dict[str, float]) -> np.ndarray:
+    """0-100 scores; a negative weight rewards low values (e.g. cheaper price)"""
+    w = np.array([weights.get(f, 0.0) for f in FEATURES], dtype=np.float64)
+    total = np.abs(w).sum()
+    if total == 0:
+        return np.zeros(len(normalized))
+    oriented = np.where(w < 0, 1.0 - normalized, normalized)
+    return 100.0 * (oriented @ np.abs(w)) / total
+
+
+class TopKHeap:
+    """Keeps the k highest scored items seen so far in a min-heap.
+
+    Ties keep the earlier item, so ranking is deterministic for a given
+    input order.
+    """
+
+    def __init__(self, k: int):
+        self.k = k
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._seen = 0
+
+    def push_many(self, scores: np.ndarray, items: List[Any]):
+        """Offer a scored chunk; only its own top-k can enter the heap"""
+        if len(items) > self.k:
+            candidates = np.argpartition(-scores, self.k - 1)[:self.k]
+        else:
+            candidates = range(len(items))
+        for i in candidates:
+            # Negated arrival order: among equal scores the earlier item ranks higher
+            entry = (float(scores[i]), -(self._seen + int(i)), items[i])
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+            elif entry[:2] > self._heap[0][:2]:
+                heapq.heapreplace(self._heap, entry)
+        self._seen += len(items)
+
+    def ranked(self) -> List[Tuple[float, Any]]:
+        """(score, item) pairs, best first"""
+        return [(score, item) for score, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+def rank_candidates(
+    candidates: Iterable[Dict[str, Any]],
+    k: int,
+    weights: Optional[Dict[str, float]] = None,
+    chunk_size: Optional[int] = None,
+    today: Optional[date] = None,
+) -> List[Tuple[float, Dict[str, Any]]]:
+    """Score candidates in vectorized chunks and return the top k, best first.
+
+    Works on any iterable, so thousands of candidates can be streamed through
+    without materializing a full feature matrix.
+    """
+    weights = weights or RANKING_CONFIG["weights"]
+    chunk_size = chunk_size or RANKING_CONFIG["chunk_size"]
+    heap = TopKHeap(k)
+    iterator = iter(candidates)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        normalized = normalize(
+            feature_matrix(chunk, today),
+            RANKING_CONFIG["recency_half_life_days"],
+            RANKING_CONFIG["missing_value"],
+        )
+        heap.push_many(score_matrix(normalized, weights), chunk)
+    return heap.ranked()
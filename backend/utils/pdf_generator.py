@@ -41,11 +41,16 @@ from reportlab.lib.colors import HexColor
 import markdown
 from bs4 import BeautifulSoup
 
+from config import OUTPUT_CONFIG
+from utils.report_parser import ReportParser
+from schemas import format_usd, report_data_from_text
+
 
 class PDFGenerator:
     """Generate professional PDF reports for deal sourcing opportunities"""
 
     def __init__(self):
+        self.max_opportunities = OUTPUT_CONFIG["max_opportunities"]
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
 
@@ -276,6 +281,10 @@ class PDFGenerator:
                 ['Average Deal Size', self.escape_xml(summary_data['metrics'].get('avg_deal_size', 'N/A'))],
                 ['Geographic Spread', self.escape_xml(summary_data['metrics'].get('geographic_spread', 'N/A'))]
             ]
+            if summary_data['metrics'].get('size_range'):
+                metrics_data.append(['Deal Size Range', self.escape_xml(summary_data['metrics']['size_range'])])
+            if summary_data['metrics'].get('market_concentration'):
+                metrics_data.append(['Market Concentration', self.escape_xml(summary_data['metrics']['market_concentration'])])
 
             table = Table(metrics_data, colWidths=[3*inch, 2*inch])
             table.setStyle(TableStyle([
@@ -320,7 +329,7 @@ class PDFGenerator:
         elements.append(Paragraph("INVESTMENT OPPORTUNITIES", self.styles['SectionHeading']))
         elements.append(Spacer(1, 0.2*inch))
 
-        for i, opp in enumerate(opportunities[:15], 1):  # Top 15 opportunities
+        for i, opp in enumerate(opportunities[:self.max_opportunities], 1):
             # Keep opportunity details together on same page if possible
             opp_elements = []
 
@@ -334,10 +343,11 @@ class PDFGenerator:
             ))
 
             # Category badge
-            opp_elements.append(Paragraph(
-                f"<i>Category: {self.escape_xml(category)}</i>",
-                self.styles['BodyText']
-            ))
+            if category:
+                opp_elements.append(Paragraph(
+                    f"<i>Category: {self.escape_xml(category)}</i>",
+                    self.styles['BodyText']
+                ))
             opp_elements.append(Spacer(1, 0.1*inch))
 
             # Create opportunity details table with better layout
@@ -359,6 +369,16 @@ class PDFGenerator:
                 details_data.append(['NOI', self.escape_xml(opp.get('noi', 'N/A'))])
             if opp.get('square_footage'):
                 details_data.append(['Square Footage', self.escape_xml(opp.get('square_footage', 'N/A'))])
+            if opp.get('price_per_sqft'):
+                details_data.append(['Price / Sq Ft', self.escape_xml(opp['price_per_sqft'])])
+            if opp.get('irr'):
+                details_data.append(['Levered IRR', self.escape_xml(opp['irr'])])
+            if opp.get('npv'):
+                details_data.append(['NPV', self.escape_xml(opp['npv'])])
+            if opp.get('cash_on_cash'):
+                details_data.append(['Cash-on-Cash (Year 1)', self.escape_xml(opp['cash_on_cash'])])
+            if opp.get('dscr'):
+                details_data.append(['DSCR (Year 1)', self.escape_xml(opp['dscr'])])
             if opp.get('risk_level'):
                 details_data.append(['Risk Level', self.escape_xml(opp.get('risk_level', 'Medium'))])
             if opp.get('priority'):
@@ -446,6 +466,84 @@ class PDFGenerator:
                         elements.append(Paragraph(f"• {self.escape_xml(clean_risk)}", self.styles['BulletText']))
                 elements.append(Spacer(1, 0.1*inch))
 
+        # Monte Carlo stress tests, one row per simulated opportunity
+        if risk_data.get('stress_tests'):
+            elements.append(Paragraph("Monte Carlo Stress Tests", self.styles['SubsectionHeading']))
+            stress_data = [['Opportunity', 'Equity Multiple\nP5 / P50 / P95', '95% VaR', 'P(Loss)', 'P(DSCR < 1)', 'Combined\nStress']]
+            for row in risk_data['stress_tests']:
+                stress_data.append([
+                    Paragraph(self.escape_xml(row['name']), self.styles['BodyText']),
+                    row['equity_multiple'],
+                    row['var_95'],
+                    row['prob_loss'],
+                    row['prob_dscr_below_1'],
+                    row['combined_stress'],
+                ])
+
+            table = Table(stress_data, colWidths=[1.7*inch, 1.5*inch, 1.1*inch, 0.6*inch, 0.8*inch, 0.7*inch], repeatRows=1)
+            table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1a472a')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+            ]))
+            elements.append(table)
+            elements.append(Paragraph(
+                "Simulated levered hold-period outcomes under interest rate, vacancy, NOI growth and exit cap "
+                "rate shocks. Combined stress: +200bp rates, 10 points of vacancy, flat NOI and +100bp exit cap.",
+                self.styles['Disclaimer']
+            ))
+            elements.append(Spacer(1, 0.2*inch))
+
+        # Portfolio composition computed from the opportunity set
+        if risk_data.get('size_distribution') or risk_data.get('allocation'):
+            elements.append(Paragraph("Portfolio Composition", self.styles['SubsectionHeading']))
+            table_style = TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), HexColor('#1a472a')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+            ])
+            if risk_data.get('size_distribution'):
+                size_data = [['Deal Size', 'Opportunities', 'Total Value']]
+                for row in risk_data['size_distribution']:
+                    size_data.append([self.escape_xml(row['bucket']), str(row['count']), format_usd(row['total_usd'])])
+                table = Table(size_data, colWidths=[2.2*inch, 1.3*inch, 1.5*inch])
+                table.setStyle(table_style)
+                elements.append(table)
+                elements.append(Spacer(1, 0.15*inch))
+
+            allocation = risk_data.get('allocation')
+            if allocation:
+                allocation_data = [['Suggested Allocation', 'Weight', 'Unlevered Return', 'Volatility']]
+                for row in allocation['weights']:
+                    allocation_data.append([
+                        Paragraph(self.escape_xml(row['name']), self.styles['BodyText']),
+                        f"{row['weight']:.0%}",
+                        f"{row['expected_return']:.1%}",
+                        f"{row['volatility']:.1%}",
+                    ])
+                allocation_data.append([
+                    'Portfolio', '100%', f"{allocation['expected_return']:.1%}", f"{allocation['volatility']:.1%}"
+                ])
+                table = Table(allocation_data, colWidths=[2.6*inch, 0.9*inch, 1.2*inch, 1.0*inch], repeatRows=1)
+                table.setStyle(table_style)
+                elements.append(table)
+                elements.append(Paragraph(
+                    "Long-only mean-variance weights with a per-opportunity cap. Correlations are assumed higher "
+                    "within the same market and sector.",
+                    self.styles['Disclaimer']
+                ))
+            elements.append(Spacer(1, 0.2*inch))
+
         # Mitigation strategies with better formatting
         if 'mitigation_strategies' in risk_data:
             elements.append(Paragraph("Risk Mitigation Strategies", self.styles['SubsectionHeading']))
@@ -564,140 +662,11 @@ class PDFGenerator:
     def _parse_agent_output(self, output: str) -> Dict[str, Any]:
         """Parse agent output into structured report data with real opportunities"""
 
-        # Clean the output first
-        output = self.clean_text(output)
-
-        report_data = {
-            'subtitle': 'Deal Sourcing Analysis Report',
-            'executive_summary': {
-                'metrics': {
-                    'total_opportunities': 0,
-                    'real_estate_count': 0,
-                    'business_deals_count': 0,
-                    'avg_deal_size': 'Varies by opportunity',
-                    'geographic_spread': 'Multiple Markets'
-                },
-                'key_findings': [],
-                'recommendations': []
-            },
-            'opportunities': [],
-            'risk_analysis': {
-                'overall_risk': 'Medium',
-                'market_risks': [],
-                'operational_risks': [],
-                'financial_risks': [],
-                'regulatory_risks': [],
-                'mitigation_strategies': []
-            },
-            'additional_content': output
-        }
-
-        # Extract real opportunities from the output
-        # This would be enhanced based on actual agent output format
-        self._extract_opportunities(output, report_data)
-        self._extract_metrics(output, report_data)
-        self._extract_findings(output, report_data)
-        self._extract_risks(output, report_data)
-
-        return report_data
-
-    def _extract_opportunities(self, output: str, report_data: Dict[str, Any]):
-        """Extract real opportunity names and details from output"""
-        # Sample extraction logic - would be enhanced based on actual format
-        opportunity_patterns = [
-            (r'([A-Z][\w\s]+(?:Apartments|Properties|Plaza|Tower|Center|Building|Park))', 'Real Estate'),
-            (r'(\d+[-\s]+unit\s+[A-Za-z\s]+)', 'Multifamily'),
-            (r'([A-Z][\w\s]+(?:acquires|acquisition|merger|M&A))', 'M&A Deal'),
-            (r'([A-Z][\w\s]+\$[\d.]+[MB])', 'Business Deal')
-        ]
-
-        opp_count = 0
-        for pattern, category in opportunity_patterns:
-            matches = re.finditer(pattern, output)
-            for match in matches:
-                if opp_count >= 15:
-                    break
-                opp_count += 1
-
-                opportunity = {
-                    'name': match.group(1).strip(),
-                    'category': category,
-                    'property_name': match.group(1).strip() if 'Real Estate' in category else None,
-                    'investment_size': 'TBD',
-                    'location': 'Various',
-                    'property_type': category,
-                    'risk_level': 'Medium',
-                    'priority': 'High' if opp_count <= 5 else 'Medium',
-                    'highlights': f"Strategic {category.lower()} opportunity with strong potential returns",
-                    'risks': 'Standard market and execution risks apply',
-                    'next_steps': 'Conduct detailed due diligence and financial analysis',
-                    'source_platform': 'LoopNet' if 'Real Estate' in category else 'Bloomberg',
-                    'source_url': 'https://example.com/listing'  # Would be actual URL
-                }
-
-                report_data['opportunities'].append(opportunity)
-
-        # Update counts
-        report_data['executive_summary']['metrics']['total_opportunities'] = len(report_data['opportunities'])
-        report_data['executive_summary']['metrics']['real_estate_count'] = sum(
-            1 for o in report_data['opportunities'] if 'Real Estate' in o.get('category', '')
-        )
-        report_data['executive_summary']['metrics']['business_deals_count'] = sum(
-            1 for o in report_data['opportunities'] if 'Business' in o.get('category', '') or 'M&A' in o.get('category', '')
-        )
-
-    def _extract_metrics(self, output: str, report_data: Dict[str, Any]):
-        """Extract metrics from output"""
-        # Look for numbers and metrics in the output
-        if 'denver' in output.lower():
-            report_data['executive_summary']['metrics']['geographic_spread'] = 'Denver Metro Area'
-
-        # Extract deal sizes if mentioned
-        size_pattern = r'\$(\d+(?:\.\d+)?[MBK])'
-        sizes = re.findall(size_pattern, output)
-        if sizes:
-            report_data['executive_summary']['metrics']['avg_deal_size'] = f"${sizes[0]} - ${sizes[-1]}" if len(sizes) > 1 else f"~${sizes[0]}"
-
-    def _extract_findings(self, output: str, report_data: Dict[str, Any]):
-        """Extract key findings and recommendations"""
-        # Default findings if none found
-        default_findings = [
-            'Multiple investment opportunities identified across real estate and business sectors',
-            'Strong deal flow in target markets with favorable pricing conditions',
-            'Diverse opportunity set suitable for portfolio construction'
-        ]
-
-        default_recommendations = [
-            'Prioritize high-confidence opportunities with clear value propositions',
-            'Conduct thorough due diligence on all opportunities before commitment',
-            'Maintain portfolio diversification across opportunity types and geographies'
-        ]
-
-        report_data['executive_summary']['key_findings'] = default_findings
-        report_data['executive_summary']['recommendations'] = default_recommendations
+        # Structured (JSON) agent output maps onto report data directly
+        structured = report_data_from_text(output)
+        if structured is not None:
+            return structured
 
-    def _extract_risks(self, output: str, report_data: Dict[str, Any]):
-        """Extract risk information"""
-        # Default risk analysis
-        report_data['risk_analysis']['market_risks'] = [
-            'Interest rate volatility affecting property valuations',
-            'Economic uncertainty impacting deal flow'
-        ]
-        report_data['risk_analysis']['operational_risks'] = [
-            'Due diligence timeline constraints',
-            'Integration challenges for M&A opportunities'
-        ]
-        report_data['risk_analysis']['financial_risks'] = [
-            'Financing availability and terms',
-            'Valuation uncertainty in current market'
-        ]
-        report_data['risk_analysis']['regulatory_risks'] = [
-            'Zoning and permitting for real estate',
-            'Regulatory approval for M&A transactions'
-        ]
-        report_data['risk_analysis']['mitigation_strategies'] = [
-            'Implement systematic due diligence process',
-            'Maintain portfolio diversification',
-            'Establish clear investment criteria',
-            'Regular monitoring and performance review'
-        ]
\ No newline at end of file
+        # Headings and bold markers delimit sections, so parse before cleaning
+        parser = ReportParser(subtitle='Deal Sourcing Analysis Report', max_opportunities=self.max_opportunities)
+        return parser.feed(output).result(additional_content=self.clean_text(output))
\ No newline at end of file
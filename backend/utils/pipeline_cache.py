@@ -0,0 +1,179 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Pipeline result memoization with in-flight request coalescing"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from config import CACHE_CONFIG, OPTIMIZATIONS
+
+_PUNCTUATION = re.compile(r"[^\w$%.&+\-]+")
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+CACHE_COALESCED = "coalesced"
+CACHE_BYPASS = "bypass"
+
+
+def normalize_criteria(*parts: Optional[str]) -> Tuple[str, ...]:
+    """Normalize search criteria so trivially different requests share a key.
+
+    Lowercases, drops punctuation and collapses whitespace, so
+    "Multifamily, Denver  under $5M" and "multifamily denver under $5m" match.
+    """
+    normalized = []
+    for part in parts:
+        text = _PUNCTUATION.sub(" ", (part or "").lower())
+        normalized.append(" ".join(text.split()))
+    return tuple(normalized)
+
+
+class PipelineCache:
+    """TTL + LRU result cache where concurrent misses share one execution.
+
+    The first caller for a key becomes the leader and runs the computation;
+    callers arriving while it is in flight wait on the same future instead of
+    starting a duplicate pipeline. Failures are propagated to every waiter
+    and never cached.
+    """
+
+    def __init__(self, ttl_seconds: int = 900, max_size: int = 100):
+        self.ttl = ttl_seconds
+        self.max_size = max_size
+        self._results: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {CACHE_HIT: 0, CACHE_MISS: 0, CACHE_COALESCED: 0, "invalidations": 0}
+
+    def _lookup(self, key) -> Tuple[Optional[Any], Optional[Future], bool]:
+        """Return (cached value, in-flight future, is_leader); caller holds the lock"""
+        entry = self._results.get(key)
+        if entry is not None:
+            stored_at, value = entry
+            if time.time() - stored_at < self.ttl:
+                self._results.move_to_end(key)
+                self.stats[CACHE_HIT] += 1
+                return value, None, False
+            del self._results[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats[CACHE_COALESCED] += 1
+            return None, future, False
+
+        future = Future()
+        self._in_flight[key] = future
+        self.stats[CACHE_MISS] += 1
+        return None, future, True
+
+    def _complete(self, key, future: Future, value: Any = None, error: Optional[BaseException] = None):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if error is None:
+                self._results[key] = (time.time(), value)
+                self._results.move_to_end(key)
+                while len(self._results) > self.max_size:
+                    self._results.popitem(last=False)
+        if error is None:
+            future.set_result(value)
+        else:
+            future.set_exception(error)
+
+    def get_or_compute(self, key, compute: Callable[[], Any]) -> Tuple[Any, str]:
+        """Return (value, status), running `compute` at most once per key"""
+        with self._lock:
+            value, future, is_leader = self._lookup(key)
+        if future is None:
+            return value, CACHE_HIT
+        if not is_leader:
+            return future.result(), CACHE_COALESCED
+
+        try:
+            value = compute()
+        except BaseException as e:
+            self._complete(key, future, error=e)
+            raise
+        self._complete(key, future, value)
+        return value, CACHE_MISS
+
+    async def get_or_compute_async(self, key, compute: Callable[[], Awaitable[Any]]) -> Tuple[Any, str]:
+        """Async variant of `get_or_compute`, safe across threads and event loops"""
+        with self._lock:
+            value, future, is_leader = self._lookup(key)
+        if future is None:
+            return value, CACHE_HIT
+        if not is_leader:
+            return await asyncio.wrap_future(future), CACHE_COALESCED
+
+        try:
+            value = await compute()
+        except BaseException as e:
+            self._complete(key, future, error=e)
+            raise
+        self._complete(key, future, value)
+        return value, CACHE_MISS
+
+    def invalidate(self, key=None) -> int:
+        """Drop one key, or every cached result when key is None.
+
+        In-flight executions are left alone; their result is stored when
+        they finish.
+        """
+        with self._lock:
+            self.stats["invalidations"] += 1
+            if key is None:
+                dropped = len(self._results)
+                self._results.clear()
+                return dropped
+            return 1 if self._results.pop(key, None) is not None else 0
+
+
+_pipeline_cache = PipelineCache(
+    ttl_seconds=CACHE_CONFIG["pipeline_ttl_seconds"],
+    max_size=CACHE_CONFIG["max_size"],
+)
+
+
+def get_pipeline_cache() -> PipelineCache:
+    """Get the global pipeline cache"""
+    return _pipeline_cache
+
+
+def memoize_pipeline(namespace: str, criteria: Tuple[str, ...], compute: Callable[[], Any]) -> Tuple[Any, str]:
+    """Run `compute` through the pipeline cache unless caching is disabled"""
+    if not OPTIMIZATIONS["enable_caching"]:
+        return compute(), CACHE_BYPASS
+    return _pipeline_cache.get_or_compute((namespace,) + criteria, compute)
+
+
+async def memoize_pipeline_async(
+    namespace: str, criteria: Tuple[str, ...], compute: Callable[[], Awaitable[Any]]
+) -> Tuple[Any, str]:
+    """Async variant of `memoize_pipeline`"""
+    if not OPTIMIZATIONS["enable_caching"]:
+        return await compute(), CACHE_BYPASS
+    return await _pipeline_cache.get_or_compute_async((namespace,) + criteria, compute)
+
+
+def invalidate_pipeline(namespace: Optional[str] = None, criteria: Optional[Tuple[str, ...]] = None) -> int:
+    """Invalidate one cached pipeline result, or everything when no key is given"""
+    if namespace is None or criteria is None:
+        return _pipeline_cache.invalidate()
+    return _pipeline_cache.invalidate((namespace,) + criteria)
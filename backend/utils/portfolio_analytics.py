@@ -0,0 +1,319 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Portfolio composition, concentration and mean-variance allocation over opportunities"""
+
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from config import FINANCING_CONFIG, PORTFOLIO_CONFIG, RISK_SIMULATION_CONFIG
+from schemas import FinancialNewsSearchOutput, RealEstateSearchOutput, format_usd, parse_structured
+from utils.numeric_extraction import parse_money
+from utils.report_parser import parse_report
+from utils.risk_simulation import search_output
+
+# z-score distance between the 5th and 95th percentile of a normal distribution
+_P5_P95_WIDTH = 2 * 1.6449
+
+
+def _market(location: Optional[str]) -> Optional[str]:
+    if not location or location.strip().lower() in ('n/a', 'various', 'multiple', 'tbd'):
+        return None
+    return ' '.join(location.replace(' ,', ',').split())
+
+
+def portfolio_positions(state: Dict[str, Any], limit: int = 500) -> List[Dict[str, Any]]:
+    """One row per opportunity with category, sector, market and size.
+
+    Reads the scored shortlist or the structured search outputs, and parses
+    the markdown reports when the searches returned free text.
+    """
+    positions = []
+    for key, schema in (
+        ("real_estate_opportunities_output", RealEstateSearchOutput),
+        ("financial_news_opportunities_output", FinancialNewsSearchOutput),
+    ):
+        raw = search_output(state, key)
+        structured = parse_structured(raw, schema)
+        if isinstance(structured, RealEstateSearchOutput):
+            positions.extend({
+                'name': o.name, 'category': 'Real Estate', 'sector': (o.property_type or '').lower() or None,
+                'market': _market(o.location), 'size_usd': o.price_usd,
+                'cap_rate': o.cap_rate,
+            } for o in structured.opportunities)
+        elif isinstance(structured, FinancialNewsSearchOutput):
+            positions.extend({
+                'name': d.company, 'category': 'Business Deal', 'sector': (d.sector or '').lower() or None,
+                'market': _market(d.location), 'size_usd': d.value_usd, 'cap_rate': None,
+            } for d in structured.deals)
+        elif isinstance(raw, str) and raw.strip():
+            report = parse_report(raw, max_opportunities=limit, fill_defaults=False)
+            positions.extend({
+                'name': o['name'], 'category': o['category'] or None, 'sector': None,
+                'market': _market(o.get('location')), 'size_usd': parse_money(o['investment_size']),
+                'cap_rate': None,
+            } for o in report['opportunities'])
+    return positions[:limit]
+
+
+def concentration(labels: List[Optional[str]], weights: np.ndarray) -> Dict[str, Any]:
+    """Herfindahl-Hirschman index (0-10,000) and shares of the labelled positions.
+
+    Positions without a label are left out. Weights are dollar sizes; when a
+    size is unknown the position counts as the average known size.
+    """
+    known = np.array([label is not None for label in labels], dtype=bool)
+    if not known.any():
+        return {'hhi': None, 'effective_count': None, 'groups': 0, 'shares': []}
+    # Group case-insensitively and show each group as first spelled
+    display: Dict[str, str] = {}
+    keys = []
+    for label in labels:
+        if label is not None:
+            keys.append(label.lower())
+            display.setdefault(keys[-1], label)
+    names, index = np.unique(np.array(keys), return_inverse=True)
+    totals = np.bincount(index, weights=weights[known], minlength=len(names))
+    shares = totals / totals.sum()
+    hhi = float(np.square(shares).sum())
+    order = np.argsort(-shares, kind='stable')
+    return {
+        'hhi': round(hhi * 10_000),
+        'effective_count': round(1 / hhi, 2),
+        'groups': len(names),
+        'shares': [{'name': display[str(names[i])], 'share': round(float(shares[i]), 4)} for i in order],
+    }
+
+
+def size_histogram(sizes: np.ndarray) -> List[Dict[str, Any]]:
+    """Count and dollar total of deals per PORTFOLIO_CONFIG size bucket, known sizes only"""
+    edges = np.array(PORTFOLIO_CONFIG["size_buckets_musd"]) * 1e6
+    sizes = sizes[~np.isnan(sizes)]
+    bucket = np.searchsorted(edges, sizes, side='right')
+    counts = np.bincount(bucket, minlength=len(edges) + 1)
+    totals = np.bincount(bucket, weights=sizes, minlength=len(edges) + 1)
+    labels = (
+        [f"Under {format_usd(edges[0])}"]
+        + [f"{format_usd(low)} - {format_usd(high)}" for low, high in zip(edges[:-1], edges[1:])]
+        + [f"{format_usd(edges[-1])}+"]
+    )
+    return [
+        {'bucket': label, 'count': int(count), 'total_usd': round(float(total))}
+        for label, count, total in zip(labels, counts, totals)
+    ]
+
+
+def correlation_matrix(markets: List[Optional[str]], sectors: List[Optional[str]]) -> np.ndarray:
+    """Base correlation for every pair plus extra for a shared market or sector.
+
+    Built as a weighted sum of block indicator matrices and the identity, so
+    it is always positive semi-definite.
+    """
+    config = PORTFOLIO_CONFIG
+
+    def same(labels):
+        values = np.array([label.lower() if label is not None else f"\0{i}" for i, label in enumerate(labels)])
+        return (values[:, None] == values[None, :]).astype(np.float64)
+
+    n = len(markets)
+    base, market, sector = config["base_correlation"], config["market_correlation"], config["sector_correlation"]
+    return base + market * same(markets) + sector * same(sectors) + (1 - base - market - sector) * np.eye(n)
+
+
+def _project_capped_simplex(values: np.ndarray, cap: float) -> np.ndarray:
+    """Euclidean projection onto {w : sum(w) = 1, 0 <= w <= cap}.
+
+    The projection is clip(values - shift, 0, cap) for the shift where its
+    sum is 1. That sum is piecewise linear in the shift with breakpoints at
+    values and values - cap; prefix sums over the sorted values give it at
+    every breakpoint in O(n log n), and the shift is interpolated on the
+    segment that crosses 1.
+    """
+    ordered = np.sort(values)
+    prefix = np.concatenate([[0.0], np.cumsum(ordered)])
+    breakpoints = np.sort(np.concatenate([values, values - cap]))
+    # Values above shift + cap contribute cap, values between contribute value - shift
+    above = np.searchsorted(ordered, breakpoints, side='right')
+    full = np.searchsorted(ordered, breakpoints + cap, side='left')
+    totals = cap * (len(values) - full) + (prefix[full] - prefix[above]) - breakpoints * (full - above)
+    # totals fall as the shift grows; find the last breakpoint still at or above 1
+    # (the first total is cap * n, at least 1 because cap >= 1 / n)
+    i = max(int(np.searchsorted(-totals, -1.0, side='right')) - 1, 0)
+    if i == len(breakpoints) - 1 or totals[i] == totals[i + 1]:
+        shift = breakpoints[i]
+    else:
+        shift = breakpoints[i] + (totals[i] - 1.0) / (totals[i] - totals[i + 1]) * (breakpoints[i + 1] - breakpoints[i])
+    return np.clip(values - shift, 0.0, cap)
+
+
+def mean_variance_weights(
+    expected: np.ndarray,
+    covariance: np.ndarray,
+    risk_aversion: float,
+    max_weight: float,
+    iterations: int = 500,
+) -> np.ndarray:
+    """Long-only weights maximizing expected - risk_aversion / 2 * variance, each at most max_weight.
+
+    Accelerated projected gradient ascent; the objective is concave, so it
+    converges to the global optimum.
+    """
+    n = len(expected)
+    cap = max(max_weight, 1.0 / n)
+    step = 1.0 / (risk_aversion * float(np.linalg.eigvalsh(covariance)[-1]) + 1e-12)
+    weights = momentum = np.full(n, 1.0 / n)
+    t = 1.0
+    for _ in range(iterations):
+        gradient = expected - risk_aversion * covariance @ momentum
+        updated = _project_capped_simplex(momentum + step * gradient, cap)
+        if np.abs(updated - weights).max() < 1e-8:
+            return updated
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        momentum = updated + (t - 1) / t_next * (updated - weights)
+        weights, t = updated, t_next
+    return weights
+
+
+def _return_estimates(
+    positions: List[Dict[str, Any]],
+    risk_simulation: Optional[Dict[str, Any]],
+    financial_metrics: Optional[Dict[str, Any]],
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """Expected return, volatility and the source of the volatility per position.
+
+    Expected returns share one basis, the unlevered cap rate plus expected
+    NOI growth; levered IRRs and simulated returns are not comparable with
+    it. The cap rate comes from the search or from the simulation or
+    metrics row of the same opportunity. Positions without one, business
+    deals among them, are NaN and left out of the allocation. Volatility is
+    the simulated levered p5-p95 range times the equity share, or the
+    real estate default.
+    """
+    config = PORTFOLIO_CONFIG
+    growth = RISK_SIMULATION_CONFIG["noi_growth_mean"]
+    cap_rates = {
+        r['name'].lower(): r['noi_usd'] / r['price_usd'] * 100
+        for r in (financial_metrics or {}).get('opportunities', []) if r.get('noi_usd') and r.get('price_usd')
+    }
+    cap_rates.update({
+        r['name'].lower(): r['cap_rate'] for r in (risk_simulation or {}).get('opportunities', []) if r.get('cap_rate')
+    })
+    simulated = {r['name'].lower(): r['annual_return'] for r in (risk_simulation or {}).get('opportunities', [])}
+    equity_share = 1 - ((risk_simulation or {}).get('assumptions') or {}).get('ltv', FINANCING_CONFIG["ltv"])
+    expected, volatility, sources = [], [], []
+    for position in positions:
+        key = position['name'].lower()
+        cap_rate = position['cap_rate'] or cap_rates.get(key)
+        expected.append(cap_rate / 100 + growth if cap_rate else np.nan)
+        if key in simulated:
+            volatility.append((simulated[key]['p95'] - simulated[key]['p5']) / _P5_P95_WIDTH * equity_share)
+            sources.append('simulation')
+        else:
+            volatility.append(config["real_estate_volatility"])
+            sources.append('default')
+    return np.array(expected, dtype=np.float64), np.array(volatility, dtype=np.float64), sources
+
+
+def portfolio_analytics(
+    positions: List[Dict[str, Any]],
+    allocate: bool = True,
+    risk_simulation: Optional[Dict[str, Any]] = None,
+    financial_metrics: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Composition, concentration and optional allocation; JSON-serializable for tools and session state"""
+    started = time.perf_counter()
+    if not positions:
+        return {'positions': 0, 'elapsed_ms': 0.0}
+
+    sizes = np.array([p['size_usd'] if p['size_usd'] else np.nan for p in positions], dtype=np.float64)
+    known = sizes[~np.isnan(sizes)]
+    weights = np.where(np.isnan(sizes), known.mean() if known.size else 1.0, sizes)
+    categories = [p['category'] for p in positions]
+
+    result = {
+        'positions': len(positions),
+        'category_mix': concentration(categories, weights)['shares'],
+        'category_counts': {c: categories.count(c) for c in dict.fromkeys(categories)},
+        'market_concentration': concentration([p['market'] for p in positions], weights),
+        'sector_concentration': concentration([p['sector'] for p in positions], weights),
+        'size': {
+            'known': int(known.size),
+            'total_usd': round(float(known.sum())),
+            'mean_usd': round(float(known.mean())) if known.size else None,
+            'median_usd': round(float(np.median(known))) if known.size else None,
+            'min_usd': round(float(known.min())) if known.size else None,
+            'max_usd': round(float(known.max())) if known.size else None,
+            'histogram': size_histogram(sizes),
+        },
+        'allocation': None,
+    }
+
+    if allocate:
+        expected, volatility, sources = _return_estimates(positions, risk_simulation, financial_metrics)
+        usable = np.flatnonzero(~np.isnan(expected))
+        if usable.size >= 2:
+            correlation = correlation_matrix(
+                [positions[i]['market'] for i in usable], [positions[i]['sector'] for i in usable]
+            )
+            covariance = correlation * np.outer(volatility[usable], volatility[usable])
+            w = mean_variance_weights(
+                expected[usable], covariance, PORTFOLIO_CONFIG["risk_aversion"], PORTFOLIO_CONFIG["max_weight"]
+            )
+            order = np.argsort(-w, kind='stable')
+            result['allocation'] = {
+                'weights': [
+                    {
+                        'name': positions[usable[i]]['name'],
+                        'weight': round(float(w[i]), 4),
+                        'expected_return': round(float(expected[usable[i]]), 4),
+                        'volatility': round(float(volatility[usable[i]]), 4),
+                        'volatility_source': sources[usable[i]],
+                    }
+                    for i in order if w[i] >= 1e-4
+                ],
+                'return_basis': 'unlevered: cap rate + NOI growth',
+                'expected_return': round(float(w @ expected[usable]), 4),
+                'volatility': round(float(np.sqrt(w @ covariance @ w)), 4),
+                'equal_weight_volatility': round(float(np.sqrt(covariance.mean())), 4),
+                'excluded': [positions[i]['name'] for i in np.flatnonzero(np.isnan(expected))],
+            }
+
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def summary_metrics(analytics: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Executive summary metric strings computed from portfolio_analytics output"""
+    if not analytics or not analytics.get('positions'):
+        return {}
+    metrics = {}
+    size = analytics['size']
+    if size['known']:
+        metrics['avg_deal_size'] = format_usd(size['mean_usd'])
+        metrics['size_range'] = (
+            format_usd(size['min_usd']) if size['min_usd'] == size['max_usd']
+            else f"{format_usd(size['min_usd'])} - {format_usd(size['max_usd'])}"
+        )
+    markets = analytics['market_concentration']
+    if markets['groups']:
+        top = markets['shares'][0]
+        metrics['geographic_spread'] = (
+            f"{markets['groups']} Market{'s' if markets['groups'] > 1 else ''}, "
+            f"largest {top['name']} ({top['share']:.0%})"
+        )
+        label = 'High' if markets['hhi'] > 2500 else 'Moderate' if markets['hhi'] > 1500 else 'Low'
+        metrics['market_concentration'] = f"HHI {markets['hhi']:,} ({label})"
+    return metrics
@@ -0,0 +1,68 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Attach analytics computed by local tools in session state to PDF report data"""
+
+from typing import Dict, Any
+
+from config import OPTIMIZATIONS
+from utils.financial_metrics import metric_fields
+from utils.portfolio_analytics import portfolio_analytics, portfolio_positions, summary_metrics
+from utils.risk_simulation import stress_test_rows
+
+# Session state keys written by the local analytics tools
+ANALYTICS_KEYS = ("risk_simulation_output", "financial_metrics_output", "portfolio_analytics_output")
+
+
+def analytics_from_state(state: Any) -> Dict[str, Any]:
+    """Analytics outputs present in session state, safe to hand to a worker thread.
+
+    Portfolio analytics take milliseconds, so they are computed here when
+    enabled and the risk analyst did not call the tool.
+    """
+    if state is None:
+        return {}
+    analytics = {key: state.get(key) for key in ANALYTICS_KEYS if state.get(key)}
+    if OPTIMIZATIONS["portfolio_analytics"] and "portfolio_analytics_output" not in analytics:
+        positions = portfolio_positions(state)
+        if positions:
+            analytics["portfolio_analytics_output"] = portfolio_analytics(
+                positions,
+                risk_simulation=analytics.get("risk_simulation_output"),
+                financial_metrics=analytics.get("financial_metrics_output"),
+            )
+    return analytics
+
+
+def enrich_report_data(report_data: Dict[str, Any], analytics: Dict[str, Any]) -> Dict[str, Any]:
+    """Add stress tests and portfolio composition to the risk section, exact
+    portfolio figures to the executive summary and metrics to matching opportunities"""
+    stress_tests = stress_test_rows(analytics.get("risk_simulation_output"))
+    if stress_tests:
+        report_data.setdefault('risk_analysis', {})['stress_tests'] = stress_tests
+
+    fields = metric_fields(analytics.get("financial_metrics_output"))
+    if fields:
+        for opportunity in report_data.get('opportunities', []):
+            opportunity.update(fields.get(str(opportunity.get('name', '')).lower(), {}))
+
+    portfolio = analytics.get("portfolio_analytics_output")
+    if portfolio and portfolio.get('positions'):
+        summary = report_data.setdefault('executive_summary', {})
+        summary.setdefault('metrics', {}).update(summary_metrics(portfolio))
+        risk_analysis = report_data.setdefault('risk_analysis', {})
+        risk_analysis['size_distribution'] = [row for row in portfolio['size']['histogram'] if row['count']]
+        if portfolio.get('allocation'):
+            risk_analysis['allocation'] = portfolio['allocation']
+    return report_data
@@ -0,0 +1,397 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Single-pass parser from free-form agent reports to PDF report data"""
+
+import re
+from typing import Dict, Any, List, Optional
+
+from config import OUTPUT_CONFIG
+from schemas import format_usd
+from utils.numeric_extraction import extract_count, parse_money
+
+DEFAULT_SUBTITLE = 'AI-Powered Investment Opportunity Analysis'
+
+DEFAULT_FINDINGS = [
+    'Multiple investment opportunities identified across real estate and business sectors',
+    'Opportunities span various risk-return profiles suitable for different investor types',
+    'Market conditions favorable for selective investment deployment',
+]
+DEFAULT_RECOMMENDATIONS = [
+    'Prioritize high-confidence opportunities with clear value propositions',
+    'Conduct thorough due diligence on all opportunities before commitment',
+    'Diversify across opportunity types to manage portfolio risk',
+]
+DEFAULT_RISKS = {
+    'market_risks': [
+        'Interest rate volatility affecting property valuations',
+        'Economic uncertainty impacting deal flow',
+    ],
+    'operational_risks': [
+        'Due diligence timeline constraints',
+        'Integration challenges for M&A opportunities',
+    ],
+    'financial_risks': [
+        'Financing availability and terms',
+        'Valuation uncertainty in current market',
+    ],
+    'regulatory_risks': [
+        'Zoning and permitting for real estate',
+        'Regulatory approval for M&A transactions',
+    ],
+}
+DEFAULT_MITIGATION = [
+    'Implement systematic due diligence process for all opportunities',
+    'Maintain portfolio diversification across sectors and geographies',
+    'Establish clear investment criteria and exit strategies',
+    'Regular monitoring and performance review of investments',
+]
+
+# Keyword -> kind. All keywords are compiled into one alternation of plain
+# lowercase literals, which `re` scans with a first-character prefilter, so
+# a line is scanned once no matter how many keywords are checked. Named
+# groups would disable that prefilter, hence the lookup table.
+_KEYWORD_KINDS = {
+    'executive summary': 'executive',
+    'key findings': 'findings',
+    'overall risk': 'overall',
+    'opportunit': 'opportunity',
+    'risk': 'risk',
+    'analysis': 'analysis',
+    'total': 'total',
+    'recommend': 'recommend',
+    'mitigat': 'mitigation',
+    'market': 'market',
+    'operational': 'operational',
+    'financial': 'financial',
+    'regulatory': 'regulatory',
+    'propert': 'real_estate',
+    'apartment': 'real_estate',
+    'multifamily': 'real_estate',
+    'plaza': 'real_estate',
+    'tower': 'real_estate',
+    'building': 'real_estate',
+    'unit': 'real_estate',
+    'deal': 'deal',
+    'acquisition': 'deal',
+    'acquires': 'deal',
+    'merger': 'deal',
+    'm&a': 'deal',
+    'ipo': 'deal',
+    'buyout': 'deal',
+    '$': 'money',
+}
+_KEYWORDS = re.compile("|".join(
+    re.escape(keyword) for keyword in sorted(_KEYWORD_KINDS, key=len, reverse=True)
+))
+_MONEY = re.compile(r"\$\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:thousand|million|billion|mm|bn|[kmb]))?\b")
+_RISK_LEVEL = re.compile(r"\b(low|medium|high)\b")
+# Numbered items, level 3+ headings and bold bullets start a record
+_RECORD = re.compile(r"^(?:#{3,6}\s+|\d{1,3}[.)]\s+|[-*]\s+\*\*|\*\*)")
+_MARKUP = re.compile(r"^(?:#{1,6}\s+|\d{1,3}[.)]\s+|[-*•]\s+)|\*\*|__")
+_NAME_END = re.compile(r"\s+[-–—|]\s+|:\s|\s\(")
+# '**3. Cross-Sector Investment Themes:**', a numbered section of the coordinated report
+_NUMBERED_HEADING = re.compile(r"^\*\*\d{1,2}[.)]\s")
+# '* **Rank 1-5: Highest Priority**' groups ranked opportunities, it is not one
+_RANK_TIER = re.compile(r"^(?:[-*•]\s+)?\*\*rank\s+\d+(?:\s*[-–]\s*\d+)?\s*:[^*]*priority\*\*:?$", re.IGNORECASE)
+# 'Label: value' once markup is removed
+_FIELD = re.compile(r"^([A-Za-z][\w /&'-]{0,40}):\s+(\S.*)$")
+_NAME_LABELS = ('opportunity', 'opportunity name', 'opportunity name/description', 'name')
+_REPORT_LABELS = ('report date', 'deal interests scope', 'industry focus')
+
+_RISK_LISTS = ('market', 'operational', 'financial', 'regulatory')
+_MAX_SUMMARY_ITEMS = 5
+
+
+def _is_heading(line: str) -> bool:
+    return line.startswith('#') or (line.startswith('**') and line.endswith(('**', '**:'))) or line.isupper()
+
+
+def _category(value: str) -> str:
+    """Category named by an opportunity's 'Category:' line"""
+    lowered = value.lower()
+    if 'real estate' in lowered:
+        return 'Real Estate'
+    if 'business' in lowered or 'financial' in lowered:
+        return 'Business Deal'
+    return value.strip(' *')[:40]
+
+
+def _clean(line: str) -> str:
+    return _MARKUP.sub('', line).strip()
+
+
+def record_name(line: str) -> str:
+    """'1. **Maple Court** - Denver, CO' -> 'Maple Court'"""
+    return _NAME_END.split(_clean(line), 1)[0].strip(' *:')
+
+
+def _scan_keywords(line: str) -> Dict[str, Any]:
+    """Keyword kinds present in a line; money and overall risk carry their value"""
+    lowered = line.lower()
+    kinds: Dict[str, Any] = {}
+    for match in _KEYWORDS.finditer(lowered):
+        start = match.start()
+        if start and lowered[start - 1].isalpha():
+            continue  # inside a longer word, e.g. 'unit' in 'opportunity'
+        kind = _KEYWORD_KINDS[match.group()]
+        if kind in kinds:
+            continue
+        if kind == 'money':
+            money = _MONEY.match(lowered, start)
+            if money:
+                kinds[kind] = money.group()
+        elif kind == 'overall':
+            level = _RISK_LEVEL.search(lowered, match.end())
+            if level:
+                kinds[kind] = level.group(1).capitalize()
+        else:
+            kinds[kind] = True
+    return kinds
+
+
+class ReportParser:
+    """Builds PDFGenerator report_data from markdown or plain-text agent output.
+
+    Text can be fed in chunks as it streams in; each line is scanned once by
+    one precompiled keyword alternation, so parsing is linear in the report
+    size. Section headings switch the current section, numbered items and
+    bold bullets inside the opportunities section become opportunities.
+    """
+
+    def __init__(self, subtitle: str = DEFAULT_SUBTITLE, max_opportunities: Optional[int] = None):
+        self.max_opportunities = max_opportunities or OUTPUT_CONFIG["max_opportunities"]
+        self.section: Optional[str] = None
+        self._section_indent = 0
+        self._mitigation_section = False
+        self.total: Optional[int] = None
+        self.opportunity_count = 0
+        self._pending = ''
+        self._chunks: List[str] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._prices: List[float] = []
+        self.report_data: Dict[str, Any] = {
+            'subtitle': subtitle,
+            'executive_summary': {'metrics': {}, 'key_findings': [], 'recommendations': []},
+            'opportunities': [],
+            'risk_analysis': {
+                'overall_risk': 'Medium',
+                'market_risks': [],
+                'operational_risks': [],
+                'financial_risks': [],
+                'regulatory_risks': [],
+                'mitigation_strategies': [],
+            },
+        }
+
+    def feed(self, chunk: str) -> 'ReportParser':
+        """Parse every complete line in `chunk`; a trailing partial line waits for the next chunk"""
+        self._chunks.append(chunk)
+        lines = (self._pending + chunk).split('\n')
+        self._pending = lines.pop()
+        for line in lines:
+            self._parse_line(line)
+        return self
+
+    def _parse_line(self, raw: str):
+        line = raw.strip()
+        if not line:
+            return
+        heading = _is_heading(line)
+        record = self.section == 'opportunities' and _RECORD.match(line) is not None
+        if self.section == 'opportunities' and self._current is None and not (heading or record):
+            return  # body of an opportunity past the report limit
+        field = _FIELD.match(_clean(line))
+        label = field.group(1).strip().lower() if field else None
+        if label in _REPORT_LABELS:
+            return
+        kinds = _scan_keywords(line)
+
+        summary = self.report_data['executive_summary']
+        risk_analysis = self.report_data['risk_analysis']
+
+        if 'total' in kinds and 'opportunity' in kinds:
+            count = extract_count(line)
+            if count is not None:
+                self.total = count
+            return
+        if 'overall' in kinds:
+            risk_analysis['overall_risk'] = kinds['overall']
+
+        indent = len(raw) - len(raw.lstrip())
+        section = self._section_for(line, heading, kinds, indent)
+        if section:
+            self._close_opportunity()
+            self.section = section
+            self._section_indent = indent
+            return
+
+        if self.section == 'opportunities':
+            if _RANK_TIER.match(line):
+                self._close_opportunity()
+            elif label in _NAME_LABELS:
+                self._close_opportunity()
+                self._open_opportunity(field.group(2), _scan_keywords(field.group(2)))
+            elif label == 'category':
+                if self._current is not None:
+                    self._current['category'] = _category(field.group(2))
+            elif record:
+                self._close_opportunity()
+                self._open_opportunity(line, kinds)
+            elif self._current is not None:
+                self._extend_opportunity(line, kinds)
+            return
+
+        text = _clean(line)
+        if self.section in ('executive_summary', 'findings') and len(text) > 20 and 'recommend' not in kinds:
+            if len(summary['key_findings']) < _MAX_SUMMARY_ITEMS:
+                summary['key_findings'].append(text[:150])
+        elif 'recommend' in kinds or self.section == 'recommendations':
+            if len(summary['recommendations']) < _MAX_SUMMARY_ITEMS and len(text) > 20:
+                summary['recommendations'].append(text[:150])
+        elif self.section == 'risk_analysis':
+            if 'mitigation' in kinds or self._mitigation_section:
+                risk_analysis['mitigation_strategies'].append(text[:100])
+            elif 'risk' in kinds:
+                for name in _RISK_LISTS:
+                    if name in kinds:
+                        risk_analysis[f'{name}_risks'].append(text[:100])
+                        break
+
+    def _section_for(self, line: str, heading: bool, kinds: Dict[str, Any], indent: int) -> Optional[str]:
+        """Section a heading line opens, or None for body lines"""
+        if not heading:
+            return None
+        self._mitigation_section = False
+        if 'executive' in kinds:
+            return 'executive_summary'
+        if 'findings' in kinds:
+            return 'findings'
+        if 'risk' in kinds and ('analysis' in kinds or 'overall' in kinds):
+            return 'risk_analysis'
+        if 'mitigation' in kinds and self.section == 'risk_analysis':
+            self._mitigation_section = True
+            return 'risk_analysis'
+        if 'recommend' in kinds:
+            return 'recommendations'
+        if 'opportunity' in kinds:
+            return 'opportunities'
+        if _NUMBERED_HEADING.match(line) and indent <= self._section_indent:
+            # The next numbered section of the report, not a bold '**1. Name**' item under the heading
+            return 'other'
+        if self.section == 'opportunities' and _RECORD.match(line):
+            # '### Maple Court Apartments' inside the opportunities section
+            return None
+        return self.section
+
+    def _open_opportunity(self, line: str, kinds: Dict[str, Any]):
+        self.opportunity_count += 1
+        if self.opportunity_count > self.max_opportunities:
+            self._current = None
+            return
+        name = record_name(line) or f'Opportunity {self.opportunity_count}'
+        self._current = {
+            'name': name[:80],
+            'category': None,
+            'investment_size': 'TBD',
+            'location': 'Various',
+            'type': 'Investment Opportunity',
+            'risk_level': 'Medium',
+            'priority': 'High' if self.opportunity_count <= 5 else 'Medium',
+            'highlights': None,
+            'risks': 'Standard market and execution risks',
+            'next_steps': 'Conduct detailed due diligence',
+        }
+        self._extend_opportunity(line, kinds, title=True)
+
+    def _extend_opportunity(self, line: str, kinds: Dict[str, Any], title: bool = False):
+        current = self._current
+        if current is None:
+            return
+        if current['category'] is None:
+            if 'real_estate' in kinds:
+                current['category'] = 'Real Estate'
+            elif 'deal' in kinds:
+                current['category'] = 'Business Deal'
+        if 'money' in kinds and current['investment_size'] == 'TBD':
+            amount = parse_money(kinds['money'])
+            if amount:
+                current['investment_size'] = format_usd(amount)
+                self._prices.append(amount)
+        if not title and current['highlights'] is None and len(line) > 20:
+            current['highlights'] = _clean(line)[:200]
+
+    def _close_opportunity(self):
+        current, self._current = self._current, None
+        if current is None:
+            return
+        # An opportunity with no category signal is left unclassified rather than guessed
+        current['category'] = current['category'] or ''
+        current['property_type'] = current['category']
+        current['highlights'] = current['highlights'] or current['name']
+        self.report_data['opportunities'].append(current)
+
+    def result(self, additional_content: Optional[str] = None, fill_defaults: bool = True) -> Dict[str, Any]:
+        """Finish parsing and return report_data.
+
+        Args:
+            additional_content: Full text shown after the structured sections,
+                defaults to everything fed so far
+            fill_defaults: Fill empty findings, recommendations and risk lists
+                with generic content so no PDF section is blank
+        """
+        if self._pending:
+            self._parse_line(self._pending)
+            self._pending = ''
+        self._close_opportunity()
+
+        report_data = self.report_data
+        opportunities = report_data['opportunities']
+        real_estate = sum(1 for o in opportunities if o['category'] == 'Real Estate')
+        if self._prices:
+            low, high = min(self._prices), max(self._prices)
+            deal_size = format_usd(low) if low == high else f"{format_usd(low)} - {format_usd(high)}"
+        else:
+            deal_size = 'Varies by opportunity'
+        report_data['executive_summary']['metrics'] = {
+            'total_opportunities': self.total if self.total is not None else self.opportunity_count,
+            'real_estate_count': real_estate,
+            'business_deals_count': sum(1 for o in opportunities if o['category'] == 'Business Deal'),
+            'avg_deal_size': deal_size,
+            'geographic_spread': 'Multiple Markets',
+        }
+        report_data['additional_content'] = (
+            additional_content if additional_content is not None else ''.join(self._chunks)
+        )
+
+        if fill_defaults:
+            summary = report_data['executive_summary']
+            summary['key_findings'] = summary['key_findings'] or list(DEFAULT_FINDINGS)
+            summary['recommendations'] = summary['recommendations'] or list(DEFAULT_RECOMMENDATIONS)
+            risk_analysis = report_data['risk_analysis']
+            if not any(risk_analysis[key] for key in DEFAULT_RISKS):
+                for key, risks in DEFAULT_RISKS.items():
+                    risk_analysis[key] = list(risks)
+            risk_analysis['mitigation_strategies'] = risk_analysis['mitigation_strategies'] or list(DEFAULT_MITIGATION)
+        return report_data
+
+
+def parse_report(
+    text: str,
+    subtitle: str = DEFAULT_SUBTITLE,
+    max_opportunities: Optional[int] = None,
+    fill_defaults: bool = True,
+) -> Dict[str, Any]:
+    """Build report_data from free-form agent output in one pass"""
+    return ReportParser(subtitle, max_opportunities).feed(text).result(fill_defaults=fill_defaults)
@@ -0,0 +1,284 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Vectorized Monte Carlo cash-flow simulation and stress tests for real estate deals"""
+
+import json
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from config import FINANCING_CONFIG, OUTPUT_CONFIG, RISK_SIMULATION_CONFIG
+from schemas import RealEstateSearchOutput, parse_structured
+from utils.deal_financing import hold_period
+from utils.numeric_extraction import extract_numeric
+from utils.report_parser import record_name
+
+# Deterministic shocks as (interest rate shock, vacancy shock, NOI growth, exit
+# cap expansion); shocks add to the base assumption, None keeps the base growth
+STRESS_SCENARIOS = {
+    "base": (0.0, 0.0, None, 0.0),
+    "rates_+200bp": (0.02, 0.0, None, 0.0),
+    "vacancy_+10pts": (0.0, 0.10, None, 0.0),
+    "exit_cap_+100bp": (0.0, 0.0, None, 0.01),
+    "combined": (0.02, 0.10, 0.0, 0.01),
+}
+PERCENTILES = (5, 50, 95)
+# Cells per simulation chunk (deals x scenarios), bounds peak memory
+_CHUNK_CELLS = 2_000_000
+
+
+def search_output(state: Dict[str, Any], key: str) -> Any:
+    """A search output from state, taken from the scored shortlist when candidate scoring ran"""
+    shortlist = state.get("shortlisted_opportunities")
+    if shortlist:
+        try:
+            return json.loads(shortlist).get(key) or state.get(key)
+        except (TypeError, ValueError, AttributeError):
+            pass
+    return state.get(key)
+
+
+def deal_parameters(state: Dict[str, Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Price, NOI, cap rate and size per real estate opportunity found by the search.
+
+    Uses the scored shortlist when candidate scoring ran, then the structured
+    search output, and the numeric extractor over the markdown report
+    otherwise. NOI and cap rate are derived from each other when only one is
+    known; listings with neither are skipped. At most `limit` deals are
+    returned, MAX_OPPORTUNITIES by default.
+    """
+    raw = search_output(state, "real_estate_opportunities_output")
+    structured = parse_structured(raw, RealEstateSearchOutput)
+    if structured is not None:
+        rows = [
+            {'name': o.name, 'price_usd': o.price_usd, 'noi_usd': o.noi_usd, 'cap_rate': o.cap_rate,
+             'sqft': o.square_footage, 'units': o.units}
+            for o in structured.opportunities
+        ]
+    elif isinstance(raw, str):
+        rows = [
+            {'name': record_name(raw[r['offset']:].split('\n', 1)[0])[:80] or f"Listing {i + 1}", **r}
+            for i, r in enumerate(extract_numeric(raw).rows())
+        ]
+    else:
+        rows = []
+
+    deals = []
+    for row in rows:
+        price, noi, cap_rate = row.get('price_usd'), row.get('noi_usd'), row.get('cap_rate')
+        if not price or not (noi or cap_rate):
+            continue
+        noi = noi or price * cap_rate / 100
+        deals.append({
+            'name': row['name'],
+            'price_usd': float(price),
+            'noi_usd': float(noi),
+            'cap_rate': float(cap_rate) if cap_rate else round(100 * noi / price, 2),
+            'sqft': float(row['sqft']) if row.get('sqft') else None,
+            'units': int(row['units']) if row.get('units') else None,
+        })
+    return deals[:OUTPUT_CONFIG["max_opportunities"] if limit is None else limit]
+
+
+def project_returns(
+    price: np.ndarray,
+    noi: np.ndarray,
+    entry_cap: np.ndarray,
+    interest_rate: np.ndarray,
+    vacancy: np.ndarray,
+    noi_growth: np.ndarray,
+    exit_cap: np.ndarray,
+    ltv: float,
+    hold_years: int,
+    amortization_years: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Levered hold-period outcome for every (deal, scenario) cell.
+
+    `price`, `noi` and `entry_cap` (fraction) have shape (deals, 1); the
+    scenario inputs broadcast against them. Listed NOI is already net of the
+    underwritten vacancy, so `vacancy` is the change from it: 0.10 loses ten
+    more points of occupancy, a negative value is a lease-up. Financing and
+    cash flows follow utils.deal_financing, the model the metrics
+    calculator uses, with the loan at the scenario's `interest_rate`.
+    """
+    period = hold_period(
+        price, noi * (1 - vacancy), noi_growth, exit_cap, interest_rate, ltv, amortization_years, hold_years,
+    )
+    proceeds = period['operating_cash_flow'] + period['sale_proceeds']
+    multiple = proceeds / period['equity']
+    with np.errstate(invalid="ignore"):
+        annual = np.where(multiple > 0, np.power(np.maximum(multiple, 1e-12), 1 / hold_years) - 1, -1.0)
+    return {
+        'equity': np.broadcast_to(period['equity'], multiple.shape),
+        'proceeds': proceeds,
+        'equity_multiple': multiple,
+        'annual_return': annual,
+        'min_dscr': period['min_dscr'],
+    }
+
+
+def simulate(
+    deals: List[Dict[str, Any]],
+    scenarios: Optional[int] = None,
+    ltv: Optional[float] = None,
+    interest_rate: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Monte Carlo over rate shocks, vacancy shocks, NOI growth and exit cap expansion.
+
+    Returns per-deal arrays: percentiles of equity multiple and annual return,
+    95% value at risk of the equity, probability of loss and probability that
+    debt service coverage drops below 1.0.
+    """
+    config = RISK_SIMULATION_CONFIG
+    scenarios = scenarios or config["scenarios"]
+    ltv = FINANCING_CONFIG["ltv"] if ltv is None else ltv
+    interest_rate = FINANCING_CONFIG["interest_rate"] if interest_rate is None else interest_rate
+    hold_years = FINANCING_CONFIG["hold_years"]
+    rng = np.random.default_rng(config["seed"] if seed is None else seed)
+
+    price = np.array([d['price_usd'] for d in deals], dtype=np.float64)[:, None]
+    noi = np.array([d['noi_usd'] for d in deals], dtype=np.float64)[:, None]
+    entry_cap = noi / price
+
+    out = {
+        'equity_multiple': np.empty((len(deals), len(PERCENTILES))),
+        'annual_return': np.empty((len(deals), len(PERCENTILES))),
+        'var_95_usd': np.empty(len(deals)),
+        'prob_loss': np.empty(len(deals)),
+        'prob_dscr_below_1': np.empty(len(deals)),
+    }
+    chunk = max(1, _CHUNK_CELLS // scenarios)
+    for start in range(0, len(deals), chunk):
+        rows = slice(start, start + chunk)
+        shape = (len(price[rows]), scenarios)
+        result = project_returns(
+            price[rows], noi[rows], entry_cap[rows],
+            interest_rate=np.maximum(interest_rate + rng.normal(0.0, config["rate_shock_sd"], shape), 0.0),
+            vacancy=np.clip(rng.normal(config["vacancy_mean"], config["vacancy_sd"], shape), -0.1, 0.9),
+            noi_growth=rng.normal(config["noi_growth_mean"], config["noi_growth_sd"], shape),
+            exit_cap=entry_cap[rows] + rng.normal(
+                config["exit_cap_expansion_mean"], config["exit_cap_expansion_sd"], shape
+            ),
+            ltv=ltv,
+            hold_years=hold_years,
+        )
+        out['equity_multiple'][rows] = np.percentile(result['equity_multiple'], PERCENTILES, axis=1).T
+        out['annual_return'][rows] = np.percentile(result['annual_return'], PERCENTILES, axis=1).T
+        worst_proceeds = np.percentile(result['proceeds'], 5, axis=1)
+        out['var_95_usd'][rows] = np.maximum(result['equity'][:, 0] - worst_proceeds, 0.0)
+        out['prob_loss'][rows] = (result['equity_multiple'] < 1.0).mean(axis=1)
+        out['prob_dscr_below_1'][rows] = (result['min_dscr'] < 1.0).mean(axis=1)
+    return out
+
+
+def stress_test(deals: List[Dict[str, Any]], ltv: Optional[float] = None, interest_rate: Optional[float] = None) -> np.ndarray:
+    """Equity multiple of every deal under each STRESS_SCENARIOS shock, shape (deals, scenarios)"""
+    config = RISK_SIMULATION_CONFIG
+    ltv = FINANCING_CONFIG["ltv"] if ltv is None else ltv
+    interest_rate = FINANCING_CONFIG["interest_rate"] if interest_rate is None else interest_rate
+    shocks = np.array([
+        (rate, config["vacancy_mean"] + vacancy,
+         config["noi_growth_mean"] if growth is None else growth, exit_cap)
+        for rate, vacancy, growth, exit_cap in STRESS_SCENARIOS.values()
+    ])
+    price = np.array([d['price_usd'] for d in deals], dtype=np.float64)[:, None]
+    noi = np.array([d['noi_usd'] for d in deals], dtype=np.float64)[:, None]
+    entry_cap = noi / price
+    result = project_returns(
+        price, noi, entry_cap,
+        interest_rate=np.broadcast_to(interest_rate + shocks[:, 0], (len(deals), len(shocks))),
+        vacancy=np.broadcast_to(shocks[:, 1], (len(deals), len(shocks))),
+        noi_growth=np.broadcast_to(shocks[:, 2], (len(deals), len(shocks))),
+        exit_cap=entry_cap + shocks[:, 3],
+        ltv=ltv,
+        hold_years=FINANCING_CONFIG["hold_years"],
+    )
+    return result['equity_multiple']
+
+
+def run_risk_simulation(
+    deals: List[Dict[str, Any]],
+    scenarios: Optional[int] = None,
+    ltv: Optional[float] = None,
+    interest_rate: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Simulate and stress test every deal; JSON-serializable for tools and session state"""
+    started = time.perf_counter()
+    config = RISK_SIMULATION_CONFIG
+    scenarios = scenarios or config["scenarios"]
+    ltv = FINANCING_CONFIG["ltv"] if ltv is None else ltv
+    interest_rate = FINANCING_CONFIG["interest_rate"] if interest_rate is None else interest_rate
+    if not deals:
+        return {'opportunities': [], 'portfolio': None, 'assumptions': None, 'elapsed_ms': 0.0}
+
+    simulated = simulate(deals, scenarios, ltv, interest_rate, seed)
+    stressed = stress_test(deals, ltv, interest_rate)
+    rows = []
+    for i, deal in enumerate(deals):
+        rows.append({
+            **deal,
+            'equity_multiple': dict(zip(("p5", "p50", "p95"), np.round(simulated['equity_multiple'][i], 3).tolist())),
+            'annual_return': dict(zip(("p5", "p50", "p95"), np.round(simulated['annual_return'][i], 4).tolist())),
+            'var_95_usd': round(float(simulated['var_95_usd'][i])),
+            'var_95_pct_of_equity': round(float(simulated['var_95_usd'][i] / (deal['price_usd'] * (1 - ltv))), 4),
+            'prob_loss': round(float(simulated['prob_loss'][i]), 4),
+            'prob_dscr_below_1': round(float(simulated['prob_dscr_below_1'][i]), 4),
+            'stress_equity_multiple': dict(zip(STRESS_SCENARIOS, np.round(stressed[i], 3).tolist())),
+        })
+
+    equity = np.array([d['price_usd'] for d in deals]) * (1 - ltv)
+    return {
+        'opportunities': rows,
+        'portfolio': {
+            'deals': len(deals),
+            'equity_usd': round(float(equity.sum())),
+            # Sum of standalone VaRs, an upper bound that ignores diversification
+            'var_95_usd_undiversified': round(float(simulated['var_95_usd'].sum())),
+            'prob_loss_weighted': round(float(np.average(simulated['prob_loss'], weights=equity)), 4),
+            'worst_deal': deals[int(np.argmax(simulated['var_95_usd'] / equity))]['name'],
+        },
+        'assumptions': {
+            'scenarios': scenarios,
+            'hold_years': FINANCING_CONFIG["hold_years"],
+            'ltv': ltv,
+            'interest_rate': interest_rate,
+            'amortization_years': FINANCING_CONFIG["amortization_years"],
+            'rate_shock_sd': config["rate_shock_sd"],
+            'vacancy_mean': config["vacancy_mean"],
+            'noi_growth_mean': config["noi_growth_mean"],
+            'exit_cap_expansion_mean': config["exit_cap_expansion_mean"],
+        },
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def stress_test_rows(simulation: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rows for the PDF stress test table, formatted for display"""
+    if not simulation:
+        return []
+    return [
+        {
+            'name': row['name'],
+            'equity_multiple': f"{row['equity_multiple']['p5']:.2f}x / {row['equity_multiple']['p50']:.2f}x / {row['equity_multiple']['p95']:.2f}x",
+            'var_95': f"{row['var_95_pct_of_equity']:.0%} of equity",
+            'prob_loss': f"{row['prob_loss']:.0%}",
+            'prob_dscr_below_1': f"{row['prob_dscr_below_1']:.0%}",
+            'combined_stress': f"{row['stress_equity_multiple']['combined']:.2f}x",
+        }
+        for row in simulation.get('opportunities', [])
+    ]
@@ -0,0 +1,373 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bounded session history with automatic compaction for the root coordinator"""
+
+import hashlib
+import json
+from typing import Dict, Any, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+from config import COMPACTION_CONFIG, OPTIMIZATIONS
+
+ARTIFACT_PREFIX = "artifact://"
+
+# Session state key listing the handles already saved as session artifacts
+SAVED_ARTIFACTS_KEY = "compacted_artifacts"
+
+# Sub-agent and tool outputs kept in session state that can grow large
+STATE_OUTPUT_KEYS = (
+    "real_estate_opportunities_output",
+    "financial_news_opportunities_output",
+    "candidate_scores_output",
+    "coordinated_analysis_output",
+    "final_risk_assessment_output",
+    "risk_simulation_output",
+    "financial_metrics_output",
+    "portfolio_analytics_output",
+    "deal_sourcing_coordinator_output",
+    "ultra_fast_output",
+)
+
+# Rough chars-per-token ratio for Gemini English text, good enough for budgeting
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate, avoids a count_tokens round trip per turn"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _part_text(part: types.Part) -> str:
+    """Serialized size proxy of a content part"""
+    if part.text:
+        return part.text
+    if part.function_call:
+        return json.dumps(part.function_call.args or {}, default=str)
+    if part.function_response:
+        return json.dumps(part.function_response.response or {}, default=str)
+    return ""
+
+
+def content_tokens(contents: List[types.Content]) -> int:
+    """Estimated prompt tokens used by a list of contents"""
+    return sum(
+        estimate_tokens(_part_text(part))
+        for content in contents
+        for part in (content.parts or [])
+    )
+
+
+def artifact_handle(label: str, payload: str) -> str:
+    """Content-addressed handle, so re-compacting the same history saves each payload once"""
+    digest = hashlib.sha1(payload.encode()).hexdigest()[:12]
+    return f"{ARTIFACT_PREFIX}compacted_{label}_{digest}.json"
+
+
+def _filename(handle: str) -> str:
+    return handle[len(ARTIFACT_PREFIX):] if handle.startswith(ARTIFACT_PREFIX) else handle
+
+
+def _is_handle(value: Any) -> bool:
+    return isinstance(value, dict) and str(value.get("artifact_handle", "")).startswith(ARTIFACT_PREFIX)
+
+
+async def _save_payloads(callback_context: CallbackContext, payloads: Dict[str, str]) -> None:
+    """Save payloads (handle -> text) as session artifacts, skipping ones already saved.
+
+    Raises ValueError if the runner has no artifact service.
+    """
+    saved = list(callback_context.state.get(SAVED_ARTIFACTS_KEY) or [])
+    new = [handle for handle in payloads if handle not in saved]
+    for handle in new:
+        await callback_context.save_artifact(_filename(handle), types.Part(text=payloads[handle]))
+    if new:
+        callback_context.state[SAVED_ARTIFACTS_KEY] = saved + new
+
+
+async def _load_payload(context: CallbackContext, handle: str) -> Optional[str]:
+    """Text of a compacted session artifact, or None if it is not in this session"""
+    try:
+        part = await context.load_artifact(_filename(handle))
+    except ValueError:
+        return None
+    if part is None:
+        return None
+    if part.text is not None:
+        return part.text
+    if part.inline_data and part.inline_data.data is not None:
+        return part.inline_data.data.decode()
+    return None
+
+
+class SessionCompactor:
+    """Keeps each model request and the session state within budget.
+
+    Runs as a `before_model_callback` on the root coordinator and rewrites
+    the request history in two passes:
+
+    1. Sub-agent outputs (function responses such as
+       real_estate_opportunities_output or the risk report) older than the
+       most recent turns are saved as session artifacts and replaced by a
+       handle plus a short preview.
+    2. If the history is still over budget, the stale turns are replaced by
+       one extractive summary, oldest first.
+
+    Recent turns are never touched, so the model always sees the current
+    exchange in full. As a `before_agent_callback` it also moves bulky
+    outputs of earlier turns out of session state, and as a
+    `before_tool_callback` puts them back before a tool or sub-agent that
+    may read them runs.
+
+    Artifacts go through the runner's artifact service, so they are scoped
+    to the session and shared by every instance serving it. Without an
+    artifact service, outputs stay inline and only pass 2 applies.
+    """
+
+    def __init__(
+        self,
+        token_budget: int,
+        keep_recent_turns: int = 2,
+        max_inline_chars: int = 2000,
+        preview_chars: int = 300,
+        state_keys: tuple = STATE_OUTPUT_KEYS,
+    ):
+        self.token_budget = token_budget
+        self.keep_recent_turns = keep_recent_turns
+        self.max_inline_chars = max_inline_chars
+        self.preview_chars = preview_chars
+        self.state_keys = state_keys
+        self.last_stats: Dict[str, Any] = {}
+
+    @staticmethod
+    def _is_user_turn_start(content: types.Content) -> bool:
+        return content.role == "user" and any(p.text for p in (content.parts or []))
+
+    def _split_turns(self, contents: List[types.Content]) -> List[List[types.Content]]:
+        """Group contents into turns, each starting at a user text message"""
+        turns: List[List[types.Content]] = []
+        for content in contents:
+            if not turns or self._is_user_turn_start(content):
+                turns.append([])
+            turns[-1].append(content)
+        return turns
+
+    def _offload_response(self, part: types.Part, offloads: Dict[str, str]) -> types.Part:
+        """Replace a bulky function response with an artifact handle"""
+        response = part.function_response
+        payload = json.dumps(response.response or {}, default=str)
+        if len(payload) <= self.max_inline_chars:
+            return part
+        handle = artifact_handle(response.name or "tool_output", payload)
+        offloads[handle] = payload
+        return types.Part(
+            function_response=types.FunctionResponse(
+                id=response.id,
+                name=response.name,
+                response={
+                    "artifact_handle": handle,
+                    "preview": payload[:self.preview_chars],
+                    "note": "Full output saved as a session artifact; call load_session_artifact with the handle if needed.",
+                },
+            )
+        )
+
+    def _summarize_turn(self, turn: List[types.Content]) -> str:
+        """One-line extractive summary of a stale turn"""
+        asked, answered, tools = "", "", []
+        for content in turn:
+            for part in content.parts or []:
+                if part.text and content.role == "user" and not asked:
+                    asked = part.text.strip().splitlines()[0][:160]
+                elif part.text and content.role == "model":
+                    lines = [l.strip("#* ").strip() for l in part.text.splitlines() if l.strip()]
+                    if lines:
+                        answered = lines[0][:200]
+                elif part.function_call:
+                    tools.append(part.function_call.name)
+                elif part.function_response and "artifact_handle" in (part.function_response.response or {}):
+                    tools.append(f"{part.function_response.name} -> {part.function_response.response['artifact_handle']}")
+        summary = f"- Member: {asked or '(no text)'}"
+        if tools:
+            summary += f" | tools: {', '.join(tools)}"
+        if answered:
+            summary += f" | answer: {answered}"
+        return summary
+
+    def compact(
+        self, contents: List[types.Content], offloads: Optional[Dict[str, str]] = None
+    ) -> List[types.Content]:
+        """Return a history that fits the token budget.
+
+        Bulky stale outputs are offloaded only when `offloads` is given; it
+        receives handle -> payload for the caller to save as artifacts.
+        """
+        tokens_before = content_tokens(contents)
+        turns = self._split_turns(contents)
+        stale_count = max(len(turns) - self.keep_recent_turns, 0)
+        offloaded = 0
+
+        # Pass 1: move bulky sub-agent outputs of stale turns out of the prompt
+        if offloads is not None:
+            for turn in turns[:stale_count]:
+                for i, content in enumerate(turn):
+                    if not any(p.function_response for p in content.parts or []):
+                        continue
+                    parts = [
+                        self._offload_response(p, offloads) if p.function_response else p
+                        for p in content.parts
+                    ]
+                    offloaded += sum(new is not old for new, old in zip(parts, content.parts))
+                    turn[i] = types.Content(role=content.role, parts=parts)
+
+        compacted = [content for turn in turns for content in turn]
+
+        # Pass 2: fold the oldest stale turns into a summary until within budget
+        summarized = 0
+        while content_tokens(compacted) > self.token_budget and summarized < stale_count:
+            summarized += 1
+            summary_lines = [self._summarize_turn(turn) for turn in turns[:summarized]]
+            summary = types.Content(
+                role="user",
+                parts=[types.Part(text="[Summary of earlier conversation]\n" + "\n".join(summary_lines))],
+            )
+            compacted = [summary] + [content for turn in turns[summarized:] for content in turn]
+
+        self.last_stats = {
+            "tokens_before": tokens_before,
+            "tokens_after": content_tokens(compacted),
+            "turns": len(turns),
+            "turns_summarized": summarized,
+            "artifacts_offloaded": offloaded,
+        }
+        return compacted
+
+    def compact_state(self, state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Handle entries for the bulky output values in `state`, keyed by state key.
+
+        Returns key -> {"artifact_handle", "preview", "payload"}; values
+        already compacted or small enough to stay inline are left out.
+        """
+        compacted = {}
+        for key in self.state_keys:
+            value = state.get(key)
+            if value is None or _is_handle(value):
+                continue
+            payload = json.dumps(value, default=str)
+            if len(payload) <= self.max_inline_chars:
+                continue
+            compacted[key] = {
+                "artifact_handle": artifact_handle(key, payload),
+                "preview": payload[:self.preview_chars],
+                "payload": payload,
+            }
+        return compacted
+
+    async def before_model_callback(self, callback_context: CallbackContext, llm_request: LlmRequest):
+        """ADK callback: compact the request history in place"""
+        if not llm_request.contents:
+            return None
+        offloads: Dict[str, str] = {}
+        compacted = self.compact(list(llm_request.contents), offloads)
+        try:
+            await _save_payloads(callback_context, offloads)
+        except ValueError:
+            # No artifact service: handles could not be resolved, keep outputs inline
+            compacted = self.compact(list(llm_request.contents))
+        llm_request.contents = compacted
+        return None
+
+    async def before_agent_callback(self, callback_context: CallbackContext):
+        """ADK callback: move bulky outputs of earlier turns out of session state"""
+        compacted = self.compact_state(callback_context.state.to_dict())
+        if not compacted:
+            return None
+        try:
+            await _save_payloads(
+                callback_context, {entry["artifact_handle"]: entry["payload"] for entry in compacted.values()}
+            )
+        except ValueError:
+            return None
+        for key, entry in compacted.items():
+            callback_context.state[key] = {
+                "artifact_handle": entry["artifact_handle"],
+                "preview": entry["preview"],
+            }
+        return None
+
+    async def before_tool_callback(self, tool, args: Dict[str, Any], tool_context: ToolContext):
+        """ADK callback: restore compacted state values before a tool reads them"""
+        if getattr(tool, "name", "") == "load_session_artifact":
+            return None
+        for key in self.state_keys:
+            value = tool_context.state.get(key)
+            if not _is_handle(value):
+                continue
+            payload = await _load_payload(tool_context, value["artifact_handle"])
+            if payload is not None:
+                tool_context.state[key] = json.loads(payload)
+        return None
+
+
+_compactor = SessionCompactor(
+    token_budget=COMPACTION_CONFIG["token_budget"],
+    keep_recent_turns=COMPACTION_CONFIG["keep_recent_turns"],
+    max_inline_chars=COMPACTION_CONFIG["max_inline_chars"],
+)
+
+
+def get_session_compactor() -> SessionCompactor:
+    """Get the global session compactor"""
+    return _compactor
+
+
+async def compact_session_history(callback_context: CallbackContext, llm_request: LlmRequest):
+    """before_model_callback that keeps the root agent prompt within budget"""
+    return await _compactor.before_model_callback(callback_context, llm_request)
+
+
+async def compact_session_state(callback_context: CallbackContext):
+    """before_agent_callback that keeps earlier turns' outputs out of session state"""
+    return await _compactor.before_agent_callback(callback_context)
+
+
+async def restore_session_state(tool, args: Dict[str, Any], tool_context: ToolContext):
+    """before_tool_callback that restores compacted outputs for the tools that read them"""
+    return await _compactor.before_tool_callback(tool, args, tool_context)
+
+
+async def load_session_artifact(handle: str, tool_context: ToolContext) -> Dict[str, Any]:
+    """Load the full output behind an artifact handle from an earlier turn.
+
+    Args:
+        handle: The artifact_handle value from a compacted tool result
+
+    Returns:
+        Dictionary with the stored content, or an error if it is not available
+    """
+    content = await _load_payload(tool_context, handle)
+    if content is None:
+        return {"success": False, "error": f"Artifact {handle} is not available in this session, re-run the search"}
+    return {"success": True, "handle": handle, "content": content}
+
+
+# Wiring helpers for the root coordinators
+COMPACTION_CALLBACK = compact_session_history if OPTIMIZATIONS["session_compaction"] else None
+COMPACTION_AGENT_CALLBACK = compact_session_state if OPTIMIZATIONS["session_compaction"] else None
+COMPACTION_TOOL_CALLBACK = restore_session_state if OPTIMIZATIONS["session_compaction"] else None
+COMPACTION_TOOLS = [load_session_artifact] if OPTIMIZATIONS["session_compaction"] else []
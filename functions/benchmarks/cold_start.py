@@ -0,0 +1,123 @@
+"""Cold vs. warm request latency of each agent Cloud Function.
+
+    cd functions && python -m benchmarks.cold_start --processes 5 --requests 20
+
+Every sample is a fresh Python process: it imports the function's main.py,
+serves a first (cold) request, then warm requests. A second set of
+processes calls /warmup before the first request. The agent's model is
+replaced by a stub that answers instantly, so the numbers are the
+function's own overhead (imports, runner, sessions), not model latency.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+FUNCTIONS = {
+    'real-estate-agent': 'real_estate_agent',
+    'financial-news-agent': 'financial_news_agent',
+    'deal-coordinator-agent': 'deal_coordinator_agent',
+    'risk-analyst-agent': 'risk_analyst_agent',
+}
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _stub_model():
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai.types import Content, Part
+
+    class StubLlm(BaseLlm):
+        async def generate_content_async(self, llm_request, stream=False):
+            yield LlmResponse(content=Content(role='model', parts=[Part(text='stub answer')]))
+
+    # A Gemini model name keeps built-in tools such as google_search valid
+    return StubLlm(model='gemini-2.0-flash')
+
+
+def child(function_dir, requests, warmup):
+    """Measure one fresh process; prints a JSON line"""
+    os.chdir(os.path.join(ROOT, function_dir))
+    sys.path.insert(0, os.getcwd())
+    import flask
+
+    started = time.perf_counter()
+    import main
+    import_ms = (time.perf_counter() - started) * 1000
+    handler = getattr(main, FUNCTIONS[function_dir])
+    app = flask.Flask('cold_start')
+
+    def call(path='/', body=None):
+        with app.test_request_context(path, method='POST', json=body or {'query': 'multifamily in Denver'}):
+            started = time.perf_counter()
+            result = handler(flask.request)
+            return (time.perf_counter() - started) * 1000, result
+
+    warmup_ms = None
+    if warmup:
+        warmup_ms, _ = call('/warmup')
+    # Swap the model once the runtime exists; the first request below still builds it if needed
+    runtime_started = time.perf_counter()
+    main.RUNTIME.get().agent.model = _stub_model()
+    runtime_ms = (time.perf_counter() - runtime_started) * 1000
+    first_ms, (body, status, _) = call()
+    assert status == 200, body
+    warm = [call()[0] for _ in range(requests)]
+    print(json.dumps({
+        'import_ms': import_ms,
+        'warmup_ms': warmup_ms,
+        'first_request_ms': first_ms + runtime_ms,
+        'warm_ms': statistics.median(warm),
+    }))
+
+
+def sample(function_dir, processes, requests, warmup):
+    rows = []
+    for _ in range(processes):
+        out = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.cold_start', '--child', function_dir,
+             '--requests', str(requests)] + (['--warmup'] if warmup else []),
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        rows.append(json.loads(out.strip().splitlines()[-1]))
+    return rows
+
+
+def run(processes=5, requests=20):
+    results = {}
+    for function_dir in FUNCTIONS:
+        cold = sample(function_dir, processes, requests, warmup=False)
+        warmed = sample(function_dir, processes, requests, warmup=True)
+        p50 = lambda rows, key: round(statistics.median(r[key] for r in rows), 1)
+        results[function_dir] = {
+            'import_p50_ms': p50(cold, 'import_ms'),
+            'cold_p50_ms': round(statistics.median(r['import_ms'] + r['first_request_ms'] for r in cold), 1),
+            'warmup_p50_ms': p50(warmed, 'warmup_ms'),
+            'first_after_warmup_p50_ms': p50(warmed, 'first_request_ms'),
+            'warm_p50_ms': p50(cold + warmed, 'warm_ms'),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=5)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--child')
+    parser.add_argument('--warmup', action='store_true')
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.requests, args.warmup)
+        return
+    for function_dir, values in run(args.processes, args.requests).items():
+        print(function_dir)
+        for key, value in values.items():
+            print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,10 @@ set -e
 
 PROJECT_ID=${GOOGLE_CLOUD_PROJECT:-$(gcloud config get-value project)}
 REGION=${REGION:-"us-central1"}
+# Concurrent requests per instance; the warm runtimes serve them on one event loop
+CONCURRENCY=${CONCURRENCY:-8}
+# Keep agents running past the coordinator's soft deadline for a follow-up poll
+KEEP_PENDING=${KEEP_PENDING:-false}
 
 echo "Deploying all deal sourcing cloud functions to project: $PROJECT_ID"
 echo "Region: $REGION"
@@ -16,6 +20,7 @@ deploy_function() {
     local function_dir=$1
     local function_name=$2
     local entry_point=$3
+    local env_vars="GOOGLE_CLOUD_PROJECT=$PROJECT_ID${4:+,$4}"
 
     echo "Deploying $function_name..."
 
@@ -30,8 +35,11 @@ deploy_function() {
         --trigger-http \
         --allow-unauthenticated \
         --memory=1024MB \
+        --cpu=1 \
+        --concurrency="$CONCURRENCY" \
         --timeout=540s \
-        --set-env-vars="GOOGLE_CLOUD_PROJECT=$PROJECT_ID"
+        --set-env-vars="$env_vars" \
+        "${@:5}"
 
     cd - > /dev/null
 
@@ -45,7 +53,13 @@ deploy_function "financial-news-agent" "financial-news-agent" "financial_news_ag
 deploy_function "real-estate-agent" "real-estate-agent" "real_estate_agent"
 deploy_function "deal-coordinator-agent" "deal-coordinator-agent" "deal_coordinator_agent"
 deploy_function "risk-analyst-agent" "risk-analyst-agent" "risk_analyst_agent"
-deploy_function "main-coordinator" "main-coordinator" "main_coordinator"
+if [ "$KEEP_PENDING" = "true" ]; then
+    # Pending results live in the memory of the instance that answered the
+    # request, so polls only find them when every request reaches that instance
+    deploy_function "main-coordinator" "main-coordinator" "main_coordinator" "KEEP_PENDING=true" --max-instances=1
+else
+    deploy_function "main-coordinator" "main-coordinator" "main_coordinator"
+fi
 
 echo "🎉 All cloud functions deployed successfully!"
 echo ""
@@ -0,0 +1,170 @@
+"""Warm agent runtime: one event loop and ADK Runner per instance, events as NDJSON"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+
+USER_ID = "cloud_function"
+
+NDJSON_HEADERS = {'Content-Type': 'application/x-ndjson', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+_DONE = object()
+
+
+def agent_timeout(agent_name):
+    """Seconds one run may take: the coordinator's per-agent timeout, e.g. RISK_ANALYST_AGENT_TIMEOUT=90"""
+    return float(os.getenv(f"{agent_name.upper()}_TIMEOUT", os.getenv('AGENT_TIMEOUT', '60')))
+
+
+def wants_stream(request, request_json):
+    """Stream when asked with "stream": true or an NDJSON Accept header"""
+    return bool(request_json.get('stream')) or 'application/x-ndjson' in request.headers.get('Accept', '')
+
+
+def event_text(event):
+    """Visible text of an event, without thoughts"""
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(p.text for p in event.content.parts if p.text and not p.thought)
+
+
+def event_to_dict(event):
+    """JSON-ready summary of an ADK event: tool calls, tool results, partial or final text"""
+    calls = event.get_function_calls()
+    responses = event.get_function_responses()
+    if calls:
+        kind = 'tool_call'
+    elif responses:
+        kind = 'tool_result'
+    elif event.partial:
+        kind = 'partial_text'
+    elif event.is_final_response():
+        kind = 'final'
+    else:
+        kind = 'text'
+
+    data = {'event': kind, 'id': event.id, 'author': event.author}
+    text = event_text(event)
+    if text:
+        data['text'] = text
+    if calls:
+        data['tool_calls'] = [{'name': c.name, 'args': c.args} for c in calls]
+    if responses:
+        data['tool_results'] = [{'name': r.name, 'response': r.response} for r in responses]
+    return data
+
+
+class AgentRuntime:
+    """Event loop thread and ADK Runner shared by every request on a warm instance.
+
+    Created once per instance, so requests skip event loop and runner
+    setup. Request threads submit runs to the loop, so concurrent requests
+    (Cloud Functions gen2 concurrency) interleave on it instead of each
+    blocking in its own `asyncio.run`. Each run gets a fresh in-memory
+    session that is deleted afterwards.
+    """
+
+    def __init__(self, agent):
+        # ADK is imported here, not at module import, to keep cold starts short
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+        from google.genai.types import Part, UserContent
+
+        self._run_configs = {
+            True: RunConfig(streaming_mode=StreamingMode.SSE),
+            False: RunConfig(streaming_mode=StreamingMode.NONE),
+        }
+        self._message = lambda query: UserContent(parts=[Part(text=query)])
+        self.agent = agent
+        self.runner = Runner(
+            agent=agent,
+            app_name=f"{agent.name}_function",
+            session_service=InMemorySessionService(),
+        )
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name=f"{agent.name}-loop", daemon=True).start()
+
+    async def iter_events(self, query, partial=False):
+        """Every event of one run on `query`; with `partial`, text is streamed as it is generated"""
+        sessions = self.runner.session_service
+        session = await sessions.create_session(app_name=self.runner.app_name, user_id=USER_ID)
+        try:
+            async for event in self.runner.run_async(
+                user_id=USER_ID,
+                session_id=session.id,
+                new_message=self._message(query),
+                run_config=self._run_configs[partial],
+            ):
+                yield event
+        finally:
+            # Sessions are single-use, drop them so warm instances do not grow
+            await sessions.delete_session(app_name=self.runner.app_name, user_id=USER_ID, session_id=session.id)
+
+    async def _final_text(self, query):
+        final_text = ""
+        async for event in self.iter_events(query):
+            if event.is_final_response() and event_text(event):
+                final_text = event_text(event)
+        return final_text
+
+    async def _warm(self):
+        sessions = self.runner.session_service
+        session = await sessions.create_session(app_name=self.runner.app_name, user_id=USER_ID)
+        await sessions.delete_session(app_name=self.runner.app_name, user_id=USER_ID, session_id=session.id)
+
+    def warm(self, timeout=30):
+        """Build the model client and exercise the session service without calling the model"""
+        llm = self.agent.canonical_model
+        try:
+            # The Gemini client (and its HTTP client) is created lazily on first access
+            getattr(llm, 'api_client', None)
+            model_client = 'ready'
+        except Exception as e:
+            model_client = f"unavailable: {e}"
+        asyncio.run_coroutine_threadsafe(self._warm(), self.loop).result(timeout)
+        return {'model': getattr(llm, 'model', type(llm).__name__), 'model_client': model_client}
+
+    def run_to_text(self, query, timeout=None):
+        """Final response text of one run, waited for on the request thread"""
+        future = asyncio.run_coroutine_threadsafe(self._final_text(query), self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    async def _forward(self, query, lines, timeout=None):
+        async with asyncio.timeout(timeout):
+            async for event in self.iter_events(query, partial=True):
+                lines.put(event)
+
+    def stream_ndjson(self, query, agent_name, timeout=None):
+        """NDJSON lines for a chunked response: one per ADK event, then a done line.
+
+        The run happens on the shared loop and hands events to the request
+        thread through a queue. The done line carries the final text as
+        `result`, like the JSON response. If the client goes away, or the
+        run takes longer than `timeout` seconds, the run is cancelled.
+        """
+        lines = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._forward(query, lines, timeout), self.loop)
+        future.add_done_callback(lambda f: lines.put(_DONE))
+        final_text = ""
+        try:
+            while (event := lines.get()) is not _DONE:
+                if event.is_final_response() and not event.partial and event_text(event):
+                    final_text = event_text(event)
+                yield json.dumps(event_to_dict(event), default=str) + "\n"
+            future.result()
+            yield json.dumps({'event': 'done', 'agent': agent_name, 'query': query, 'result': final_text, 'status': 'success'}) + "\n"
+        except TimeoutError:
+            print(f"{agent_name} stream timed out after {timeout:g}s")
+            yield json.dumps({'event': 'error', 'agent': agent_name, 'error': f"Timed out after {timeout:g}s", 'status': 'error'}) + "\n"
+        except Exception as e:
+            print(f"Error in {agent_name} stream: {str(e)}")
+            yield json.dumps({'event': 'error', 'agent': agent_name, 'error': str(e), 'status': 'error'}) + "\n"
+        finally:
+            future.cancel()
@@ -0,0 +1,143 @@
+"""Deadline-aware collection of agent results, with pending results kept for polling"""
+
+import os
+import threading
+import time
+import uuid
+
+# Aggregation configuration
+AGGREGATION_CONFIG = {
+    # Hard limit for the agent calls of one coordinator request
+    "timeout": float(os.getenv('COORDINATOR_TIMEOUT', '120')),
+    # Seconds after which the coordinator answers with the agents finished so far
+    "soft_deadline": float(os.getenv('SOFT_DEADLINE', os.getenv('COORDINATOR_TIMEOUT', '120'))),
+    # Keep unfinished agents running after the answer so a follow-up poll can fetch them
+    "keep_pending": os.getenv('KEEP_PENDING', 'false').lower() == 'true',
+    # Seconds a pending request stays available for polling
+    "pending_ttl": float(os.getenv('PENDING_TTL', '600')),
+}
+
+
+class ResultCollector:
+    """Thread-safe collection of the results of one request's agent calls.
+
+    Agent calls publish their result from whichever thread or event loop
+    they run on; the request thread waits on it with a deadline.
+    """
+
+    def __init__(self, agents):
+        self.agents = list(agents)
+        self.created = time.time()
+        self._results = {}
+        self._order = []  # agent names in completion order
+        self._condition = threading.Condition()
+        self._cancel = None
+
+    def publish(self, result):
+        """Record an agent's result; the first result of an agent wins"""
+        with self._condition:
+            if result['agent'] not in self._results:
+                self._results[result['agent']] = result
+                self._order.append(result['agent'])
+                self._condition.notify_all()
+
+    def on_cancel(self, cancel):
+        """Register the callable that stops the calls still running"""
+        self._cancel = cancel
+
+    def cancel(self, error="Not finished within the deadline"):
+        """Stop unfinished calls and record them as failed"""
+        if self._cancel is not None:
+            self._cancel()
+        for agent_name in self.pending():
+            self.publish({'agent': agent_name, 'success': False, 'error': error})
+
+    def done(self):
+        with self._condition:
+            return len(self._results) >= len(self.agents)
+
+    def wait(self, timeout):
+        """Block until every agent has a result or `timeout` seconds pass; True if all finished"""
+        deadline = time.monotonic() + max(timeout, 0)
+        with self._condition:
+            while len(self._results) < len(self.agents):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def iter_results(self, timeout, heartbeat=None):
+        """Yield each result as it arrives until all agents finished or `timeout` passes.
+
+        With `heartbeat`, None is yielded after that many idle seconds so a
+        streaming response can keep its connection open.
+        """
+        deadline = time.monotonic() + max(timeout, 0)
+        sent = 0
+        while True:
+            with self._condition:
+                while sent == len(self._order) and len(self._order) < len(self.agents):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    if not self._condition.wait(min(remaining, heartbeat or remaining)):
+                        break
+                ready = [self._results[a] for a in self._order[sent:]]
+            if not ready:
+                if sent >= len(self.agents) or time.monotonic() >= deadline:
+                    return
+                yield None
+                continue
+            sent += len(ready)
+            yield from ready
+            if sent >= len(self.agents):
+                return
+
+    def results(self):
+        """Finished results in agent order"""
+        with self._condition:
+            return [self._results[a] for a in self.agents if a in self._results]
+
+    def pending(self):
+        with self._condition:
+            return [a for a in self.agents if a not in self._results]
+
+
+class PendingStore:
+    """Collectors of answered requests whose agents are still running.
+
+    Lives in the instance's memory, like the agent calls it waits on, so a
+    poll only finds requests answered by the same warm instance. Deploy the
+    coordinator with --max-instances=1 when KEEP_PENDING is on (see
+    deploy-all.sh). Entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._collectors = {}
+
+    def put(self, collector):
+        poll_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune()
+            self._collectors[poll_id] = collector
+        return poll_id
+
+    def get(self, poll_id):
+        with self._lock:
+            self._prune()
+            return self._collectors.get(poll_id)
+
+    def discard(self, poll_id):
+        with self._lock:
+            self._collectors.pop(poll_id, None)
+
+    def _prune(self):
+        expired = [k for k, c in self._collectors.items() if time.time() - c.created > self.ttl]
+        for poll_id in expired:
+            self._collectors.pop(poll_id).cancel("Expired before it finished")
+
+
+PENDING = PendingStore(AGGREGATION_CONFIG["pending_ttl"])
@@ -0,0 +1,152 @@
+"""Asyncio fan-out of agent calls over one long-lived aiohttp session"""
+
+import asyncio
+import os
+import threading
+
+import aiohttp
+
+from transport import call_in_process, is_in_process
+
+# Async fan-out configuration
+FANOUT_CONFIG = {
+    # Open connections across all agent hosts, and per host
+    "limit": int(os.getenv('ASYNC_POOL_LIMIT', '100')),
+    "limit_per_host": int(os.getenv('ASYNC_POOL_LIMIT_PER_HOST', '32')),
+    # Seconds an idle connection is kept open for the next request
+    "keepalive_timeout": float(os.getenv('ASYNC_KEEPALIVE_TIMEOUT', '75')),
+    # Seconds to establish a connection
+    "connect_timeout": float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+    # Seconds each agent may take, unless overridden by <AGENT_NAME>_TIMEOUT
+    "agent_timeout": float(os.getenv('AGENT_TIMEOUT', '60')),
+}
+
+
+def agent_timeout(agent_name):
+    """Per-agent timeout, e.g. RISK_ANALYST_AGENT_TIMEOUT=90"""
+    return float(os.getenv(f"{agent_name.upper()}_TIMEOUT", FANOUT_CONFIG["agent_timeout"]))
+
+
+class EventLoopThread:
+    """One event loop on a daemon thread, shared by every request on the instance.
+
+    Request threads submit coroutines with `run`; the loop and the aiohttp
+    session it owns live as long as the instance, so connections stay warm.
+    """
+
+    def __init__(self, name='coordinator-loop'):
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop = None
+        self._session = None
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=self._name, daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    async def session(self):
+        """The loop's aiohttp session, created on first use inside the loop"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=FANOUT_CONFIG["limit"],
+                    limit_per_host=FANOUT_CONFIG["limit_per_host"],
+                    keepalive_timeout=FANOUT_CONFIG["keepalive_timeout"],
+                    ttl_dns_cache=300,
+                ),
+                headers={'Content-Type': 'application/json'},
+                raise_for_status=False,
+            )
+        return self._session
+
+    def submit(self, coro):
+        """Schedule `coro` on the shared loop; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Run `coro` on the shared loop and wait for it; cancel it if the wait times out"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+
+LOOP = EventLoopThread()
+
+
+async def call_agent_async(session, agent_name, function_url, query, timeout=None):
+    """Call one agent function, or run it here if its transport is in-process; failures become an unsuccessful result"""
+    timeout = timeout or agent_timeout(agent_name)
+    if is_in_process(agent_name):
+        return await call_in_process(agent_name, query, timeout)
+    try:
+        async with session.post(
+            function_url,
+            json={'query': query},
+            timeout=aiohttp.ClientTimeout(total=timeout, connect=FANOUT_CONFIG["connect_timeout"]),
+        ) as response:
+            if response.status == 200:
+                return {'agent': agent_name, 'success': True, 'data': await response.json(content_type=None)}
+            return {'agent': agent_name, 'success': False, 'error': f"HTTP {response.status}: {await response.text()}"}
+    except asyncio.TimeoutError:
+        return {'agent': agent_name, 'success': False, 'error': f"Timed out after {timeout:g}s"}
+    except Exception as e:
+        # Connection errors and malformed bodies alike; raising here would
+        # make the TaskGroup cancel every sibling call
+        return {'agent': agent_name, 'success': False, 'error': str(e)}
+
+
+async def fan_out(calls, query, total_timeout=120, collector=None):
+    """Call every (agent_name, function_url) pair concurrently.
+
+    Each call has its own timeout. The TaskGroup cancels every call still
+    running when `total_timeout` expires or the caller is cancelled, so no
+    request leaks past its coordinator request. Results keep the call order
+    and are also published to `collector` as each call finishes.
+    """
+    session = await LOOP.session()
+    tasks = {}
+
+    async def call(agent_name, function_url):
+        result = await call_agent_async(session, agent_name, function_url, query)
+        if collector is not None:
+            collector.publish(result)
+        return result
+
+    try:
+        async with asyncio.timeout(total_timeout):
+            async with asyncio.TaskGroup() as group:
+                for agent_name, function_url in calls:
+                    tasks[agent_name] = group.create_task(call(agent_name, function_url))
+    except TimeoutError:
+        pass
+
+    results = []
+    for agent_name, task in tasks.items():
+        if task.done() and not task.cancelled():
+            results.append(task.result())
+        else:
+            results.append({'agent': agent_name, 'success': False, 'error': f"Cancelled after {total_timeout:g}s"})
+            if collector is not None:
+                collector.publish(results[-1])
+    return results
+
+
+def fan_out_sync(calls, query, total_timeout=120):
+    """fan_out for synchronous request handlers, run on the shared loop"""
+    # A little grace so the loop's own deadline fires before the caller's
+    return LOOP.run(fan_out(calls, query, total_timeout), timeout=total_timeout + 5)
+
+
+def start_fan_out(calls, query, collector, total_timeout=120):
+    """Start fan_out on the shared loop without waiting; results arrive in `collector`"""
+    future = LOOP.submit(fan_out(calls, query, total_timeout, collector))
+    collector.on_cancel(future.cancel)
+    return future
@@ -0,0 +1,126 @@
+"""Agent fan-out latency: fresh connection per call, pooled session and asyncio fan-out.
+
+    python -m benchmarks.http_pool --rounds 50 --handshake-ms 30
+
+Runs a local keep-alive stub of the four agent functions. --handshake-ms
+delays every new connection, standing in for the TCP+TLS round trips a
+fresh `requests.post` pays to a real Cloud Function URL.
+"""
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from async_fanout import fan_out_sync
+from http_pool import create_session, pool_stats, post_json
+
+AGENTS = ('real_estate_agent', 'financial_news_agent', 'deal_coordinator_agent', 'risk_analyst_agent')
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        query = json.loads(body or b'{}').get('query', '')
+        time.sleep(self.server.work_seconds)
+        payload = json.dumps({'agent': self.path.strip('/'), 'query': query, 'result': 'ok', 'status': 'success'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Keep-alive stub agent server; each new connection costs `handshake_seconds`"""
+
+    daemon_threads = True
+
+    def __init__(self, handshake_seconds=0.0, work_seconds=0.0):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.handshake_seconds = handshake_seconds
+        self.work_seconds = work_seconds
+        self.connections = 0
+
+    def process_request_thread(self, request, client_address):
+        # Runs once per connection on its own thread, so handshakes overlap
+        self.connections += 1
+        time.sleep(self.handshake_seconds)
+        super().process_request_thread(request, client_address)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def fan_out(call, base_url, rounds):
+    """Per-round wall time of calling all four agents in parallel"""
+    timings = []
+    with ThreadPoolExecutor(max_workers=len(AGENTS)) as executor:
+        for i in range(rounds):
+            started = time.perf_counter()
+            list(executor.map(lambda agent: call(f"{base_url}/{agent}", {'query': f"q{i}"}), AGENTS))
+            timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run(rounds=50, handshake_ms=30.0, work_ms=5.0):
+    results = {}
+    for mode in ('fresh', 'pooled'):
+        server = StubServer(handshake_ms / 1000, work_ms / 1000)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        session = create_session()
+        if mode == 'fresh':
+            call = lambda url, payload: requests.post(url, json=payload, timeout=10).raise_for_status()
+        else:
+            call = lambda url, payload: post_json(url, payload, timeout=10, session=session).raise_for_status()
+        timings = fan_out(call, server.url, rounds)
+        server.shutdown()
+        server.server_close()
+        results[f"{mode}_p50_ms"] = round(statistics.median(timings) * 1000, 2)
+        results[f"{mode}_total_s"] = round(sum(timings), 3)
+        results[f"{mode}_connections"] = server.connections
+        if mode == 'pooled':
+            stats = pool_stats(session)
+            results['pooled_reuse_ratio'] = stats['reuse_ratio']
+            results['pooled_requests'] = stats['requests_sent']
+    results['speedup'] = round(results['fresh_total_s'] / results['pooled_total_s'], 1)
+
+    # One shared loop and aiohttp session, no thread per outbound call
+    server = StubServer(handshake_ms / 1000, work_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    timings = []
+    for i in range(rounds):
+        started = time.perf_counter()
+        fan_out_sync([(agent, f"{server.url}/{agent}") for agent in AGENTS], f"q{i}", total_timeout=10)
+        timings.append(time.perf_counter() - started)
+    server.shutdown()
+    server.server_close()
+    results['async_p50_ms'] = round(statistics.median(timings) * 1000, 2)
+    results['async_connections'] = server.connections
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--handshake-ms', type=float, default=30.0)
+    parser.add_argument('--work-ms', type=float, default=5.0)
+    args = parser.parse_args()
+    for key, value in run(args.rounds, args.handshake_ms, args.work_ms).items():
+        print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Router CPU and agent calls: substring keywords vs. the compiled, cached router.
+
+    cd main-coordinator && python -m benchmarks.router --messages 20000
+"""
+
+import argparse
+import random
+import time
+
+import router
+
+# Labelled messages: what a reviewer decided each message needs
+LABELLED = [
+    ("find multifamily properties in austin under 5m", {'real_estate_agent'}),
+    ("show me rental buildings near downtown denver", {'real_estate_agent'}),
+    ("any houses for sale in phoenix with good cap rates", {'real_estate_agent'}),
+    ("what is the current stock market doing", {'financial_news_agent'}),
+    ("latest financial news on regional banks", {'financial_news_agent'}),
+    ("how is the economy affecting interest rates", {'financial_news_agent'}),
+    ("analyze the housing market in miami", {'real_estate_agent', 'financial_news_agent'}),
+    ("real estate market news for seattle", {'real_estate_agent', 'financial_news_agent'}),
+    ("find real estate deals in dallas", {'real_estate_agent'}),
+    ("evaluate this investment opportunity", {'deal_coordinator_agent'}),
+    ("rank the best investment opportunities from the search", {'deal_coordinator_agent'}),
+    ("analyze this deal", {'deal_coordinator_agent'}),
+    ("assess the risk of the denver office building", {'real_estate_agent', 'risk_analyst_agent'}),
+    ("is it safe to invest in this property", {'real_estate_agent', 'risk_analyst_agent'}),
+    ("what are the risks of this investment", {'deal_coordinator_agent', 'risk_analyst_agent'}),
+    ("current apartment prices in boston", {'real_estate_agent'}),
+    ("hello", {'real_estate_agent'}),
+]
+
+
+def legacy_route(message):
+    """The substring router main_coordinator used before router.py"""
+    message_lower = message.lower()
+    agents = []
+    if any(k in message_lower for k in ['real estate', 'property', 'house', 'building', 'rent']):
+        agents.append('real_estate_agent')
+    if any(k in message_lower for k in ['news', 'market', 'financial', 'stock', 'economy']):
+        agents.append('financial_news_agent')
+    if any(k in message_lower for k in ['deal', 'investment', 'opportunity', 'analyze']):
+        agents.append('deal_coordinator_agent')
+    if any(k in message_lower for k in ['risk', 'safe', 'secure', 'danger', 'assess']):
+        agents.append('risk_analyst_agent')
+    return agents or ['real_estate_agent']
+
+
+def time_per_message(route, messages):
+    started = time.perf_counter()
+    calls = sum(len(route(m)) for m in messages)
+    return (time.perf_counter() - started) / len(messages) * 1e6, calls
+
+
+def run(count=20000, seed=7):
+    rng = random.Random(seed)
+    # Repeated messages with varying case and spacing, like a real chat workload
+    messages = [
+        "  ".join(m.split()) if rng.random() < 0.5 else m.upper()
+        for m, _ in (rng.choice(LABELLED) for _ in range(count))
+    ]
+    legacy_us, legacy_calls = time_per_message(legacy_route, messages)
+    uncached_us, calls = time_per_message(lambda m: router.keyword_agents(router.normalize(m)), messages)
+    router._route.cache_clear()
+    cached_us, _ = time_per_message(router.route, messages)
+
+    def mistakes(route):
+        return sum(set(route(m)) != agents for m, agents in LABELLED)
+
+    classifier = router.IntentClassifier.train([m for m, _ in LABELLED], [a for _, a in LABELLED])
+    started = time.perf_counter()
+    for m, _ in LABELLED:
+        classifier.predict_proba(m)
+    classifier_us = (time.perf_counter() - started) / len(LABELLED) * 1e6
+
+    return {
+        'legacy_us_per_message': round(legacy_us, 2),
+        'compiled_us_per_message': round(uncached_us, 2),
+        'cached_us_per_message': round(cached_us, 2),
+        'classifier_us_per_message': round(classifier_us, 2),
+        'legacy_agent_calls': legacy_calls,
+        'router_agent_calls': calls,
+        'legacy_misrouted': mistakes(legacy_route),
+        'router_misrouted': mistakes(router.route),
+        'labelled_messages': len(LABELLED),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20000)
+    args = parser.parse_args()
+    for key, value in run(args.messages).items():
+        print(f"{key:>28}: {value}")
+
+
+if __name__ == "__main__":
+    main()
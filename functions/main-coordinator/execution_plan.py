@@ -0,0 +1,142 @@
+"""Dependency-aware execution of agent functions within one coordinator request"""
+
+import asyncio
+import os
+import time
+
+from async_fanout import LOOP, call_agent_async
+from transport import is_in_process
+
+# Agents whose input is the output of other agents
+DEPENDENCIES = {
+    'deal_coordinator_agent': ('real_estate_agent', 'financial_news_agent'),
+    'risk_analyst_agent': ('deal_coordinator_agent',),
+}
+
+# Execution plan configuration
+PLAN_CONFIG = {
+    # Add the upstream agents a requested agent depends on, so it never runs on nothing
+    "expand": os.getenv('EXECUTION_PLAN_EXPAND', 'true').lower() == 'true',
+    # Characters of each upstream output passed downstream
+    "upstream_chars": int(os.getenv('PLAN_UPSTREAM_CHARS', '12000')),
+}
+
+
+def build_plan(agents, expand=None):
+    """Order `agents` into stages; each stage only depends on earlier ones.
+
+    With `expand`, the upstream agents of every requested agent are added.
+    Returns a list of stages, each a list of agent names.
+    """
+    expand = PLAN_CONFIG["expand"] if expand is None else expand
+    selected = list(dict.fromkeys(agents))
+    if expand:
+        pending = list(selected)
+        while pending:
+            for upstream in DEPENDENCIES.get(pending.pop(), ()):
+                if upstream not in selected:
+                    selected.append(upstream)
+                    pending.append(upstream)
+
+    stages, placed = [], set()
+    while len(placed) < len(selected):
+        stage = [
+            agent for agent in selected
+            if agent not in placed and all(dep in placed or dep not in selected for dep in DEPENDENCIES.get(agent, ()))
+        ]
+        stages.append(stage)
+        placed.update(stage)
+    return stages
+
+
+def _agent_text(result):
+    data = result.get('data') or {}
+    text = data.get('result', '') if isinstance(data, dict) else data
+    return text if isinstance(text, str) else str(text)
+
+
+def downstream_query(user_message, upstream_results):
+    """The user message followed by the outputs the agent depends on"""
+    limit = PLAN_CONFIG["upstream_chars"]
+    parts = [f"User request: {user_message}"]
+    for result in upstream_results:
+        text = _agent_text(result)
+        if len(text) > limit:
+            text = text[:limit] + "\n[truncated]"
+        parts.append(f"{result['agent']}_output:\n{text}")
+    return "\n\n".join(parts)
+
+
+async def run_plan(stages, function_urls, user_message, total_timeout=120, collector=None):
+    """Run every agent as soon as the agents it depends on have returned.
+
+    Independent agents run concurrently. A downstream agent gets the user
+    message plus its successful upstream outputs and is skipped only when
+    every upstream agent failed. Calls still running at `total_timeout` are
+    cancelled. Returns results in plan order and per-agent timings; each
+    result is also published to `collector` as soon as it is known.
+    """
+    session = await LOOP.session()
+    selected = [agent for stage in stages for agent in stage]
+    started = time.perf_counter()
+    tasks, timings = {}, {}
+
+    async def run_agent(agent_name):
+        try:
+            result = await _run_agent(agent_name)
+        except Exception as e:
+            # Raising would make the TaskGroup cancel agents that do not depend on this one
+            result = {'agent': agent_name, 'success': False, 'error': str(e)}
+        if collector is not None:
+            collector.publish(result)
+        return result
+
+    async def _run_agent(agent_name):
+        upstream = [tasks[dep] for dep in DEPENDENCIES.get(agent_name, ()) if dep in tasks]
+        upstream_results = [await task for task in upstream]
+        succeeded = [r for r in upstream_results if r['success']]
+        if upstream and not succeeded:
+            return {'agent': agent_name, 'success': False, 'error': 'Skipped: every upstream agent failed'}
+        query = downstream_query(user_message, succeeded) if succeeded else user_message
+        function_url = function_urls.get(agent_name)
+        if not function_url and not is_in_process(agent_name):
+            return {'agent': agent_name, 'success': False, 'error': f'Function URL not configured for {agent_name}'}
+        call_started = time.perf_counter()
+        result = await call_agent_async(session, agent_name, function_url, query)
+        timings[agent_name] = {
+            'started_ms': round((call_started - started) * 1000),
+            'duration_ms': round((time.perf_counter() - call_started) * 1000),
+        }
+        return result
+
+    try:
+        async with asyncio.timeout(total_timeout):
+            async with asyncio.TaskGroup() as group:
+                # Stage order guarantees upstream tasks exist before their dependents
+                for agent_name in selected:
+                    tasks[agent_name] = group.create_task(run_agent(agent_name))
+    except TimeoutError:
+        pass
+
+    results = []
+    for agent_name in selected:
+        task = tasks[agent_name]
+        if task.done() and not task.cancelled():
+            results.append(task.result())
+        else:
+            results.append({'agent': agent_name, 'success': False, 'error': f"Cancelled after {total_timeout:g}s"})
+            if collector is not None:
+                collector.publish(results[-1])
+    return results, timings
+
+
+def run_plan_sync(stages, function_urls, user_message, total_timeout=120):
+    """run_plan for synchronous request handlers, run on the shared loop"""
+    return LOOP.run(run_plan(stages, function_urls, user_message, total_timeout), timeout=total_timeout + 5)
+
+
+def start_plan(stages, function_urls, user_message, collector, total_timeout=120):
+    """Start run_plan on the shared loop without waiting; results arrive in `collector`"""
+    future = LOOP.submit(run_plan(stages, function_urls, user_message, total_timeout, collector))
+    collector.on_cancel(future.cancel)
+    return future
@@ -0,0 +1,109 @@
+"""Pooled keep-alive HTTP client shared by every request on a warm instance"""
+
+import os
+import socket
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+# Connection pool configuration
+POOL_CONFIG = {
+    # Distinct agent hosts kept in the pool manager
+    "hosts": int(os.getenv('HTTP_POOL_HOSTS', '8')),
+    # Open connections kept per host, at least the number of concurrent calls to it
+    "maxsize": int(os.getenv('HTTP_POOL_MAXSIZE', '16')),
+    # Seconds to establish a connection; the read timeout is set per call
+    "connect_timeout": float(os.getenv('HTTP_CONNECT_TIMEOUT', '5')),
+    # Retries on connection errors only, since agent calls are not idempotent
+    "connect_retries": int(os.getenv('HTTP_CONNECT_RETRIES', '2')),
+}
+
+# TCP keep-alive probes stop idle pooled sockets from being dropped silently
+# by NATs and load balancers between requests
+_KEEPALIVE_OPTIONS = HTTPConnection.default_socket_options + [
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+] + [
+    (socket.IPPROTO_TCP, getattr(socket, name), value)
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4))
+    if hasattr(socket, name)
+]
+
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keep-alive sockets and connection reuse counters"""
+
+    def __init__(self, **kwargs):
+        self._lock = threading.Lock()
+        self._retired = {'connections': 0, 'requests': 0}
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs['socket_options'] = _KEEPALIVE_OPTIONS
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        # Keep the counters of pools the manager evicts, so stats stay cumulative
+        self.poolmanager.pools.dispose_func = self._retire_pool
+
+    def _retire_pool(self, pool):
+        with self._lock:
+            self._retired['connections'] += pool.num_connections
+            self._retired['requests'] += pool.num_requests
+        pool.close()
+
+    def stats(self):
+        """Connections opened and requests sent since the adapter was created"""
+        pools = self.poolmanager.pools
+        with self._lock:
+            connections = self._retired['connections']
+            requests_sent = self._retired['requests']
+            live = [pools[key] for key in pools.keys()]
+        connections += sum(pool.num_connections for pool in live)
+        requests_sent += sum(pool.num_requests for pool in live)
+        return {
+            'hosts': len(live),
+            'connections_opened': connections,
+            'requests_sent': requests_sent,
+            'connections_reused': max(requests_sent - connections, 0),
+            'reuse_ratio': round(1 - connections / requests_sent, 4) if requests_sent else 0.0,
+        }
+
+
+def create_session():
+    """requests.Session with a tuned keep-alive adapter for http and https"""
+    session = requests.Session()
+    adapter = KeepAliveAdapter(
+        pool_connections=POOL_CONFIG["hosts"],
+        pool_maxsize=POOL_CONFIG["maxsize"],
+        max_retries=Retry(
+            total=POOL_CONFIG["connect_retries"],
+            connect=POOL_CONFIG["connect_retries"],
+            read=0,
+            status=0,
+            other=0,
+            backoff_factor=0.1,
+        ),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Content-Type': 'application/json', 'Connection': 'keep-alive'})
+    return session
+
+
+# Module level, so warm instances reuse connections (and TLS sessions) across invocations
+SESSION = create_session()
+
+
+def post_json(url, payload, timeout=60, session=None):
+    """POST a JSON payload over the pooled session"""
+    return (session or SESSION).post(
+        url,
+        json=payload,
+        timeout=(POOL_CONFIG["connect_timeout"], timeout),
+    )
+
+
+def pool_stats(session=None):
+    """Connection reuse counters of the pooled session"""
+    return (session or SESSION).get_adapter('https://').stats()
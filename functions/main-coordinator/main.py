@@ -1,14 +1,28 @@
 import json
 import functions_framework
+from flask import Response, stream_with_context
 from google.cloud import logging
-import requests
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+from concurrent.futures import ThreadPoolExecutor
 import time
 
-# Set up logging
-logging_client = logging.Client()
-logging_client.setup_logging()
+# Add the local path for imports
+sys.path.append(os.path.dirname(__file__))
+
+from aggregation import AGGREGATION_CONFIG, PENDING, ResultCollector
+from async_fanout import LOOP, start_fan_out
+from execution_plan import build_plan, start_plan
+from http_pool import pool_stats, post_json
+from router import route
+from transport import call_in_process, is_in_process, transports
+
+# Set up logging; without Google Cloud credentials (local runs, tests) print output stays on stdout
+try:
+    logging_client = logging.Client()
+    logging_client.setup_logging()
+except Exception as e:
+    print(f"Cloud Logging unavailable, logging to stdout: {str(e)}")
 
 # Configuration for agent function URLs
 AGENT_FUNCTIONS = {
@@ -18,18 +32,26 @@ AGENT_FUNCTIONS = {
     'risk_analyst_agent': os.getenv('RISK_ANALYST_FUNCTION_URL', 'https://us-central1-tiger21-demo.cloudfunctions.net/risk-analyst-agent')
 }
 
+# Fan out on one shared event loop and aiohttp session instead of a thread per agent call
+ASYNC_FANOUT = os.getenv('ASYNC_FANOUT', 'false').lower() == 'true'
+
+# Feed search outputs into the deal coordinator and its output into the risk analyst
+EXECUTION_PLAN = os.getenv('EXECUTION_PLAN', 'false').lower() == 'true'
+
+# Seconds between keep-alive messages while a streamed response waits on agents
+STREAM_HEARTBEAT = float(os.getenv('STREAM_HEARTBEAT', '15'))
+STREAM_HEADERS = {
+    'sse': {'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    'ndjson': {'Content-Type': 'application/x-ndjson', 'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+}
+
 def call_agent_function(agent_name, function_url, query, timeout=60):
-    """Call an individual agent function"""
+    """Call an individual agent function over the pooled keep-alive session"""
+    if is_in_process(agent_name):
+        # Runs on the shared loop; this worker thread only waits for it
+        return LOOP.run(call_in_process(agent_name, query, timeout), timeout=timeout + 5)
     try:
-        headers = {'Content-Type': 'application/json'}
-        payload = {'query': query}
-
-        response = requests.post(
-            function_url,
-            json=payload,
-            headers=headers,
-            timeout=timeout
-        )
+        response = post_json(function_url, {'query': query}, timeout=timeout)
 
         if response.status_code == 200:
             return {
@@ -50,6 +72,147 @@ def call_agent_function(agent_name, function_url, query, timeout=60):
             'error': str(e)
         }
 
+def combine_results(results):
+    """Combine the successful agent responses into one message"""
+    successful_results = [r for r in results if r['success']]
+    if not successful_results:
+        return "I'm your AI deal sourcing agent. I can help you find real estate deals, analyze financial opportunities, and assess investment risks. How can I assist you today?"
+    combined_response = "Based on my analysis:\n\n"
+    for result in successful_results:
+        agent_name = result['agent'].replace('_', ' ').title()
+        agent_response = result['data'].get('result', '')
+        combined_response += f"**{agent_name}:** {agent_response}\n\n"
+    return combined_response
+
+def poll_pending(poll_id, wait=0.0):
+    """Results of a request answered before all of its agents finished"""
+    collector = PENDING.get(poll_id)
+    if collector is None:
+        return None
+    collector.wait(wait)
+    results = collector.results()
+    pending = collector.pending()
+    if not pending:
+        PENDING.discard(poll_id)
+    return {
+        'message': combine_results(results),
+        'poll_id': poll_id,
+        'results': [
+            {'agent': r['agent'], 'success': r['success'], 'result': r['data'].get('result', '') if r['success'] else None}
+            for r in results
+        ],
+        'pending_agents': pending,
+        'timestamp': int(time.time()),
+        'status': 'partial' if pending else 'success'
+    }
+
+def start_agent_calls(agents_to_call, stages, user_message):
+    """Start the agent calls without waiting; returns the collector their results arrive in"""
+    collector = ResultCollector(agents_to_call)
+    timeout = AGGREGATION_CONFIG["timeout"]
+    if stages:
+        # The plan reports unconfigured agents itself, since dependents wait on them
+        return collector, start_plan(stages, AGENT_FUNCTIONS, user_message, collector, total_timeout=timeout)
+
+    calls = []
+    for agent_name in agents_to_call:
+        function_url = AGENT_FUNCTIONS.get(agent_name)
+        if function_url or is_in_process(agent_name):
+            calls.append((agent_name, function_url))
+        else:
+            collector.publish({
+                'agent': agent_name,
+                'success': False,
+                'error': f'Function URL not configured for {agent_name}'
+            })
+
+    if ASYNC_FANOUT:
+        start_fan_out(calls, user_message, collector, total_timeout=timeout)
+    else:
+        executor = ThreadPoolExecutor(max_workers=4)
+        for agent_name, function_url in calls:
+            future = executor.submit(call_agent_function, agent_name, function_url, user_message)
+            future.add_done_callback(lambda f: collector.publish(f.result()))
+        # Threads of unfinished calls end with their own request timeout
+        executor.shutdown(wait=False)
+    return collector, None
+
+def build_response(collector, agents_to_call, session_id, stages=None, plan_future=None):
+    """Final coordinator response; unfinished agents are kept for polling or stopped"""
+    pending_agents = collector.pending()
+    poll_id = None
+    if pending_agents:
+        if AGGREGATION_CONFIG["keep_pending"]:
+            poll_id = PENDING.put(collector)
+        else:
+            collector.cancel()
+            pending_agents = []
+
+    # Process and combine results
+    results = collector.results()
+    successful_results = [r for r in results if r['success']]
+    failed_results = [r for r in results if not r['success']]
+
+    response = {
+        'message': combine_results(results),
+        'session_id': session_id,
+        'agents_called': agents_to_call,
+        'successful_agents': len(successful_results),
+        'failed_agents': len(failed_results),
+        'timestamp': int(time.time()),
+        'status': 'partial' if pending_agents else 'success'
+    }
+
+    agent_transports = transports(agents_to_call)
+    if 'inprocess' in agent_transports.values():
+        response['transports'] = agent_transports
+
+    if pending_agents:
+        response['pending_agents'] = pending_agents
+        response['poll_id'] = poll_id
+
+    if plan_future is not None:
+        # The plan returns its timings right after publishing its last result
+        timings = plan_future.result(timeout=1)[1] if collector.done() and not plan_future.cancelled() else None
+        response['execution_plan'] = {'stages': stages, 'timings': timings}
+    elif not ASYNC_FANOUT:
+        response['connection_pool'] = pool_stats()
+
+    if failed_results:
+        response['errors'] = [{'agent': r['agent'], 'error': r['error']} for r in failed_results]
+    return response
+
+def wants_stream(request, request_json):
+    """Stream when asked with "stream": true or an event-stream / NDJSON Accept header"""
+    if request_json.get('stream'):
+        return True
+    accept = request.headers.get('Accept', '')
+    return 'text/event-stream' in accept or 'application/x-ndjson' in accept
+
+def agent_event(result):
+    """Streamed event for one finished agent"""
+    event = {'event': 'agent_result', 'agent': result['agent'], 'success': result['success']}
+    if result['success']:
+        event['result'] = result['data'].get('result', '')
+    else:
+        event['error'] = result['error']
+    return event
+
+def stream_events(collector, soft_deadline, agents_to_call, session_id, stages=None, plan_future=None):
+    """Events of a streamed response: the plan, each agent result as it finishes, then the summary"""
+    yield {'event': 'start', 'session_id': session_id, 'agents': agents_to_call, 'stages': stages}
+    for result in collector.iter_results(soft_deadline, heartbeat=STREAM_HEARTBEAT):
+        yield agent_event(result) if result is not None else None
+    yield {'event': 'summary', **build_response(collector, agents_to_call, session_id, stages, plan_future)}
+
+def format_event(event, stream_format):
+    """One SSE message or NDJSON line; None becomes a keep-alive"""
+    if stream_format == 'ndjson':
+        return json.dumps(event or {'event': 'heartbeat'}) + "\n"
+    if event is None:
+        return ": keep-alive\n\n"
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
 @functions_framework.http
 def main_coordinator(request):
     """HTTP Cloud Function for Main Deal Sourcing Coordinator"""
@@ -72,6 +235,14 @@ def main_coordinator(request):
     try:
         # Get the request data
         request_json = request.get_json(silent=True)
+
+        # Follow-up poll for agents still running after a partial answer
+        if request_json and 'poll_id' in request_json:
+            response = poll_pending(request_json['poll_id'], float(request_json.get('wait', 0)))
+            if response is None:
+                return json.dumps({'error': 'Unknown or expired poll_id'}), 404, headers
+            return json.dumps(response), 200, headers
+
         if not request_json or 'message' not in request_json:
             return json.dumps({'error': 'Missing message parameter'}), 400, headers
 
@@ -80,78 +251,33 @@ def main_coordinator(request):
 
         print(f"Processing message: {user_message}")
 
-        # Determine which agents to call based on the message content
-        message_lower = user_message.lower()
-        agents_to_call = []
-
-        # Simple keyword-based routing
-        if any(keyword in message_lower for keyword in ['real estate', 'property', 'house', 'building', 'rent']):
-            agents_to_call.append('real_estate_agent')
-
-        if any(keyword in message_lower for keyword in ['news', 'market', 'financial', 'stock', 'economy']):
-            agents_to_call.append('financial_news_agent')
+        # Determine which agents to call based on the message content;
+        # compiled once and cached per normalized message
+        agents_to_call = route(user_message)
 
-        if any(keyword in message_lower for keyword in ['deal', 'investment', 'opportunity', 'analyze']):
-            agents_to_call.append('deal_coordinator_agent')
-
-        if any(keyword in message_lower for keyword in ['risk', 'safe', 'secure', 'danger', 'assess']):
-            agents_to_call.append('risk_analyst_agent')
-
-        # If no specific agents identified, use real estate as default
-        if not agents_to_call:
-            agents_to_call = ['real_estate_agent']
+        stages = None
+        if EXECUTION_PLAN:
+            stages = build_plan(agents_to_call)
+            agents_to_call = [agent_name for stage in stages for agent_name in stage]
 
         print(f"Calling agents: {agents_to_call}")
 
-        # Call the relevant agent functions in parallel
-        results = []
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {}
-
-            for agent_name in agents_to_call:
-                function_url = AGENT_FUNCTIONS.get(agent_name)
-                if function_url:
-                    future = executor.submit(call_agent_function, agent_name, function_url, user_message)
-                    futures[future] = agent_name
-                else:
-                    results.append({
-                        'agent': agent_name,
-                        'success': False,
-                        'error': f'Function URL not configured for {agent_name}'
-                    })
-
-            # Collect results
-            for future in as_completed(futures, timeout=120):
-                result = future.result()
-                results.append(result)
-
-        # Process and combine results
-        successful_results = [r for r in results if r['success']]
-        failed_results = [r for r in results if not r['success']]
-
-        if successful_results:
-            # Combine the agent responses
-            combined_response = "Based on my analysis:\n\n"
-            for result in successful_results:
-                agent_name = result['agent'].replace('_', ' ').title()
-                agent_response = result['data'].get('result', '')
-                combined_response += f"**{agent_name}:** {agent_response}\n\n"
-        else:
-            combined_response = "I'm your AI deal sourcing agent. I can help you find real estate deals, analyze financial opportunities, and assess investment risks. How can I assist you today?"
-
-        response = {
-            'message': combined_response,
-            'session_id': session_id,
-            'agents_called': agents_to_call,
-            'successful_agents': len(successful_results),
-            'failed_agents': len(failed_results),
-            'timestamp': int(time.time()),
-            'status': 'success'
-        }
+        # Call the relevant agent functions in parallel; results are
+        # collected as they finish, so a slow agent cannot discard the others
+        collector, plan_future = start_agent_calls(agents_to_call, stages, user_message)
+        soft_deadline = min(AGGREGATION_CONFIG["soft_deadline"], AGGREGATION_CONFIG["timeout"])
 
-        if failed_results:
-            response['errors'] = [{'agent': r['agent'], 'error': r['error']} for r in failed_results]
+        if wants_stream(request, request_json):
+            stream_format = 'ndjson' if 'ndjson' in (request_json.get('stream_format') or request.headers.get('Accept', '')) else 'sse'
+            events = stream_events(collector, soft_deadline, agents_to_call, session_id, stages, plan_future)
+            return Response(
+                stream_with_context(format_event(event, stream_format) for event in events),
+                headers={**headers, **STREAM_HEADERS[stream_format]},
+            )
 
+        # Answer with whatever has finished by the soft deadline
+        collector.wait(soft_deadline)
+        response = build_response(collector, agents_to_call, session_id, stages, plan_future)
         return json.dumps(response), 200, headers
 
     except Exception as e:
@@ -0,0 +1,225 @@
+"""Routing of coordinator messages to agents: one compiled keyword matcher,
+an optional hashed-feature classifier, and a cache per normalized message.
+
+Train a classifier on logged routes (ROUTER_LOG=true) or labelled messages:
+
+    python -m router train routes.jsonl router_model.npz
+
+Each JSON line needs "message" and "agents"; lines exported from Cloud
+Logging with the route under "jsonPayload" are read as well.
+"""
+
+import json
+import os
+import re
+import sys
+import zlib
+from functools import lru_cache
+
+# Router configuration
+ROUTER_CONFIG = {
+    # Classifier trained with `python -m router train`; empty for keywords only
+    "model_path": os.getenv('ROUTER_MODEL', ''),
+    # Probability at which the classifier overrides the keywords, in either direction
+    "threshold": float(os.getenv('ROUTER_THRESHOLD', '0.8')),
+    # Normalized messages whose route is cached
+    "cache_size": int(os.getenv('ROUTER_CACHE_SIZE', '4096')),
+    # Print each route as a JSON line, to collect training data
+    "log": os.getenv('ROUTER_LOG', 'false').lower() == 'true',
+}
+
+AGENTS = ('real_estate_agent', 'financial_news_agent', 'deal_coordinator_agent', 'risk_analyst_agent')
+
+DEFAULT_AGENTS = ('real_estate_agent',)
+
+# Whole words (a plural 's' or 'es' is accepted) that select an agent
+KEYWORDS = {
+    'real_estate_agent': ('real estate', 'property', 'properties', 'house', 'housing', 'building', 'rent', 'rental'),
+    'financial_news_agent': ('news', 'market', 'financial', 'stock', 'economy'),
+    'deal_coordinator_agent': ('investment', 'opportunity', 'opportunities'),
+    # Negated forms are listed too: 'safe' does not match inside 'unsafe'
+    'risk_analyst_agent': (
+        'risk', 'risky', 'safe', 'safety', 'unsafe', 'secure', 'insecure', 'unsecured', 'danger', 'dangerous',
+    ),
+}
+
+# Generic words that only select an agent when nothing more specific matched;
+# "analyze the housing market" should not also call the deal coordinator
+WEAK_KEYWORDS = {
+    'deal_coordinator_agent': ('deal', 'analyze'),
+    'risk_analyst_agent': ('assess',),
+}
+
+
+def _keyword_table(keywords, weak_keywords):
+    """Keyword -> (agent name, whether the keyword is weak)"""
+    table = {}
+    for weak, keyword_map in ((False, keywords), (True, weak_keywords)):
+        for agent_name, words in keyword_map.items():
+            for word in words:
+                table[word] = (agent_name, weak)
+    return table
+
+
+def _compile(table):
+    """One regex for every keyword; the captured group is the keyword itself.
+
+    Messages are normalized to single spaces, so multi-word keywords match
+    literally. The lookbehind lets the engine skip positions inside words
+    before trying the alternation, which keeps the scan cheap.
+    """
+    alternatives = "|".join(re.escape(word) for word in sorted(table, key=len, reverse=True))
+    return re.compile(r"(?<![a-z0-9_])(?=[a-z])(" + alternatives + r")(?:e?s)?\b")
+
+
+KEYWORD_TABLE = _keyword_table(KEYWORDS, WEAK_KEYWORDS)
+
+MATCHER = _compile(KEYWORD_TABLE)
+
+
+def normalize(message):
+    return " ".join(message.lower().split())
+
+
+def keyword_agents(normalized):
+    """Agents selected by the keyword matcher, in AGENTS order"""
+    hits = {KEYWORD_TABLE[word] for word in MATCHER.findall(normalized)}
+    selected = {agent_name for agent_name, weak in hits if not weak} or {agent_name for agent_name, _ in hits}
+    return [agent_name for agent_name in AGENTS if agent_name in selected]
+
+
+def _tokens(text):
+    words = re.findall(r"[a-z0-9']+", text)
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class IntentClassifier:
+    """One-vs-rest logistic regression over hashed word and bigram counts.
+
+    Small enough to train in seconds and score in microseconds with NumPy
+    alone; features are hashed with crc32 so they are stable across
+    processes, unlike Python's salted hash().
+    """
+
+    def __init__(self, weights, bias, agents, n_features):
+        self.weights = weights
+        self.bias = bias
+        self.agents = tuple(agents)
+        self.n_features = n_features
+
+    @staticmethod
+    def features(texts, n_features):
+        import numpy as np
+
+        matrix = np.zeros((len(texts), n_features), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _tokens(text):
+                matrix[row, zlib.crc32(token.encode()) % n_features] += 1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-9)
+
+    @classmethod
+    def train(cls, messages, labels, agents=AGENTS, n_features=4096, epochs=300, learning_rate=2.0, l2=1e-4):
+        """Fit on normalized `messages` and, per message, the agents it should go to"""
+        import numpy as np
+
+        x = cls.features(messages, n_features)
+        y = np.array([[agent_name in label for agent_name in agents] for label in labels], dtype=np.float32)
+        weights = np.zeros((n_features, len(agents)), dtype=np.float32)
+        bias = np.zeros(len(agents), dtype=np.float32)
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(x @ weights + bias)))
+            error = (p - y) / len(messages)
+            weights -= learning_rate * (x.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+        return cls(weights, bias, agents, n_features)
+
+    def predict_proba(self, normalized):
+        """Probability per agent that `normalized` should go to it"""
+        import numpy as np
+
+        logits = self.features([normalized], self.n_features)[0] @ self.weights + self.bias
+        return dict(zip(self.agents, (1.0 / (1.0 + np.exp(-logits))).tolist()))
+
+    def save(self, path):
+        import numpy as np
+
+        np.savez(path, weights=self.weights, bias=self.bias, agents=np.array(self.agents), n_features=self.n_features)
+
+    @classmethod
+    def load(cls, path):
+        import numpy as np
+
+        data = np.load(path)
+        return cls(data['weights'], data['bias'], [str(a) for a in data['agents']], int(data['n_features']))
+
+
+def load_classifier(path):
+    """The configured classifier, or None to route on keywords alone"""
+    if not path:
+        return None
+    try:
+        return IntentClassifier.load(path)
+    except Exception as e:
+        print(f"Router classifier unavailable, using keywords only: {str(e)}")
+        return None
+
+
+CLASSIFIER = load_classifier(ROUTER_CONFIG["model_path"])
+
+
+@lru_cache(maxsize=ROUTER_CONFIG["cache_size"])
+def _route(normalized):
+    selected = keyword_agents(normalized)
+    if CLASSIFIER is not None:
+        threshold = ROUTER_CONFIG["threshold"]
+        probabilities = CLASSIFIER.predict_proba(normalized)
+        # A confident classifier adds or drops an agent; otherwise the keywords decide
+        selected = [
+            agent_name for agent_name in AGENTS
+            if probabilities.get(agent_name, 0.5) >= threshold
+            or (agent_name in selected and probabilities.get(agent_name, 0.5) > 1 - threshold)
+        ]
+    return tuple(selected) or DEFAULT_AGENTS
+
+
+def route(message):
+    """Agents to call for `message`, cached per normalized message"""
+    normalized = normalize(message)
+    agents = list(_route(normalized))
+    if ROUTER_CONFIG["log"]:
+        print(json.dumps({'event': 'route', 'message': normalized, 'agents': agents}))
+    return agents
+
+
+def read_routes(path):
+    """(message, agents) pairs from a JSONL file of routes"""
+    routes = []
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            record = record.get('jsonPayload', record) if isinstance(record, dict) else None
+            if isinstance(record, dict) and 'message' in record and 'agents' in record:
+                routes.append((normalize(record['message']), set(record['agents'])))
+    return routes
+
+
+def main(argv):
+    if len(argv) != 3 or argv[0] != 'train':
+        print("usage: python -m router train <routes.jsonl> <model.npz>")
+        return 2
+    routes = read_routes(argv[1])
+    if not routes:
+        print(f"No routes with 'message' and 'agents' in {argv[1]}")
+        return 1
+    classifier = IntentClassifier.train([m for m, _ in routes], [a for _, a in routes])
+    classifier.save(argv[2])
+    print(f"Trained on {len(routes)} messages, saved to {argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
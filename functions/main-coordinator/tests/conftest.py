@@ -0,0 +1,43 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class _AgentHandler(BaseHTTPRequestHandler):
+    """/ok answers JSON, /slow answers JSON after 0.2 s, /bad answers 200 with a non-JSON body"""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        self.server.queries.append((self.path, body.get('query')))
+        if self.path == '/slow':
+            time.sleep(0.2)
+        if self.path == '/bad':
+            payload = b'<html>upstream proxy error</html>'
+        else:
+            payload = json.dumps({'result': f"answer from {self.path}", 'status': 'success'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def agent_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _AgentHandler)
+    server.daemon_threads = True
+    server.queries = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
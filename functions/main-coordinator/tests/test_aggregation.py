@@ -0,0 +1,109 @@
+import threading
+import time
+
+from aggregation import PendingStore, ResultCollector
+
+
+def _result(agent_name, success=True):
+    return {'agent': agent_name, 'success': success, 'data': {'result': agent_name}}
+
+
+def _publish_later(collector, delays):
+    """Publish a result per (agent, seconds) from another thread, like the agent calls do"""
+    def run():
+        started = time.monotonic()
+        for agent_name, delay in delays:
+            time.sleep(max(delay - (time.monotonic() - started), 0))
+            collector.publish(_result(agent_name))
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_wait_returns_once_every_agent_published():
+    collector = ResultCollector(['a', 'b'])
+    _publish_later(collector, [('a', 0.02), ('b', 0.05)])
+
+    assert collector.wait(2)
+    assert collector.done()
+    assert [r['agent'] for r in collector.results()] == ['a', 'b']
+
+
+def test_wait_gives_up_at_the_timeout():
+    collector = ResultCollector(['a', 'b'])
+    collector.publish(_result('a'))
+
+    started = time.monotonic()
+    assert not collector.wait(0.05)
+    assert time.monotonic() - started < 1
+    assert collector.pending() == ['b']
+    # A negative timeout checks without blocking
+    assert not collector.wait(-1)
+
+
+def test_first_result_of_an_agent_wins():
+    collector = ResultCollector(['a'])
+    collector.publish(_result('a'))
+    collector.publish(_result('a', success=False))
+    assert collector.results() == [_result('a')]
+
+
+def test_iter_results_yields_in_completion_order():
+    collector = ResultCollector(['a', 'b', 'c'])
+    _publish_later(collector, [('c', 0.01), ('a', 0.03), ('b', 0.05)])
+
+    assert [r['agent'] for r in collector.iter_results(2)] == ['c', 'a', 'b']
+
+
+def test_iter_results_sends_heartbeats_while_idle():
+    collector = ResultCollector(['a', 'b'])
+    _publish_later(collector, [('a', 0.0), ('b', 0.25)])
+
+    updates = list(collector.iter_results(2, heartbeat=0.05))
+
+    assert [u['agent'] for u in updates if u is not None] == ['a', 'b']
+    assert updates[0]['agent'] == 'a' and updates[-1]['agent'] == 'b'
+    assert updates.count(None) >= 2
+
+
+def test_iter_results_stops_at_the_deadline():
+    collector = ResultCollector(['a', 'b'])
+    collector.publish(_result('a'))
+
+    started = time.monotonic()
+    updates = list(collector.iter_results(0.1, heartbeat=0.03))
+
+    assert time.monotonic() - started < 1
+    assert updates[0]['agent'] == 'a'
+    assert all(u is None for u in updates[1:])
+    assert collector.pending() == ['b']
+
+
+def test_iter_results_returns_immediately_when_all_finished():
+    collector = ResultCollector(['a'])
+    collector.publish(_result('a'))
+    assert list(collector.iter_results(0, heartbeat=0.01)) == [_result('a')]
+
+
+def test_cancel_stops_calls_and_fails_pending_agents():
+    cancelled = []
+    collector = ResultCollector(['a', 'b'])
+    collector.on_cancel(lambda: cancelled.append(True))
+    collector.publish(_result('a'))
+
+    collector.cancel()
+
+    assert cancelled == [True]
+    assert collector.done()
+    assert collector.results()[1] == {'agent': 'b', 'success': False, 'error': "Not finished within the deadline"}
+
+
+def test_pending_store_expires_and_cancels_entries():
+    store = PendingStore(ttl=60)
+    collector = ResultCollector(['a'])
+    poll_id = store.put(collector)
+    assert store.get(poll_id) is collector
+
+    collector.created -= 61
+    assert store.get(poll_id) is None
+    assert collector.results()[0]['error'] == "Expired before it finished"
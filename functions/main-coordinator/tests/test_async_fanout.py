@@ -0,0 +1,31 @@
+from aggregation import ResultCollector
+from async_fanout import fan_out_sync, start_fan_out
+
+
+def test_bad_response_does_not_cancel_other_calls(agent_server):
+    calls = [('real_estate_agent', f"{agent_server.url}/bad"), ('financial_news_agent', f"{agent_server.url}/slow")]
+
+    results = fan_out_sync(calls, "denver multifamily", total_timeout=5)
+
+    bad, slow = results
+    assert bad['agent'] == 'real_estate_agent' and not bad['success']
+    assert slow['success'] and slow['data']['result'] == "answer from /slow"
+
+
+def test_bad_response_is_published_to_collector(agent_server):
+    collector = ResultCollector(['real_estate_agent', 'financial_news_agent'])
+    calls = [('real_estate_agent', f"{agent_server.url}/bad"), ('financial_news_agent', f"{agent_server.url}/slow")]
+
+    start_fan_out(calls, "denver multifamily", collector, total_timeout=5)
+
+    assert collector.wait(5)
+    assert collector.pending() == []
+    assert [r['success'] for r in collector.results()] == [False, True]
+
+
+def test_unreachable_agent_fails_alone(agent_server):
+    calls = [('real_estate_agent', "http://127.0.0.1:1/closed"), ('financial_news_agent', f"{agent_server.url}/ok")]
+
+    results = fan_out_sync(calls, "q", total_timeout=5)
+
+    assert [r['success'] for r in results] == [False, True]
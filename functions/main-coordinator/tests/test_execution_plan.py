@@ -0,0 +1,80 @@
+import execution_plan
+from execution_plan import build_plan, downstream_query, run_plan_sync
+
+ALL_AGENTS = ['real_estate_agent', 'financial_news_agent', 'deal_coordinator_agent', 'risk_analyst_agent']
+
+
+def test_build_plan_expands_upstream_agents():
+    assert build_plan(['risk_analyst_agent'], expand=True) == [
+        ['real_estate_agent', 'financial_news_agent'],
+        ['deal_coordinator_agent'],
+        ['risk_analyst_agent'],
+    ]
+
+
+def test_build_plan_without_expansion_keeps_requested_agents():
+    assert build_plan(['risk_analyst_agent', 'real_estate_agent'], expand=False) == [
+        ['risk_analyst_agent', 'real_estate_agent'],
+    ]
+
+
+def test_build_plan_orders_dependents_after_upstream():
+    stages = build_plan(['deal_coordinator_agent', 'real_estate_agent', 'real_estate_agent'], expand=False)
+
+    assert stages == [['real_estate_agent'], ['deal_coordinator_agent']]
+
+
+def test_downstream_query_truncates_upstream_output(monkeypatch):
+    monkeypatch.setitem(execution_plan.PLAN_CONFIG, "upstream_chars", 5)
+    result = {'agent': 'real_estate_agent', 'success': True, 'data': {'result': "0123456789"}}
+
+    query = downstream_query("find deals", [result])
+
+    assert query.startswith("User request: find deals")
+    assert "real_estate_agent_output:\n01234\n[truncated]" in query
+
+
+def _urls(server, **paths):
+    return {agent: f"{server.url}/{paths.get(agent, agent)}" for agent in ALL_AGENTS}
+
+
+def test_downstream_runs_when_some_upstream_agents_fail(agent_server):
+    stages = build_plan(['risk_analyst_agent'])
+
+    results, timings = run_plan_sync(stages, _urls(agent_server, real_estate_agent='bad'), "find deals", total_timeout=5)
+
+    by_agent = {r['agent']: r for r in results}
+    assert not by_agent['real_estate_agent']['success']
+    assert by_agent['financial_news_agent']['success']
+    assert by_agent['deal_coordinator_agent']['success']
+    assert by_agent['risk_analyst_agent']['success']
+    assert set(timings) == set(ALL_AGENTS)
+    # The coordinator gets the successful upstream output only
+    coordinator_query = dict(agent_server.queries)['/deal_coordinator_agent']
+    assert "financial_news_agent_output:\nanswer from /financial_news_agent" in coordinator_query
+    assert "real_estate_agent_output" not in coordinator_query
+
+
+def test_downstream_skipped_when_every_upstream_agent_fails(agent_server):
+    stages = build_plan(['risk_analyst_agent'])
+    urls = _urls(agent_server, real_estate_agent='bad', financial_news_agent='bad')
+
+    results, _ = run_plan_sync(stages, urls, "find deals", total_timeout=5)
+
+    by_agent = {r['agent']: r for r in results}
+    assert by_agent['deal_coordinator_agent']['error'] == 'Skipped: every upstream agent failed'
+    assert by_agent['risk_analyst_agent']['error'] == 'Skipped: every upstream agent failed'
+    # Skipped agents are never called
+    assert [path for path, _ in agent_server.queries] == ['/bad', '/bad']
+
+
+def test_malformed_response_does_not_cancel_independent_agents(agent_server):
+    stages = build_plan(['real_estate_agent', 'financial_news_agent'])
+    urls = _urls(agent_server, real_estate_agent='bad', financial_news_agent='slow')
+
+    results, _ = run_plan_sync(stages, urls, "market news", total_timeout=5)
+
+    assert [(r['agent'], r['success']) for r in results] == [
+        ('real_estate_agent', False),
+        ('financial_news_agent', True),
+    ]
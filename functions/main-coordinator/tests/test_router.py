@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import router
+
+
+@pytest.fixture(autouse=True)
+def keywords_only(monkeypatch):
+    monkeypatch.setattr(router, 'CLASSIFIER', None)
+    router._route.cache_clear()
+    yield
+    router._route.cache_clear()
+
+
+def test_strong_keywords_select_their_agents():
+    assert router.route("Find rental properties near the stock market") == ['real_estate_agent', 'financial_news_agent']
+    assert router.route("Which investment opportunities are risky?") == ['deal_coordinator_agent', 'risk_analyst_agent']
+
+
+def test_weak_keywords_only_count_without_strong_ones():
+    assert router.route("Analyze the housing market") == ['real_estate_agent', 'financial_news_agent']
+    assert router.route("Analyze this deal") == ['deal_coordinator_agent']
+    assert router.route("Assess this deal") == ['deal_coordinator_agent', 'risk_analyst_agent']
+
+
+def test_negated_forms_go_to_the_risk_analyst():
+    assert router.route("Is this deal unsafe?") == ['risk_analyst_agent']
+    assert router.route("How insecure is an unsecured loan?") == ['risk_analyst_agent']
+
+
+def test_keywords_match_whole_words_and_plurals():
+    assert router.route("Compare houses, buildings and stocks") == ['real_estate_agent', 'financial_news_agent']
+    assert router.route("What are the risks?") == ['risk_analyst_agent']
+    # 'rent' in 'parent', 'market' in 'marketplace' and 'news' in 'newsletter' are not keywords
+    assert router.keyword_agents("my parent company newsletter marketplace") == []
+    assert router.route("hello there") == list(router.DEFAULT_AGENTS)
+
+
+def test_routes_are_cached_per_normalized_message():
+    first = router.route("Is this  deal RISKY?")
+    second = router.route("is this deal risky?")
+
+    assert first == second == ['risk_analyst_agent']
+    info = router._route.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def _routes():
+    return [
+        ("any good apartments in austin", {'real_estate_agent'}),
+        ("apartments for sale in denver", {'real_estate_agent'}),
+        ("latest merger headlines", {'financial_news_agent'}),
+        ("merger headlines this week", {'financial_news_agent'}),
+        ("should i worry about this acquisition", {'risk_analyst_agent'}),
+        ("worry about downside here", {'risk_analyst_agent'}),
+    ] * 5
+
+
+def test_classifier_trains_saves_and_loads(tmp_path):
+    messages, labels = zip(*_routes())
+    classifier = router.IntentClassifier.train(messages, labels)
+    path = tmp_path / "router_model.npz"
+    classifier.save(path)
+
+    loaded = router.load_classifier(str(path))
+    probabilities = loaded.predict_proba("apartments in austin")
+    assert probabilities == pytest.approx(classifier.predict_proba("apartments in austin"))
+    assert probabilities['real_estate_agent'] > 0.5 > probabilities['financial_news_agent']
+    assert router.load_classifier(str(tmp_path / "missing.npz")) is None
+    assert router.load_classifier('') is None
+
+
+def test_confident_classifier_overrides_keywords(monkeypatch):
+    messages, labels = zip(*_routes())
+    monkeypatch.setattr(router, 'CLASSIFIER', router.IntentClassifier.train(messages, labels, epochs=2000, learning_rate=8.0))
+    monkeypatch.setitem(router.ROUTER_CONFIG, 'threshold', 0.7)
+
+    # No keyword matches 'worry'; the classifier adds the risk analyst
+    assert router.route("worry about this acquisition") == ['risk_analyst_agent']
+
+
+def test_train_command_reads_logged_routes(tmp_path, capsys):
+    log = tmp_path / "routes.jsonl"
+    lines = [json.dumps({'jsonPayload': {'event': 'route', 'message': m, 'agents': sorted(a)}}) for m, a in _routes()]
+    log.write_text("\n".join(lines + ["not json", json.dumps({'message': "no agents"})]) + "\n")
+    model = tmp_path / "model.npz"
+
+    assert router.main(['train', str(log), str(model)]) == 0
+    assert f"Trained on {len(_routes())} messages" in capsys.readouterr().out
+    assert router.IntentClassifier.load(model).agents == router.AGENTS
+    assert router.main(['train']) == 2
@@ -0,0 +1,87 @@
+import json
+
+import flask
+import pytest
+
+import main
+
+
+@pytest.fixture
+def client(agent_server, monkeypatch):
+    """Test client of the coordinator with the real estate agent fast and the news agent slow"""
+    monkeypatch.setattr(main, 'AGENT_FUNCTIONS', {
+        'real_estate_agent': f"{agent_server.url}/real_estate_agent",
+        'financial_news_agent': f"{agent_server.url}/slow",
+    })
+    monkeypatch.setattr(main, 'STREAM_HEARTBEAT', 0.03)
+    monkeypatch.setattr(main, 'ASYNC_FANOUT', False)
+    monkeypatch.setattr(main, 'EXECUTION_PLAN', False)
+    app = flask.Flask(__name__)
+    app.add_url_rule('/', 'main_coordinator', lambda: main.main_coordinator(flask.request), methods=['POST'])
+    return app.test_client()
+
+
+MESSAGE = "Find rental properties and market news"
+
+
+def _sse_messages(body):
+    return [message for message in body.split("\n\n") if message]
+
+
+def test_sse_stream_frames_events_and_heartbeats(client):
+    response = client.post('/', json={'message': MESSAGE}, headers={'Accept': 'text/event-stream'})
+    assert response.headers['Content-Type'] == 'text/event-stream'
+    messages = _sse_messages(response.get_data(as_text=True))
+
+    events = []
+    for message in messages:
+        if message == ": keep-alive":
+            events.append('heartbeat')
+            continue
+        name, data = message.split("\n")
+        assert name.startswith("event: ") and data.startswith("data: ")
+        payload = json.loads(data[len("data: "):])
+        assert payload['event'] == name[len("event: "):]
+        events.append(payload)
+
+    names = [e if e == 'heartbeat' else e['event'] for e in events]
+    assert names[0] == 'start' and names[-1] == 'summary'
+    results = [e for e in events if e != 'heartbeat' and e['event'] == 'agent_result']
+    # The fast agent arrives first, the slow one after keep-alives
+    assert [r['agent'] for r in results] == ['real_estate_agent', 'financial_news_agent']
+    assert 'heartbeat' in names[names.index('agent_result'):names.index('summary')]
+    assert results[0]['result'] == "answer from /real_estate_agent"
+
+    summary = events[-1]
+    assert summary['status'] == 'success' and summary['successful_agents'] == 2
+    assert summary['agents_called'] == ['real_estate_agent', 'financial_news_agent']
+
+
+@pytest.mark.parametrize("request_kwargs", [
+    {'json': {'message': MESSAGE, 'stream': True, 'stream_format': 'ndjson'}},
+    {'json': {'message': MESSAGE}, 'headers': {'Accept': 'application/x-ndjson'}},
+])
+def test_ndjson_stream_has_one_event_per_line(client, request_kwargs):
+    response = client.post('/', **request_kwargs)
+    assert response.headers['Content-Type'] == 'application/x-ndjson'
+    body = response.get_data(as_text=True)
+    assert body.endswith("\n")
+
+    events = [json.loads(line) for line in body.splitlines()]
+    names = [e['event'] for e in events]
+    assert names[0] == 'start' and names[-1] == 'summary'
+    assert events[0]['agents'] == ['real_estate_agent', 'financial_news_agent']
+    assert [e['agent'] for e in events if e['event'] == 'agent_result'] == ['real_estate_agent', 'financial_news_agent']
+    assert 'heartbeat' in names
+    assert events[-1]['message'].startswith("Based on my analysis:")
+
+
+def test_failed_agent_is_streamed_as_an_error(client, agent_server, monkeypatch):
+    monkeypatch.setitem(main.AGENT_FUNCTIONS, 'financial_news_agent', f"{agent_server.url}/bad")
+
+    response = client.post('/', json={'message': MESSAGE, 'stream': True, 'stream_format': 'ndjson'})
+    events = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    failed = next(e for e in events if e.get('agent') == 'financial_news_agent')
+    assert failed['success'] is False and 'error' in failed
+    assert events[-1]['failed_agents'] == 1 and events[-1]['errors'][0]['agent'] == 'financial_news_agent'
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+import transport
+
+
+class StubAgent:
+    """Stands in for an InProcessAgent: answers after `delay` seconds, or raises `error`"""
+
+    def __init__(self, delay=0.0, error=None):
+        self.delay = delay
+        self.error = error
+        self.queries = []
+
+    async def run(self, query):
+        self.queries.append(query)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"stub answer to {query}"
+
+
+@pytest.fixture
+def stub_agents(monkeypatch):
+    agents = {}
+    monkeypatch.setattr(transport, '_agents', agents)
+    return agents
+
+
+def test_transport_comes_from_the_agent_env_then_the_default(monkeypatch):
+    monkeypatch.setitem(transport.TRANSPORT_CONFIG, 'default', 'http')
+    monkeypatch.setenv('RISK_ANALYST_AGENT_TRANSPORT', 'InProcess')
+
+    assert transport.agent_transport('risk_analyst_agent') == 'inprocess'
+    assert transport.agent_transport('real_estate_agent') == 'http'
+    assert transport.is_in_process('risk_analyst_agent')
+    assert not transport.is_in_process('real_estate_agent')
+    assert transport.transports(['real_estate_agent', 'risk_analyst_agent']) == {
+        'real_estate_agent': 'http', 'risk_analyst_agent': 'inprocess',
+    }
+
+    monkeypatch.setitem(transport.TRANSPORT_CONFIG, 'default', 'inprocess')
+    assert transport.is_in_process('real_estate_agent')
+    # Agents without a function directory are always called over HTTP
+    assert not transport.is_in_process('custom_agent')
+
+
+def test_unknown_transport_is_an_error(monkeypatch):
+    monkeypatch.setenv('REAL_ESTATE_AGENT_TRANSPORT', 'grpc')
+
+    with pytest.raises(ValueError, match="Unknown transport 'grpc' for real_estate_agent"):
+        transport.agent_transport('real_estate_agent')
+
+
+def test_call_in_process_has_the_http_result_shape(stub_agents):
+    stub_agents['real_estate_agent'] = StubAgent()
+
+    result = asyncio.run(transport.call_in_process('real_estate_agent', "lofts in austin", timeout=1))
+
+    assert result == {
+        'agent': 'real_estate_agent',
+        'success': True,
+        'data': {
+            'agent': 'real_estate_agent', 'query': "lofts in austin", 'result': "stub answer to lofts in austin",
+            'status': 'success', 'transport': 'inprocess',
+        },
+    }
+
+
+def test_call_in_process_times_out(stub_agents):
+    stub_agents['risk_analyst_agent'] = StubAgent(delay=5)
+
+    result = asyncio.run(transport.call_in_process('risk_analyst_agent', "q", timeout=0.05))
+
+    assert result == {'agent': 'risk_analyst_agent', 'success': False, 'error': "Timed out after 0.05s"}
+
+
+def test_call_in_process_reports_agent_and_import_failures(stub_agents, monkeypatch):
+    stub_agents['deal_coordinator_agent'] = StubAgent(error=RuntimeError("model quota exceeded"))
+    failed = asyncio.run(transport.call_in_process('deal_coordinator_agent', "q", timeout=1))
+    assert failed == {'agent': 'deal_coordinator_agent', 'success': False,
+                      'error': "In-process call failed: model quota exceeded"}
+
+    def missing(agent_name):
+        raise FileNotFoundError("Agent function directory not found")
+    monkeypatch.setattr(transport, 'load_agent', missing)
+    result = asyncio.run(transport.call_in_process('financial_news_agent', "q", timeout=1))
+    assert result['success'] is False and "directory not found" in result['error']
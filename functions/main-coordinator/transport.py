@@ -0,0 +1,158 @@
+"""Agent transports: HTTP calls to the agent functions, or the agents run in this process"""
+
+import asyncio
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+
+USER_ID = "main_coordinator"
+
+# Function directory of each agent, relative to TRANSPORT_CONFIG["functions_root"]
+AGENT_DIRS = {
+    'real_estate_agent': 'real-estate-agent',
+    'financial_news_agent': 'financial-news-agent',
+    'deal_coordinator_agent': 'deal-coordinator-agent',
+    'risk_analyst_agent': 'risk-analyst-agent',
+}
+
+# Transport configuration
+TRANSPORT_CONFIG = {
+    # 'http' calls the agent's function URL; 'inprocess' imports the agent and runs it here
+    "default": os.getenv('AGENT_TRANSPORT', 'http').lower(),
+    # Directory holding the agent function directories, relative to this one
+    "functions_root": os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        os.getenv('AGENT_FUNCTIONS_ROOT', '..'),
+    ),
+}
+
+TRANSPORTS = ('http', 'inprocess')
+
+
+def agent_transport(agent_name):
+    """Per-agent transport, e.g. RISK_ANALYST_AGENT_TRANSPORT=inprocess"""
+    transport = os.getenv(f"{agent_name.upper()}_TRANSPORT", TRANSPORT_CONFIG["default"]).lower()
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {transport!r} for {agent_name}, expected one of {TRANSPORTS}")
+    return transport
+
+
+def is_in_process(agent_name):
+    return agent_name in AGENT_DIRS and agent_transport(agent_name) == 'inprocess'
+
+
+def _load_package(name, path):
+    """Import the package at `path` as `name`.
+
+    Every agent function ships its own top-level `agents` package, so each
+    is loaded under a distinct name to keep them apart in sys.modules.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(path, '__init__.py'), submodule_search_locations=[path]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+class InProcessAgent:
+    """An agent function's ADK agent, run on the caller's event loop.
+
+    Imports the agent from its function directory and wraps it in an ADK
+    Runner with an in-memory session service, like the function itself
+    does, but without the HTTP hop or the function's own cold start.
+    """
+
+    def __init__(self, agent_name):
+        from google.adk.agents.run_config import RunConfig, StreamingMode
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+        from google.genai.types import Part, UserContent
+
+        function_dir = os.path.join(TRANSPORT_CONFIG["functions_root"], AGENT_DIRS[agent_name])
+        if not os.path.isdir(function_dir):
+            raise FileNotFoundError(f"Agent function directory not found: {function_dir}")
+        # The agent modules import `config` from their function directory;
+        # it is the same file in every agent function
+        if function_dir not in sys.path:
+            sys.path.append(function_dir)
+        package = _load_package(f"{agent_name}_function", os.path.join(function_dir, 'agents'))
+        module = importlib.import_module(f"{package.__name__}.sub_agents.agent")
+
+        self.agent_name = agent_name
+        self.agent = getattr(module, agent_name)
+        self.runner = Runner(
+            agent=self.agent,
+            app_name=f"{agent_name}_inprocess",
+            session_service=InMemorySessionService(),
+        )
+        self._run_config = RunConfig(streaming_mode=StreamingMode.NONE)
+        self._message = lambda query: UserContent(parts=[Part(text=query)])
+
+    async def run(self, query):
+        """Final response text of one run on a fresh session"""
+        sessions = self.runner.session_service
+        session = await sessions.create_session(app_name=self.runner.app_name, user_id=USER_ID)
+        final_text = ""
+        try:
+            async for event in self.runner.run_async(
+                user_id=USER_ID,
+                session_id=session.id,
+                new_message=self._message(query),
+                run_config=self._run_config,
+            ):
+                if event.is_final_response() and event.content and event.content.parts:
+                    text = "".join(p.text for p in event.content.parts if p.text and not p.thought)
+                    if text:
+                        final_text = text
+        finally:
+            await sessions.delete_session(app_name=self.runner.app_name, user_id=USER_ID, session_id=session.id)
+        return final_text
+
+
+_agents = {}
+_lock = threading.Lock()
+
+
+def load_agent(agent_name):
+    """The instance's InProcessAgent for `agent_name`, imported on first use"""
+    with _lock:
+        if agent_name not in _agents:
+            _agents[agent_name] = InProcessAgent(agent_name)
+        return _agents[agent_name]
+
+
+async def call_in_process(agent_name, query, timeout):
+    """Run one agent in this process; failures become an unsuccessful result.
+
+    The result has the same shape as an HTTP call's, so callers cannot tell
+    the transports apart. Importing the agent blocks, so the first call does
+    it on a worker thread instead of the shared event loop.
+    """
+    try:
+        agent = _agents.get(agent_name) or await asyncio.to_thread(load_agent, agent_name)
+        async with asyncio.timeout(timeout):
+            text = await agent.run(query)
+    except TimeoutError:
+        return {'agent': agent_name, 'success': False, 'error': f"Timed out after {timeout:g}s"}
+    except Exception as e:
+        return {'agent': agent_name, 'success': False, 'error': f"In-process call failed: {str(e)}"}
+    return {
+        'agent': agent_name,
+        'success': True,
+        'data': {'agent': agent_name, 'query': query, 'result': text, 'status': 'success', 'transport': 'inprocess'},
+    }
+
+
+def transports(agent_names):
+    """Transport of each agent, for the coordinator response"""
+    return {agent_name: agent_transport(agent_name) for agent_name in agent_names}
@@ -81,6 +81,6 @@ def get_optimization_summary():
     benefits = [optimization_benefits.get(opt, opt) for opt in enabled]
     return f"Optimizations enabled: {', '.join(benefits)}"
 
-# Print optimization status on module load
-if __name__ != "__main__":
+# Print optimization status on module load; off by default to keep cold starts quiet
+if __name__ != "__main__" and OUTPUT_CONFIG["verbose_output"]:
     print(f"Deal Sourcing Agent: {get_optimization_summary()}")
\ No newline at end of file
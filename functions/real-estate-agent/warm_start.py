@@ -0,0 +1,104 @@
+"""Cold-start helpers: deferred logging, timed lazy imports and a warm-up path"""
+
+import importlib
+import os
+import threading
+import time
+
+from agent_events import AgentRuntime
+
+# Milliseconds each lazily imported module may take before a warning is logged
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', '1500'))
+
+# Module name -> import time in milliseconds, for the /warmup response
+IMPORT_TIMES = {}
+
+# Modules ADK only imports on an agent's first run (LLM flow, auth, workflow);
+# importing them during warm-up keeps that cost off the first real request
+FIRST_RUN_MODULES = (
+    'google.adk.flows.llm_flows.auto_flow',
+    'google.adk.flows.llm_flows.functions',
+    'google.adk.auth.auth_preprocessor',
+    'google.adk.workflow',
+    'google.adk.a2a.agent',
+)
+
+_lock = threading.Lock()
+_logging_ready = False
+
+
+def setup_logging():
+    """Attach Cloud Logging on first use instead of at import"""
+    global _logging_ready
+    with _lock:
+        if _logging_ready:
+            return
+        _logging_ready = True
+    try:
+        from google.cloud import logging
+        logging.Client().setup_logging()
+    except Exception as e:
+        # Logs still reach stdout, which Cloud Functions collects
+        print(f"Cloud Logging unavailable, logging to stdout: {str(e)}")
+
+
+def timed_import(name):
+    """Import `name`, recording how long it took against IMPORT_BUDGET_MS"""
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    IMPORT_TIMES.setdefault(name, elapsed_ms)
+    if elapsed_ms > IMPORT_BUDGET_MS:
+        print(f"Import of {name} took {elapsed_ms:.0f} ms, over the {IMPORT_BUDGET_MS:.0f} ms budget")
+    return module
+
+
+def import_report():
+    return {
+        name: {'ms': ms, 'budget_ms': IMPORT_BUDGET_MS, 'within_budget': ms <= IMPORT_BUDGET_MS}
+        for name, ms in IMPORT_TIMES.items()
+    }
+
+
+class LazyRuntime:
+    """AgentRuntime built on the first request or warm-up instead of at import"""
+
+    def __init__(self, agent_module, agent_name):
+        self._agent_module = agent_module
+        self._agent_name = agent_name
+        self._runtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._runtime is None:
+            with self._lock:
+                if self._runtime is None:
+                    timed_import('google.adk.runners')
+                    agent = getattr(timed_import(self._agent_module), self._agent_name)
+                    self._runtime = AgentRuntime(agent)
+        return self._runtime
+
+    def warmup(self):
+        """Initialize logging, imports, runner and model client; returns what it did and how long"""
+        started = time.perf_counter()
+        setup_logging()
+        runtime = self.get()
+        for name in FIRST_RUN_MODULES:
+            try:
+                timed_import(name)
+            except ImportError:
+                # Module layout differs between ADK versions; the first run imports what it needs
+                pass
+        model = runtime.warm()
+        return {
+            'status': 'warm',
+            'agent': self._agent_name,
+            **model,
+            'warmup_ms': round((time.perf_counter() - started) * 1000, 1),
+            'imports': import_report(),
+        }
+
+
+def is_warmup(request):
+    """Requests to <function-url>/warmup, e.g. from Cloud Scheduler or a startup probe"""
+    return request.path.rstrip('/').endswith('/warmup')
@@ -1,15 +1,21 @@
 import json
 import functions_framework
-from google.cloud import logging
+from flask import Response, stream_with_context
 import sys
 import os
 
 # Add the local path for imports
 sys.path.append(os.path.dirname(__file__))
 
-# Set up logging
-logging_client = logging.Client()
-logging_client.setup_logging()
+from agent_events import NDJSON_HEADERS, agent_timeout, wants_stream
+from warm_start import LazyRuntime, is_warmup, setup_logging
+
+# Event loop thread and ADK Runner, built on the first request or /warmup and
+# reused by every later request; ADK is not imported until then
+RUNTIME = LazyRuntime('agents.sub_agents.agent', 'risk_analyst_agent')
+
+# The coordinator's timeout for this agent; a run it has given up on is cancelled
+TIMEOUT = agent_timeout('risk_analyst_agent')
 
 @functions_framework.http
 def risk_analyst_agent(request):
@@ -31,6 +37,12 @@ def risk_analyst_agent(request):
     }
 
     try:
+        # Pre-initialize imports, runner and model client without running the agent
+        if is_warmup(request):
+            return json.dumps(RUNTIME.warmup()), 200, headers
+
+        setup_logging()
+
         # Get the request data
         request_json = request.get_json(silent=True)
         if not request_json or 'query' not in request_json:
@@ -38,24 +50,22 @@ def risk_analyst_agent(request):
 
         query = request_json['query']
 
-        # Import and use the risk analyst agent
-        from agents.sub_agents.agent import risk_analyst_agent
-
-        # Run the agent using the correct method
-        import asyncio
-        async def run_agent():
-            async for event in risk_analyst_agent.run_live(query):
-                if hasattr(event, 'content') and event.content:
-                    return event.content
-                elif hasattr(event, 'text') and event.text:
-                    return event.text
-                elif hasattr(event, 'message') and event.message:
-                    return event.message
-                elif isinstance(event, str):
-                    return event
-            return "I can help you analyze risks and evaluate potential downsides of investment opportunities."
-
-        result = asyncio.run(run_agent())
+        # Forward every ADK event as NDJSON instead of buffering the run
+        if wants_stream(request, request_json):
+            return Response(
+                stream_with_context(RUNTIME.get().stream_ndjson(query, 'risk_analyst_agent', timeout=TIMEOUT)),
+                headers={**headers, **NDJSON_HEADERS},
+            )
+
+        # Run the agent on the shared loop and keep its final response, within the timeout
+        try:
+            result = RUNTIME.get().run_to_text(query, timeout=TIMEOUT)
+        except TimeoutError:
+            return json.dumps({
+                'agent': 'risk_analyst_agent',
+                'error': f"Timed out after {TIMEOUT:g}s",
+                'status': 'error'
+            }), 504, headers
 
         response = {
             'agent': 'risk_analyst_agent',